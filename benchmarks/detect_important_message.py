@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the detection of known error and warning messages with and without the precompiled message matcher.
+
+The script builds a synthetic stdout by sampling lines from the ``relax_success`` fixture of the ``pw`` parser tests and
+sprinkling in a few error and warning markers. It then times both the line by line detection that is used by the
+``pw.x`` stdout parser and the search over the entire stdout that is used by ``BaseParser._parse_stdout_base``, each
+against an implementation that checks all markers one by one.
+"""
+import argparse
+import pathlib
+import random
+import re
+import time
+
+from aiida_quantumespresso.parsers.parse_raw.messages import get_message_matcher
+from aiida_quantumespresso.parsers.parse_raw.pw import ERROR_MESSAGES, WARNING_MESSAGES, detect_important_message
+from aiida_quantumespresso.utils.mapping import get_logging_container
+
+FILEPATH_FIXTURE = pathlib.Path(__file__).parent.parent / 'tests' / 'parsers' / 'fixtures' / 'pw' / 'relax_success'
+MARKER_LINES = [
+    '     convergence NOT achieved after 100 iterations: stopping',
+    '     some nodes have no k-points',
+    '     Warning: card &INPUTPH ignored',
+    '     DEPRECATED: option will be removed',
+]
+
+
+def detect_reference(logs, line):
+    """Check all markers one by one, as ``detect_important_message`` used to."""
+    for markers, messages in ((ERROR_MESSAGES, logs.error), (WARNING_MESSAGES, logs.warning)):
+        for marker, message in markers.items():
+            if (marker in line) if isinstance(marker, str) else marker.match(line):
+                messages.append(line if message is None else message)
+
+
+def search_reference(logs, stdout, errors, warnings):
+    """Search the entire stdout marker by marker, as ``BaseParser._parse_stdout_base`` used to."""
+    for marker, message in errors.items():
+        if re.search(marker, stdout):
+            logs.error.append(message)
+
+    for marker, message in warnings.items():
+        for warning in set(re.findall(fr'({marker}.+)\n', stdout)):
+            logs.warning.append(warning if message is None else message)
+
+
+def timed(function, *args):
+    """Call the function with the given arguments and return the elapsed time in seconds and the result."""
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=1_000_000, help='Number of lines of the synthetic stdout.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the random sampling of lines.')
+    args = parser.parse_args()
+
+    from aiida_quantumespresso.parsers.ph import PhParser
+
+    random.seed(args.seed)
+    source = (FILEPATH_FIXTURE / 'aiida.out').read_text().split('\n')
+    lines = [random.choice(source) for _ in range(args.lines)]
+
+    for index, line in enumerate(MARKER_LINES):
+        lines[(index + 1) * args.lines // (len(MARKER_LINES) + 1)] = line
+
+    stdout = '\n'.join(lines) + '\n'
+
+    def detect_lines(function):
+        logs = get_logging_container()
+        for line in lines:
+            function(logs, line)
+        return logs
+
+    reference, expected = timed(detect_lines, detect_reference)
+    compiled, logs = timed(detect_lines, detect_important_message)
+    assert logs == expected
+
+    print(f'Detecting messages in a synthetic stdout of {args.lines} lines')
+    print(f'line by line, all markers:        {reference:8.3f} s')
+    print(f'line by line, compiled matcher:   {compiled:8.3f} s ({reference / compiled:.1f}x)')
+
+    errors = dict(PhParser.get_error_map())
+    warnings = dict(PhParser.get_warning_map())
+    matcher = get_message_matcher(PhParser.get_message_registry_name())
+
+    reference, _ = timed(search_reference, get_logging_container(), stdout, errors, warnings)
+    compiled, _ = timed(matcher.search, get_logging_container(), stdout)
+
+    print(f'entire stdout, all markers:       {reference:8.3f} s')
+    print(f'entire stdout, compiled matcher:  {compiled:8.3f} s ({reference / compiled:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
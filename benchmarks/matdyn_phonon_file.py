@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the parsing of the phonon frequencies file of a ``matdyn.x`` calculation.
+
+The script writes a synthetic frequencies file in the fixed-width format of ``matdyn.x``: for each q-point a line with
+its coordinates followed by the frequencies of all branches, six per line, formatted as ``f10.4``. A fraction of the
+frequencies is negative with four integer digits, such that they fill their field completely and are glued to the
+preceding value, as in the real output of ``matdyn.x``. The file is then parsed with
+:func:`~aiida_quantumespresso.parsers.matdyn.parse_raw_matdyn_phonon_file`, which is what ``MatdynParser`` does.
+"""
+import argparse
+import time
+
+import numpy
+from qe_tools import CONSTANTS
+
+from aiida_quantumespresso.parsers.matdyn import parse_raw_matdyn_phonon_file
+
+
+def create_phonon_frequencies(num_qpoints, num_branches, glued_fraction, seed=0):
+    """Return the content of a synthetic frequencies file and the frequencies in cm^-1 that it contains."""
+    rng = numpy.random.default_rng(seed)
+    frequencies = rng.uniform(-50., 1000., size=(num_qpoints, num_branches))
+    glued = rng.random(size=frequencies.shape) < glued_fraction
+    frequencies[glued] = rng.uniform(-9999., -1000., size=glued.sum())
+    frequencies = numpy.round(frequencies, 4)
+    qpoints = rng.uniform(-0.5, 0.5, size=(num_qpoints, 3))
+
+    lines_per_qpoint = -(-num_branches // 6)
+    line_formats = ['%10.4f' * 6] * (num_branches // 6) + ['%10.4f' * (num_branches % 6)] * (num_branches % 6 > 0)
+    qpoint_format = f'{" " * 10}%10.6f%10.6f%10.6f\n' + '\n'.join(line_formats) + '\n'
+    assert len(line_formats) == lines_per_qpoint
+
+    content = [f' &plot nbnd={num_branches:4d}, nks={num_qpoints:6d} /\n']
+    content.extend(qpoint_format % (*qpoint, *values) for qpoint, values in zip(qpoints, frequencies))
+
+    return ''.join(content), frequencies
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--qpoints', type=int, default=100000, help='Number of q-points of the synthetic file.')
+    parser.add_argument('--branches', type=int, default=300, help='Number of phonon branches of the synthetic file.')
+    parser.add_argument('--glued', type=float, default=0.001, help='Fraction of values glued to the previous one.')
+    args = parser.parse_args()
+
+    content, frequencies = create_phonon_frequencies(args.qpoints, args.branches, args.glued)
+
+    start = time.perf_counter()
+    parsed_data = parse_raw_matdyn_phonon_file(content)
+    elapsed = time.perf_counter() - start
+
+    assert not parsed_data['warnings'], parsed_data['warnings']
+    numpy.testing.assert_allclose(parsed_data['phonon_bands'], frequencies * CONSTANTS.invcm_to_THz)
+
+    print(f'Parsed {args.qpoints} q-points with {args.branches} branches ({len(content) / 1e6:.0f} MB)')
+    print(f'parse_raw_matdyn_phonon_file: {elapsed:8.2f} s ({frequencies.size / elapsed / 1e6:.1f} M values/s)')
+
+
+if __name__ == '__main__':
+    main()
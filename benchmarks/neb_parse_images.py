@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the parsing of the images of a NEB calculation sequentially and with a pool of threads or processes.
+
+The script builds a synthetic retrieved folder with the requested number of images, by cycling through the images of the
+``neb`` parser test fixture, and parses each image with :func:`~aiida_quantumespresso.parsers.neb.parse_image`, which is
+exactly what ``NebParser.parse`` does for every image, depending on the ``image_workers`` and ``image_executor`` parser
+options.
+"""
+import argparse
+import pathlib
+import shutil
+import tempfile
+import time
+
+from aiida_quantumespresso.parsers.neb import parse_image
+from aiida_quantumespresso.utils.executors import get_executor
+
+DIRPATH_FIXTURE = pathlib.Path(__file__).parent.parent / 'tests' / 'parsers' / 'fixtures' / 'neb' / 'default'
+
+
+def create_retrieved_folder(dirpath, num_images):
+    """Create a synthetic retrieved folder with ``num_images`` images in ``dirpath``."""
+    fixture_images = sorted(DIRPATH_FIXTURE.glob('aiida_*'))
+
+    for index in range(num_images):
+        shutil.copytree(fixture_images[index % len(fixture_images)], dirpath / f'aiida_{index + 1}')
+
+
+def run(dirpath, num_images, executor=None, max_workers=None):
+    """Parse all images in ``dirpath`` and return the elapsed time in seconds."""
+    start = time.perf_counter()
+    arguments = []
+
+    for index in range(num_images):
+        image = dirpath / f'aiida_{index + 1}'
+        arguments.append((str(image / 'aiida.save' / 'data-file-schema.xml'), str(image / 'PW.out'), {}, {}))
+
+    if executor is None:
+        results = [parse_image(*args) for args in arguments]
+    else:
+        with get_executor(executor, max_workers) as pool:
+            results = list(pool.map(parse_image, *zip(*arguments)))
+
+    assert all(error is None for error, _ in results)
+
+    return time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--images', type=int, default=32, help='Number of images of the synthetic NEB calculation.')
+    parser.add_argument('--workers', type=int, default=4, help='Number of workers of the thread and process pools.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dirname:
+        dirpath = pathlib.Path(dirname)
+        create_retrieved_folder(dirpath, args.images)
+
+        # Parse once to compile the XML schemas, such that all timings below use the compiled schema registry
+        run(dirpath, 1)
+
+        sequential = run(dirpath, args.images)
+        threads = run(dirpath, args.images, 'thread', args.workers)
+        processes = run(dirpath, args.images, 'process', args.workers)
+
+    print(f'Parsed a synthetic NEB calculation with {args.images} images')
+    print(f'sequential:       {sequential:8.2f} s')
+    print(f'thread pool:      {threads:8.2f} s ({sequential / threads:.1f}x with {args.workers} workers)')
+    print(f'process pool:     {processes:8.2f} s ({sequential / processes:.1f}x with {args.workers} workers)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the XML parsing of the `PwParser` with and without the process-wide compiled schema registry.
+
+The script parses the ``data-file-schema.xml`` files of the ``pw`` parser test fixtures in a round-robin fashion, which
+is exactly what ``PwParser.parse_xml`` does for every retrieved calculation.
+"""
+import argparse
+import pathlib
+import time
+
+from aiida_quantumespresso.parsers.parse_xml.pw.parse import parse_xml
+from aiida_quantumespresso.parsers.parse_xml.registry import REGISTRY
+
+DIRPATH_FIXTURES = pathlib.Path(__file__).parent.parent / 'tests' / 'parsers' / 'fixtures' / 'pw'
+
+
+def run(filepaths, runs):
+    """Parse ``runs`` XML files cycling through ``filepaths`` and return the elapsed time in seconds."""
+    start = time.perf_counter()
+
+    for index in range(runs):
+        with filepaths[index % len(filepaths)].open('rb') as handle:
+            parse_xml(handle)
+
+    return time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=1000, help='Number of consecutive parser runs.')
+    args = parser.parse_args()
+
+    filepaths = sorted(DIRPATH_FIXTURES.glob('default_xml_*/data-file-schema.xml'))
+    maxsize = REGISTRY.maxsize
+
+    REGISTRY.maxsize = 0
+    uncached = run(filepaths, args.runs)
+
+    REGISTRY.maxsize = maxsize
+    REGISTRY.clear()
+    cached = run(filepaths, args.runs)
+
+    print(f'Parsed {args.runs} XML files from {len(filepaths)} fixtures')
+    print(f'without schema registry: {uncached:8.2f} s ({uncached / args.runs * 1000:.2f} ms per run)')
+    print(f'with schema registry:    {cached:8.2f} s ({cached / args.runs * 1000:.2f} ms per run)')
+    print(f'speed-up: {uncached / cached:.1f}x (hits={REGISTRY.hits}, misses={REGISTRY.misses})')
+
+
+if __name__ == '__main__':
+    main()
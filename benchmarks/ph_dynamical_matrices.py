@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the parsing of the dynamical matrix files of a ``ph.x`` calculation.
+
+The script writes synthetic dynamical matrix files, with the frequencies and eigenvectors of all modes in the format of
+``ph.x``, for a given number of q-points and atoms. They are then parsed with
+:func:`~aiida_quantumespresso.parsers.parse_raw.ph.parse_raw_ph_output`, which is what ``PhParser`` does, both one after
+the other and in a pool of workers.
+"""
+import argparse
+import time
+
+import numpy
+
+from aiida_quantumespresso.parsers.parse_raw.ph import parse_raw_ph_output
+from aiida_quantumespresso.utils.mapping import get_logging_container
+
+
+def create_dynamical_matrix(num_atoms, seed=0):
+    """Return the content of a synthetic dynamical matrix file with the modes of the given number of atoms."""
+    rng = numpy.random.default_rng(seed)
+    frequencies = rng.uniform(-1., 20., size=3 * num_atoms)
+    eigenvectors = rng.uniform(-1., 1., size=(3 * num_atoms, num_atoms, 6))
+
+    lines = ['Dynamical matrix file', '', '     Diagonalizing the dynamical matrix', '']
+    lines.append('     q = (    0.000000000   0.000000000   0.125000000 )')
+    lines.append('')
+    lines.append(' ' + '*' * 74)
+
+    for mode, (frequency, eigenvector) in enumerate(zip(frequencies, eigenvectors), start=1):
+        lines.append(f'     freq ({mode:5d}) = {frequency:14.6f} [THz] = {frequency * 33.35641:14.6f} [cm-1]')
+        lines.extend(' (' + ''.join(f'{value:10.6f}' for value in atom) + ' )' for atom in eigenvector)
+
+    lines.append(' ' + '*' * 74)
+
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--qpoints', type=int, default=16, help='Number of dynamical matrix files.')
+    parser.add_argument('--atoms', type=int, default=100, help='Number of atoms in the unit cell.')
+    parser.add_argument('--workers', type=int, default=4, help='Number of workers of the pool.')
+    args = parser.parse_args()
+
+    dynamical_matrices = [create_dynamical_matrix(args.atoms, seed) for seed in range(args.qpoints)]
+    size = sum(len(dynmat) for dynmat in dynamical_matrices) / 1e6
+
+    print(f'Parsing {args.qpoints} dynamical matrices with {args.atoms} atoms ({size:.0f} MB)')
+
+    for max_workers, executor in [(None, 'thread'), (args.workers, 'thread'), (args.workers, 'process')]:
+        start = time.perf_counter()
+        logs = get_logging_container()
+        parsed_data, logs = parse_raw_ph_output('', logs, None, dynamical_matrices, max_workers, executor)
+        elapsed = time.perf_counter() - start
+
+        assert not logs.warning, logs.warning
+        assert len(parsed_data['dynamical_matrix_1']['frequencies']) == 3 * args.atoms
+
+        label = 'sequential' if max_workers is None else f'{max_workers} {executor} workers'
+        print(f'{label:20s}: {elapsed:8.2f} s')
+
+
+if __name__ == '__main__':
+    main()
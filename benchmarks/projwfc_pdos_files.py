@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the reading of the PDOS files of a ``projwfc.x`` calculation.
+
+The script writes a synthetic folder with the requested number of ``pdos_atm`` files of a spin-polarised calculation,
+alternating between ``s`` and ``p`` wavefunctions. The files are then read with ``ProjwfcParser._read_pdos_atm_files``,
+which is what ``ProjwfcParser`` does, both sequentially and with a pool of threads as defined by the
+``pdos_max_workers`` parser option. For comparison, the files are also read with the previous implementation, that read
+each file with ``numpy.genfromtxt`` and built the PDOS array by concatenating the columns. Besides the time, the peak of
+the memory allocated while reading the files is reported.
+"""
+import argparse
+import pathlib
+import tempfile
+import time
+import tracemalloc
+
+import numpy
+
+from aiida_quantumespresso.parsers.projwfc import ProjwfcParser
+
+
+def create_pdos_folder(dirpath, num_files, num_energies, seed=0):
+    """Write ``num_files`` spin-polarised ``pdos_atm`` files in ``dirpath`` and return their paths in orbital order."""
+    rng = numpy.random.default_rng(seed)
+    energies = numpy.linspace(-10., 10., num_energies)
+    filepaths = []
+
+    for index in range(num_files):
+        atom, wfc = divmod(index, 2)
+        label, num_orbitals = (('s', 1), ('p', 3))[wfc]
+        columns = rng.random((num_energies, 3 + 2 * num_orbitals))
+        columns[:, 0] = energies
+        filepath = dirpath / f'aiida.pdos_atm#{atom + 1}(Si)_wfc#{wfc + 1}({label})'
+        numpy.savetxt(filepath, columns, fmt='%10.3E', header='E (eV)  ldosup(E)  ldosdw(E)  pdos(E)')
+        filepaths.append(filepath)
+
+    return filepaths
+
+
+def read_pdos_files_reference(filepaths, num_energies):
+    """Return the PDOS array as built by the previous implementation, for spin-polarised calculations."""
+    arrays = [numpy.atleast_2d(numpy.genfromtxt(path))[:, 3:] for path in filepaths]
+    pdos_array = numpy.concatenate(arrays, axis=1)
+    assert pdos_array.shape[0] == num_energies
+
+    return numpy.concatenate([pdos_array[:, 0::2], pdos_array[:, 1::2]], axis=1)
+
+
+def read_pdos_files(filepaths, num_energies, max_workers=None):
+    """Return the PDOS array as built by ``ProjwfcParser``, for spin-polarised calculations."""
+    return ProjwfcParser._read_pdos_atm_files(filepaths, num_energies, 2, False, max_workers)  # pylint: disable=protected-access
+
+
+def run(function, *args):
+    """Call the function with the given arguments and return the result, the elapsed time and the peak memory in MB.
+
+    The peak memory is measured in a second call, since tracing the memory allocations slows down the function.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, elapsed, peak / 1e6
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=500, help='Number of `pdos_atm` files of the synthetic folder.')
+    parser.add_argument('--energies', type=int, default=2000, help='Number of energies of each PDOS file.')
+    parser.add_argument('--workers', type=int, default=4, help='Number of workers of the thread pool.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dirname:
+        filepaths = create_pdos_folder(pathlib.Path(dirname), args.files, args.energies)
+        reference, time_reference, peak_reference = run(read_pdos_files_reference, filepaths, args.energies)
+        sequential, time_sequential, peak_sequential = run(read_pdos_files, filepaths, args.energies)
+        threads, time_threads, peak_threads = run(read_pdos_files, filepaths, args.energies, args.workers)
+
+    assert numpy.array_equal(sequential, reference)
+    assert numpy.array_equal(threads, reference)
+
+    print(f'Read {args.files} PDOS files with {args.energies} energies into {reference.nbytes / 1e6:.1f} MB of PDOS')
+    print(f'genfromtxt + concatenate: {time_reference:8.2f} s, peak memory {peak_reference:8.1f} MB')
+    print(f'preallocated, sequential: {time_sequential:8.2f} s, peak memory {peak_sequential:8.1f} MB')
+    print(f'preallocated, {args.workers} threads: {time_threads:8.2f} s, peak memory {peak_threads:8.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
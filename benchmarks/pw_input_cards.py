@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the generation of the input file of a ``PwCalculation`` for large structures and explicit k-point lists.
+
+The script creates synthetic structures with an increasing number of sites, with the ``FIXED_COORDS``,
+``ATOMIC_FORCES`` and ``ATOMIC_VELOCITIES`` settings, together with explicit lists of k-points with weights, and times
+``PwCalculation._generate_PWCPinputdata``, which is what ``PwCalculation.prepare_for_submission`` calls to write the
+input file. The ``ATOMIC_POSITIONS`` and ``K_POINTS`` cards are checked against the same cards formatted row by row.
+
+The nodes are created in a temporary profile, so the script does not require a configured AiiDA profile.
+"""
+import argparse
+import io
+import time
+
+from aiida import load_profile, orm
+from aiida.storage.sqlite_temp import SqliteTempBackend
+import numpy
+
+KIND_NAMES = ('Si', 'Ge')
+
+
+def create_inputs(num_sites, num_kpoints, seed=0):
+    """Return the inputs of ``_generate_PWCPinputdata`` for a synthetic structure and list of k-points."""
+    from aiida_pseudo.data.pseudo import UpfData
+
+    rng = numpy.random.default_rng(seed)
+    cell = numpy.diag(rng.uniform(50., 100., size=3))
+
+    structure = orm.StructureData(cell=cell.tolist())
+    for kind_name in KIND_NAMES:
+        structure.append_kind(orm.Kind(symbols=kind_name, name=kind_name))
+    for index, position in enumerate(rng.uniform(0., 50., size=(num_sites, 3)).tolist()):
+        structure.append_site(orm.Site(kind_name=KIND_NAMES[index % len(KIND_NAMES)], position=position))
+
+    kpoints = orm.KpointsData()
+    kpoints.set_cell(cell.tolist())
+    kpoints.set_kpoints(rng.uniform(-0.5, 0.5, size=(num_kpoints, 3)), weights=rng.uniform(0., 1., num_kpoints))
+
+    pseudos = {}
+    for kind_name in KIND_NAMES:
+        content = f'<UPF version="2.0.1"><PP_HEADER\nelement="{kind_name}"\nz_valence="4.0"\n/></UPF>\n'
+        pseudos[kind_name] = UpfData(io.BytesIO(content.encode('utf-8')), filename=f'{kind_name}.upf').store()
+
+    settings = {
+        'FIXED_COORDS': (rng.random(size=(num_sites, 3)) < 0.5).tolist(),
+        'ATOMIC_FORCES': rng.normal(size=(num_sites, 3)).tolist(),
+        'ATOMIC_VELOCITIES': rng.normal(size=(num_sites, 3)).tolist(),
+    }
+    parameters = orm.Dict({'CONTROL': {'calculation': 'md'}, 'SYSTEM': {'ecutwfc': 30.}})
+
+    return parameters, settings, pseudos, structure.store(), kpoints.store()
+
+
+def format_cards(settings, structure, kpoints):
+    """Return the ``ATOMIC_POSITIONS`` and ``K_POINTS`` cards formatted row by row."""
+    lines = ['ATOMIC_POSITIONS angstrom\n']
+    for site, fixed in zip(structure.sites, settings['FIXED_COORDS']):
+        coordinates = ' '.join(f'{coordinate:18.10f}' for coordinate in site.position)
+        flags = ' '.join(str(int(not flag)) for flag in fixed)
+        lines.append(f'{site.kind_name.ljust(6)} {coordinates} {flags}\n')
+
+    points, weights = kpoints.get_kpoints(also_weights=True)
+    lines.append(f'K_POINTS crystal\n{len(points):d}\n')
+    for point, weight in zip(points, weights):
+        lines.append(f'  {point[0]:18.10f} {point[1]:18.10f} {point[2]:18.10f} {weight:18.10f}\n')
+
+    return ''.join(lines)
+
+
+def main():
+    """Run the benchmark."""
+    from aiida_quantumespresso.calculations.pw import PwCalculation
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sites', type=int, nargs='+', default=[1000, 5000, 20000], help='Numbers of sites.')
+    parser.add_argument('--kpoints', type=int, nargs='+', default=[1000, 10000, 50000], help='Numbers of k-points.')
+    args = parser.parse_args()
+
+    load_profile(SqliteTempBackend.create_profile('benchmark'), allow_switch=True)
+
+    for num_sites, num_kpoints in zip(args.sites, args.kpoints):
+        parameters, settings, pseudos, structure, kpoints = create_inputs(num_sites, num_kpoints)
+        expected = format_cards(settings, structure, kpoints)
+
+        start = time.perf_counter()
+        inputfile, _ = PwCalculation._generate_PWCPinputdata(  # pylint: disable=protected-access
+            parameters, dict(settings), pseudos, structure, kpoints
+        )
+        elapsed = time.perf_counter() - start
+
+        positions, forces = inputfile.index('ATOMIC_POSITIONS'), inputfile.index('ATOMIC_FORCES')
+        start_kpoints, end_kpoints = inputfile.index('K_POINTS'), inputfile.index('CELL_PARAMETERS')
+        assert inputfile[positions:forces] + inputfile[start_kpoints:end_kpoints] == expected
+
+        print(f'{num_sites:6d} sites {num_kpoints:6d} k-points: {elapsed:8.3f} s ({len(inputfile) / 1e6:.1f} MB)')
+
+
+if __name__ == '__main__':
+    main()
@@ -18,6 +18,7 @@ from qe_tools.converters import get_parameters_from_cell
 from aiida_quantumespresso.data.hubbard_structure import HubbardStructureData
 from aiida_quantumespresso.utils.convert import convert_input_to_namelist_entry
 from aiida_quantumespresso.utils.hubbard import HubbardUtils
+from aiida_quantumespresso.utils.remote_cache import get_remote_cache_copy_lists
 
 from .base import CalcJob
 from .helpers import QEInputValidationError
@@ -25,6 +26,9 @@ from .helpers import QEInputValidationError
 LegacyUpfData = DataFactory('core.upf')
 UpfData = DataFactory('pseudo.upf')
 
+# Format of the rows of the cards with one row per site: the kind name followed by a three-dimensional vector
+_SITE_ROW_FORMAT = '%-6s %18.10f %18.10f %18.10f\n'
+
 
 class BasePwCpInputGenerator(CalcJob):
     """Base `CalcJob` for implementations for pw.x and cp.x of Quantum ESPRESSO."""
@@ -263,6 +267,22 @@ class BasePwCpInputGenerator(CalcJob):
         input_filecontent, local_copy_pseudo_list = self._generate_PWCPinputdata(*arguments)
         local_copy_list += local_copy_pseudo_list
 
+        # The files that were staged in a remote cache directory with `stage_remote_cache` are symlinked from there
+        remote_file_cache = settings.pop('REMOTE_FILE_CACHE', None)
+        if remote_file_cache is not None:
+            if not isinstance(remote_file_cache, str) or not os.path.isabs(remote_file_cache):
+                raise exceptions.InputValidationError(
+                    f'The `REMOTE_FILE_CACHE` setting should be an absolute path, got: {remote_file_cache}'
+                )
+            local_copy_list, remote_symlink_list = get_remote_cache_copy_lists(
+                self.node.computer, remote_file_cache, local_copy_list
+            )
+            if local_copy_list:
+                self.node.logger.warning(
+                    f'The files {[filename for _, filename, _ in local_copy_list]} are not staged in the remote cache '
+                    f'`{remote_file_cache}` and are copied instead.'
+                )
+
         with folder.open(self.metadata.options.input_filename, 'w') as handle:
             handle.write(input_filecontent)
 
@@ -531,78 +551,71 @@ class BasePwCpInputGenerator(CalcJob):
         del atomic_species_card_list
 
         # ------------ ATOMIC_POSITIONS -----------
-        coordinates = [site.position for site in structure.sites]
+        # The rows of the cards are formatted in bulk from arrays, since structures can have many thousands of sites
+        sites = structure.sites
+        site_kind_names = [site.kind_name for site in sites]
+        coordinates = numpy.array([site.position for site in sites], dtype=float).reshape(len(sites), 3)
         if use_fractional:
             atomic_positions_card_header = 'ATOMIC_POSITIONS crystal\n'
-            coordinates = numpy.dot(coordinates, numpy.linalg.inv(numpy.array(structure.cell))).tolist()
+            coordinates = numpy.dot(coordinates, numpy.linalg.inv(numpy.array(structure.cell)))
         else:
             atomic_positions_card_header = 'ATOMIC_POSITIONS angstrom\n'
 
-        atomic_positions_card_list = [
-            '{0} {1:18.10f} {2:18.10f} {3:18.10f}'.format(site.kind_name.ljust(6), *site_coords)  # pylint: disable=consider-using-f-string
-            for site, site_coords in zip(structure.sites, coordinates)
-        ]
-
         fixed_coords = settings.pop('FIXED_COORDS', None)
 
-        if fixed_coords is not None:
-            fixed_coords_strings = [
-                ' {:d} {:d} {:d}'.format(*row) for row in numpy.int32(numpy.invert(fixed_coords)).tolist()  # pylint: disable=consider-using-f-string
-            ]
-            atomic_positions_card_list = [
-                atomic_pos_str + fixed_coords_str
-                for atomic_pos_str, fixed_coords_str in zip(atomic_positions_card_list, fixed_coords_strings)
-            ]
+        if fixed_coords is None:
+            atomic_positions_card_rows = _format_card_rows(_SITE_ROW_FORMAT, site_kind_names, coordinates)
+        else:
+            atomic_positions_card_rows = _format_card_rows(
+                _SITE_ROW_FORMAT.replace('\n', ' %d %d %d\n'),
+                site_kind_names,
+                coordinates,
+                numpy.int32(numpy.invert(fixed_coords)),
+            )
 
-        atomic_positions_card = atomic_positions_card_header + '\n'.join(atomic_positions_card_list) + '\n'
+        atomic_positions_card = atomic_positions_card_header + atomic_positions_card_rows
 
         # Optional ATOMIC_FORCES card
         atomic_forces = settings.pop('ATOMIC_FORCES', None)
         if atomic_forces is not None:
 
             # Checking that there are as many forces defined as there are sites in the structure
-            if len(atomic_forces) != len(structure.sites):
+            if len(atomic_forces) != len(sites):
                 raise exceptions.InputValidationError(
-                    f'Input structure contains {len(structure.sites):d} sites, but atomic forces has length '
+                    f'Input structure contains {len(sites):d} sites, but atomic forces has length '
                     f'{len(atomic_forces):d}'
                 )
 
-            lines = ['ATOMIC_FORCES\n']
-            for site, vector in zip(structure.sites, atomic_forces):
-
-                # Checking that all 3 dimensions are specified:
+            # Checking that all 3 dimensions are specified:
+            for site, vector in zip(sites, atomic_forces):
                 if len(vector) != 3:
                     raise exceptions.InputValidationError(f'Forces({vector}) for {site} has not length three')
 
-                lines.append('{0} {1:18.10f} {2:18.10f} {3:18.10f}\n'.format(site.kind_name.ljust(6), *vector))  # pylint: disable=consider-using-f-string
-
             # Append to atomic_positions_card so that this card will be printed directly after
-            atomic_positions_card += ''.join(lines)
-            del lines
+            atomic_positions_card += 'ATOMIC_FORCES\n' + _format_card_rows(
+                _SITE_ROW_FORMAT, site_kind_names, numpy.array(atomic_forces, dtype=float)
+            )
 
         # Optional ATOMIC_VELOCITIES card
         atomic_velocities = settings.pop('ATOMIC_VELOCITIES', None)
         if atomic_velocities is not None:
 
             # Checking that there are as many velocities defined as there are sites in the structure
-            if len(atomic_velocities) != len(structure.sites):
+            if len(atomic_velocities) != len(sites):
                 raise exceptions.InputValidationError(
-                    f'Input structure contains {len(structure.sites):d} sites, but atomic velocities has length '
+                    f'Input structure contains {len(sites):d} sites, but atomic velocities has length '
                     f'{len(atomic_velocities):d}'
                 )
 
-            lines = ['ATOMIC_VELOCITIES\n']
-            for site, vector in zip(structure.sites, atomic_velocities):
-
-                # Checking that all 3 dimensions are specified:
+            # Checking that all 3 dimensions are specified:
+            for site, vector in zip(sites, atomic_velocities):
                 if len(vector) != 3:
                     raise exceptions.InputValidationError(f'Velocities({vector}) for {site} has not length three')
 
-                lines.append('{0} {1:18.10f} {2:18.10f} {3:18.10f}\n'.format(site.kind_name.ljust(6), *vector))  # pylint: disable=consider-using-f-string
-
             # Append to atomic_positions_card so that this card will be printed directly after
-            atomic_positions_card += ''.join(lines)
-            del lines
+            atomic_positions_card += 'ATOMIC_VELOCITIES\n' + _format_card_rows(
+                _SITE_ROW_FORMAT, site_kind_names, numpy.array(atomic_velocities, dtype=float)
+            )
 
         # I set the variables that must be specified, related to the system
         # Set some variables (look out at the case! NAMELISTS should be
@@ -620,7 +633,7 @@ class BasePwCpInputGenerator(CalcJob):
             except ValueError as exc:
                 raise QEInputValidationError(f'Cannot get structure parameters from cell: {exc}') from exc
             input_params['SYSTEM'].update(structure_parameters)
-        input_params['SYSTEM']['nat'] = len(structure.sites)
+        input_params['SYSTEM']['nat'] = len(sites)
         input_params['SYSTEM']['ntyp'] = len(structure.kinds)
 
         # ============ I prepare the k-points =============
@@ -694,10 +707,13 @@ class BasePwCpInputGenerator(CalcJob):
                 pass
             else:
                 kpoints_card_list.append(f'{num_kpoints:d}\n')
-                for kpoint, weight in zip(kpoints_list, weights):
-                    kpoints_card_list.append(
-                        f'  {kpoint[0]:18.10f} {kpoint[1]:18.10f} {kpoint[2]:18.10f} {weight:18.10f}\n'
+                kpoints_card_list.append(
+                    _format_card_rows(
+                        '  %18.10f %18.10f %18.10f %18.10f\n',
+                        numpy.asarray(kpoints_list, dtype=float),
+                        numpy.asarray(weights, dtype=float),
                     )
+                )
 
             kpoints_card = ''.join(kpoints_card_list)
             del kpoints_card_list
@@ -765,6 +781,33 @@ class BasePwCpInputGenerator(CalcJob):
         return inputfile, local_copy_list_to_append
 
 
+def _format_card_rows(row_format, *columns):
+    """Return the rows of a card, formatting the values of all rows with a single ``%`` operation.
+
+    This produces the exact same output as formatting each row separately, but is much faster for cards with many rows,
+    such as the ``ATOMIC_POSITIONS`` of large structures or long explicit lists of ``K_POINTS``.
+
+    :param row_format: the ``%`` format of a single row, including the newline.
+    :param columns: sequences with one element or one one-dimensional array of values per row, whose values are
+        formatted in the order of the columns.
+    :return: the formatted rows concatenated in a single string.
+    """
+    num_rows = len(columns[0])
+
+    if num_rows == 0:
+        return ''
+
+    blocks = [numpy.asarray(column).reshape(num_rows, -1) for column in columns]
+    table = numpy.empty((num_rows, sum(block.shape[1] for block in blocks)), dtype=object)
+
+    start = 0
+    for block in blocks:
+        table[:, start:start + block.shape[1]] = block
+        start += block.shape[1]
+
+    return (row_format * num_rows) % tuple(table.ravel().tolist())
+
+
 def _lowercase_dict(dictionary, dict_name):
     return _case_transform_dict(dictionary, dict_name, '_lowercase_dict', str.lower)
 
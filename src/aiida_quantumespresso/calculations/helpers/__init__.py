@@ -1,13 +1,22 @@
 # -*- coding: utf-8 -*-
 """Utilities to automatically format, convert and validate data structures from python to fortran."""
+import collections
 import copy
 import difflib
+import functools
+import hashlib
+import io
+import json
 import os
+import tempfile
+import types
 import xml.dom.minidom
 
 from aiida.common import InputValidationError, InternalError
 from packaging.version import Version
 
+DIRPATH_DEFINITIONS = os.path.dirname(os.path.abspath(__file__))
+
 
 class QEInputValidationError(InputValidationError):
     """Raise when the parser encounters an error while creating the input file of Quantum ESPRESSO."""
@@ -50,7 +59,182 @@ def _check_and_convert(keyword, val, expected_type):
     return outval
 
 
-def pw_input_helper(input_params, structure, stop_at_first_error=False, flat_mode=False, version='6.2'):
+KeywordIndex = collections.namedtuple('KeywordIndex', ('variables', 'dimensions', 'multidimensions', 'names'))
+KeywordIndex.__doc__ = """Index of the keywords defined in an ``INPUT_PW.xml`` file, see :func:`get_keyword_index`.
+
+Each of the ``variables``, ``dimensions`` and ``multidimensions`` is a read-only mapping of the lowercase keyword names
+onto a dictionary with the ``namelist`` and the ``expected_type`` of the keyword, if these are defined. Variables also
+define the list of ``allowed_values`` of string keywords that have a fixed set of options, dimensions the ``end_val`` of
+the array and multidimensions the ``start``, ``end`` and ``indexes`` of each dimension. The ``names`` are a tuple of all
+keyword names.
+"""
+
+
+def get_pw_definitions_versions():
+    """Return the versions of Quantum ESPRESSO for which the ``INPUT_PW`` definitions are shipped with this module.
+
+    :return: list of the versions sorted from oldest to newest.
+    """
+    prefix = 'INPUT_PW-'
+    suffix = '.xml'
+    versions = [
+        fname[len(prefix):-len(suffix)]
+        for fname in os.listdir(DIRPATH_DEFINITIONS)
+        if fname.startswith(prefix) and fname.endswith(suffix)
+    ]
+    return sorted(versions, key=Version)
+
+
+def _compile_dimension_type(node):
+    """Return the type of a ``var`` or ``dimension`` node, which is defined on the group for groups of variables."""
+    expected_type = node.getAttribute('type')
+
+    # Fix for groups of variables
+    if expected_type == '':
+        if node.parentNode.tagName in ('vargroup', 'dimensiongroup'):
+            expected_type = node.parentNode.getAttribute('type')
+
+    return expected_type.upper()
+
+
+def _compile_namelist(node, entry):
+    """Add the name of the namelist that contains the node to the entry of the keyword index, if there is one."""
+    parent = node
+    try:
+        while True:
+            parent = parent.parentNode
+            if parent.tagName == 'namelist':
+                entry['namelist'] = parent.getAttribute('name').upper()
+                break
+    except AttributeError:
+        # There are also variables in cards instead of namelists: I ignore them
+        pass
+
+
+def compile_keyword_index(handle):
+    """Compile the keywords defined in an ``INPUT_PW.xml`` file into a dictionary.
+
+    :param handle: filelike object with the content of the ``INPUT_PW.xml`` file.
+    :return: dictionary with the ``variables``, ``dimensions`` and ``multidimensions`` as described in
+        :class:`KeywordIndex`, which can be serialized to JSON.
+    """
+    dom = xml.dom.minidom.parse(handle)
+
+    # ========== List of known PW variables (from XML file) ===============
+    valid_kws = {}
+    for keyword in dom.getElementsByTagName('var'):
+        entry = valid_kws[keyword.getAttribute('name').lower()] = {}
+        _compile_namelist(keyword, entry)
+        entry['expected_type'] = _compile_dimension_type(keyword)
+
+        # The options of string keywords are quoted and multiple aliases of the same option are separated by commas
+        options = [option.getAttribute('val') for option in keyword.getElementsByTagName('opt')]
+        values = [value.strip() for option in options for value in option.split(',')]
+        if entry['expected_type'] == 'CHARACTER' and values and all(
+            len(value) > 1 and value[0] == value[-1] == "'" for value in values
+        ):
+            entry['allowed_values'] = [value[1:-1] for value in values]
+
+    # ====== List of known PW 'dimensions' (arrays) (from XML file) ===========
+    valid_dims = {}
+    for dim in dom.getElementsByTagName('dimension'):
+        entry = valid_dims[dim.getAttribute('name').lower()] = {}
+        _compile_namelist(dim, entry)
+        entry['expected_type'] = _compile_dimension_type(dim)
+        # I assume start_val is always 1
+        start_val = dim.getAttribute('start')
+        if start_val != '1':
+            raise InternalError(
+                f"Wrong start value '{start_val}' in input array (dimension) {dim.getAttribute('name')}"
+            )
+        # I save the string as it is; somewhere else I will check for its value
+        entry['end_val'] = dim.getAttribute('end')
+
+    # ====== List of known PW 'multidimensions' (arrays) (from XML file) ===========
+    valid_multidims = {}
+    for dim in dom.getElementsByTagName('multidimension'):
+        entry = valid_multidims[dim.getAttribute('name').lower()] = {}
+        _compile_namelist(dim, entry)
+
+        start_values = dim.getAttribute('start').split(',')
+        end_values = dim.getAttribute('end').split(',')
+        indexes = dim.getAttribute('indexes').split(',')
+
+        entry['expected_type'] = dim.getAttribute('type').upper()
+        entry['start'] = start_values
+        entry['end'] = end_values
+        entry['indexes'] = indexes
+
+        if len(set([len(start_values), len(end_values), len(indexes)])) != 1:
+            raise InternalError(
+                'XML schema defines a multidimension keyword with start, end and indexes values of unequal length'
+            )
+
+    return {'variables': valid_kws, 'dimensions': valid_dims, 'multidimensions': valid_multidims}
+
+
+@functools.lru_cache(maxsize=None)
+def get_keyword_index(version='6.2', filepath=None, dirpath_cache=None):
+    """Return the index of the keywords defined in the ``INPUT_PW`` definitions of the given version.
+
+    The definitions are compiled once per process. If ``dirpath_cache`` is specified, the compiled index is also
+    written to that directory as a JSON file, which is keyed on the checksum of the definitions, and read from there
+    in other processes.
+
+    :param version: string with the version of Quantum ESPRESSO whose definitions are shipped with this module.
+    :param filepath: the path to an ``INPUT_PW.xml`` file to use instead of the definitions shipped with this module,
+        e.g. that of a newer version of Quantum ESPRESSO, which can be found in the ``PW/Doc`` folder of its source.
+    :param dirpath_cache: optional directory in which the compiled index is cached on disk.
+    :return: the :class:`KeywordIndex`.
+    :raise QEInputValidationError: if there are no definitions for the version.
+    """
+    if filepath is None:
+        filepath = os.path.join(DIRPATH_DEFINITIONS, f'INPUT_PW-{version}.xml')
+
+    try:
+        with open(filepath, 'rb') as handle:
+            content = handle.read()
+    except IOError as exception:
+        versions = get_pw_definitions_versions()
+        strictversions = versions + [version]
+        strictversions = sorted(strictversions, key=Version)
+        pos = strictversions.index(version)
+        if pos == 0:
+            add_str = ' (the version you specified is too old)'
+        else:
+            add_str = f' (the older, closest version you can use is {strictversions[pos - 1]})'
+        raise QEInputValidationError(
+            f"Unknown Quantum Espresso version: {version}. Available versions: {', '.join(versions)};{add_str}"
+        ) from exception
+
+    index = None
+
+    if dirpath_cache is not None:
+        filepath_cache = os.path.join(dirpath_cache, f'INPUT_PW-{hashlib.md5(content).hexdigest()}.json')
+        try:
+            with open(filepath_cache, 'r', encoding='utf-8') as handle:
+                index = json.load(handle)
+        except (IOError, ValueError):
+            pass
+
+    if index is None:
+        index = compile_keyword_index(io.BytesIO(content))
+
+        if dirpath_cache is not None:
+            # Write to a temporary file first, such that concurrent processes never read a partially written index
+            os.makedirs(dirpath_cache, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=dirpath_cache, suffix='.json', delete=False) as handle:
+                json.dump(index, handle)
+            os.replace(handle.name, filepath_cache)
+
+    names = tuple(name for keywords in index.values() for name in keywords)
+
+    return KeywordIndex(names=names, **{key: types.MappingProxyType(value) for key, value in index.items()})
+
+
+def pw_input_helper(
+    input_params, structure, stop_at_first_error=False, flat_mode=False, version='6.2', keyword_index=None
+):
     """Validate if the input dictionary for Quantum ESPRESSO is valid.
 
     Return the dictionary (possibly with small variations: e.g. convert integer to float where necessary, recreate the
@@ -105,6 +289,9 @@ def pw_input_helper(input_params, structure, stop_at_first_error=False, flat_mod
         available in the validator. It reads the definitions from the XML files
         in the same folder as this python module. If the version is not
         recognised, the Exception message will also suggest a close-by version.
+    :param keyword_index: the :class:`KeywordIndex` to validate the keywords against. By default, the index of the
+        definitions of ``version`` is used, see :func:`get_keyword_index`, which can also compile the ``INPUT_PW.xml``
+        file of a newer version of Quantum ESPRESSO.
 
     :raise QEInputValidationError:
         if the input is not considered valid.
@@ -175,141 +362,13 @@ def pw_input_helper(input_params, structure, stop_at_first_error=False, flat_mod
         'ecutwfc',
     ]}
 
-    # ===================== PARSING OF THE XML DEFINITION FILE ===============
-    module_dir = os.path.dirname(__file__)
-    if module_dir == '':
-        module_dir = os.curdir
-    xml_path = os.path.join(module_dir, f'INPUT_PW-{version}.xml')
-    try:
-        with open(xml_path, 'r', encoding='utf-8') as handle:
-            dom = xml.dom.minidom.parse(handle)
-    except IOError as exception:
-        prefix = 'INPUT_PW-'
-        suffix = '.xml'
-        versions = [
-            fname[len(prefix):-len(suffix)]
-            for fname in os.listdir(module_dir)
-            if fname.startswith(prefix) and fname.endswith(suffix)
-        ]
-        versions = sorted(versions, key=Version)
-        strictversions = versions + [version]
-        strictversions = sorted(strictversions, key=Version)
-        pos = strictversions.index(version)
-        if pos == 0:
-            add_str = ' (the version you specified is too old)'
-        else:
-            add_str = f' (the older, closest version you can use is {strictversions[pos - 1]})'
-        raise QEInputValidationError(
-            f"Unknown Quantum Espresso version: {version}. Available versions: {', '.join(versions)};{add_str}"
-        ) from exception
-
-    # ========== List of known PW variables (from XML file) ===============
-    known_kws = dom.getElementsByTagName('var')
-    valid_kws = {}
-    for keyword in known_kws:
-        if keyword in valid_kws:
-            raise InternalError(
-                f"Something strange, I found more than one keyword '{keyword}' in the XML description..."
-            )
-
-        valid_kws[keyword.getAttribute('name').lower()] = {}
-        parent = keyword
-        try:
-            while True:
-                parent = parent.parentNode
-                if parent.tagName == 'namelist':
-                    valid_kws[keyword.getAttribute('name').lower()]['namelist'] = parent.getAttribute('name').upper()
-                    break
-        except AttributeError:
-            # There are also variables in cards instead of namelists:
-            # I ignore them
-            pass
-            # raise QEInputValidationError("Unable to find namelist for "
-            #     "keyword %s." % kw.getAttribute('name'))
-        expected_type = keyword.getAttribute('type')
-        # Fix for groups of variables
-        if expected_type == '':
-            if keyword.parentNode.tagName == 'vargroup':
-                expected_type = keyword.parentNode.getAttribute('type')
-        valid_kws[keyword.getAttribute('name').lower()]['expected_type'] = expected_type.upper()
-
-    # ====== List of known PW 'dimensions' (arrays) (from XML file) ===========
-    known_dims = dom.getElementsByTagName('dimension')
-    valid_dims = {}
-    for dim in known_dims:
-        if dim in valid_dims:
-            raise InternalError(f"Something strange, I found more than one keyword '{dim}' in the XML description...")
-
-        valid_dims[dim.getAttribute('name').lower()] = {}
-        parent = dim
-        try:
-            while True:
-                parent = parent.parentNode
-                if parent.tagName == 'namelist':
-                    valid_dims[dim.getAttribute('name').lower()]['namelist'] = parent.getAttribute('name').upper()
-                    break
-        except AttributeError:
-            # There are also variables in cards instead of namelists:
-            # I ignore them
-            pass
-            # raise QEInputValidationError("Unable to find namelist "
-            #     "for keyword %s." % dim.getAttribute('name'))
-        expected_type = dim.getAttribute('type')
-        # Fix for groups of variables
-        if expected_type == '':
-            if dim.parentNode.tagName == 'vargroup':
-                expected_type = dim.parentNode.getAttribute('type')
-        valid_dims[dim.getAttribute('name').lower()]['expected_type'] = expected_type.upper()
-        # I assume start_val is always 1
-        start_val = dim.getAttribute('start')
-        if start_val != '1':
-            raise InternalError(
-                f"Wrong start value '{start_val}' in input array (dimension) {dim.getAttribute('name')}"
-            )
-        # I save the string as it is; somewhere else I will check for its value
-        valid_dims[dim.getAttribute('name').lower()]['end_val'] = dim.getAttribute('end')
-
-    # ====== List of known PW 'multidimensions' (arrays) (from XML file) ===========
-    known_multidims = dom.getElementsByTagName('multidimension')
-    valid_multidims = {}
-    for dim in known_multidims:
-        if dim in valid_multidims:
-            raise InternalError(
-                f"Something strange, I found more than one multidimensional keyword '{dim}' in the XML description..."
-            )
-
-        valid_multidims[dim.getAttribute('name').lower()] = {}
-        parent = dim
-        try:
-            while True:
-                parent = parent.parentNode
-                if parent.tagName == 'namelist':
-                    valid_multidims[dim.getAttribute('name').lower()]['namelist'] = parent.getAttribute('name').upper()
-                    break
-        except AttributeError:
-            # There are also variables in cards instead of namelists: ignore them
-            pass
-
-        expected_type = dim.getAttribute('type').upper()
-        start_values = dim.getAttribute('start').split(',')
-        end_values = dim.getAttribute('end').split(',')
-        indexes = dim.getAttribute('indexes').split(',')
-
-        valid_multidims[dim.getAttribute('name').lower()]['expected_type'] = expected_type
-        valid_multidims[dim.getAttribute('name').lower()]['start'] = start_values
-        valid_multidims[dim.getAttribute('name').lower()]['end'] = end_values
-        valid_multidims[dim.getAttribute('name').lower()]['indexes'] = indexes
-
-        if len(set([len(start_values), len(end_values), len(indexes)])) != 1:
-            raise InternalError(
-                'XML schema defines a multidimension keyword with start, end and indexes values of unequal length'
-            )
+    # ===================== KEYWORD INDEX OF THE XML DEFINITION FILE ===============
+    if keyword_index is None:
+        keyword_index = get_keyword_index(version)
 
-    # Used to suggest valid keywords if an unknown one is found
-    valid_invars_list = list(
-        set([i.lower() for i in valid_dims] + [i.lower() for i in valid_multidims] + [i.lower() for i in valid_kws]) -
-        set(blocked_kws)
-    )
+    valid_kws = keyword_index.variables
+    valid_dims = keyword_index.dimensions
+    valid_multidims = keyword_index.multidimensions
 
     # =================== Check for blocked keywords ===========================
     for keyword in input_params_internal:
@@ -582,6 +641,7 @@ def pw_input_helper(input_params, structure, stop_at_first_error=False, flat_mod
         else:
             # Neither a variable nor an array
             err_str = f'Problem parsing keyword {keyword}. '
+            valid_invars_list = list(set(keyword_index.names) - set(blocked_kws))
             similar_kws = difflib.get_close_matches(keyword, valid_invars_list)
             if len(similar_kws) == 1:
                 err_str += f'Maybe you wanted to specify {similar_kws[0]}?'
@@ -6,7 +6,7 @@ from aiida import orm
 from aiida.common import datastructures, exceptions
 import numpy
 
-from aiida_quantumespresso.calculations import _lowercase_dict, _uppercase_dict
+from aiida_quantumespresso.calculations import _lowercase_dict, _pop_parser_options, _uppercase_dict
 from aiida_quantumespresso.calculations.pw import PwCalculation
 from aiida_quantumespresso.utils.convert import convert_input_to_namelist_entry
 
@@ -324,6 +324,8 @@ class PhCalculation(CalcJob):
         calcinfo.retrieve_list.append(os.path.join(filepath_xml_tensor, self._OUTPUT_XML_TENSOR_FILE_NAME))
         calcinfo.retrieve_list += settings.pop('ADDITIONAL_RETRIEVE_LIST', [])
 
+        _pop_parser_options(self, settings)
+
         if settings:
             unknown_keys = ', '.join(list(settings.keys()))
             raise exceptions.InputValidationError(f'`settings` contained unexpected keys: {unknown_keys}')
@@ -82,6 +82,11 @@ class PwCalculation(BasePwCpInputGenerator):
             help='The `output_band` output node of the successful calculation if present.')
         spec.output('output_kpoints', valid_type=orm.KpointsData, required=False)
         spec.output('output_atomic_occupations', valid_type=orm.Dict, required=False)
+        spec.output('output_parameters_arrays', valid_type=orm.ArrayData, required=False,
+            help='The bulky output parameters, if the `output_parameters_arrays` parser option is enabled. These are '
+                 'the `symmetries` and `lattice_symmetries`, the per-species `starting_magnetization`, '
+                 '`magnetization_angle1` and `magnetization_angle2` and the Hubbard `atomic_occupations`, which are '
+                 'then no longer stored in the `output_parameters` and `output_atomic_occupations`, respectively.')
         spec.default_output_node = 'output_parameters'
 
         # Unrecoverable errors: required retrieved files could not be read, parsed or are otherwise incomplete
@@ -14,6 +14,11 @@ def cmd_launch():
     """Launch calculations."""
 
 
+@cmd_calculation.group('monitor')
+def cmd_monitor():
+    """Monitor running calculations."""
+
+
 # Import the sub commands to register them with the CLI
 from .cp import launch_calculation
 from .dos import launch_calculation
@@ -24,5 +29,5 @@ from .ph import launch_calculation
 from .pp import launch_calculation
 from .projwfc import launch_calculation
 from .pw2wannier90 import launch_calculation
-from .pw import launch_calculation
+from .pw import launch_calculation, monitor_calculation
 from .q2r import launch_calculation
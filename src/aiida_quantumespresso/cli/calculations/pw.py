@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
-"""Command line scripts to launch a `PwCalculation` for testing and demonstration purposes."""
+"""Command line scripts to launch a `PwCalculation` for testing and demonstration purposes and to monitor it."""
+import os
+import time
+
+from aiida.cmdline.params import arguments
 from aiida.cmdline.params import options as options_core
 from aiida.cmdline.params import types
-from aiida.cmdline.utils import decorators
+from aiida.cmdline.utils import decorators, echo
 import click
 
-from . import cmd_launch
+from . import cmd_launch, cmd_monitor
 from ..utils import defaults, launch, options, validate
 
 CALCS_REQUIRING_PARENT = set(['nscf'])
@@ -119,3 +123,114 @@ def launch_calculation(
         inputs['metadata']['dry_run'] = True
 
     launch.launch_process(CalculationFactory('quantumespresso.pw'), daemon, **inputs)
+
+
+@cmd_monitor.command('pw')
+@arguments.CALCULATION()
+@click.option(
+    '-i',
+    '--interval',
+    type=click.FloatRange(min=0),
+    default=30.,
+    show_default=True,
+    help='Number of seconds to wait between reading the new content of the stdout.'
+)
+@click.option('--once', is_flag=True, help='Only parse the stdout that has been written so far and exit.')
+@decorators.with_dbenv()
+def monitor_calculation(calculation, interval, once):
+    """Follow the ionic steps of a running PwCalculation.
+
+    The stdout is read directly from the remote working directory. Every time it is read, only the content that was
+    appended since the previous time is transferred and parsed. For each completed ionic step the total energy, the
+    maximum force and the accuracy of the last SCF iteration are printed. As long as the calculation is queued and
+    the stdout does not exist yet, nothing is printed.
+    """
+    import numpy
+
+    from aiida_quantumespresso.calculations.pw import PwCalculation
+    from aiida_quantumespresso.parsers.parse_raw.pw_stream import PwStdoutState, parse_stdout_tail
+
+    if calculation.process_class is not PwCalculation:
+        echo.echo_critical(f'{calculation.process_label}<{calculation.pk}> is not a `PwCalculation`.')
+
+    remote_workdir = calculation.get_remote_workdir()
+
+    if remote_workdir is None:
+        echo.echo_critical(f'{calculation.process_label}<{calculation.pk}> has not been submitted yet.')
+
+    filepath = os.path.join(remote_workdir, calculation.get_option('output_filename'))
+    settings = calculation.inputs.settings.get_dict() if 'settings' in calculation.inputs else {}
+    state = PwStdoutState(calculation.inputs.parameters.get_dict(), settings.get('parser_options', None))
+    steps = {}
+    num_steps = 0
+
+    click.echo(f"{'Step':>6s} {'Energy [eV]':>20s} {'Max force [eV/A]':>18s} {'SCF accuracy [eV]':>18s}")
+
+    with calculation.get_transport() as transport:
+        while True:
+            finished = once or state.job_done or calculation.is_terminated
+
+            try:
+                tail = read_stdout_tail(transport, filepath, state.offset)
+            except OSError as exception:
+                echo.echo_critical(f'failed to read the stdout `{filepath}`: {exception}')
+
+            try:
+                trajectory = parse_stdout_tail(tail, state)
+            except Exception as exception:  # pylint: disable=broad-except
+                echo.echo_critical(f'failed to parse the stdout `{filepath}`: {exception}')
+
+            finished = finished or state.job_done
+
+            for key, values in trajectory.items():
+                steps.setdefault(key, []).extend(values)
+
+            # The forces of the last step may not have been written yet, so it is only printed once the run finished
+            energies = steps.get('energy', [])
+            forces = steps.get('forces', [])
+            scf_accuracy = steps.get('scf_accuracy', [])
+            scf_iterations = numpy.cumsum(steps.get('scf_iterations', []))
+
+            for step in range(num_steps, len(energies) if finished else len(energies) - 1):
+                force = numpy.linalg.norm(forces[step], axis=-1).max() if step < len(forces) else None
+                accuracy = None
+
+                if step < len(scf_iterations) and 0 < scf_iterations[step] <= len(scf_accuracy):
+                    accuracy = scf_accuracy[scf_iterations[step] - 1]
+
+                click.echo(
+                    f'{step + 1:6d} {energies[step]:20.8f} '
+                    f"{'-' if force is None else f'{force:.6f}':>18s} "
+                    f"{'-' if accuracy is None else f'{accuracy:.3e}':>18s}"
+                )
+
+            num_steps = max(num_steps, len(energies) if finished else len(energies) - 1)
+
+            if finished:
+                break
+
+            time.sleep(interval)
+
+
+def read_stdout_tail(transport, filepath, offset):
+    """Return the content of a remote file starting at the given byte offset.
+
+    A file that does not exist yet, e.g. because the calculation is still queued, is treated as an empty file.
+
+    :param transport: an open transport to the computer on which the file is stored.
+    :param filepath: the absolute path of the file on the remote computer.
+    :param offset: the number of bytes at the start of the file that should be skipped.
+    :returns: the bytes of the file after the offset.
+    :raises OSError: if the file cannot be read.
+    """
+    from aiida.common.escaping import escape_for_bash
+
+    if not transport.isfile(filepath):
+        return b''
+
+    retval, stdout, stderr = transport.exec_command_wait_bytes(f'tail -c +{offset + 1} {escape_for_bash(filepath)}')
+
+    if retval != 0:
+        raise OSError(stderr.decode('utf-8', errors='replace').strip())
+
+    return stdout
@@ -88,6 +88,22 @@ class ForceConstantsData(SinglefileData):
         """
         return tuple(self.base.attributes.get('qpoints_mesh'))
 
+    @property
+    def force_constants(self):
+        """Return the real-space force constants.
+
+        The force constants are parsed from the file the first time they are requested and then cached on the instance.
+
+        :return: a numpy.array with 7 indices, of the kind C(mi1, mi2, mi3, ji1, ji2, na1, na2), see
+            :func:`parse_q2r_force_constants_file`.
+        """
+        if getattr(self, '_force_constants', None) is None:
+            lines = self.get_content().splitlines()
+            _, force_constants, _ = parse_q2r_force_constants_file(lines, also_force_constants=True)
+            self._force_constants = force_constants  # pylint: disable=attribute-defined-outside-init
+
+        return self._force_constants
+
 
 def parse_q2r_force_constants_file(lines, also_force_constants=False):
     """Parse the real-space interatomic force constants file from QE-Q2R.
@@ -121,7 +137,7 @@ def parse_q2r_force_constants_file(lines, also_force_constants=False):
         * (ji1, ji2): axis of the displacement of the two atoms (from 1 to 3)
         * (na1, na2): atom numbers in the cell.
     """
-    # pylint: disable=too-many-statements,too-many-branches,too-many-nested-blocks
+    # pylint: disable=too-many-statements,too-many-branches
 
     parsed_data = {}
     warnings = []
@@ -204,32 +220,53 @@ def parse_q2r_force_constants_file(lines, also_force_constants=False):
 
         force_constants = ()
         if also_force_constants:
-            # read force_constants
-            force_constants = numpy.zeros(qpoints_mesh + (3, 3, nat, nat), dtype=float)
-            for ji1 in range(3):
-                for ji2 in range(3):
-                    for na1 in range(nat):
-                        for na2 in range(nat):
+            force_constants = parse_force_constants_block(lines[current_line:], qpoints_mesh, nat)
 
-                            indices = tuple(int(c) for c in lines[current_line].split())
-                            current_line += 1
-                            if (ji1 + 1, ji2 + 1, na1 + 1, na2 + 1) != indices:
-                                raise ValueError('Wrong indices in force constants')
+    except (IndexError, ValueError) as exc:
+        raise ValueError(str(exc) + '\nForce constants file could not be parsed (incorrect file format)') from exc
 
-                            for mi3 in range(qpoints_mesh[2]):
-                                for mi2 in range(qpoints_mesh[1]):
-                                    for mi1 in range(qpoints_mesh[0]):
+    return parsed_data, force_constants, warnings
 
-                                        line = lines[current_line].split()
-                                        indices = tuple(int(c) for c in line[:3])
 
-                                        if (mi1 + 1, mi2 + 1, mi3 + 1) != indices:
-                                            raise ValueError('Wrong supercell indices in force constants')
+def parse_force_constants_block(lines, qpoints_mesh, nat):
+    """Parse the block with the real-space force constants of a QE-Q2R force constants file.
 
-                                        force_constants[mi1, mi2, mi3, ji1, ji2, na1, na2] = float(line[3])
-                                        current_line += 1
+    The block consists of a header line ``ji1 ji2 na1 na2`` for each pair of displacement axes and atoms, followed by a
+    line ``mi1 mi2 mi3 C`` for each point of the supercell, with ``mi1`` running fastest. Since the number of values of
+    each part is fixed, the entire block is converted into a single array at once, which is then reshaped such that the
+    indices can be verified and the force constants transposed to the order of the output array.
 
-    except (IndexError, ValueError) as exc:
-        raise ValueError(str(exc) + '\nForce constants file could not be parsed (incorrect file format)') from exc
+    :param lines: the lines of the file, starting at the first line of the force constants block
+    :param qpoints_mesh: length-3 tuple with number of qpoints in each dimension of the reciprocal lattice
+    :param nat: the number of atoms
+    :return: the real-space force constants: array with 7 indices, of the kind C(mi1, mi2, mi3, ji1, ji2, na1, na2)
+    :raises ValueError: if the block is incomplete or its indices are wrong
+    """
+    num_blocks = 9 * nat**2
+    num_supercell = int(numpy.prod(qpoints_mesh))
+    num_lines = num_blocks * (1 + num_supercell)
 
-    return parsed_data, force_constants, warnings
+    if len(lines) < num_lines:
+        raise ValueError('Force constants block is incomplete')
+
+    values = numpy.array(' '.join(lines[:num_lines]).split(), dtype=float)
+
+    if values.size != num_blocks * 4 * (1 + num_supercell):
+        raise ValueError('Wrong number of values in force constants')
+
+    values = values.reshape(num_blocks, 4 * (1 + num_supercell))
+
+    # The header of each block should contain the indices (ji1, ji2, na1, na2), with na2 running fastest
+    indices = numpy.indices((3, 3, nat, nat)).reshape(4, -1).T + 1
+    if not numpy.array_equal(values[:, :4], indices):
+        raise ValueError('Wrong indices in force constants')
+
+    # The lines of each block should contain the supercell indices (mi1, mi2, mi3), with mi1 running fastest
+    supercell = values[:, 4:].reshape((num_blocks,) + tuple(reversed(qpoints_mesh)) + (4,))
+    indices = numpy.stack(numpy.indices(tuple(reversed(qpoints_mesh)))[::-1], axis=-1) + 1
+    if not numpy.array_equal(supercell[..., :3], numpy.broadcast_to(indices, supercell[..., :3].shape)):
+        raise ValueError('Wrong supercell indices in force constants')
+
+    force_constants = supercell[..., 3].reshape((3, 3, nat, nat) + tuple(reversed(qpoints_mesh)))
+
+    return numpy.ascontiguousarray(force_constants.transpose(6, 5, 4, 0, 1, 2, 3))
@@ -6,14 +6,17 @@ All `Parser` implementations in `aiida-quantumespresso` must use this base class
 from __future__ import annotations
 
 import abc
+import functools
 import re
 from typing import Optional, Tuple
 
-from aiida.common import AttributeDict
+from aiida.common import AttributeDict, exceptions
 from aiida.engine import ExitCode
 from aiida.parsers import Parser
 
 from aiida_quantumespresso.parsers.parse_raw.base import convert_qe_time_to_sec
+from aiida_quantumespresso.parsers.parse_raw.messages import MESSAGES, MessageMatcher
+from aiida_quantumespresso.utils.profiling import record_timings, timed
 
 __all__ = ('BaseParser',)
 
@@ -33,6 +36,72 @@ class BaseParser(Parser, metaclass=abc.ABCMeta):
     }
     success_string = 'JOB DONE'
 
+    _recording_timings = False
+
+    def __init_subclass__(cls, **kwargs):
+        """Register the error and warning markers of the parser class in the message registry.
+
+        The markers are interpreted as regular expressions. Plugins can add markers to a parser class through
+        :func:`~aiida_quantumespresso.parsers.parse_raw.messages.register_messages`, using the name returned by
+        :meth:`get_message_registry_name`.
+
+        The ``parse`` method of the parser class is wrapped, such that the timings of its phases are recorded if this is
+        requested through the parser options, see :meth:`get_profiling_options`.
+        """
+        super().__init_subclass__(**kwargs)
+        MESSAGES.register(
+            cls.get_message_registry_name(),
+            errors={re.compile(marker): message for marker, message in cls.get_error_map().items()},
+            warnings={re.compile(marker): message for marker, message in cls.get_warning_map().items()},
+        )
+
+        if 'parse' in cls.__dict__:
+            cls.parse = _record_parse_timings(cls.parse)
+
+    def get_profiling_options(self) -> Tuple[bool, bool]:
+        """Return whether the timings of the parsing phases should be recorded and whether the parsing is profiled.
+
+        These are enabled by the ``timings`` and ``profile`` parser options in the ``settings`` input, respectively,
+        where ``profile`` implies ``timings``. The timings are stored in the ``parser_timings`` extra of the node, as
+        a dictionary with the wall time in seconds of each phase that was marked with :meth:`timed` and the ``total``.
+        The ``cProfile`` statistics of the functions with the largest cumulative time are stored in the
+        ``parser_profile`` extra.
+
+        :returns: tuple of two booleans, whether the timings are recorded and whether the parsing is profiled.
+        """
+        try:
+            settings = self.node.inputs.settings.get_dict()
+        except (exceptions.NotExistent, AttributeError):
+            settings = {}
+
+        parser_options = settings.get('parser_options', None) or {}
+        profile = bool(parser_options.get('profile', False))
+
+        return profile or bool(parser_options.get('timings', False)), profile
+
+    @staticmethod
+    def timed(phase: str):
+        """Return a context manager that records the wall time spent in the block as the given phase of the parsing.
+
+        The time is only recorded if this is enabled through the parser options, see :meth:`get_profiling_options`::
+
+            with self.timed('stdout'):
+                parsed_data = parse_stdout(stdout)
+
+        :param phase: the name of the phase, e.g. ``stdout``.
+        """
+        return timed(phase)
+
+    @classmethod
+    def get_message_registry_name(cls) -> str:
+        """Return the name under which the error and warning markers of the parser class are registered."""
+        return f'{cls.__module__}.{cls.__qualname__}'
+
+    @classmethod
+    def get_message_matcher(cls) -> MessageMatcher:
+        """Return the precompiled matcher for the error and warning markers of the parser class."""
+        return MESSAGES.get_matcher(cls.get_message_registry_name())
+
     @classmethod
     def get_error_map(cls):
         """The full error map of the parser class."""
@@ -60,7 +129,7 @@ class BaseParser(Parser, metaclass=abc.ABCMeta):
             return '', {}, logs
 
         try:
-            with self.retrieved.open(filename_stdout, 'r') as handle:
+            with self.timed('read'), self.retrieved.open(filename_stdout, 'r') as handle:
                 stdout = handle.read()
         except OSError as exception:
             logs.error.append('ERROR_OUTPUT_STDOUT_READ')
@@ -68,7 +137,8 @@ class BaseParser(Parser, metaclass=abc.ABCMeta):
             return '', {}, logs
 
         try:
-            parsed_data, logs = self._parse_stdout_base(stdout, logs)
+            with self.timed('stdout'):
+                parsed_data, logs = self._parse_stdout_base(stdout, logs)
         except Exception as exception:
             logs.error.append('ERROR_OUTPUT_STDOUT_PARSE')
             logs.error.append(exception)
@@ -193,24 +263,49 @@ class BaseParser(Parser, metaclass=abc.ABCMeta):
                 except ValueError:
                     logs.warnings.append('Unable to convert wall time from `stdout` to seconds.')
 
+        matcher = cls.get_message_matcher()
+
         # Look for typical Quantum ESPRESSO error messages between %%%%%-lines that are not in our error map
         if re.search(r'\%\%\%\%\%', stdout):  # Note: using e.g. `\%{5}` is significantly slower
             for error_message in set(re.split(r'\%\%\%\%\%\n', stdout)[1::2]):
 
-                if not any(error_marker in error_message for error_marker in cls.get_error_map().keys()):
+                if not matcher.has_error(error_message):
                     logs.error.append(error_message.rstrip('\n%'))
 
-        # Look for error messages in general
-        for error_marker, error, in cls.get_error_map().items():
-            if re.search(fr'{error_marker}', stdout):
-                logs.error.append(error)
-
-        # Look for lines with warnings from the `warning_map`
-        for warning_marker, warning in cls.get_warning_map().items():
-            for warning_message in set(re.findall(fr'({warning_marker}.+)\n', stdout)):
-                if warning is not None:
-                    logs.warning.append(warning)
-                else:
-                    logs.warning.append(warning_message)
+        # Look for error messages in general and for lines with warnings from the `warning_map`
+        matcher.search(logs, stdout)
 
         return parsed_data, logs
+
+
+def _record_parse_timings(parse):
+    """Wrap the ``parse`` method of a parser class to record the timings of its phases if requested.
+
+    :param parse: the ``parse`` method of a subclass of ``BaseParser``.
+    """
+
+    @functools.wraps(parse)
+    def wrapper(self, **kwargs):
+        # The ``parse`` of a parent class called through ``super`` is part of the recording that is already active
+        if self._recording_timings:
+            return parse(self, **kwargs)
+
+        timings, profile = self.get_profiling_options()
+
+        if not timings:
+            return parse(self, **kwargs)
+
+        self._recording_timings = True
+
+        try:
+            with record_timings(profile) as result:
+                return parse(self, **kwargs)
+        finally:
+            self._recording_timings = False
+            timings = {phase: round(seconds, 6) for phase, seconds in result['timings'].items()}
+            self.node.base.extras.set('parser_timings', timings)
+
+            if profile:
+                self.node.base.extras.set('parser_profile', result['profile'])
+
+    return wrapper
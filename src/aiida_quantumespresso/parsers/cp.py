@@ -1,13 +1,26 @@
 # -*- coding: utf-8 -*-
+import contextlib
+import functools
+import os
+import tempfile
+
+from aiida.common import exceptions
 from aiida.orm import Dict, TrajectoryData
 import numpy
 from packaging.version import Version
 from qe_tools import CONSTANTS
 
 from aiida_quantumespresso.utils.mapping import get_logging_container
+from aiida_quantumespresso.utils.trajectory import (
+    TrajectoryArrayWriter,
+    get_trajectory_chunk_size,
+    get_trajectory_sampling,
+    sample_trajectory_array,
+    set_trajectory,
+)
 
 from .base import BaseParser
-from .parse_raw.cp import parse_cp_raw_output, parse_cp_traj_stanzas
+from .parse_raw.cp import iterate_cp_traj_chunks, parse_cp_raw_output, parse_cp_traj_array
 
 
 class CpParser(BaseParser):
@@ -69,9 +82,10 @@ class CpParser(BaseParser):
 
         output_xml = retrieved.base.repository.get_object_content(xml_files[0])
         output_xml_counter = None if no_trajectory_output else retrieved.base.repository.get_object_content(filename_counter)
-        out_dict, _raw_successful = parse_cp_raw_output(
-            stdout, output_xml, output_xml_counter, print_counter_xml
-        )
+        with self.timed('xml'):
+            out_dict, _raw_successful = parse_cp_raw_output(
+                stdout, output_xml, output_xml_counter, print_counter_xml
+            )
 
         if not no_trajectory_output:
             # parse the trajectory. Units in Angstrom, picoseconds and eV.
@@ -82,6 +96,21 @@ class CpParser(BaseParser):
                 'enthalpy_plus_kinetic', 'energy_constant_motion', 'volume', 'pressure'
             ]
 
+            try:
+                settings = self.node.inputs.settings.get_dict()
+            except exceptions.NotExistent:
+                settings = {}
+
+            parser_options = settings.get('parser_options', None) or {}
+
+            # With the `trajectory_chunk_size` parser option, the trajectory files are parsed in chunks of frames that
+            # are written to a temporary directory, such that the full trajectory is never held in memory.
+            try:
+                chunk_size = get_trajectory_chunk_size(parser_options)
+            except ValueError as exception:
+                logs.error.append(f'{exception}: building the trajectory in memory.')
+                chunk_size = None
+
             # order of atom in the output trajectory changed somewhere after 6.5
             if Version(out_dict['creator_version']) > Version('6.5'):
                 new_cp_ordering = True
@@ -116,138 +145,160 @@ class CpParser(BaseParser):
                 ('stresses', 'str', 1.0, 3) #stress in GPa
             ]
 
-            for name, extension, scale, elements in trajectories:
-                try:
-                    with retrieved.base.repository.open(f'{self.node.process_class._PREFIX}.{extension}') as datafile:
-                        data = [l.split() for l in datafile]
-                        # POSITIONS stored in angstrom
-                    traj_data = parse_cp_traj_stanzas(
-                        num_elements=elements, splitlines=data, prepend_name=f'{name}_traj', rescale=scale
-                    )
+            trajectory_directory = tempfile.TemporaryDirectory() if chunk_size else contextlib.nullcontext()
+
+            with trajectory_directory as dirpath:
+                for name, extension, scale, elements in trajectories:
                     # here initialize the dictionary.
                     if extension == 'cel':
                         # NOTE: the trajectory output has the cell matrix transposed!!
-                        raw_trajectory['cells'] = numpy.array(traj_data['cells_traj_data']).transpose((0, 2, 1))
+                        transform = functools.partial(numpy.transpose, axes=(0, 2, 1))
+                        key = 'cells'
                     elif extension == 'str':
-                        raw_trajectory['stresses'] = numpy.array(traj_data['stresses_traj_data'])
+                        transform = numpy.asarray
+                        key = 'stresses'
+                    else:
+                        transform = functools.partial(self._get_reordered_array, reordering=reordering)
+                        key = f'{name}_ordered'
+                    try:
+                        with retrieved.base.repository.open(f'{self.node.process_class._PREFIX}.{extension}') as datafile:
+                            # POSITIONS stored in angstrom
+                            with self.timed('trajectory'):
+                                times, raw_trajectory[key] = self._parse_trajectory_file(
+                                    datafile, name, elements, scale, transform, chunk_size, dirpath
+                                )
+                        if extension == 'pos':
+                            raw_trajectory['traj_times'] = times
+                    except IOError:
+                        out_dict['warnings'].append(f'Unable to open the {extension.upper()} file... skipping.')
+
+                # =============== EVP trajectory ============================
+                try:
+                    with retrieved.base.repository.open(f'{self._node.process_class._PREFIX}.evp') as handle:
+                        matrix = numpy.genfromtxt(handle)
+                    # there might be a different format if the matrix has one row only
+                    try:
+                        matrix.shape[1]
+                    except IndexError:
+                        matrix = numpy.array(numpy.matrix(matrix))
+
+                    if Version(out_dict['creator_version']) > Version('5.1'):
+                        # Between version 5.1 and 5.1.1, someone decided to change
+                        # the .evp output format, without any way to know that this
+                        # happened... SVN commit 11158.
+                        # I here use the version number to parse, plus some
+                        # heuristics to check that I'm doing the right thing
+                        #print "New version"
+                        raw_trajectory['steps'] = numpy.array(matrix[:, 0], dtype=int)
+                        raw_trajectory['times'] = matrix[:, 1]  # TPS, ps
+                        raw_trajectory['electronic_kinetic_energy'] = matrix[:, 2] * CONSTANTS.hartree_to_ev  # EKINC, eV
+                        raw_trajectory['cell_temperature'] = matrix[:, 3]  # TEMPH, K
+                        raw_trajectory['ionic_temperature'] = matrix[:, 4]  # TEMPP, K
+                        raw_trajectory['scf_total_energy'] = matrix[:, 5] * CONSTANTS.hartree_to_ev  # ETOT, eV
+                        raw_trajectory['enthalpy'] = matrix[:, 6] * CONSTANTS.hartree_to_ev  # ENTHAL, eV
+                        raw_trajectory['enthalpy_plus_kinetic'] = matrix[:, 7] * CONSTANTS.hartree_to_ev  # ECONS, eV
+                        raw_trajectory['energy_constant_motion'] = matrix[:, 8] * CONSTANTS.hartree_to_ev  # ECONT, eV
+                        raw_trajectory['volume'] = matrix[:, 9] * (CONSTANTS.bohr_to_ang**3)  # volume, angstrom^3
+                        raw_trajectory['pressure'] = matrix[:, 10]  # out_press, GPa
                     else:
-                        raw_trajectory[f'{name}_ordered'] = self._get_reordered_array(
-                            traj_data[f'{name}_traj_data'], reordering
+                        #print "Old version"
+                        raw_trajectory['steps'] = numpy.array(matrix[:, 0], dtype=int)
+                        raw_trajectory['electronic_kinetic_energy'] = matrix[:, 1] * CONSTANTS.hartree_to_ev  # EKINC, eV
+                        raw_trajectory['cell_temperature'] = matrix[:, 2]  # TEMPH, K
+                        raw_trajectory['ionic_temperature'] = matrix[:, 3]  # TEMPP, K
+                        raw_trajectory['scf_total_energy'] = matrix[:, 4] * CONSTANTS.hartree_to_ev  # ETOT, eV
+                        raw_trajectory['enthalpy'] = matrix[:, 5] * CONSTANTS.hartree_to_ev  # ENTHAL, eV
+                        raw_trajectory['enthalpy_plus_kinetic'] = matrix[:, 6] * CONSTANTS.hartree_to_ev  # ECONS, eV
+                        raw_trajectory['energy_constant_motion'] = matrix[:, 7] * CONSTANTS.hartree_to_ev  # ECONT, eV
+                        raw_trajectory['volume'] = matrix[:, 8] * (CONSTANTS.bohr_to_ang**3)  # volume, angstrom^3
+                        raw_trajectory['pressure'] = matrix[:, 9]  # out_press, GPa
+                        raw_trajectory['times'] = matrix[:, 10]  # TPS, ps
+
+                    # Huristics to understand if it's correct.
+                    # A better heuristics could also try to fix possible issues
+                    # (in new versions of QE, it's possible to recompile it with
+                    # the __OLD_FORMAT flag to get back the old version format...)
+                    # but I won't do it, as there may be also other columns swapped.
+                    # Better to stop and ask the user to check what's going on.
+
+                    #work around for 100ps format bug
+                    mask = numpy.array(raw_trajectory['traj_times']) >= 0
+                    len_bugged = len(numpy.array(raw_trajectory['times'])[mask == False])
+                    len_ok = len(numpy.array(raw_trajectory['times'])[mask])
+                    if len_ok > 0:
+                        max_time_difference = abs(
+                            numpy.array(raw_trajectory['times'])[mask] - numpy.array(raw_trajectory['traj_times'])[mask]
+                        ).max()
+                    else:
+                        max_time_difference = 0.0
+
+                    if max_time_difference > 1.e-4 or (
+                        len_bugged > 0 and numpy.array(raw_trajectory['times'])[mask == False].min() < 100.0
+                    ):  # It is typically ~1.e-7 due to roundoff errors
+                        # If there is a large discrepancy
+                        # it means there is something very weird going on...
+                        return self.exit_codes.ERROR_READING_TRAJECTORY_DATA
+
+                    # keep both times array (that usually are duplicated)
+                    # so that the user can check them by himselves
+                    if len_bugged > 0:
+                        out_dict['warnings'].append(
+                            '100ps format bug detected: ignoring trajectory\'s printed time from 100ps on'
                         )
-                    if extension == 'pos':
-                        raw_trajectory['traj_times'] = numpy.array(traj_data[f'{name}_traj_times'])
                 except IOError:
-                    out_dict['warnings'].append(f'Unable to open the {extension.upper()} file... skipping.')
-
-            # =============== EVP trajectory ============================
-            try:
-                with retrieved.base.repository.open(f'{self._node.process_class._PREFIX}.evp') as handle:
-                    matrix = numpy.genfromtxt(handle)
-                # there might be a different format if the matrix has one row only
-                try:
-                    matrix.shape[1]
-                except IndexError:
-                    matrix = numpy.array(numpy.matrix(matrix))
-
-                if Version(out_dict['creator_version']) > Version('5.1'):
-                    # Between version 5.1 and 5.1.1, someone decided to change
-                    # the .evp output format, without any way to know that this
-                    # happened... SVN commit 11158.
-                    # I here use the version number to parse, plus some
-                    # heuristics to check that I'm doing the right thing
-                    #print "New version"
-                    raw_trajectory['steps'] = numpy.array(matrix[:, 0], dtype=int)
-                    raw_trajectory['times'] = matrix[:, 1]  # TPS, ps
-                    raw_trajectory['electronic_kinetic_energy'] = matrix[:, 2] * CONSTANTS.hartree_to_ev  # EKINC, eV
-                    raw_trajectory['cell_temperature'] = matrix[:, 3]  # TEMPH, K
-                    raw_trajectory['ionic_temperature'] = matrix[:, 4]  # TEMPP, K
-                    raw_trajectory['scf_total_energy'] = matrix[:, 5] * CONSTANTS.hartree_to_ev  # ETOT, eV
-                    raw_trajectory['enthalpy'] = matrix[:, 6] * CONSTANTS.hartree_to_ev  # ENTHAL, eV
-                    raw_trajectory['enthalpy_plus_kinetic'] = matrix[:, 7] * CONSTANTS.hartree_to_ev  # ECONS, eV
-                    raw_trajectory['energy_constant_motion'] = matrix[:, 8] * CONSTANTS.hartree_to_ev  # ECONT, eV
-                    raw_trajectory['volume'] = matrix[:, 9] * (CONSTANTS.bohr_to_ang**3)  # volume, angstrom^3
-                    raw_trajectory['pressure'] = matrix[:, 10]  # out_press, GPa
-                else:
-                    #print "Old version"
-                    raw_trajectory['steps'] = numpy.array(matrix[:, 0], dtype=int)
-                    raw_trajectory['electronic_kinetic_energy'] = matrix[:, 1] * CONSTANTS.hartree_to_ev  # EKINC, eV
-                    raw_trajectory['cell_temperature'] = matrix[:, 2]  # TEMPH, K
-                    raw_trajectory['ionic_temperature'] = matrix[:, 3]  # TEMPP, K
-                    raw_trajectory['scf_total_energy'] = matrix[:, 4] * CONSTANTS.hartree_to_ev  # ETOT, eV
-                    raw_trajectory['enthalpy'] = matrix[:, 5] * CONSTANTS.hartree_to_ev  # ENTHAL, eV
-                    raw_trajectory['enthalpy_plus_kinetic'] = matrix[:, 6] * CONSTANTS.hartree_to_ev  # ECONS, eV
-                    raw_trajectory['energy_constant_motion'] = matrix[:, 7] * CONSTANTS.hartree_to_ev  # ECONT, eV
-                    raw_trajectory['volume'] = matrix[:, 8] * (CONSTANTS.bohr_to_ang**3)  # volume, angstrom^3
-                    raw_trajectory['pressure'] = matrix[:, 9]  # out_press, GPa
-                    raw_trajectory['times'] = matrix[:, 10]  # TPS, ps
-
-                # Huristics to understand if it's correct.
-                # A better heuristics could also try to fix possible issues
-                # (in new versions of QE, it's possible to recompile it with
-                # the __OLD_FORMAT flag to get back the old version format...)
-                # but I won't do it, as there may be also other columns swapped.
-                # Better to stop and ask the user to check what's going on.
-
-                #work around for 100ps format bug
-                mask = numpy.array(raw_trajectory['traj_times']) >= 0
-                len_bugged = len(numpy.array(raw_trajectory['times'])[mask == False])
-                len_ok = len(numpy.array(raw_trajectory['times'])[mask])
-                if len_ok > 0:
-                    max_time_difference = abs(
-                        numpy.array(raw_trajectory['times'])[mask] - numpy.array(raw_trajectory['traj_times'])[mask]
-                    ).max()
-                else:
-                    max_time_difference = 0.0
-
-                if max_time_difference > 1.e-4 or (
-                    len_bugged > 0 and numpy.array(raw_trajectory['times'])[mask == False].min() < 100.0
-                ):  # It is typically ~1.e-7 due to roundoff errors
-                    # If there is a large discrepancy
-                    # it means there is something very weird going on...
-                    return self.exit_codes.ERROR_READING_TRAJECTORY_DATA
-
-                # keep both times array (that usually are duplicated)
-                # so that the user can check them by himselves
-                if len_bugged > 0:
-                    out_dict['warnings'].append(
-                        '100ps format bug detected: ignoring trajectory\'s printed time from 100ps on'
-                    )
-            except IOError:
-                out_dict['warnings'].append('Unable to open the EVP file... skipping.')
-
-            # get the symbols from the input
-            # TODO: I should have kinds in TrajectoryData
-            input_structure = self.node.inputs.structure
-            raw_trajectory['symbols'] = [str(i.kind_name) for i in input_structure.sites]
-
-            traj = TrajectoryData()
-            traj.set_trajectory(
-                stepids=raw_trajectory['steps'],
-                cells=raw_trajectory['cells'],
-                symbols=raw_trajectory['symbols'],
-                positions=raw_trajectory['positions_ordered'],
-                times=raw_trajectory['times'],
-                velocities=raw_trajectory['velocities_ordered'],
-            )
-
-            # eventually set the forces
-            try:
-                traj.set_array('forces', raw_trajectory['forces_ordered'])
-            except KeyError:
-                out_dict['warnings'].append('failed to set forces')
+                    out_dict['warnings'].append('Unable to open the EVP file... skipping.')
 
-            # eventually set the stress
-            if 'stresses' in raw_trajectory:
-                traj.set_array('stresses',raw_trajectory['stresses'])
+                # get the symbols from the input
+                # TODO: I should have kinds in TrajectoryData
+                input_structure = self.node.inputs.structure
+                raw_trajectory['symbols'] = [str(i.kind_name) for i in input_structure.sites]
 
-            for this_name in evp_keys:
+                # The frames of the trajectory can be sub-sampled and their precision reduced through the parser options,
+                # while the scalar observables of the EVP file are always stored for all steps.
+                try:
+                    frames, dtype = get_trajectory_sampling(parser_options)
+                except ValueError as exception:
+                    logs.error.append(f'{exception}: storing the full trajectory.')
+                    frames, dtype = slice(None), None
+
+                for key in ['steps', 'times', 'cells', 'positions_ordered', 'velocities_ordered']:
+                    if key in raw_trajectory:
+                        raw_trajectory[key] = sample_trajectory_array(raw_trajectory[key], frames)
+
+                for key in ['forces_ordered', 'stresses']:
+                    if key in raw_trajectory:
+                        raw_trajectory[key] = sample_trajectory_array(raw_trajectory[key], frames, dtype)
+
+                traj = TrajectoryData()
+                set_trajectory(
+                    traj,
+                    dtype=dtype,
+                    stepids=raw_trajectory['steps'],
+                    cells=raw_trajectory['cells'],
+                    symbols=raw_trajectory['symbols'],
+                    positions=raw_trajectory['positions_ordered'],
+                    times=raw_trajectory['times'],
+                    velocities=raw_trajectory['velocities_ordered'],
+                )
+
+                # eventually set the forces
                 try:
-                    traj.set_array(this_name, raw_trajectory[this_name])
+                    traj.set_array('forces', raw_trajectory['forces_ordered'])
                 except KeyError:
-                    # Some columns may have not been parsed, skip
-                    pass
+                    out_dict['warnings'].append('failed to set forces')
+
+                # eventually set the stress
+                if 'stresses' in raw_trajectory:
+                    traj.set_array('stresses',raw_trajectory['stresses'])
+
+                for this_name in evp_keys:
+                    try:
+                        traj.set_array(this_name, raw_trajectory[this_name])
+                    except KeyError:
+                        # Some columns may have not been parsed, skip
+                        pass
 
-            self.out('output_trajectory', traj)
+                self.out('output_trajectory', traj)
 
         # Remove big dictionaries that would be redundant
         # For atoms and cell, there is a small possibility that nothing is parsed but then probably nothing moved.
@@ -268,6 +319,45 @@ class CpParser(BaseParser):
 
         return self.exit(logs=logs)
 
+    @staticmethod
+    def _parse_trajectory_file(handle, name, num_elements, rescale, transform, chunk_size=None, dirpath=None):
+        """Parse a trajectory file of `cp.x` into the array of the times and the array of the frames.
+
+        If a `chunk_size` is defined, the file is parsed in chunks of that number of frames, which are appended to a
+        file in the `dirpath` temporary directory. The frames are then returned as an array that is memory mapped to
+        this file, such that the full trajectory is never held in memory.
+
+        :param handle: text file handle of the trajectory file
+        :param name: the name of the trajectory array
+        :param num_elements: the number of lines with three values in each stanza
+        :param rescale: the factor to convert the values to the output units
+        :param transform: function to apply to each (chunk of) frames, e.g. to reorder the atoms
+        :param chunk_size: optional number of frames in each chunk
+        :param dirpath: the path of the temporary directory to write the frames to if a `chunk_size` is defined
+        :return: tuple of the times and the frames
+        """
+        prepend_name = f'{name}_traj'
+
+        if chunk_size is None or num_elements is None:
+            traj_data = parse_cp_traj_array(num_elements, handle.read().splitlines(), prepend_name, rescale)
+            return traj_data[f'{prepend_name}_times'], transform(traj_data[f'{prepend_name}_data'])
+
+        times = []
+        filepath = os.path.join(dirpath, f'{name}.bin')
+
+        with TrajectoryArrayWriter(filepath, (num_elements, 3), chunk_size=chunk_size) as writer:
+            for traj_data in iterate_cp_traj_chunks(num_elements, handle, prepend_name, rescale, chunk_size):
+                times.append(traj_data[f'{prepend_name}_times'])
+                data = traj_data[f'{prepend_name}_data']
+                if data.size:
+                    writer.extend(transform(data))
+
+        if writer.num_frames == 0:
+            # Consistent with the in-memory parsing of an empty file
+            return numpy.array([]), transform(numpy.array([]))
+
+        return numpy.concatenate(times), writer.finalize()
+
     def get_linkname_trajectory(self):
         """Returns the name of the link to the output_structure (None if not present)"""
         return 'output_trajectory'
@@ -318,7 +408,8 @@ class CpParser(BaseParser):
         return [origlist[e] for e in reordering]
 
     def _get_reordered_array(self, _input, reordering):
-        if reordering is not None:
-            return numpy.array([self._get_reordered_list(i, reordering) for i in _input])
+        _input = numpy.asarray(_input)
+        if reordering is not None and _input.size:
+            return _input[:, reordering]
         else:
-            return numpy.array(_input)
+            return _input
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
+import warnings
+
 from aiida import orm
+import numpy
 from qe_tools import CONSTANTS
 
 from aiida_quantumespresso.calculations.matdyn import MatdynCalculation
@@ -62,6 +65,10 @@ class MatdynParser(BaseParser):
 def parse_raw_matdyn_phonon_file(phonon_frequencies):
     """Parses the phonon frequencies file.
 
+    The file is tokenized in a single pass over the whole content: the values that are glued together because they
+    fill their fixed-width Fortran field, e.g. ``-1204.1234-1020.536``, are first separated by inserting a space before
+    every minus sign, after which all values are converted at once and the frequency matrix is obtained by reshaping.
+
     :param phonon_frequencies: phonon frequencies file from the matdyn calculation
 
     :return dict parsed_data: keys:
@@ -69,10 +76,6 @@ def parse_raw_matdyn_phonon_file(phonon_frequencies):
          * num_kpoints: number of kpoints read from the file
          * phonon_bands: BandsData object with the bands for each kpoint
     """
-    import re
-
-    import numpy
-
     parsed_data = {}
     parsed_data['warnings'] = []
 
@@ -85,43 +88,26 @@ def parse_raw_matdyn_phonon_file(phonon_frequencies):
         parsed_data['warnings'].append('Number of bands or kpoints unreadable in phonon frequencies file')
         return parsed_data
 
-    # initialize array of frequencies
-    freq_matrix = numpy.zeros((num_kpoints, num_bands))
+    # discard the header of the file and separate the values that are glued together, except for negative exponents
+    raw_data = phonon_frequencies.partition('/')[2].replace('-', ' -').replace('E -', 'E-').replace('e -', 'e-')
+
+    try:
+        # Older versions of NumPy only warn and return the values up to the first invalid one
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)
+            values = numpy.fromstring(raw_data, dtype=numpy.float64, sep=' ')
+    except (ValueError, DeprecationWarning):
+        parsed_data['warnings'].append('Bad formatting of frequencies')
+        return parsed_data
+
+    # each kpoint consists of its three coordinates followed by the frequencies of all bands
+    num_values = num_kpoints * (num_bands + 3)
 
-    split_data = phonon_frequencies.split()
-    # discard the header of the file
-    raw_data = split_data[split_data.index('/') + 1:]
+    if values.size < num_values:
+        parsed_data['warnings'].append('Error while parsing the frequencies, dimension exceeded')
+        return parsed_data
 
-    # try to improve matdyn deficiencies
-    corrected_data = []
-    for b in raw_data:
-        try:
-            corrected_data.append(float(b))
-        except ValueError:
-            # case in which there are two frequencies attached like -1204.1234-1020.536
-            if '-' in b:
-                c = re.split('(-)', b)
-                d = [i for i in c if i != '']
-                for i in range(0, len(d), 2):  # d should have an even number of elements
-                    corrected_data.append(float(d[i] + d[i + 1]))
-            else:
-                # I don't know what to do
-                parsed_data['warnings'].append('Bad formatting of frequencies')
-                return parsed_data
-
-    counter = 3
-    for i in range(num_kpoints):
-        for j in range(num_bands):
-            try:
-                freq_matrix[i, j] = corrected_data[counter] * CONSTANTS.invcm_to_THz  # from cm-1 to THz
-            except ValueError:
-                parsed_data['warnings'].append('Error while parsing the frequencies')
-            except IndexError:
-                parsed_data['warnings'].append('Error while parsing the frequencies, dimension exceeded')
-                return parsed_data
-            counter += 1
-        counter += 3  # move past the kpoint coordinates
-
-    parsed_data['phonon_bands'] = freq_matrix
+    freq_matrix = values[:num_values].reshape(num_kpoints, num_bands + 3)[:, 3:]
+    parsed_data['phonon_bands'] = freq_matrix * CONSTANTS.invcm_to_THz  # from cm-1 to THz
 
     return parsed_data
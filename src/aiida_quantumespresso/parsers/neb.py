@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 import os
+import pathlib
+import shutil
+import tempfile
 
 from aiida.common import AttributeDict, NotExistent
 from aiida.orm import ArrayData, Dict, TrajectoryData
@@ -8,11 +11,12 @@ import numpy
 from aiida_quantumespresso.calculations.pw import PwCalculation
 from aiida_quantumespresso.parsers.parse_raw import convert_qe_to_aiida_structure
 from aiida_quantumespresso.parsers.parse_raw.neb import parse_raw_output_neb
-from aiida_quantumespresso.parsers.parse_raw.pw import parse_stdout as parse_pw_stdout
 from aiida_quantumespresso.parsers.parse_raw.pw import reduce_symmetries
+from aiida_quantumespresso.parsers.parse_raw.pw_stream import parse_stdout_stream
 from aiida_quantumespresso.parsers.parse_xml.exceptions import XMLParseError, XMLUnsupportedFormatError
 from aiida_quantumespresso.parsers.parse_xml.pw.parse import parse_xml as parse_pw_xml
 from aiida_quantumespresso.parsers.pw import PwParser
+from aiida_quantumespresso.utils.executors import get_executor, validate_executor
 from aiida_quantumespresso.utils.mapping import get_logging_container
 
 from .base import BaseParser
@@ -60,72 +64,75 @@ class NebParser(BaseParser):
         if base_exit_code:
             return self.exit(base_exit_code, logs)
 
-        neb_out_dict, iteration_data = parse_raw_output_neb(stdout)
+        with self.timed('stdout'):
+            neb_out_dict, iteration_data = parse_raw_output_neb(stdout)
         parsed_data.update(neb_out_dict)
 
         num_images = parsed_data['num_of_images']
 
-        # Now parse the information from the individual pw calculations for the different images
+        # The parsing of the images is independent, so it can be dispatched to a pool of workers, as defined by the
+        # `image_workers` and `image_executor` parser options. The results are always returned in the order of images.
+        max_workers = parser_options.get('image_workers', None) if parser_options is not None else None
+        executor = parser_options.get('image_executor', 'thread') if parser_options is not None else 'thread'
+
+        try:
+            validate_executor(executor)
+        except ValueError as exception:
+            return self.exit(self.exit_codes.ERROR_UNEXPECTED_PARSER_EXCEPTION.format(exception=exception))
+
+        # The output files of the individual pw calculations for the different images are copied to a temporary folder,
+        # such that each image is only read into memory by the worker that parses it.
+        with tempfile.TemporaryDirectory() as dirname:
+            image_files = []
+
+            for i in range(num_images):
+                # check if any of the known XML output file names are present, and copy the first that we find
+                relative_output_folder = os.path.join(f'{prefix}_{i + 1}', f'{prefix}.save')
+                retrieved_files = self.retrieved.base.repository.list_object_names(relative_output_folder)
+                image_folder = pathlib.Path(dirname) / f'{prefix}_{i + 1}'
+                image_folder.mkdir()
+
+                for xml_filename in PwCalculation.xml_filenames:
+                    if xml_filename in retrieved_files:
+                        xml_file_path = image_folder / xml_filename
+                        try:
+                            self.copy_object(os.path.join(relative_output_folder, xml_filename), xml_file_path)
+                        except IOError:
+                            return self.exit(self.exit_codes.ERROR_OUTPUT_XML_READ)
+                        # this image is dealt with, so break the inner loop and go to the next image
+                        break
+                # otherwise, if none of the filenames we tried exists, exit with an error
+                else:
+                    return self.exit(self.exit_codes.ERROR_MISSING_XML_FILE)
+
+                # look for pw output and copy it
+                pw_out_file_path = image_folder / 'PW.out'
+                try:
+                    self.copy_object(os.path.join(f'{prefix}_{i + 1}', 'PW.out'), pw_out_file_path)
+                except IOError:
+                    return self.exit(self.exit_codes.ERROR_OUTPUT_STDOUT_READ)
+
+                image_files.append((str(xml_file_path), str(pw_out_file_path)))
+
+            arguments = [(xml, stdout, pw_input_dict, parser_options) for xml, stdout in image_files]
+
+            if max_workers is None or max_workers <= 1:
+                with self.timed('images'):
+                    results = [parse_image(*args) for args in arguments]
+            else:
+                with self.timed('images'), get_executor(executor, max_workers) as pool:
+                    results = list(pool.map(parse_image, *zip(*arguments)))
+
         image_data = {}
         positions = []
         cells = []
 
-        for i in range(num_images):
-            # check if any of the known XML output file names are present, and parse the first that we find
-            relative_output_folder = os.path.join(f'{prefix}_{i + 1}', f'{prefix}.save')
-            retrieved_files = self.retrieved.base.repository.list_object_names(relative_output_folder)
-
-            for xml_filename in PwCalculation.xml_filenames:
-                if xml_filename in retrieved_files:
-                    xml_file_path = os.path.join(relative_output_folder, xml_filename)
-                    try:
-                        with self.retrieved.base.repository.open(xml_file_path) as xml_file:
-                            parsed_data_xml, logs_xml = parse_pw_xml(xml_file, None)
-                    except IOError:
-                        return self.exit(self.exit_codes.ERROR_OUTPUT_XML_READ)
-                    except XMLParseError:
-                        return self.exit(self.exit_codes.ERROR_OUTPUT_XML_PARSE)
-                    except XMLUnsupportedFormatError:
-                        return self.exit(self.exit_codes.ERROR_OUTPUT_XML_FORMAT)
-                    except Exception:
-                        import traceback
-                        traceback.print_exc()
-                        return self.exit(self.exit_codes.ERROR_UNEXPECTED_PARSER_EXCEPTION)
-                    # this image is dealt with, so break the inner loop and go to the next image
-                    break
-            # otherwise, if none of the filenames we tried exists, exit with an error
-            else:
-                return self.exit(self.exit_codes.ERROR_MISSING_XML_FILE)
-
-            # look for pw output and parse it
-            pw_out_file = os.path.join(f'{prefix}_{i + 1}', 'PW.out')
-            try:
-                with self.retrieved.base.repository.open(pw_out_file, 'r') as f:
-                    pw_out_text = f.read()  # Note: read() and not readlines()
-            except IOError:
-                return self.exit(self.exit_codes.ERROR_OUTPUT_STDOUT_READ)
-
-            try:
-                parsed_data_stdout, logs_stdout = parse_pw_stdout(
-                    pw_out_text, pw_input_dict, parser_options, parsed_data_xml
-                )
-            except Exception as exc:
-                return self.exit(self.exit_codes.ERROR_UNEXPECTED_PARSER_EXCEPTION.format(exception=exc))
-
-            parsed_structure = parsed_data_stdout.pop('structure', {})
-            parsed_trajectory = parsed_data_stdout.pop('trajectory', {})
-            parsed_parameters = PwParser.build_output_parameters(parsed_data_xml, parsed_data_stdout)
-
-            # Explicit information about k-points does not need to be queryable so we remove it from the parameters
-            parsed_parameters.pop('k_points', None)
-            parsed_parameters.pop('k_points_units', None)
-            parsed_parameters.pop('k_points_weights', None)
-
-            # Delete bands # TODO: this is just to make pytest happy; do we want to keep them instead?
-            parsed_parameters.pop('bands', None)
-
-            # Append the last frame of some of the smaller trajectory arrays to the parameters for easy querying
-            PwParser.final_trajectory_frame_to_parameters(parsed_parameters, parsed_trajectory)
+        for i, (error, parsed_image) in enumerate(results):
+            if error is not None:
+                exit_code_label, exception = error
+                return self.exit(self.exit_codes.get(exit_code_label).format(exception=exception))
+
+            parsed_parameters, parsed_structure, logs_stdout = parsed_image
 
             # If the parser option 'all_symmetries' is False, we reduce the raw parsed symmetries to save space
             all_symmetries = False if parser_options is None else parser_options.get('all_symmetries', False)
@@ -196,3 +203,65 @@ class NebParser(BaseParser):
             return self.exit(self.exit_codes.ERROR_OUTPUT_STDOUT_INCOMPLETE, logs)
 
         return self.exit(logs=logs)
+
+    def copy_object(self, path, filepath):
+        """Copy an object of the retrieved folder to a file, without reading it into memory as a whole.
+
+        :param path: the relative path of the object in the retrieved folder.
+        :param filepath: the path of the file to write.
+        :raises IOError: if the object cannot be read.
+        """
+        with self.retrieved.base.repository.open(path, 'rb') as source, open(filepath, 'wb') as target:
+            shutil.copyfileobj(source, target)
+
+
+def parse_image(xml_filepath, pw_out_filepath, pw_input_dict, parser_options):
+    """Parse the XML and stdout output of the pw calculation of a single image of a NEB calculation.
+
+    This function is independent of the parser instance and only takes and returns plain Python objects, such that it
+    can be executed in a pool of threads or processes. The output files are only opened here, and the stdout is parsed
+    while it is read, such that only the image that is being parsed by a worker is held in memory. Within a single
+    process, all images share the compiled XML schemas of :mod:`~aiida_quantumespresso.parsers.parse_xml.registry`.
+
+    :param xml_filepath: the path of the XML output file.
+    :param pw_out_filepath: the path of the stdout of the pw calculation.
+    :param pw_input_dict: dictionary with the input parameters of the pw calculation.
+    :param parser_options: the parser options from the settings input node.
+    :return: tuple of the error and the parsed data. If the parsing failed, the error is a tuple of the label of the
+        exit code and the exception message and the parsed data is ``None``. Otherwise, the error is ``None`` and the
+        parsed data is a tuple of the output parameters, the parsed structure and the logs of the stdout parsing.
+    """
+    try:
+        with open(xml_filepath, 'rb') as handle:
+            parsed_data_xml, _ = parse_pw_xml(handle, None)
+    except XMLParseError as exception:
+        return ('ERROR_OUTPUT_XML_PARSE', str(exception)), None
+    except XMLUnsupportedFormatError as exception:
+        return ('ERROR_OUTPUT_XML_FORMAT', str(exception)), None
+    except Exception as exception:  # pylint: disable=broad-except
+        return ('ERROR_UNEXPECTED_PARSER_EXCEPTION', str(exception)), None
+
+    try:
+        with open(pw_out_filepath, 'r', encoding='utf-8') as handle:
+            parsed_data_stdout, logs_stdout = parse_stdout_stream(
+                handle, pw_input_dict, parser_options, parsed_data_xml
+            )
+    except Exception as exception:  # pylint: disable=broad-except
+        return ('ERROR_UNEXPECTED_PARSER_EXCEPTION', str(exception)), None
+
+    parsed_structure = parsed_data_stdout.pop('structure', {})
+    parsed_trajectory = parsed_data_stdout.pop('trajectory', {})
+    parsed_parameters = PwParser.build_output_parameters(parsed_data_xml, parsed_data_stdout)
+
+    # Explicit information about k-points does not need to be queryable so we remove it from the parameters
+    parsed_parameters.pop('k_points', None)
+    parsed_parameters.pop('k_points_units', None)
+    parsed_parameters.pop('k_points_weights', None)
+
+    # Delete bands # TODO: this is just to make pytest happy; do we want to keep them instead?
+    parsed_parameters.pop('bands', None)
+
+    # Append the last frame of some of the smaller trajectory arrays to the parameters for easy querying
+    PwParser.final_trajectory_frame_to_parameters(parsed_parameters, parsed_trajectory)
+
+    return None, (parsed_parameters, parsed_structure, logs_stdout)
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
+import itertools
 from xml.dom.minidom import parseString
 from xml.etree import ElementTree
 
+import numpy
+
 from aiida_quantumespresso.parsers import QEOutputParsingError
 from aiida_quantumespresso.parsers.parse_xml.cp.legacy import parse_cp_xml_output
 from aiida_quantumespresso.parsers.parse_xml.parse import parse_xml_post_6_2
@@ -63,6 +66,87 @@ def parse_cp_traj_stanzas(num_elements, splitlines, prepend_name, rescale=1.):
         raise e
 
 
+def parse_cp_traj_array(num_elements, lines, prepend_name, rescale=1.):
+    """Parse a CP trajectory file into arrays, loading all the stanzas in bulk.
+
+    The layout of the file, a short line with the step number and the time followed by ``num_elements`` lines with
+    three values each, is checked once on the whole file: the step lines are sliced out and the remaining lines are
+    converted in a single call to ``numpy.loadtxt`` and reshaped to ``(nsteps, num_elements, 3)``. If the file does
+    not match the expected layout, it is parsed again line by line with ``parse_cp_traj_stanzas``, such that malformed
+    stanzas are reported with the same errors.
+
+    :param num_elements: number of lines with three values in each stanza: 3 for the cell, the number of atoms for
+        positions, velocities and forces.
+    :param lines: a list of the lines of the file.
+    :param prepend_name: a string to be prepended to the name of keys returned in the return dictionary.
+    :param rescale: the values in each stanza are multiplied by this factor, for units conversion.
+    :return: dictionary with the steps, times and data of the trajectory as numpy arrays.
+    """
+    try:
+        steps, times, data = _parse_cp_traj_layout(num_elements, lines)
+    except ValueError:
+        traj_data = parse_cp_traj_stanzas(num_elements, [line.split() for line in lines], prepend_name, rescale)
+        return {key: numpy.array(value) for key, value in traj_data.items()}
+
+    return {
+        f'{prepend_name}_steps': steps,
+        f'{prepend_name}_times': times,
+        f'{prepend_name}_data': data * rescale,
+    }
+
+
+def iterate_cp_traj_chunks(num_elements, handle, prepend_name, rescale=1., chunk_size=1000):
+    """Parse a CP trajectory file in chunks of stanzas, such that the file is never fully loaded in memory.
+
+    :param num_elements: number of lines with three values in each stanza.
+    :param handle: a text file handle of the trajectory file.
+    :param prepend_name: a string to be prepended to the name of keys returned in the dictionaries.
+    :param rescale: the values in each stanza are multiplied by this factor, for units conversion.
+    :param chunk_size: the number of stanzas in each chunk.
+    :return: generator of the dictionaries returned by ``parse_cp_traj_array`` for each chunk of stanzas.
+    """
+    num_lines = chunk_size * (num_elements + 1)
+
+    while True:
+        lines = ''.join(itertools.islice(handle, num_lines)).splitlines()
+
+        if not lines:
+            return
+
+        yield parse_cp_traj_array(num_elements, lines, prepend_name, rescale)
+
+
+def _parse_cp_traj_layout(num_elements, lines):
+    """Parse the lines of a CP trajectory file assuming a regular layout of the stanzas.
+
+    :raises ValueError: if the lines do not follow the regular layout.
+    """
+    if not isinstance(num_elements, int) or num_elements <= 0 or not lines:
+        raise ValueError('no regular stanza layout')
+
+    stanza_length = num_elements + 1
+
+    if len(lines) % stanza_length != 0:
+        raise ValueError('number of lines is not a multiple of the stanza length')
+
+    headers = [line.split() for line in lines[::stanza_length]]
+
+    if any(len(header) != 2 for header in headers):
+        raise ValueError('step line with wrong length')
+
+    steps = numpy.array([int(header[0]) for header in headers])
+    times = numpy.array([-1.0 if set(header[1]) == {'*'} else float(header[1]) for header in headers])
+
+    body = list(lines)
+    del body[::stanza_length]
+    data = numpy.loadtxt(body, dtype=float, comments=None, ndmin=2)
+
+    if data.shape != (len(body), 3):
+        raise ValueError('data line with wrong length')
+
+    return steps, times, data.reshape(len(headers), num_elements, 3)
+
+
 def parse_cp_text_output(data, xml_data):
     """data must be a list of strings, one for each lines, as returned by readlines().
 
@@ -175,6 +259,10 @@ def parse_cp_raw_output(stdout, output_xml=None, xml_counter_file=None, print_co
         xml_file_version = get_xml_file_version(xml_parsed)
         if xml_file_version == QeXmlVersion.POST_6_2:
             xml_data, logs = parse_xml_post_6_2(xml_parsed)
+            # The k-points end up in the output parameters, which only accept JSON-serializable values
+            for key in ['k_points', 'k_points_weights']:
+                if key in xml_data:
+                    xml_data[key] = xml_data[key].tolist()
         elif xml_file_version == QeXmlVersion.PRE_6_2:
             xml_data = parse_cp_xml_output(output_xml)
     else:
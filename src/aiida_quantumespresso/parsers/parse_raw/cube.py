@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""Streaming reader for volumetric data in the Gaussian cube format, as written by ``pp.x``.
+
+The volumetric block of a cube file of a large supercell can easily be several GB of text. Instead of reading the
+entire file into memory and splitting it into lines and values, the header is parsed line by line after which the
+volumetric block is read in chunks of fixed size. Each chunk is converted by NumPy directly into the preallocated output
+array, such that the memory overhead is bounded by the chunk size, regardless of the size of the file.
+
+Optionally, the data can be downsampled by only keeping every n-th point of the grid along each axis, and/or restricted
+to a region of the grid. In that case, the output array only has the size of the selected grid points and the full grid
+is never materialised.
+"""
+import io
+import math
+import warnings
+
+import numpy as np
+
+__all__ = ('get_region', 'parse_cube_header', 'read_cube')
+
+DEFAULT_CHUNK_SIZE = 2**22
+
+
+def parse_cube_header(handle):
+    """Parse the header of a cube file, leaving the handle positioned at the start of the volumetric data.
+
+    :param handle: text file handle positioned at the start of the cube file.
+    :return: dictionary with the ``origin`` and the ``shape`` of the grid, the ``voxel`` vectors as the rows of a 3x3
+        array and the ``atoms``, as a list of tuples of the atomic number, the charge and the position.
+    :raises ValueError: if the header cannot be parsed.
+    """
+    lines = [handle.readline() for _ in range(6)]
+
+    if not lines[-1]:
+        raise ValueError('the cube file ended before the end of the header.')
+
+    atoms_line = lines[2].split()
+    natoms = int(atoms_line[0])
+    origin = np.array(atoms_line[1:], dtype=float)
+
+    shape = tuple(int(line.split()[0]) for line in lines[3:6])
+    voxel = np.array([line.split()[1:4] for line in lines[3:6]], dtype=np.float64)
+
+    if any(dimension <= 0 for dimension in shape):
+        raise ValueError(f'invalid dimensions of the volumetric data: {shape}')
+
+    atoms = []
+
+    for _ in range(natoms):
+        values = handle.readline().split()
+        atoms.append((int(values[0]), float(values[1]), [float(value) for value in values[2:5]]))
+
+    return {'origin': origin, 'shape': shape, 'voxel': voxel, 'atoms': atoms}
+
+
+def iterate_volumetric_chunks(handle, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the values of the volumetric data as arrays of consecutive values, reading at most ``chunk_size`` at once.
+
+    Each chunk is cut after its last complete line, such that no value is ever split across two chunks.
+
+    :param handle: text file handle positioned at the start of the volumetric data.
+    :param chunk_size: number of characters to read at once.
+    :raises ValueError: if the data contains anything that is not a number.
+    """
+    remainder = ''
+
+    while True:
+        chunk = handle.read(chunk_size)
+
+        if not chunk:
+            text, remainder = remainder, ''
+        else:
+            text, _, remainder = (remainder + chunk).rpartition('\n')
+
+        if text.strip():
+            # Older versions of NumPy only warn and return the values up to the first invalid one. The values are only
+            # yielded once the warning filter is restored, since it is global and the generator may be suspended.
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', DeprecationWarning)
+                try:
+                    values = np.fromstring(text, dtype=np.float64, sep=' ')
+                except DeprecationWarning as exception:
+                    raise ValueError(str(exception)) from exception
+
+            yield values
+
+        if not chunk:
+            return
+
+
+def get_stride(stride):
+    """Return the stride along each of the three axes.
+
+    :param stride: a positive integer that is used for all three axes, or a sequence of three positive integers.
+    :raises ValueError: if the stride is invalid.
+    """
+    if isinstance(stride, int):
+        stride = (stride,) * 3
+
+    try:
+        stride = tuple(stride)
+    except TypeError:
+        stride = (stride,)
+
+    if len(stride) != 3 or not all(isinstance(value, int) and value > 0 for value in stride):
+        raise ValueError(f'the stride should be a positive integer or a sequence of three, got: {stride}')
+
+    return stride
+
+
+def get_region(region, shape):
+    """Return the region of a grid with the given shape as a tuple of ``(start, stop)`` index pairs, one for each axis.
+
+    :param region: ``None`` for the entire grid, or a sequence with a ``[start, stop]`` pair of grid indices for each
+        axis. These follow the semantics of a Python slice, i.e. the ``stop`` is excluded, negative indices count from
+        the end and either may be ``None``. An axis can also be specified as ``None`` as a whole, to keep all of it.
+    :param shape: the shape of the grid.
+    :raises ValueError: if the region is invalid or empty.
+    """
+    if region is None:
+        region = (None,) * len(shape)
+
+    region = tuple(region)
+
+    if len(region) != len(shape):
+        raise ValueError(f'the region should define a range for each of the {len(shape)} axes, got: {region}')
+
+    normalized = []
+
+    for axis, dimension in zip(region, shape):
+        axis = (None, None) if axis is None else tuple(axis)
+
+        if len(axis) != 2 or not all(index is None or isinstance(index, int) for index in axis):
+            raise ValueError(f'the range of an axis of the region should be a pair of integers, got: {axis}')
+
+        start, stop, _ = slice(*axis).indices(dimension)
+
+        if start >= stop:
+            raise ValueError(f'the range {axis} of the region is empty for an axis with dimension {dimension}.')
+
+        normalized.append((start, stop))
+
+    return tuple(normalized)
+
+
+def read_cube(handle, stride=1, region=None, dtype=np.float64, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Read a cube file, streaming its volumetric data into an array of shape ``(nx, ny, nz)``.
+
+    If a ``stride`` is specified, only the grid points whose indices are multiples of the stride are kept, i.e. the
+    returned data is identical to ``data[::sx, ::sy, ::sz]`` of the full data, and the voxel vectors are scaled by the
+    stride, such that they describe the spacing of the downsampled grid.
+
+    If a ``region`` is specified, only the grid points within that region are kept, such that e.g. a slab or a line of
+    the grid can be extracted without ever materialising the full grid. The stride is then applied starting from the
+    first point of the region and the origin is shifted to that point.
+
+    :param handle: text file handle of the cube file, or its content as a string.
+    :param stride: a positive integer that is used for all three axes, or a sequence of three positive integers.
+    :param region: the region of the grid to keep, see :func:`get_region`.
+    :param dtype: the floating point type of the returned data. The output array is allocated with this type directly,
+        such that a lower precision also reduces the peak memory.
+    :param chunk_size: number of characters of the volumetric data to read at once.
+    :return: tuple of the header, as returned by :func:`parse_cube_header`, and the volumetric data.
+    :raises ValueError: if the file cannot be parsed or the number of values does not match the declared dimensions.
+    """
+    if isinstance(handle, str):
+        handle = io.StringIO(handle)
+
+    stride = get_stride(stride)
+    header = parse_cube_header(handle)
+    shape = header['shape']
+    size = math.prod(shape)
+    region = get_region(region, shape)
+    starts = np.array([start for start, _ in region])
+    full_grid = stride == (1, 1, 1) and region == tuple((0, dimension) for dimension in shape)
+
+    if full_grid:
+        data = np.empty(size, dtype=dtype)
+    else:
+        data = np.empty(tuple(-(-(stop - start) // step) for (start, stop), step in zip(region, stride)), dtype=dtype)
+        header['origin'] = header['origin'] + starts @ header['voxel']
+        header['voxel'] = header['voxel'] * np.array(stride, dtype=np.float64)[:, None]
+
+    cursor = 0
+
+    for values in iterate_volumetric_chunks(handle, chunk_size):
+        if cursor + values.size > size:
+            raise ValueError(f'the volumetric data contains more than the {size} values declared in the header.')
+
+        if full_grid:
+            data[cursor:cursor + values.size] = values
+        else:
+            # Determine the grid indices of the values in this chunk and only keep those that are within the region and
+            # on the coarse grid
+            indices = np.unravel_index(np.arange(cursor, cursor + values.size), shape)
+            offsets = [index - start for index, start in zip(indices, starts)]
+            mask = np.ones(values.size, dtype=bool)
+
+            for offset, (start, stop), step in zip(offsets, region, stride):
+                mask &= (offset >= 0) & (offset < stop - start) & (offset % step == 0)
+
+            data[tuple(offset[mask] // step for offset, step in zip(offsets, stride))] = values[mask]
+
+        cursor += values.size
+
+    if cursor != size:
+        raise ValueError(f'the volumetric data contains {cursor} values instead of the {size} declared in the header.')
+
+    return header, data.reshape(shape) if full_grid else data
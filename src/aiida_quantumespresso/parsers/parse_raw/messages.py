@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""Precompiled matching of the known error and warning messages in the output of Quantum ESPRESSO codes.
+
+Every line of the output of a calculation has to be compared with the known error and warning markers of the code. Doing
+this marker by marker means scanning each line tens of times, even though the vast majority of lines contain none of
+them. A :class:`MessageMatcher` compiles all markers into a single regular expression once, that is used as a cheap
+prefilter: only the rare lines that pass it are checked marker by marker to determine which messages to log. When an
+entire output is searched at once, literal markers are instead looked up directly with a substring search, which is
+faster than any regular expression, and the prefilter is only used for markers that require one.
+
+The markers of each parser are stored in the :data:`MESSAGES` registry under a name, e.g. ``pw`` for the markers of
+:func:`~aiida_quantumespresso.parsers.parse_raw.pw.detect_important_message`, or the full name of a ``BaseParser``
+subclass. Additional markers can be added to an existing entry by plugins through :func:`register_messages`, and the
+compiled matcher of an entry is retrieved with :func:`get_message_matcher`.
+"""
+import re
+import threading
+
+__all__ = ('MessageMatcher', 'MessageRegistry', 'get_message_matcher', 'register_messages')
+
+REGEX_PREFILTER_PREFIX = re.compile(r'^(?:\^|\\s[+*]|\.\*)+')
+REGEX_PREFILTER_SUFFIX = re.compile(r'(?<!\\)(?:\.[+*]|\$)+$')
+REGEX_SPECIAL_CHARACTERS = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+
+class MessageMatcher:
+    """Matcher for a fixed set of error and warning markers.
+
+    A marker is either a string, which is matched as a literal substring, or a compiled regular expression. The message
+    of a marker is the string that is logged when it matches, or ``None`` to log the matching line itself. All markers
+    are expected to be confined to a single line.
+    """
+
+    def __init__(self, errors=None, warnings=None):
+        """Construct a new instance.
+
+        :param errors: mapping of error markers onto their messages.
+        :param warnings: mapping of warning markers onto their messages.
+        """
+        self.errors = dict(errors or {})
+        self.warnings = dict(warnings or {})
+        self._prefilter = self._compile_prefilter([*self.errors, *self.warnings])
+
+        # For searching an entire text, literal markers are best looked up directly, as substring search is much faster
+        # than any regular expression. Only the remaining markers are compiled into a prefilter for the candidate lines.
+        self._literals = {marker: self._get_literal(marker) for marker in self.errors}
+        self._regex_prefilter = self._compile_prefilter([
+            marker for marker, literal in self._literals.items() if literal is None
+        ])
+        self._warning_finders = [
+            (re.compile(fr'({re.escape(marker) if isinstance(marker, str) else marker.pattern}.+)\n'), message)
+            for marker, message in self.warnings.items()
+        ]
+
+    @classmethod
+    def _compile_prefilter(cls, markers):
+        """Return a single compiled regular expression that matches wherever any of the markers can match."""
+        if not markers:
+            return None
+
+        return re.compile('|'.join(cls._get_prefilter_pattern(marker) for marker in markers))
+
+    @staticmethod
+    def _get_literal(marker):
+        """Return the literal string a marker matches, or ``None`` if it is a regular expression with special syntax."""
+        if isinstance(marker, str):
+            return marker
+
+        if marker.flags & ~re.UNICODE == 0 and not REGEX_SPECIAL_CHARACTERS.search(marker.pattern):
+            return marker.pattern
+
+        return None
+
+    @staticmethod
+    def _get_prefilter_pattern(marker):
+        """Return the pattern with which the marker is represented in the combined prefilter expression.
+
+        For a compiled regular expression, leading anchors and whitespace quantifiers, as well as trailing wildcards, are
+        stripped: these can only make the prefilter slower and removing them can only make it match more lines.
+        """
+        if isinstance(marker, str):
+            return re.escape(marker)
+
+        pattern = REGEX_PREFILTER_PREFIX.sub('', marker.pattern)
+        pattern = REGEX_PREFILTER_SUFFIX.sub('', pattern)
+
+        return f'(?:{pattern or marker.pattern})'
+
+    def prefilter(self, line):
+        """Return whether the line can contain any of the markers.
+
+        :param line: a single line of output.
+        """
+        return self._prefilter is not None and self._prefilter.search(line) is not None
+
+    def detect(self, logs, line):
+        """Add the messages of all markers that match the line to the logging container.
+
+        String markers match if they are a substring of the line, compiled regular expressions if they match at the
+        start of the line. The messages are added in the order of the markers.
+
+        :param logs: logging container with ``error`` and ``warning`` lists.
+        :param line: a single line of output.
+        """
+        if self._prefilter is None or self._prefilter.search(line) is None:
+            return
+
+        for markers, messages in ((self.errors, logs.error), (self.warnings, logs.warning)):
+            for marker, message in markers.items():
+                if isinstance(marker, str):
+                    matched = marker in line
+                else:
+                    matched = marker.match(line) is not None
+
+                if matched:
+                    messages.append(line if message is None else message)
+
+    @staticmethod
+    def _filter(text, prefilter):
+        """Return the lines of the text that match the prefilter, including their line terminator.
+
+        Searching for the markers in the returned string gives the same result as searching the entire text, since the
+        markers do not span multiple lines, but it is typically orders of magnitude smaller.
+
+        :param text: the output content as a string.
+        :param prefilter: compiled prefilter regular expression, or ``None`` in which case an empty string is returned.
+        :return: string with the concatenated lines that can contain a marker.
+        """
+        if prefilter is None:
+            return ''
+
+        lines = []
+        position = 0
+        search = prefilter.search
+
+        while position < len(text):
+            match = search(text, position)
+
+            if match is None:
+                break
+
+            start = text.rfind('\n', 0, match.start()) + 1
+            end = text.find('\n', match.end())
+            end = len(text) if end == -1 else end + 1
+            lines.append(text[start:end])
+            position = end
+
+        return ''.join(lines)
+
+    def has_error(self, text):
+        """Return whether any of the error markers is found anywhere in the text.
+
+        :param text: the text to search.
+        """
+        for marker, literal in self._literals.items():
+            if literal is not None:
+                if literal in text:
+                    return True
+            elif marker.search(text):
+                return True
+
+        return False
+
+    def search(self, logs, text):
+        """Add the messages of all markers found anywhere in the text to the logging container.
+
+        Each error message is added once if its marker is found. For warnings, the matching part of each distinct line,
+        starting from the marker, is added if the message is ``None``, otherwise the message is added once per distinct
+        line. Only lines that are terminated by a newline are considered for warnings.
+
+        :param logs: logging container with ``error`` and ``warning`` lists.
+        :param text: the output content as a string.
+        """
+        candidates = None
+
+        for marker, message in self.errors.items():
+            literal = self._literals[marker]
+
+            if literal is not None:
+                matched = literal in text
+            else:
+                if candidates is None:
+                    candidates = self._filter(text, self._regex_prefilter)
+                matched = marker.search(candidates) is not None
+
+            if matched:
+                logs.error.append(message)
+
+        for finder, message in self._warning_finders:
+            for warning in set(finder.findall(text)):
+                logs.warning.append(warning if message is None else message)
+
+
+class MessageRegistry:
+    """Thread-safe registry of error and warning markers, keyed on name, with lazily compiled matchers."""
+
+    def __init__(self):
+        """Construct a new empty registry."""
+        self._entries = {}
+        self._matchers = {}
+        self._lock = threading.RLock()
+
+    def __contains__(self, name):
+        with self._lock:
+            return name in self._entries
+
+    def register(self, name, errors=None, warnings=None):
+        """Register error and warning markers under the given name.
+
+        If markers were already registered under the name, the new markers are added to them. Markers that already
+        exist have their message replaced.
+
+        :param name: the name of the entry, e.g. ``pw``.
+        :param errors: mapping of error markers onto their messages.
+        :param warnings: mapping of warning markers onto their messages.
+        """
+        with self._lock:
+            entry = self._entries.setdefault(name, ({}, {}))
+            entry[0].update(errors or {})
+            entry[1].update(warnings or {})
+            self._matchers.pop(name, None)
+
+    def get_errors(self, name):
+        """Return a copy of the error markers registered under the given name."""
+        with self._lock:
+            return dict(self._entries[name][0])
+
+    def get_warnings(self, name):
+        """Return a copy of the warning markers registered under the given name."""
+        with self._lock:
+            return dict(self._entries[name][1])
+
+    def get_matcher(self, name):
+        """Return the compiled matcher for the markers registered under the given name.
+
+        :raises KeyError: if no markers are registered under the given name.
+        """
+        try:
+            return self._matchers[name]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if name not in self._matchers:
+                errors, warnings = self._entries[name]
+                self._matchers[name] = MessageMatcher(errors, warnings)
+            return self._matchers[name]
+
+
+MESSAGES = MessageRegistry()
+
+
+def register_messages(name, errors=None, warnings=None):
+    """Register error and warning markers under the given name in the process-wide registry.
+
+    :param name: the name of the entry, e.g. ``pw``.
+    :param errors: mapping of error markers onto their messages.
+    :param warnings: mapping of warning markers onto their messages.
+    """
+    MESSAGES.register(name, errors, warnings)
+
+
+def get_message_matcher(name):
+    """Return the compiled matcher for the markers registered under the given name in the process-wide registry.
+
+    :param name: the name of the entry, e.g. ``pw``.
+    """
+    return MESSAGES.get_matcher(name)
@@ -6,21 +6,50 @@ without aiida and will return a dictionary with parsed keys.
 """
 from __future__ import annotations
 
+import bisect
+import re
+import warnings
+
 import numpy
 from qe_tools import CONSTANTS
 
 from aiida_quantumespresso.parsers import QEOutputParsingError
 from aiida_quantumespresso.parsers.parse_raw.base import convert_qe_time_to_sec
 from aiida_quantumespresso.parsers.parse_xml.pw.legacy import parse_xml_child_bool, read_xml_card
-
-
-def parse_raw_ph_output(stdout, logs, tensors=None, dynamical_matrices=None):
+from aiida_quantumespresso.utils.executors import get_executor
+from aiida_quantumespresso.utils.mapping import get_logging_container
+
+# The markers of the lines of the stdout that are parsed by ``parse_ph_text_output``
+REGEX_PH_STDOUT_MARKERS = re.compile(
+    '|'.join(
+        re.escape(marker) for marker in [
+            'q-points for this run',
+            'q-points)',
+            'Calculation of q =',
+            'number of atoms/cell',
+            'irreducible representations',
+            'Diagonalizing the dynamical matrix',
+        ]
+    )
+)
+
+MARKER_DYNMAT_SEPARATOR = '*' * 48
+
+# An eigenvector line of a mode in a dynamical matrix file: a single parenthesized group of exactly six values
+REGEX_DYNMAT_EIGENVECTOR = re.compile(r'\(((?:\s*[^\s()]+){6})\s*\)')
+
+
+def parse_raw_ph_output(stdout, logs, tensors=None, dynamical_matrices=None, max_workers=None, executor='thread'):
     """Parses the raw output of a Quantum ESPRESSO `ph.x` calculation.
 
     :param stdout: the content of the stdout file as a string
     :param tensors: the content of the tensors.xml file as a string
     :param dynamical_matrices: a list of the content of the dynamical matrix files as a string
+    :param max_workers: the number of workers with which the dynamical matrices are parsed concurrently. By default,
+        or if it is 1, they are parsed one after the other.
+    :param executor: the type of pool of workers, see :func:`aiida_quantumespresso.utils.executors.get_executor`.
     :returns: tuple of two dictionaries, with the parsed data and log messages, respectively
+    :raises ValueError: if the executor is not supported.
     """
     data_lines = stdout.split('\n')
 
@@ -37,26 +66,20 @@ def parse_raw_ph_output(stdout, logs, tensors=None, dynamical_matrices=None):
     # parse dynamical matrices if present
     dynmat_data = {}
     if dynamical_matrices:
-        # find lattice parameter
-        for dynmat_counter, dynmat in enumerate(dynamical_matrices):
-
-            lines = dynmat.split('\n')
-
-            # check if the file contains frequencies (i.e. is useful) or not
-            dynmat_to_parse = False
-            if not lines:
-                continue
-            try:
-                _ = [float(i) for i in lines[0].split()]
-            except ValueError:
-                dynmat_to_parse = True
-
-            if not dynmat_to_parse:
+        # The dynamical matrices are independent, so they can be dispatched to a pool of workers. The results, and the
+        # warnings of each of them, are always merged in the order of the files.
+        if max_workers is None or max_workers <= 1:
+            results = [parse_dynamical_matrix(dynmat) for dynmat in dynamical_matrices]
+        else:
+            with get_executor(executor, max_workers) as pool:
+                results = list(pool.map(parse_dynamical_matrix, dynamical_matrices))
+
+        for dynmat_counter, (this_dynmat_data, warnings_dynmat) in enumerate(results):
+            logs.warning.extend(warnings_dynmat)
+
+            if this_dynmat_data is None:
                 continue
 
-            # parse it
-            this_dynmat_data = parse_ph_dynmat(lines, logs)
-
             # join it with the previous dynmat info
             dynmat_data[f'dynamical_matrix_{dynmat_counter}'] = this_dynmat_data
             # TODO: use the bands format?
@@ -82,6 +105,28 @@ def parse_raw_ph_output(stdout, logs, tensors=None, dynamical_matrices=None):
     return parsed_data, logs
 
 
+def parse_dynamical_matrix(dynmat):
+    """Parse the frequencies of a single dynamical matrix file, as done by ``parse_raw_ph_output``.
+
+    This function only takes and returns plain Python objects, such that it can be executed in a pool of threads or
+    processes.
+
+    :param dynmat: the content of the dynamical matrix file as a string.
+    :return: tuple of the parsed data, which is ``None`` if the file does not contain frequencies, e.g. because it only
+        contains the list of q-points, and the list of warnings.
+    """
+    logs = get_logging_container()
+    lines = dynmat.split('\n')
+
+    # check if the file contains frequencies (i.e. is useful) or not
+    try:
+        _ = [float(i) for i in lines[0].split()]
+    except ValueError:
+        return parse_ph_dynmat(lines, logs), list(logs.warning)
+
+    return None, list(logs.warning)
+
+
 def parse_ph_tensor(data):
     """Parse the xml tensor file of QE v5.0.3 data must be read from the file with the .read() function (avoid
     readlines)"""
@@ -189,6 +234,10 @@ def parse_ph_text_output(lines, logs):
     # Parse number of q-points and number of atoms
     for count, line in enumerate(lines):
 
+        # Most lines contain none of the markers, which is checked for all markers at once with a single search
+        if not REGEX_PH_STDOUT_MARKERS.search(line):
+            continue
+
         if 'q-points for this run' in line:
             try:
                 parsed_data['number_of_qpoints'] = int(line.split('/')[1].split('q-points')[0])
@@ -281,9 +330,6 @@ def parse_ph_dynmat(data, logs, lattice_parameter=None, also_eigenvectors=False,
     if 'Dynamical matrix file' not in data[0]:
         raise QEOutputParsingError('Dynamical matrix is not in the expected format')
 
-    frequencies = []
-    eigenvectors = []
-
     starting_line = 1
     if parse_header:
         header_dict = {'warnings': []}
@@ -386,6 +432,11 @@ def parse_ph_dynmat(data, logs, lattice_parameter=None, also_eigenvectors=False,
         # I store what I got
         parsed_data['header'] = header_dict
 
+    # Single pass over the lines to find the computed q-point and the boundaries of the block of each mode, which
+    # starts with a frequency line and is followed by the eigenvector of that mode, one line per atom.
+    mode_starts = []
+    separators = []
+
     for line_counter, line in enumerate(data[starting_line:], start=starting_line):
         if 'q = ' in line:
             # q point is written several times, because it can also be rotated.
@@ -400,36 +451,31 @@ def parse_ph_dynmat(data, logs, lattice_parameter=None, also_eigenvectors=False,
                     parsed_data['q_point_units'] = '2pi/lattice_parameter'
 
         if 'freq' in line or 'omega' in line:
-            this_freq = line.split('[cm-1]')[0].split('=')[-1]
+            mode_starts.append(line_counter)
+        elif MARKER_DYNMAT_SEPARATOR in line:
+            separators.append(line_counter)
 
-            # exception for bad fortran coding: *** could be written instead of the number
-            if '*' in this_freq:
-                frequencies.append(None)
-                logs.warning.append('Wrong fortran formatting found while parsing frequencies')
-            else:
-                frequencies.append(float(this_freq))
-
-            this_eigenvectors = []
-            for new_line in data[line_counter + 1:]:
-                if (
-                    'freq' in new_line or 'omega' in new_line or
-                    '************************************************' in new_line
-                ):
-                    break
-                this_things = new_line.split('(')[1].split(')')[0].split()
-                try:
-                    this_flatlist = [float(i) for i in this_things]
-                except ValueError:
-                    logs.warning.append('Wrong fortran formatting found while parsing eigenvectors')
-                    # then save the three (xyz) complex numbers as [None,None]
-                    this_eigenvectors.append([[None, None]] * 3)
-                    continue
+    # Each block of eigenvector lines ends at the next frequency or separator line, or at the end of the file
+    mode_blocks = []
 
-                list_tuples = list(zip(*[iter(this_flatlist)] * 2))
-                # I save every complex number as a list of two numbers
-                this_eigenvectors.append([[i[0], i[1]] for i in list_tuples])
+    for index, start in enumerate(mode_starts):
+        end = mode_starts[index + 1] if index + 1 < len(mode_starts) else len(data)
+        separator = bisect.bisect_right(separators, start)
+        if separator < len(separators):
+            end = min(end, separators[separator])
+        mode_blocks.append((start, end))
 
-            eigenvectors.append(this_eigenvectors)
+    modes = _parse_dynmat_modes(data, mode_blocks, also_eigenvectors)
+
+    if modes is None:
+        # The blocks are not all well-formatted, so they are parsed line by line, recording what could not be parsed
+        modes = _parse_dynmat_modes_lines(data, mode_blocks, logs)
+    else:
+        for frequency in modes[0]:
+            if frequency is None:
+                logs.warning.append('Wrong fortran formatting found while parsing frequencies')
+
+    frequencies, eigenvectors = modes
 
     parsed_data['frequencies'] = frequencies
     parsed_data['frequencies_units'] = 'cm-1'
@@ -442,6 +488,107 @@ def parse_ph_dynmat(data, logs, lattice_parameter=None, also_eigenvectors=False,
     return parsed_data
 
 
+def _parse_dynmat_frequency(line):
+    """Return the frequency in cm^-1 of a frequency line of a dynamical matrix file.
+
+    :return: the frequency or ``None`` if it was written as asterisks because it overflowed its Fortran format.
+    """
+    this_freq = line.split('[cm-1]')[0].split('=')[-1]
+
+    # exception for bad fortran coding: *** could be written instead of the number
+    if '*' in this_freq:
+        return None
+
+    return float(this_freq)
+
+
+def _parse_dynmat_modes(data, mode_blocks, also_eigenvectors=True):
+    """Parse the frequencies and eigenvectors of all modes in a dynamical matrix, tokenizing all eigenvectors at once.
+
+    This requires each mode to have the same number of eigenvector lines, each with exactly one parenthesized group of
+    six values, the real and imaginary parts of the three cartesian components. The groups of all modes are extracted
+    with a single regular expression and converted into one array with shape ``(modes, atoms, 3, 2)``.
+
+    :param data: the lines of the dynamical matrix file.
+    :param mode_blocks: list of the index of the frequency line of each mode and of the line following its eigenvector.
+    :param also_eigenvectors: if False, the eigenvectors are still validated but not converted to a nested list.
+    :return: tuple of the list of frequencies and the nested list of eigenvectors, or ``None`` if the modes are not all
+        well-formatted, in which case they should be parsed line by line with ``_parse_dynmat_modes_lines``.
+    """
+    frequencies = [_parse_dynmat_frequency(data[start]) for start, _ in mode_blocks]
+
+    if not mode_blocks:
+        return frequencies, []
+
+    num_atoms = {end - start - 1 for start, end in mode_blocks}
+
+    if len(num_atoms) != 1:
+        return None
+
+    num_atoms = num_atoms.pop()
+    num_lines = num_atoms * len(mode_blocks)
+    block = '\n'.join(line for start, end in mode_blocks for line in data[start + 1:end])
+    groups = REGEX_DYNMAT_EIGENVECTOR.findall(block)
+
+    if len(groups) != num_lines or block.count('(') != num_lines:
+        return None
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            values = numpy.fromstring(' '.join(groups), sep=' ')
+        except (ValueError, DeprecationWarning):
+            return None
+
+    if values.size != num_lines * 6:
+        return None
+
+    if not also_eigenvectors:
+        return frequencies, None
+
+    return frequencies, values.reshape(len(mode_blocks), num_atoms, 3, 2).tolist()
+
+
+def _parse_dynmat_modes_lines(data, mode_blocks, logs):
+    """Parse the frequencies and eigenvectors of all modes of a dynamical matrix file line by line.
+
+    Values that are not correctly formatted are set to ``None`` and a warning is added to the logs for each of them.
+
+    :param data: the lines of the dynamical matrix file.
+    :param mode_blocks: list of the index of the frequency line of each mode and of the line following its eigenvector.
+    :param logs: the logging container.
+    :return: tuple of the list of frequencies and the nested list of eigenvectors.
+    """
+    frequencies = []
+    eigenvectors = []
+
+    for start, end in mode_blocks:
+        frequency = _parse_dynmat_frequency(data[start])
+        frequencies.append(frequency)
+
+        if frequency is None:
+            logs.warning.append('Wrong fortran formatting found while parsing frequencies')
+
+        this_eigenvectors = []
+        for new_line in data[start + 1:end]:
+            this_things = new_line.split('(')[1].split(')')[0].split()
+            try:
+                this_flatlist = [float(i) for i in this_things]
+            except ValueError:
+                logs.warning.append('Wrong fortran formatting found while parsing eigenvectors')
+                # then save the three (xyz) complex numbers as [None,None]
+                this_eigenvectors.append([[None, None]] * 3)
+                continue
+
+            list_tuples = list(zip(*[iter(this_flatlist)] * 2))
+            # I save every complex number as a list of two numbers
+            this_eigenvectors.append([[i[0], i[1]] for i in list_tuples])
+
+        eigenvectors.append(this_eigenvectors)
+
+    return frequencies, eigenvectors
+
+
 def parse_initialization_qpoints(stdout: str) -> dict:
     """Return the number of q-points from an initialization run.
 
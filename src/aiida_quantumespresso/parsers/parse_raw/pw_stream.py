@@ -0,0 +1,1115 @@
+# -*- coding: utf-8 -*-
+"""Single-pass, streaming parser for the stdout of a Quantum ESPRESSO `pw.x` calculation.
+
+The :class:`PwStdoutParser` defined here consumes the stdout line by line, e.g. directly from an open file handle,
+such that the memory footprint does not depend on the size of the output, even for very long `md` and `vc-relax` runs.
+
+Every piece of information that follows a marker line is parsed by a collector: a generator that is started at the
+marker line and that receives all subsequent lines until it has seen what it needs. Information that precedes a marker
+line is tracked by keeping the last relevant line of the current trajectory frame.
+"""
+import re
+import traceback
+
+from qe_tools import CONSTANTS
+
+from aiida_quantumespresso.parsers import QEOutputParsingError
+from aiida_quantumespresso.parsers.parse_raw import convert_qe_time_to_sec
+from aiida_quantumespresso.utils.mapping import get_logging_container
+
+from .pw import (
+    default_charge_units,
+    default_dipole_units,
+    default_energy_units,
+    default_force_units,
+    default_magnetization_units,
+    default_stress_units,
+    detect_important_message,
+    grep_energy_from_line,
+    lattice_tolerance,
+    units_suffix,
+)
+
+__all__ = ('PwStdoutParser', 'PwStdoutState', 'iterate_lines', 'parse_stdout_stream', 'parse_stdout_tail')
+
+MARKER_FRAME = 'Self-consistent Calculation'
+MARKER_HUBBARD = 'LDA+U parameters'
+
+REGEX_RAM = re.compile(r'\s+([+-]?\d+(\.\d*)?|\.\d+([eE][+-]?\d+)?)\s*(Mb|MB|GB)')
+
+ENERGY_TERMS = (
+    ('one-electron contribution', 'energy_one_electron'),
+    ('hartree contribution', 'energy_hartree'),
+    ('xc contribution', 'energy_xc'),
+    ('ewald contribution', 'energy_ewald'),
+    ('smearing contrib.', 'energy_smearing'),
+    ('one-center paw contrib.', 'energy_one_center_paw'),
+    ('est. exchange err', 'energy_est_exchange'),
+    ('Fock energy', 'energy_fock'),
+    ('Hubbard energy', 'energy_hubbard'),
+    # Add also ENVIRON specific contribution to the total energy
+    ('solvation energy', 'energy_solvation'),
+    ('cavitation energy', 'energy_cavitation'),
+    ('PV energy', 'energy_pv'),
+    ('periodic energy correct.', 'energy_pbc_correction'),
+    ('ionic charge energy', 'energy_ionic_charge'),
+    ('external charges energy', 'energy_external_charges'),
+)
+
+
+def iterate_lines(handle):
+    """Yield the lines of a text file handle without their line terminator.
+
+    The lines are identical to the elements of ``content.split('\\n')``, including the trailing empty string if the
+    content ends with a newline, but the content is never loaded in memory as a whole.
+
+    :param handle: an iterable of lines, e.g. a file handle opened in text mode.
+    """
+    line = None
+
+    for line in handle:
+        yield line[:-1] if line.endswith('\n') else line
+
+    if line is None or line.endswith('\n'):
+        yield ''
+
+
+def parse_stdout_stream(
+    lines, input_parameters, parser_options=None, parsed_xml=None, crash_file=None, trajectory_frames=None
+):
+    """Parse the stdout of a Quantum ESPRESSO `pw.x` calculation from an iterable of lines in a single pass.
+
+    The stdout can be passed either as a string or as an open file handle, in which case it is never loaded in memory as
+    a whole.
+
+    :param lines: the stdout content as a string or an iterable of lines, e.g. an open file handle.
+    :param input_parameters: dictionary with the input parameters
+    :param parser_options: the parser options from the settings input parameter node
+    :param parsed_xml: dictionary with data parsed from the XML output file
+    :param crash_file: the content of the ``CRASH`` file as a string if it was written, ``None`` otherwise.
+    :param trajectory_frames: optional factory of the containers of the trajectory arrays with one frame per step, see
+        :class:`PwStdoutParser`.
+    :returns: tuple of two dictionaries, with the parsed data and log messages, respectively
+    """
+    parser = PwStdoutParser(input_parameters, parser_options, parsed_xml, crash_file, trajectory_frames)
+
+    if isinstance(lines, str):
+        lines = lines.split('\n')
+    else:
+        lines = iterate_lines(lines)
+
+    for line in lines:
+        parser.feed(line)
+
+    return parser.finalize()
+
+
+def parse_stdout_tail(tail, state):
+    """Parse the content that was appended to the stdout of a running `pw.x` calculation since the previous call.
+
+    This allows to follow a calculation while it is running, by repeatedly reading the stdout from ``state.offset``
+    onwards and passing it to this function, without ever parsing the same line twice::
+
+        state = PwStdoutState(input_parameters)
+        trajectory = {}
+
+        while not done:
+            with open(filepath, 'rb') as handle:
+                handle.seek(state.offset)
+                for key, values in parse_stdout_tail(handle.read(), state).items():
+                    trajectory.setdefault(key, []).extend(values)
+
+    Only complete lines are parsed: a trailing line without line terminator may still be in the process of being
+    written, so it is left to be parsed in the next call, which should therefore start again at ``state.offset``.
+
+    :param tail: the bytes of the stdout starting at ``state.offset``.
+    :param state: the :class:`PwStdoutState` of the previous call, which is updated in place.
+    :returns: dictionary with the values of the trajectory that were completed by this call, see
+        :meth:`PwStdoutState.get_trajectory`.
+    """
+    end = tail.rfind(b'\n') + 1
+
+    for line in tail[:end].decode('utf-8', errors='replace').split('\n')[:-1]:
+        state.parser.feed(line[:-1] if line.endswith('\r') else line)
+
+    state.offset += end
+
+    return state.get_trajectory()
+
+
+class PwStdoutState:
+    """State of the incremental parsing of the stdout of a running `pw.x` calculation with :func:`parse_stdout_tail`.
+
+    The state only lives in memory, since the :class:`PwStdoutParser` that it wraps keeps the collectors of the blocks
+    that are still being parsed, which are generators.
+    """
+
+    def __init__(self, input_parameters, parser_options=None):
+        """Construct a new instance.
+
+        :param input_parameters: dictionary with the input parameters
+        :param parser_options: the parser options from the settings input parameter node
+        """
+        self.offset = 0
+        self.cursors = {}
+        self.parser = PwStdoutParser(input_parameters, parser_options)
+
+    @property
+    def job_done(self):
+        """Return whether the ``JOB DONE`` line has been parsed, i.e. whether `pw.x` has finished."""
+        return self.parser.job_done
+
+    def get_trajectory(self):
+        """Return the values of the trajectory that were completed since the previous call.
+
+        The values are the same as those of the ``trajectory`` returned by :func:`parse_stdout_stream`, except for the
+        ones that can only be determined at the end of a frame or of the output, e.g. the ``energy_threshold`` of the
+        current frame and the ``energy_vdw``. These, and all values of the same quantity that follow them, are held back
+        until they are determined, such that concatenating the lists returned by successive calls yields the trajectory.
+
+        :returns: dictionary with a list of new values for each of the parsed trajectory quantities
+        """
+        trajectory = {}
+
+        for key, values in self.parser.trajectory_data.items():
+            start = self.cursors.get(key, 0)
+            stop = start
+
+            while stop < len(values) and not isinstance(values[stop], _Placeholder):
+                stop += 1
+
+            if stop > start:
+                trajectory[key] = values[start:stop]
+                self.cursors[key] = stop
+
+        return trajectory
+
+
+class _Placeholder:
+    """Value in a trajectory list that can only be determined once the current frame or the entire output is parsed."""
+
+    def __init__(self, key):
+        self.key = key
+        self.line = None
+
+
+class _MagneticMomentsBlock:
+    """A block of magnetic moments per site, following a ``Magnetic moment per site`` line."""
+
+    def __init__(self):
+        self.magnetic_moments = []
+        self.charges = []
+        self.complete = False
+        self.selected = False
+        self.exception = None
+
+
+class _Frame:
+    """State of a single trajectory frame, i.e. the output following a ``Self-consistent Calculation`` line."""
+
+    def __init__(self):
+        self.collectors = []
+        self.last_ethr_line = None
+        self.last_vdw_line = None
+        self.last_magnetic_marker = None
+        self.placeholders = []
+        self.dipoles = {}
+
+
+class PwStdoutParser:
+    """State machine that parses the stdout of a `pw.x` calculation line by line.
+
+    Feed all lines of the stdout, in order and without line terminators, through :meth:`feed` and call :meth:`finalize`
+    to obtain the parsed data and logs.
+    """
+
+    def __init__(self, input_parameters, parser_options=None, parsed_xml=None, crash_file=None, trajectory_frames=None):
+        """Construct a new instance.
+
+        :param input_parameters: dictionary with the input parameters
+        :param parser_options: the parser options from the settings input parameter node
+        :param parsed_xml: dictionary with data parsed from the XML output file. Note that the ``bands`` and
+            ``structure`` keys are popped from this dictionary.
+        :param crash_file: the content of the ``CRASH`` file as a string if it was written, ``None`` otherwise.
+        :param trajectory_frames: optional function that is called with the key of a trajectory array with a frame
+            per step, e.g. ``forces``, and that returns the empty container to which its frames are appended as soon as
+            they are parsed, e.g. a :class:`~aiida_quantumespresso.utils.trajectory.TrajectoryFrames` that writes them
+            to a file. By default, the frames are appended to a list.
+        """
+        parser_options = parser_options or {}
+        parsed_xml = {} if parsed_xml is None else parsed_xml
+
+        self.input_parameters = input_parameters
+        self.crash_file = crash_file
+        self.lelfield = input_parameters.get('CONTROL', {}).get('lelfield', False)
+        self.parse_atomic_occupations = parser_options.get('parse_atomic_occupations', False)
+
+        self.logs = get_logging_container()
+        self.logs_detected = get_logging_container()
+
+        self.bands_data = parsed_xml.pop('bands', {})
+        self.structure_data = parsed_xml.pop('structure', {})
+        self.parsed_data = {}
+        self.parsed_frames = {}
+        self.trajectory_data = {}
+        self.trajectory_frames = trajectory_frames or (lambda key: [])
+        self.atomic_occupations = {}
+
+        self.job_done = False
+        self.vdw_correction = False
+        self.c_bands_error = False
+        self.marker_bfgs_converged = False
+        self.maximum_ionic_steps = None
+
+        self.exception = None
+        self.collectors = []
+        self.placeholders = []
+        self.frame = None
+
+        # The basic information is taken from the XML if available, otherwise it is parsed from the stdout header
+        self.header = {}
+        self.header_from_stdout = not parsed_xml.get('number_of_bands', None)
+        self.header_done = not self.header_from_stdout
+        self.header_complete = not self.header_from_stdout
+
+        if self.header_from_stdout:
+            self.nat = None
+            self.alat = None
+        else:
+            self.nat = self.structure_data['number_of_atoms']
+            self.ntyp = self.structure_data['number_of_species']
+            self.alat = self.structure_data['lattice_parameter_xml']
+            self.volume = self.structure_data['cell']['volume']
+
+    def feed(self, line):
+        """Parse the next line of the stdout.
+
+        :param line: a single line of the stdout without the line terminator.
+        """
+        if 'JOB DONE' in line:
+            self.job_done = True
+
+        if not self.header_done:
+            self._parse_header(line)
+
+        # Compare the line to the known set of error and warning messages and add them to the log container
+        detect_important_message(self.logs_detected, line)
+
+        if self.exception is None:
+            try:
+                self._feed_collectors(self.collectors, line)
+                self._parse_line(line)
+            except Exception as exception:  # pylint: disable=broad-except
+                # If the header has not been fully parsed yet, the output may turn out to be unparsable in which case
+                # the exception should be ignored. Therefore, the exception is only raised in ``finalize``.
+                if self.header_complete:
+                    raise
+                self.exception = exception
+                return
+
+            try:
+                self._feed_frames(line)
+            except Exception as exception:  # pylint: disable=broad-except
+                if self.header_complete:
+                    raise
+                self.exception = exception
+
+        if self.parse_atomic_occupations:
+            self._parse_atomic_occupations(line)
+
+    def finalize(self):
+        """Finish the parsing after all lines have been fed and return the results.
+
+        :returns: tuple of two dictionaries, with the parsed data and log messages, respectively
+        """
+        if self.exception is None:
+            try:
+                self._close_frame()
+                for collector in self.collectors:
+                    try:
+                        collector.throw(IndexError('list index out of range'))
+                    except StopIteration:
+                        pass
+            except Exception as exception:  # pylint: disable=broad-except
+                self.exception = exception
+
+        logs = get_logging_container()
+        parsed_data = {}
+
+        if not self.job_done and self.crash_file is None:
+            logs.error.append('ERROR_OUTPUT_STDOUT_INCOMPLETE')
+
+        if self.header_from_stdout:
+            header = self.header
+
+            try:
+                alat = header['alat'] * CONSTANTS.bohr_to_ang
+                volume = header['volume'] * CONSTANTS.bohr_to_ang**3
+                parsed_data['lattice_parameter_initial'] = alat
+                parsed_data['number_of_bands'] = header['nbnd']
+            except KeyError:
+                return self._finalize_unparsable(parsed_data, logs)
+
+            # these are not crucial, so parsing does not fail if they are not found
+            for key, header_key in [
+                ('number_of_k_points', 'nk'),
+                ('fft_grid', 'fft_grid'),
+                ('smooth_fft_grid', 'smooth_fft_grid'),
+            ]:
+                if header_key not in header:
+                    break
+                parsed_data[key] = header[header_key]
+
+            try:
+                nat = header['nat']
+                ntyp = header['ntyp']
+            except KeyError as exception:
+                raise QEOutputParsingError(f'Parser cannot load basic info: {exception} not found.') from exception
+        else:
+            nat = self.nat
+            ntyp = self.ntyp
+            volume = self.volume
+
+        if self.exception is not None:
+            raise self.exception
+
+        parsed_data['number_of_atoms'] = nat
+        parsed_data['number_of_species'] = ntyp
+        parsed_data['volume'] = volume
+        parsed_data.update(self.parsed_data)
+        parsed_data.update(self.parsed_frames)
+
+        if self.vdw_correction:
+            self._resolve_vdw_placeholders()
+
+        for level in ['error', 'warning']:
+            logs[level].extend(self.logs[level])
+            logs[level].extend(self.logs_detected[level])
+
+        trajectory_data = self.trajectory_data
+
+        for key, values in list(trajectory_data.items()):
+            if not isinstance(values, list):
+                continue  # the frames of the arrays with a frame per step never contain placeholders
+            trajectory_data[key] = [value for value in values if not isinstance(value, _Placeholder)]
+            if not trajectory_data[key]:
+                trajectory_data.pop(key)
+
+        if self.c_bands_error:
+            logs.warning.append('c_bands: at least 1 eigenvalues not converged')
+
+        # check consistency of scf_accuracy and scf_iterations
+        if 'scf_accuracy' in trajectory_data:
+            if 'scf_iterations' in trajectory_data:
+                if len(trajectory_data['scf_accuracy']) != sum(trajectory_data['scf_iterations']):
+                    logs.warning.append(
+                        'the length of scf_accuracy does not match the sum of the elements of scf_iterations.'
+                    )
+            else:
+                logs.warning.append('"the scf_accuracy array was parsed but the scf_iterations was not.')
+
+        if self.parse_atomic_occupations:
+            parsed_data['atomic_occupations'] = self.atomic_occupations
+
+        # Ionic calculations and BFGS algorithm did not print that calculation is converged
+        if 'atomic_positions_relax' in trajectory_data and not self.marker_bfgs_converged:
+            logs.error.append('ERROR_IONIC_CONVERGENCE_NOT_REACHED')
+
+        # Ionic calculation that hit the maximum number of ionic steps. Note: does not necessarily mean that convergence
+        # was not reached as it could have occurred in the last step.
+        if self.maximum_ionic_steps is not None and self.maximum_ionic_steps == parsed_data.get(
+            'number_ionic_steps', None
+        ):
+            logs.warning.append('ERROR_MAXIMUM_IONIC_STEPS_REACHED')
+
+        parsed_data['bands'] = self.bands_data
+        parsed_data['structure'] = self.structure_data
+        parsed_data['trajectory'] = trajectory_data
+
+        # Double check to detect error messages if CRASH is found
+        if self.crash_file is not None:
+            for line in self.crash_file.split('\n'):
+                detect_important_message(logs, line)
+
+            if len(logs.error) == len(logs.warning) == 0:
+                raise QEOutputParsingError('Parser cannot load basic info.')
+
+        # Remove duplicate log messages by turning it into a set. Then convert back to list as that is what is expected
+        logs.error = list(set(logs.error))
+        logs.warning = list(set(logs.warning))
+
+        return parsed_data, logs
+
+    def _finalize_unparsable(self, parsed_data, logs):
+        """Return the results for an output whose basic information could not be parsed from the header.
+
+        In this case only the known error and warning messages are returned, taken from the ``CRASH`` file if it exists
+        or from the stdout otherwise.
+        """
+        if self.crash_file is None:
+            detected = self.logs_detected
+        else:
+            detected = get_logging_container()
+            for line in self.crash_file.split('\n'):
+                detect_important_message(detected, line)
+
+        for level in ['error', 'warning']:
+            logs[level].extend(detected[level])
+
+        if len(logs.error) or len(logs.warning) > 0:
+            parsed_data['trajectory'] = {}
+            return parsed_data, logs
+
+        # did not find any error message -> raise an Error and do not return anything
+        raise QEOutputParsingError('Parser cannot load basic info.')
+
+    def _parse_header(self, line):
+        """Parse the basic information from the header of the stdout.
+
+        The values keep being updated until the ``Smooth grid`` line is encountered, which marks the end of the header.
+        """
+        header = self.header
+
+        if 'lattice parameter (alat)' in line:
+            header['alat'] = float(line.split('=')[1].split('a.u')[0])
+            self.alat = header['alat'] * CONSTANTS.bohr_to_ang
+        elif 'number of atoms/cell' in line:
+            header['nat'] = int(line.split('=')[1])
+            self.nat = header['nat']
+        elif 'number of atomic types' in line:
+            header['ntyp'] = int(line.split('=')[1])
+        elif 'unit-cell volume' in line:
+            if '(a.u.)^3' in line:
+                header['volume'] = float(line.split('=')[1].split('(a.u.)^3')[0])
+            else:
+                # occurs in v5.3.0
+                header['volume'] = float(line.split('=')[1].split('a.u.^3')[0])
+        elif 'number of Kohn-Sham states' in line:
+            header['nbnd'] = int(line.split('=')[1])
+        elif 'number of k points' in line:
+            nk = int(line.split('=')[1].split()[0])
+            if self.input_parameters.get('SYSTEM', {}).get('nspin', 1) > 1:
+                # QE counts twice each k-point in spin-polarized calculations
+                nk /= 2
+            header['nk'] = nk
+        elif 'Dense  grid' in line:
+            header['fft_grid'] = [int(g) for g in line.split('(')[1].split(')')[0].split(',')]
+        elif 'Smooth grid' in line:
+            header['smooth_fft_grid'] = [int(g) for g in line.split('(')[1].split(')')[0].split(',')]
+            self.header_done = True
+            self.header_complete = all(key in header for key in ['alat', 'volume', 'nbnd', 'nat', 'ntyp'])
+
+    def _parse_atomic_occupations(self, line):
+        """Parse the atomic occupations from the last block of Hubbard parameters."""
+        if MARKER_HUBBARD in line:
+            self.atomic_occupations = {}
+            line = line.split(MARKER_HUBBARD)[-1]
+
+        if 'Tr[ns(na)]' in line:
+
+            values = line.split('=')
+            atomic_index = values[0].split()[1]
+            occupations = values[1].split()
+
+            if len(occupations) == 1:
+                self.atomic_occupations[atomic_index] = {'total': occupations[0]}
+            elif len(occupations) == 3:
+                self.atomic_occupations[atomic_index] = {
+                    'up': occupations[0],
+                    'down': occupations[1],
+                    'total': occupations[2]
+                }
+
+    @staticmethod
+    def _start_collector(collectors, collector):
+        """Prime the collector and add it to the list of active collectors unless it finished immediately."""
+        try:
+            next(collector)
+        except StopIteration:
+            return
+        collectors.append(collector)
+
+    @staticmethod
+    def _feed_collectors(collectors, line):
+        """Send the line to all active collectors, removing those that have finished."""
+        for collector in list(collectors):
+            try:
+                collector.send(line)
+            except StopIteration:
+                collectors.remove(collector)
+
+    def _parse_line(self, line):
+        """Parse information that is printed once or is accumulated over the entire stdout."""
+        parsed_data = self.parsed_data
+        logs = self.logs
+
+        # to be used for later
+        if 'Non-local correlation energy' in line:
+            self.vdw_correction = True
+
+        elif 'Cartesian axes' in line:
+            # this is the part when initial positions and chemical
+            # symbols are printed (they do not change during a run)
+            self._start_collector(self.collectors, self._collect_species_names())
+
+        # parse the initialization time (take only first occurence)
+        elif ('init_wall_time_seconds' not in parsed_data and 'total cpu time spent up to now is' in line):
+            init_time = float(line.split('total cpu time spent up to now is')[1].split('secs')[0])
+            parsed_data['init_wall_time_seconds'] = init_time
+
+        # parse dynamical RAM estimates
+        elif 'Estimated max dynamical RAM per process' in line:
+            value = line.split('>')[-1]
+            match = REGEX_RAM.match(value)
+            if match:
+                try:
+                    parsed_data['estimated_ram_per_process'] = float(match.group(1))
+                    parsed_data[f'estimated_ram_per_process{units_suffix}'] = match.group(4)
+                except (IndexError, ValueError):
+                    pass
+
+        # parse dynamical RAM estimates
+        elif 'Estimated total dynamical RAM' in line:
+            value = line.split('>')[-1]
+            match = REGEX_RAM.match(value)
+            if match:
+                try:
+                    parsed_data['estimated_ram_total'] = float(match.group(1))
+                    parsed_data[f'estimated_ram_total{units_suffix}'] = match.group(4)
+                except (IndexError, ValueError):
+                    pass
+
+        # parse the global file, for informations that are written only once
+        elif 'PWSCF' in line and 'WALL' in line:
+            try:
+                time = line.split('CPU')[1].split('WALL')[0]
+                parsed_data['wall_time'] = time
+            except Exception:  # pylint: disable=broad-except
+                logs.warning.append('Error while parsing wall time.')
+            try:
+                parsed_data['wall_time_seconds'] = convert_qe_time_to_sec(time)
+            except ValueError:
+                raise QEOutputParsingError('Unable to convert wall_time in seconds.')
+
+        # for later control on relaxation-dynamics convergence
+        elif 'nstep' in line and '=' in line:
+            self.maximum_ionic_steps = int(line.split()[2])
+
+        elif 'bfgs converged in' in line:
+            self.marker_bfgs_converged = True
+
+        elif 'number of bfgs steps' in line:
+            parsed_data['number_ionic_steps'] = parsed_data.get('number_ionic_steps', 0) + 1
+
+        elif 'A final scf calculation at the relaxed structure' in line:
+            parsed_data['final_scf'] = True
+
+        elif 'point group' in line:
+            if 'k-point group' not in line:
+                try:
+                    # Split line in components delimited by either space(s) or
+                    # parenthesis and filter out empty strings
+                    line_elems = [_f for _f in re.split(r' +|\(|\)', line) if _f]
+
+                    parsed_data['pointgroup_international'] = line_elems[-1]
+                    parsed_data['pointgroup_schoenflies'] = line_elems[-2]
+
+                except Exception:  # pylint: disable=broad-except
+                    logs.warning.append(f'Problem parsing point group, I found: {line.strip()}')
+
+        # special parsing of c_bands error
+        elif 'c_bands' in line and 'eigenvalues not converged' in line:
+            self.c_bands_error = True
+
+        elif 'iteration #' in line:
+            if 'Calculation restarted' not in line and 'Calculation stopped' not in line:
+                parsed_data['total_number_of_scf_iterations'] = parsed_data.get('total_number_of_scf_iterations', 0) + 1
+
+            # if there is another iteration, c_bands is not necessarily a problem
+            # I put a warning only if c_bands error appears in the last iteration
+            self.c_bands_error = False
+
+    def _collect_species_names(self):
+        """Collect the names of the atomic species from the block following the ``Cartesian axes`` line."""
+        line = yield
+
+        for _ in range(9):
+            if 'site n.' in line and 'atom' in line:
+                break
+            line = yield
+
+        if 'site n.' in line and 'atom' in line:
+            names = []
+            for _ in range(self.nat):
+                line = yield
+                names.append(line.split()[1])
+            self.trajectory_data['atomic_species_name'] = names
+
+    def _feed_frames(self, line):
+        """Dispatch the line to the current trajectory frame, opening and closing frames at the frame markers."""
+        if MARKER_FRAME not in line:
+            if self.frame is not None:
+                self._feed_frame(line)
+            return
+
+        parts = line.split(MARKER_FRAME)
+
+        for index, part in enumerate(parts):
+            if index > 0:
+                self._close_frame()
+                self.frame = _Frame()
+            if self.frame is not None:
+                self._feed_frame(part)
+
+    def _close_frame(self):
+        """Close the current trajectory frame, signalling the end of the frame to all collectors that are still active.
+
+        The collectors receive an ``IndexError``, which is what the original implementation would encounter when trying
+        to look beyond the last line of the frame.
+        """
+        frame = self.frame
+
+        if frame is None:
+            return
+
+        self.frame = None
+
+        for collector in frame.collectors:
+            try:
+                collector.throw(IndexError('list index out of range'))
+            except StopIteration:
+                pass
+
+        for placeholder in frame.placeholders:
+            if placeholder.key == 'energy_threshold':
+                self._resolve_ethr_placeholder(placeholder, frame.last_ethr_line)
+            else:
+                placeholder.line = frame.last_vdw_line
+                self.placeholders.append(placeholder)
+
+        # End of trajectory frame, only keep last entries for dipole related values
+        if self.lelfield is True:
+            values = []
+
+            for key in [
+                'electronic_dipole_cell_average',
+                'electronic_dipole_cartesian_axes',
+                'ionic_dipole_cell_average',
+                'ionic_dipole_cartesian_axes',
+            ]:
+                try:
+                    values.append((key, frame.dipoles[key][-1]))
+                except (IndexError, KeyError):
+                    values.append((key, None))
+
+            # Only add them if all four properties were successfully parsed
+            if all(value is not None for _, value in values):
+                for key, value in values:
+                    self.trajectory_data.setdefault(key, []).append(value)
+
+    def _feed_frame(self, line):
+        """Parse a line of the current trajectory frame."""
+        frame = self.frame
+        self._feed_collectors(frame.collectors, line)
+        self._parse_frame_line(frame, line)
+
+        # Keep track of the last lines that the original implementation would find by looking back from a marker line
+        if 'ethr' in line:
+            frame.last_ethr_line = line
+
+        if 'Non-local correlation energy' in line:
+            frame.last_vdw_line = line
+
+        if 'Magnetic moment per site' in line:
+            block = _MagneticMomentsBlock()
+            frame.last_magnetic_marker = block
+            self._start_collector(frame.collectors, self._collect_magnetic_moments(block))
+        elif 'iteration' in line:
+            frame.last_magnetic_marker = None
+
+    def _parse_frame_line(self, frame, line):
+        """Parse information that is printed for each trajectory frame."""
+        trajectory_data = self.trajectory_data
+        logs = self.logs
+
+        if 'CELL_PARAMETERS' in line:
+            self._start_collector(frame.collectors, self._collect_cell(line))
+
+        elif 'ATOMIC_POSITIONS' in line:
+            self._start_collector(frame.collectors, self._collect_positions(line))
+
+        # NOTE: in the above, the chemical symbols are not those of AiiDA
+        # since the AiiDA structure is different. So, I assume now that the
+        # order of atoms is the same of the input atomic structure.
+
+        # Computed dipole correction in slab geometries.
+        # save dipole in debye units, only at last iteration of scf cycle
+        elif 'Computed dipole along edir' in line:
+            self._start_collector(frame.collectors, self._collect_dipole())
+
+        # saving the SCF convergence accuracy for each SCF cycle
+        # If for some step this line is not printed, the later check with the scf_accuracy array length should catch it
+        elif 'estimated scf accuracy' in line:
+            try:
+                value = float(line.split()[-2]) * CONSTANTS.ry_to_ev
+                trajectory_data.setdefault('scf_accuracy', []).append(value)
+            except Exception:  # pylint: disable=broad-except
+                logs.warning.append('Error while parsing scf accuracy.')
+
+        elif 'convergence has been achieved in' in line or 'convergence NOT achieved after' in line:
+            try:
+                value = int(line.split('iterations')[0].split()[-1])
+                trajectory_data.setdefault('scf_iterations', []).append(value)
+            except Exception:  # pylint: disable=broad-except
+                logs.warning.append('Error while parsing scf iterations.')
+
+        elif 'Calculation stopped in scf loop at iteration' in line:
+            try:
+                value = int(line.split()[-1])
+                trajectory_data.setdefault('scf_iterations', []).append(value)
+            except Exception:  # pylint: disable=broad-except
+                logs.warning.append('Error while parsing scf iterations.')
+
+        elif 'End of self-consistent calculation' in line:
+            # parse energy threshold for diagonalization algorithm
+            if frame.last_ethr_line is not None:
+                self._resolve_ethr_placeholder(None, frame.last_ethr_line)
+            else:
+                # The threshold line is searched for from the end of the frame
+                placeholder = _Placeholder('energy_threshold')
+                trajectory_data.setdefault('energy_threshold', []).append(placeholder)
+                frame.placeholders.append(placeholder)
+
+            # parse final magnetic moments, if present
+            block = frame.last_magnetic_marker
+            if block is not None:
+                if block.exception is not None:
+                    raise block.exception
+                block.selected = True
+                if block.complete:
+                    self._append_magnetic_moments(block)
+
+        # grep energy and possibly, magnetization
+        elif '!' in line:
+            self._start_collector(frame.collectors, self._collect_energies(frame, line))
+
+        elif 'the Fermi energy is' in line:
+            try:
+                value = float(line.split('is')[1].split('ev')[0])
+                trajectory_data.setdefault('fermi_energy', []).append(value)
+                self.parsed_frames['fermi_energy' + units_suffix] = default_energy_units
+            except Exception:  # pylint: disable=broad-except
+                logs.warning.append('Error while parsing Fermi energy from the output file.')
+
+        elif 'Forces acting on atoms' in line:
+            self._start_collector(frame.collectors, self._collect_forces())
+
+        elif 'Total force =' in line:
+            try:  # note that I can't check the units: not written in output!
+                value = float(line.split('=')[1].split('Total')[0]) * CONSTANTS.ry_to_ev / CONSTANTS.bohr_to_ang
+                trajectory_data.setdefault('total_force', []).append(value)
+                self.parsed_frames['total_force' + units_suffix] = default_force_units
+            except Exception:  # pylint: disable=broad-except
+                logs.warning.append('Error while parsing total force.')
+
+        elif ('entering subroutine stress ...' in line) or ('Computing stress (Cartesian axis) and pressure' in line):
+            self._start_collector(frame.collectors, self._collect_stress())
+
+        # Electronic and ionic dipoles when 'lelfield' was set to True in input parameters
+        elif self.lelfield is True:
+
+            if 'Electronic Dipole per cell' in line:
+                electronic_dipole = float(line.split()[-1])
+                frame.dipoles.setdefault('electronic_dipole_cell_average', []).append(electronic_dipole)
+
+            elif 'Ionic Dipole per cell' in line:
+                ionic_dipole = float(line.split()[-1])
+                frame.dipoles.setdefault('ionic_dipole_cell_average', []).append(ionic_dipole)
+
+            elif 'Electronic Dipole on Cartesian axes' in line:
+                self._start_collector(
+                    frame.collectors, self._collect_dipole_cartesian(frame, 'electronic_dipole_cartesian_axes')
+                )
+
+            elif 'Ionic Dipole on Cartesian axes' in line:
+                self._start_collector(
+                    frame.collectors, self._collect_dipole_cartesian(frame, 'ionic_dipole_cartesian_axes')
+                )
+
+    def _resolve_ethr_placeholder(self, placeholder, line):
+        """Parse the energy threshold from ``line`` and append it or, if given, replace the placeholder with it."""
+        values = self.trajectory_data.setdefault('energy_threshold', [])
+
+        try:
+            value = float(line.split('=')[1].split(',')[0])
+        except Exception:  # pylint: disable=broad-except
+            self.logs.warning.append('Error while parsing ethr.')
+            if placeholder is not None:
+                values.remove(placeholder)
+            return
+
+        if placeholder is None:
+            values.append(value)
+        else:
+            values[values.index(placeholder)] = value
+
+    def _resolve_vdw_placeholders(self):
+        """Parse the van der Waals energies for frames where it could only be determined at the end of the stdout."""
+        for placeholder in self.placeholders:
+            values = self.trajectory_data['energy_vdw']
+            try:
+                values[values.index(placeholder)] = grep_energy_from_line(placeholder.line)
+            except Exception:  # pylint: disable=broad-except
+                self.logs.warning.append('Error while parsing for energy terms.')
+            else:
+                self.parsed_frames['energy_vdw' + units_suffix] = default_energy_units
+
+    def _append_frame(self, key, frame):
+        """Append a frame to a trajectory array with a frame per step, e.g. the positions or the forces."""
+        if key not in self.trajectory_data:
+            self.trajectory_data[key] = self.trajectory_frames(key)
+
+        self.trajectory_data[key].append(frame)
+
+    def _append_magnetic_moments(self, block):
+        """Append the magnetic moments and charges of the given block to the trajectory."""
+        self._append_frame('atomic_magnetic_moments', block.magnetic_moments)
+        self._append_frame('atomic_charges', block.charges)
+        self.parsed_frames['atomic_magnetic_moments' + units_suffix] = default_magnetization_units
+        self.parsed_frames['atomic_charges' + units_suffix] = default_charge_units
+
+    def _collect_magnetic_moments(self, block):
+        """Collect the magnetic moments and charges per site following a ``Magnetic moment per site`` line."""
+        try:
+            while True:
+                line = yield
+                if 'atom:' in line:
+                    block.magnetic_moments.append(float(line.split('magn:')[1].split()[0]))
+                    block.charges.append(float(line.split('charge:')[1].split()[0]))
+                # Alternate parsing for new format introduced in v6.8
+                elif 'atom' in line:
+                    block.magnetic_moments.append(float(line.split('magn=')[1].split()[0]))
+                    block.charges.append(float(line.split('charge=')[1].split()[0]))
+                if len(block.magnetic_moments) == self.nat:
+                    break
+        except Exception as exception:  # pylint: disable=broad-except
+            # The block only matters if it turns out to be the last one before the end of the self-consistent cycle
+            block.exception = exception
+            if block.selected:
+                raise
+            return
+
+        block.complete = True
+
+        if block.selected:
+            self._append_magnetic_moments(block)
+
+    def _collect_cell(self, line):
+        """Collect the lattice vectors following a ``CELL_PARAMETERS`` line."""
+        alat = self.alat
+
+        try:
+            a1 = [float(s) for s in (yield).split()]
+            a2 = [float(s) for s in (yield).split()]
+            a3 = [float(s) for s in (yield).split()]
+            # try except indexerror for not enough lines
+            lattice = line.split('(')[1].split(')')[0].split('=')
+            if lattice[0].lower() not in ['alat', 'bohr', 'angstrom']:
+                raise QEOutputParsingError('Error while parsing cell_parameters: ' + f'unsupported units {lattice[0]}')
+
+            if 'alat' in lattice[0].lower():
+                a1 = [alat * CONSTANTS.bohr_to_ang * float(s) for s in a1]
+                a2 = [alat * CONSTANTS.bohr_to_ang * float(s) for s in a2]
+                a3 = [alat * CONSTANTS.bohr_to_ang * float(s) for s in a3]
+                lattice_parameter_b = float(lattice[1])
+                if abs(lattice_parameter_b - alat) > lattice_tolerance:
+                    raise QEOutputParsingError('Lattice parameters mismatch! ' + f'{lattice_parameter_b} vs {alat}')
+            elif 'bohr' in lattice[0].lower():
+                lattice_parameter_b *= CONSTANTS.bohr_to_ang  # pylint: disable=used-before-assignment
+                a1 = [CONSTANTS.bohr_to_ang * float(s) for s in a1]
+                a2 = [CONSTANTS.bohr_to_ang * float(s) for s in a2]
+                a3 = [CONSTANTS.bohr_to_ang * float(s) for s in a3]
+            self._append_frame('lattice_vectors_relax', [a1, a2, a3])
+
+        except Exception:  # pylint: disable=broad-except
+            self.logs.warning.append('Error while parsing relaxation cell parameters.')
+
+    def _collect_positions(self, line):
+        """Collect the atomic positions following an ``ATOMIC_POSITIONS`` line."""
+        alat = self.alat
+
+        try:
+            this_key = 'atomic_positions_relax'
+            metric = line.split('(')[1].split(')')[0]
+            if metric == 'crystal':
+                this_key = 'atomic_fractionals_relax'
+            elif metric not in ['alat', 'bohr', 'angstrom']:
+                raise QEOutputParsingError('Error while parsing atomic_positions: units not supported.')
+            positions = []
+            for _ in range(self.nat):
+                line2 = (yield).split()
+                tau = [float(s) for s in line2[1:4]]
+                if metric == 'alat':
+                    tau = [alat * float(s) for s in tau]
+                elif metric == 'bohr':
+                    tau = [CONSTANTS.bohr_to_ang * float(s) for s in tau]
+                positions.append(tau)
+            self._append_frame(this_key, positions)
+        except Exception:  # pylint: disable=broad-except
+            self.logs.warning.append('Error while parsing relaxation atomic positions.')
+
+    def _collect_dipole(self):
+        """Collect the dipole following a ``Computed dipole along edir`` line.
+
+        Only the last dipole of the self-consistent cycle is kept, i.e. the one that is not followed by another dipole
+        before the ``End of self-consistent calculation`` line.
+        """
+        yield
+        yield
+        line2 = yield
+        value = None
+
+        try:
+            units = line2.split()[-1]
+            if default_dipole_units.lower() not in units.lower():  # only debye
+                raise QEOutputParsingError(f'Error parsing the dipole correction. Units {units} are not supported.')
+            value = float(line2.split()[-2])
+        except IndexError:  # on units
+            pass
+
+        # save only the last dipole correction
+        while 'Computed dipole along edir' not in line2:
+            try:
+                line2 = yield
+            except IndexError:  # The dipole is also written at the beginning of a new bfgs iteration
+                break
+            if 'End of self-consistent calculation' in line2:
+                self.trajectory_data.setdefault('dipole', []).append(value)
+                self.parsed_frames['dipole' + units_suffix] = default_dipole_units
+                break
+
+    def _collect_energies(self, frame, line):
+        """Collect the total energy, its contributions and the magnetization following the ``!`` line."""
+        trajectory_data = self.trajectory_data
+        parsed_frames = self.parsed_frames
+        vdw_line = frame.last_vdw_line
+
+        try:
+            En = float(line.split('=')[1].split('Ry')[0]) * CONSTANTS.ry_to_ev  # pylint: disable=invalid-name
+
+            # Up till v6.5, the line after total energy would be the Harris-Foulkes estimate, followed by the
+            # estimated SCF accuracy. However, pw.x v6.6 removed the HF estimate line.
+            marker = 'estimated scf accuracy'
+            pending = []
+            subline = line
+            for i in range(5):
+                if i > 0:
+                    subline = yield
+                    pending.append(subline)
+                if marker in subline:
+                    try:
+                        E_acc = float(subline.split('<')[1].split('Ry')[0]) * CONSTANTS.ry_to_ev  # pylint: disable=invalid-name
+                    except Exception:  # pylint: disable=broad-except
+                        pass
+                    else:
+                        break
+            else:
+                raise KeyError(f'could not find and parse the line with `{marker}`')
+
+            for key, value in [['energy', En], ['energy_accuracy', E_acc]]:
+                trajectory_data.setdefault(key, []).append(value)
+                parsed_frames[key + units_suffix] = default_energy_units
+
+            while True:
+                line2 = pending.pop(0) if pending else (yield)
+
+                for string, key in ENERGY_TERMS:
+                    if string in line2:
+                        value = grep_energy_from_line(line2)
+                        trajectory_data.setdefault(key, []).append(value)
+                        parsed_frames[key + units_suffix] = default_energy_units
+                # magnetizations
+                if 'total magnetization' in line2:
+                    this_m = line2.split('=')[1].split('Bohr')[0]
+                    try:  # magnetization might be a scalar
+                        value = float(this_m)
+                    except ValueError:  # but can also be a three vector component in non-collinear calcs
+                        value = [float(i) for i in this_m.split()]
+                    trajectory_data.setdefault('total_magnetization', []).append(value)
+                    parsed_frames['total_magnetization' + units_suffix] = default_magnetization_units
+
+                elif 'absolute magnetization' in line2:
+                    value = float(line2.split('=')[1].split('Bohr')[0])
+                    trajectory_data.setdefault('absolute_magnetization', []).append(value)
+                    parsed_frames['absolute_magnetization' + units_suffix] = default_magnetization_units
+                # exit loop
+                elif 'convergence' in line2:
+                    break
+
+            if vdw_line is not None:
+                value = grep_energy_from_line(vdw_line)
+                trajectory_data.setdefault('energy_vdw', []).append(value)
+                parsed_frames['energy_vdw' + units_suffix] = default_energy_units
+            else:
+                # Whether the van der Waals energy is needed is only known at the end of the stdout, and it is then
+                # searched for from the end of the frame.
+                placeholder = _Placeholder('energy_vdw')
+                trajectory_data.setdefault('energy_vdw', []).append(placeholder)
+                frame.placeholders.append(placeholder)
+
+        except Exception:  # pylint: disable=broad-except
+            self.logs.warning.append('Error while parsing for energy terms.')
+
+    def _collect_forces(self):
+        """Collect the forces following the ``Forces acting on atoms`` line."""
+        try:
+            forces = []
+            while True:
+                line2 = yield
+                if 'atom ' in line2:
+                    line2 = line2.split('=')[1].split()
+                    # CONVERT FORCES IN eV/Ang
+                    vec = [float(s) * CONSTANTS.ry_to_ev / CONSTANTS.bohr_to_ang for s in line2]
+                    forces.append(vec)
+                if len(forces) == self.nat:
+                    break
+            self._append_frame('forces', forces)
+            self.parsed_frames['forces' + units_suffix] = default_force_units
+        except Exception:  # pylint: disable=broad-except
+            self.logs.warning.append('Error while parsing forces.')
+
+    def _collect_stress(self):
+        """Collect the stress tensor following the start of the stress block."""
+        try:
+            stress = []
+            window = []
+            index_pressure = None
+            for k in range(15):  # Up to 15 lines later - more than 10 are needed if vdW is turned on
+                window.append((yield))
+                if 'P=' in window[-1]:
+                    index_pressure = k
+            if index_pressure is None:
+                self.logs.warning.append(
+                    'Error while parsing stress tensor: '
+                    '"P=" not found within 15 lines from the start of the stress block'
+                )
+            else:
+                window = window[index_pressure:]
+                if '(Ry/bohr**3)' not in window[0]:
+                    raise QEOutputParsingError('Error while parsing stress: unexpected units.')
+                for k in range(3):
+                    line2 = (window[k + 1] if k + 1 < len(window) else (yield)).split()
+                    vec = [float(s) * 10**(-9) * CONSTANTS.ry_si / (CONSTANTS.bohr_si)**3 for s in line2[0:3]]
+                    stress.append(vec)
+                self._append_frame('stress', stress)
+                self.parsed_frames['stress' + units_suffix] = default_stress_units
+        except Exception:  # pylint: disable=broad-except
+            self.logs.warning.append(f'Error while parsing stress tensor: {traceback.format_exc()}')
+
+    @staticmethod
+    def _collect_dipole_cartesian(frame, key):
+        """Collect the three cartesian components of an electronic or ionic dipole."""
+        dipole = []
+        for _ in range(3):
+            dipole.append(float((yield).split()[1]))
+        frame.dipoles.setdefault(key, []).append(dipole)
@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+"""Non-validating extraction of the fields of the schema-based XML output that are used by the parser.
+
+Decoding the XML output with :meth:`xmlschema.XMLSchema.to_dict` validates and converts every element of the document,
+even though :func:`~aiida_quantumespresso.parsers.parse_xml.parse.parse_xml_post_6_2` only uses a small, fixed subset
+of them. The :func:`extract_xml_dictionary` function instead walks the already parsed element tree once and only
+converts the elements that are declared in :data:`FIELDS`, with the same types the schema assigns to them. The result
+has the same structure as the dictionary returned by the schema decoder, restricted to the declared elements, such that
+it can be processed by the exact same code.
+
+No validation is performed whatsoever: an element with a structure that does not correspond to its declaration raises
+:class:`XMLExtractionError`, upon which the caller is expected to fall back to decoding the document with the schema.
+"""
+
+__all__ = ('XMLExtractionError', 'extract_xml_dictionary')
+
+
+class XMLExtractionError(Exception):
+    """Raised when an element of the XML output does not have the structure expected by the extractor."""
+
+
+def to_string(text):
+    """Decode the content of an element of type ``string``."""
+    return text
+
+
+def to_float(text):
+    """Decode the content of an element of type ``double``."""
+    return float(text)
+
+
+def to_int(text):
+    """Decode the content of an element of type ``integer``."""
+    return int(text)
+
+
+def to_bool(text):
+    """Decode the content of an element of type ``boolean``."""
+    value = text.strip()
+
+    if value in ('true', '1'):
+        return True
+
+    if value in ('false', '0'):
+        return False
+
+    raise ValueError(f'invalid boolean value: {value}')
+
+
+def to_floats(text):
+    """Decode the content of an element whose type is a list of ``double``."""
+    return [float(value) for value in text.split()]
+
+
+def to_ints(text):
+    """Decode the content of an element whose type is a list of ``integer``."""
+    return [int(value) for value in text.split()]
+
+
+class Field:
+    """Declaration of an XML element that should be extracted.
+
+    An element either has simple content, which is decoded with the ``text`` callable, or has child elements, declared
+    in ``children``. Following the conventions of the schema decoder, an element with simple content is represented by
+    its decoded content, unless it defines attributes, in which case it is represented by a dictionary with the content
+    under the ``$`` key and the attributes under their name prefixed with ``@``. Only the declared attributes and child
+    elements are extracted, all others are ignored.
+    """
+
+    def __init__(self, text=None, attributes=None, children=None, multiple=False):
+        """Construct a new instance.
+
+        :param text: callable to decode the content of the element, or ``None`` if the content should be ignored.
+        :param attributes: mapping of attribute names onto the callable to decode them.
+        :param children: mapping of the tags of child elements onto their ``Field`` declaration.
+        :param multiple: whether the element can occur multiple times, in which case it is represented by a list.
+        """
+        self.text = text
+        self.attributes = attributes or {}
+        self.children = children or {}
+        self.multiple = multiple
+
+    def decode(self, element):
+        """Return the decoded representation of the element.
+
+        :param element: the ``Element`` to decode.
+        :raises XMLExtractionError: if the element does not correspond to this declaration.
+        """
+        result = {}
+
+        for name, decode in self.attributes.items():
+            if name in element.attrib:
+                result[f'@{name}'] = self._convert(decode, element.attrib[name], element, f'attribute `{name}`')
+
+        for child in element:
+            field = self.children.get(child.tag, None)
+
+            if field is None:
+                continue
+
+            value = field.decode(child)
+
+            if field.multiple:
+                result.setdefault(child.tag, []).append(value)
+            elif child.tag in result:
+                raise XMLExtractionError(f'element `{child.tag}` occurs more than once in `{element.tag}`')
+            else:
+                result[child.tag] = value
+
+        if self.text is None:
+            # Like the schema decoder, only represent an element without any attributes or children by ``None``
+            return result if result or element.attrib or len(element) else None
+
+        if self.children:
+            raise XMLExtractionError(f'element `{element.tag}` cannot have both content and children')
+
+        if element.text is None:
+            raise XMLExtractionError(f'element `{element.tag}` has no content')
+
+        value = self._convert(self.text, element.text, element, 'content')
+
+        if not element.attrib:
+            return value
+
+        result['$'] = value
+
+        return result
+
+    @staticmethod
+    def _convert(decode, text, element, description):
+        """Return the text decoded with the given callable, raising ``XMLExtractionError`` if it cannot be decoded."""
+        try:
+            return decode(text)
+        except (TypeError, ValueError) as exception:
+            raise XMLExtractionError(f'invalid {description} of element `{element.tag}`: {exception}') from exception
+
+
+SMEARING = Field(to_string, attributes={'degauss': to_float})
+MONKHORST_PACK = Field(attributes={name: to_int for name in ('nk1', 'nk2', 'nk3', 'k1', 'k2', 'k3')})
+FFT_GRID = Field(attributes={name: to_int for name in ('nr1', 'nr2', 'nr3')})
+VECTORS = {name: Field(to_floats) for name in ('a1', 'a2', 'a3')}
+RECIPROCAL_VECTORS = {name: Field(to_floats) for name in ('b1', 'b2', 'b3')}
+
+FIELDS = Field(
+    children={
+        'general_info':
+        Field(
+            children={
+                'xml_format': Field(attributes={
+                    'NAME': to_string,
+                    'VERSION': to_string
+                }),
+                'creator': Field(attributes={
+                    'NAME': to_string,
+                    'VERSION': to_string
+                }),
+            }
+        ),
+        'status':
+        Field(to_int),
+        'input':
+        Field(
+            children={
+                'electric_field':
+                Field(children={
+                    'electric_potential': Field(to_string),
+                    'dipole_correction': Field(to_bool),
+                }),
+                'bands':
+                Field(children={'occupations': Field(to_string)}),
+                'spin':
+                Field(children={
+                    'lsda': Field(to_bool),
+                    'spinorbit': Field(to_bool),
+                }),
+                'spin_constraints':
+                Field(children={'spin_constraints': Field(to_string)}),
+                'symmetry_flags':
+                Field(children={
+                    'noinv': Field(to_bool),
+                    'no_t_rev': Field(to_bool),
+                }),
+                'basis':
+                Field(children={'ecutwfc': Field(to_float)}),
+                'dft':
+                Field(children={'functional': Field(to_string)}),
+                'smearing':
+                SMEARING,
+                'k_points_IBZ':
+                Field(children={'monkhorst_pack': MONKHORST_PACK}),
+            }
+        ),
+        'output':
+        Field(
+            children={
+                'convergence_info':
+                Field(
+                    children={
+                        'scf_conv':
+                        Field(
+                            children={
+                                'convergence_achieved': Field(to_bool),
+                                'n_scf_steps': Field(to_int),
+                                'scf_error': Field(to_float),
+                            }
+                        ),
+                        'opt_conv':
+                        Field(
+                            children={
+                                'convergence_achieved': Field(to_bool),
+                                'n_opt_steps': Field(to_int),
+                                'grad_norm': Field(to_float),
+                            }
+                        ),
+                    }
+                ),
+                'algorithmic_info':
+                Field(children={
+                    'real_space_q': Field(to_bool),
+                    'real_space_beta': Field(to_bool),
+                }),
+                'atomic_species':
+                Field(
+                    attributes={'ntyp': to_int},
+                    children={
+                        'species':
+                        Field(
+                            attributes={'name': to_string},
+                            children={
+                                'mass': Field(to_float),
+                                'pseudo_file': Field(to_string),
+                                'starting_magnetization': Field(to_float),
+                                'magnetization_angle1': Field(to_float),
+                                'magnetization_angle2': Field(to_float),
+                            },
+                            multiple=True,
+                        ),
+                    },
+                ),
+                'atomic_structure':
+                Field(
+                    attributes={
+                        'nat': to_int,
+                        'alat': to_float,
+                        'num_of_atomic_wfc': to_int
+                    },
+                    children={
+                        'atomic_positions':
+                        Field(children={
+                            'atom': Field(to_floats, attributes={'name': to_string}, multiple=True),
+                        }),
+                        'cell':
+                        Field(children=VECTORS),
+                    },
+                ),
+                'symmetries':
+                Field(
+                    children={
+                        'nsym':
+                        Field(to_int),
+                        'nrot':
+                        Field(to_int),
+                        'symmetry':
+                        Field(
+                            children={
+                                'info': Field(to_string, attributes={
+                                    'name': to_string,
+                                    'time_reversal': to_bool
+                                }),
+                                'rotation': Field(to_floats),
+                                'fractional_translation': Field(to_floats),
+                                'equivalent_atoms': Field(to_ints),
+                            },
+                            multiple=True,
+                        ),
+                    }
+                ),
+                'basis_set':
+                Field(
+                    children={
+                        'ecutrho': Field(to_float),
+                        'fft_grid': FFT_GRID,
+                        'fft_smooth': FFT_GRID,
+                        'reciprocal_lattice': Field(children=RECIPROCAL_VECTORS),
+                    }
+                ),
+                'dftU':
+                Field(),
+                'magnetization':
+                Field(children={
+                    'noncolin': Field(to_bool),
+                    'do_magnetization': Field(to_bool),
+                }),
+                'band_structure':
+                Field(
+                    children={
+                        'nbnd':
+                        Field(to_int),
+                        'nbnd_up':
+                        Field(to_int),
+                        'nbnd_dw':
+                        Field(to_int),
+                        'nelec':
+                        Field(to_float),
+                        'num_of_atomic_wfc':
+                        Field(to_int),
+                        'fermi_energy':
+                        Field(to_float),
+                        'two_fermi_energies':
+                        Field(to_floats),
+                        'smearing':
+                        SMEARING,
+                        'nks':
+                        Field(to_int),
+                        'ks_energies':
+                        Field(
+                            children={
+                                'k_point': Field(to_floats, attributes={'weight': to_float}),
+                                'eigenvalues': Field(to_floats),
+                                'occupations': Field(to_floats),
+                            },
+                            multiple=True,
+                        ),
+                    }
+                ),
+                'boundary_conditions':
+                Field(children={'assume_isolated': Field(to_string)}),
+                'electric_field':
+                Field(
+                    children={
+                        'BerryPhase':
+                        Field(
+                            children={
+                                'totalPolarization':
+                                Field(
+                                    children={
+                                        'polarization': Field(to_float, attributes={'Units': to_string}),
+                                        'modulus': Field(to_float),
+                                        'direction': Field(to_floats),
+                                    }
+                                ),
+                                'totalPhase':
+                                Field(to_float, attributes={
+                                    'ionic': to_float,
+                                    'electronic': to_float
+                                }),
+                            }
+                        ),
+                    }
+                ),
+            }
+        ),
+    }
+)
+
+
+def extract_xml_dictionary(xml):
+    """Extract the elements declared in :data:`FIELDS` from the XML output without validating it.
+
+    :param xml: the parsed XML output, as an ``ElementTree``.
+    :return: dictionary with the same structure as the one returned by the schema decoder, restricted to the elements
+        that are declared in :data:`FIELDS`.
+    :raises XMLExtractionError: if any of the declared elements has an unexpected structure.
+    """
+    return FIELDS.decode(xml.getroot()) or {}
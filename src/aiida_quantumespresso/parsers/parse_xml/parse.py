@@ -4,12 +4,14 @@ from urllib.error import URLError
 import numpy as np
 from packaging.version import Version
 from qe_tools import CONSTANTS
-from xmlschema import XMLSchema
 
 from aiida_quantumespresso.utils.mapping import get_logging_container
+from aiida_quantumespresso.utils.profiling import timed
 
 from .exceptions import XMLParseError
-from .versions import get_default_schema_filepath, get_schema_filepath
+from .extract import extract_xml_dictionary
+from .registry import get_schema
+from .versions import DEFAULT_SCHEMA_FILENAME, get_schema_filename
 
 
 def raise_parsing_error(message):
@@ -39,33 +41,103 @@ def cell_volume(a1, a2, a3):
     return abs(float(a1[0] * a_mid_0 + a1[1] * a_mid_1 + a1[2] * a_mid_2))
 
 
-def parse_xml_post_6_2(xml):
+def parse_ks_energies(ks_states, num_spins, num_bands, alat):
+    """Extract the k-points, weights, eigenvalues and occupations from the decoded ``ks_energies`` elements.
+
+    The values are copied directly into preallocated arrays and the unit conversions are applied to the entire arrays.
+    For spin-polarized calculations, the eigenvalues and occupations of each k-point contain those of the spin-up
+    channel followed by those of the spin-down channel.
+
+    :param ks_states: list of decoded ``ks_energies`` elements.
+    :param num_spins: number of spin channels, i.e. 2 for collinear spin-polarized calculations and 1 otherwise.
+    :param num_bands: number of bands per spin channel.
+    :param alat: the lattice parameter in angstrom, the k-points are expressed in units of ``2 pi / alat``.
+    :returns: tuple of the k-points in cartesian coordinates in 1 / angstrom, with shape ``(nk, 3)``, the k-point
+        weights, with shape ``(nk,)``, and the eigenvalues in eV and occupations, both with shape
+        ``(num_spins, nk, num_bands)``.
+    :raises XMLParseError: if the number of eigenvalues or occupations of a k-point is incorrect.
+    """
+    num_k_points = len(ks_states)
+    size = num_spins * num_bands
+
+    k_points = np.empty((num_k_points, 3))
+    k_points_weights = np.empty(num_k_points)
+    band_eigenvalues = np.empty((num_spins, num_k_points, num_bands))
+    band_occupations = np.empty((num_spins, num_k_points, num_bands))
+
+    for index, ks_state in enumerate(ks_states):
+        k_points[index] = ks_state['k_point']['$']
+        k_points_weights[index] = ks_state['k_point']['@weight']
+
+        for key, array in (('eigenvalues', band_eigenvalues), ('occupations', band_occupations)):
+            values = ks_state[key]['$']
+
+            if len(values) != size:
+                raise XMLParseError(f'Unexpected number of {key} for k-point {index}: {len(values)} instead of {size}')
+
+            array[:, index] = np.reshape(values, (num_spins, num_bands))
+
+    k_points *= 2
+    k_points *= np.pi
+    k_points /= alat
+    band_eigenvalues *= CONSTANTS.hartree_to_ev
+
+    return k_points, k_points_weights, band_eigenvalues, band_occupations
+
+
+def parse_xml_post_6_2(xml, validate=True):
     """Parse the content of XML output file written by `pw.x` and `cp.x` with the new schema-based XML format.
 
+    By default, the XML is validated and decoded in its entirety using the XSD schema it declares. If ``validate`` is
+    set to ``False``, only the elements that are used are extracted directly from the parsed XML, which is considerably
+    faster, but means that schema violations are not reported. If the extraction encounters an unexpected structure,
+    the XML is decoded with the schema instead.
+
     :param xml: parsed XML
+    :param validate: whether to validate and decode the XML with the XSD schema.
     :returns: tuple of two dictionaries, with the parsed data and log messages, respectively
     """
-    e_bohr2_to_coulomb_m2 = 57.214766  # e/a0^2 to C/m^2 (electric polarization) from Wolfram Alpha
-
     logs = get_logging_container()
 
-    schema_filepath = get_schema_filepath(xml)
+    if not validate:
+        try:
+            with timed('xml_extract'):
+                xml_dictionary = extract_xml_dictionary(xml)
+            return parse_xml_dictionary(xml_dictionary, get_logging_container())
+        except Exception as exception:  # pylint: disable=broad-except
+            # Any exception, including those raised for inconsistent data, is handled by repeating the parsing with the
+            # schema, which will raise the exact same exception if it is not caused by the non-validating extraction.
+            logs.info.append(f'Falling back to decoding the XML with the schema: {type(exception).__name__}: {exception}')
 
-    try:
-        xsd = XMLSchema(schema_filepath)
-    except URLError:
+    return parse_xml_dictionary(decode_xml(xml, logs), logs)
 
-        # If loading the XSD file specified in the XML file fails, we try the default
-        schema_filepath_default = get_default_schema_filepath()
 
+def decode_xml(xml, logs):
+    """Validate the XML output against the XSD schema it declares and decode it into a dictionary.
+
+    :param xml: parsed XML
+    :param logs: logging container to which the validation errors are added.
+    :returns: the decoded XML dictionary
+    """
+    schema_filename = get_schema_filename(xml)
+
+    # The compiled schemas are cached in a process-wide registry, so each XSD file is only compiled once per process
+    with timed('xml_schema'):
         try:
-            xsd = XMLSchema(schema_filepath_default)
+            xsd = get_schema(schema_filename)
         except URLError:
-            raise XMLParseError(
-                f'Could not open or parse the XSD files {schema_filepath} and {schema_filepath_default}'
-            )
-        else:
-            schema_filepath = schema_filepath_default
+
+            # If loading the XSD file specified in the XML file fails, we try the default
+            schema_filename_default = DEFAULT_SCHEMA_FILENAME
+
+            try:
+                xsd = get_schema(schema_filename_default)
+            except URLError:
+                raise XMLParseError(
+                    f'Could not open or parse the XSD files {schema_filename} and {schema_filename_default}'
+                )
+            else:
+                schema_filename = schema_filename_default
 
     # Validate XML document against the schema
     # Returned dictionary has a structure where, if tag ['key'] is "simple", xml_dictionary['key'] returns its content.
@@ -89,12 +161,26 @@ def parse_xml_post_6_2(xml):
             except (TypeError, ValueError):
                 pass
 
-    xml_dictionary, errors = xsd.to_dict(xml, validation='lax')
+    with timed('xml_decode'):
+        xml_dictionary, errors = xsd.to_dict(xml, validation='lax')
     if errors:
-        logs.error.append(f'{len(errors)} XML schema validation error(s) schema: {schema_filepath}:')
+        logs.error.append(f'{len(errors)} XML schema validation error(s) schema: {schema_filename}:')
         for err in errors:
             logs.error.append(str(err))
 
+    return xml_dictionary
+
+
+def parse_xml_dictionary(xml_dictionary, logs):
+    """Parse the dictionary of the schema-based XML output into the raw parsed data.
+
+    :param xml_dictionary: dictionary of the XML output, as returned by :func:`decode_xml`, or the subset thereof
+        returned by :func:`~aiida_quantumespresso.parsers.parse_xml.extract.extract_xml_dictionary`.
+    :param logs: logging container to which the log messages are added.
+    :returns: tuple of two dictionaries, with the parsed data and log messages, respectively
+    """
+    e_bohr2_to_coulomb_m2 = 57.214766  # e/a0^2 to C/m^2 (electric polarization) from Wolfram Alpha
+
     xml_version = Version(xml_dictionary['general_info']['xml_format']['@VERSION'])
     inputs = xml_dictionary.get('input', {})
     outputs = xml_dictionary['output']
@@ -329,45 +415,10 @@ def parse_xml_post_6_2(xml):
             if num_bands is None:
                 num_bands = num_bands_up + num_bands_down  # backwards compatibility;
 
-        k_points = []
-        k_points_weights = []
         ks_states = band_structure['ks_energies']
-        for ks_state in ks_states:
-            k_points.append([kp * 2 * np.pi / output_alat_angstrom for kp in ks_state['k_point']['$']])
-            k_points_weights.append(ks_state['k_point']['@weight'])
-
-        if not spins:
-            band_eigenvalues = [[]]
-            band_occupations = [[]]
-            for ks_state in ks_states:
-                band_eigenvalues[0].append(ks_state['eigenvalues']['$'])
-                band_occupations[0].append(ks_state['occupations']['$'])
-        else:
-            band_eigenvalues = [[], []]
-            band_occupations = [[], []]
-            for ks_state in ks_states:
-                band_eigenvalues[0].append(ks_state['eigenvalues']['$'][0:num_bands_up])
-                band_eigenvalues[1].append(ks_state['eigenvalues']['$'][num_bands_up:num_bands])
-                band_occupations[0].append(ks_state['occupations']['$'][0:num_bands_up])
-                band_occupations[1].append(ks_state['occupations']['$'][num_bands_up:num_bands])
-
-        band_eigenvalues = np.array(band_eigenvalues) * CONSTANTS.hartree_to_ev
-        band_occupations = np.array(band_occupations)
-
-        if not spins:
-            parser_assert_equal(
-                band_eigenvalues.shape, (1, num_k_points, num_bands), 'Unexpected shape of band_eigenvalues'
-            )
-            parser_assert_equal(
-                band_occupations.shape, (1, num_k_points, num_bands), 'Unexpected shape of band_occupations'
-            )
-        else:
-            parser_assert_equal(
-                band_eigenvalues.shape, (2, num_k_points, num_bands_up), 'Unexpected shape of band_eigenvalues'
-            )
-            parser_assert_equal(
-                band_occupations.shape, (2, num_k_points, num_bands_up), 'Unexpected shape of band_occupations'
-            )
+        k_points, k_points_weights, band_eigenvalues, band_occupations = parse_ks_energies(
+            ks_states, 2 if spins else 1, num_bands_up if spins else num_bands, output_alat_angstrom
+        )
 
         if not spins:
             xml_data['number_of_bands'] = num_bands
@@ -8,7 +8,7 @@ from aiida_quantumespresso.parsers.parse_xml.versions import QeXmlVersion, get_x
 from .legacy import parse_pw_xml_pre_6_2
 
 
-def parse_xml(xml_file, dir_with_bands=None):
+def parse_xml(xml_file, dir_with_bands=None, validate=True):
     try:
         xml_parsed = ElementTree.parse(xml_file)
     except ElementTree.ParseError:
@@ -17,7 +17,7 @@ def parse_xml(xml_file, dir_with_bands=None):
     xml_file_version = get_xml_file_version(xml_parsed)
 
     if xml_file_version == QeXmlVersion.POST_6_2:
-        parsed_data, logs = parse_xml_post_6_2(xml_parsed)
+        parsed_data, logs = parse_xml_post_6_2(xml_parsed, validate)
     elif xml_file_version == QeXmlVersion.PRE_6_2:
         xml_file.seek(0)
         parsed_data, logs = parse_pw_xml_pre_6_2(xml_file, dir_with_bands)
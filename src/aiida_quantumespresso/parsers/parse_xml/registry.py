@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""Process-wide registry of compiled XML schemas used to decode the XML output of `pw.x` and `cp.x`.
+
+Compiling an XSD file into an :class:`xmlschema.XMLSchema` is by far the most expensive step of parsing the XML output
+of a small calculation. Since the schemas that are bundled with the package never change, each of them only needs to be
+compiled once per (daemon worker) process. The registry is keyed on the schema filename, as returned by
+:func:`~aiida_quantumespresso.parsers.parse_xml.versions.get_schema_filename`, and keeps at most ``maxsize`` compiled
+schemas in memory, evicting the least recently used one when full.
+"""
+from collections import OrderedDict
+import os
+import threading
+
+from xmlschema import XMLSchema
+
+from .versions import DIRPATH_SCHEMAS, get_available_xml_schemas
+
+__all__ = ('SchemaRegistry', 'get_schema', 'prewarm_schemas')
+
+
+class SchemaRegistry:
+    """Thread-safe, size-bounded LRU cache of compiled ``XMLSchema`` instances keyed on the schema filename."""
+
+    DEFAULT_MAXSIZE = 16
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, dirpath=DIRPATH_SCHEMAS):
+        """Construct a new registry.
+
+        :param maxsize: maximum number of compiled schemas to keep. A value of zero disables the caching altogether.
+        :param dirpath: absolute path of the directory that contains the XSD files.
+        """
+        if maxsize < 0:
+            raise ValueError(f'`maxsize` should be a non-negative integer, got: {maxsize}')
+
+        self._maxsize = maxsize
+        self._dirpath = dirpath
+        self._schemas = OrderedDict()
+        self._lock = threading.RLock()
+        self._compile_locks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, filename):
+        with self._lock:
+            return filename in self._schemas
+
+    def __len__(self):
+        with self._lock:
+            return len(self._schemas)
+
+    @property
+    def maxsize(self):
+        """Return the maximum number of compiled schemas kept in the registry."""
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, value):
+        """Set the maximum number of compiled schemas, evicting the least recently used ones if necessary."""
+        if value < 0:
+            raise ValueError(f'`maxsize` should be a non-negative integer, got: {value}')
+
+        with self._lock:
+            self._maxsize = value
+            self._evict()
+
+    def get_filepath(self, filename):
+        """Return the absolute filepath of the schema with the given filename."""
+        return os.path.join(self._dirpath, filename)
+
+    def get(self, filename):
+        """Return the compiled schema for the given filename, compiling it if it is not yet in the registry.
+
+        Concurrent requests for the same schema that is not yet compiled will wait for a single compilation rather than
+        each compiling it themselves. Exceptions raised by the compilation, e.g. ``URLError`` if the file does not exist,
+        are propagated and nothing is stored in the registry.
+
+        :param filename: the filename of the XSD file, e.g. ``qes_230310.xsd``.
+        :return: the compiled ``XMLSchema``.
+        """
+        with self._lock:
+            try:
+                schema = self._schemas[filename]
+            except KeyError:
+                self.misses += 1
+                compile_lock = self._compile_locks.setdefault(filename, threading.Lock())
+            else:
+                self.hits += 1
+                self._schemas.move_to_end(filename)
+                return schema
+
+        with compile_lock:
+            with self._lock:
+                if filename in self._schemas:
+                    self._schemas.move_to_end(filename)
+                    return self._schemas[filename]
+
+            try:
+                schema = XMLSchema(self.get_filepath(filename))
+            except Exception:
+                with self._lock:
+                    self._compile_locks.pop(filename, None)
+                raise
+
+            with self._lock:
+                self._compile_locks.pop(filename, None)
+                if self._maxsize > 0:
+                    self._schemas[filename] = schema
+                    self._evict()
+
+        return schema
+
+    def prewarm(self, filenames=None):
+        """Compile the given schemas upfront, e.g. when a daemon worker starts.
+
+        :param filenames: optional list of schema filenames. By default all bundled schemas are compiled, starting from
+            the most recent ones, up to ``maxsize``.
+        :return: list of filenames of the schemas that are in the registry after prewarming.
+        """
+        if filenames is None:
+            filenames = sorted(get_available_xml_schemas(), reverse=True)[:self._maxsize]
+
+        # Compile in reverse order such that the first filename ends up as the most recently used
+        for filename in reversed(list(filenames)):
+            self.get(filename)
+
+        with self._lock:
+            return list(self._schemas.keys())
+
+    def clear(self):
+        """Remove all compiled schemas from the registry and reset the statistics."""
+        with self._lock:
+            self._schemas.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _evict(self):
+        """Remove the least recently used schemas until the registry respects its maximum size."""
+        while len(self._schemas) > self._maxsize:
+            self._schemas.popitem(last=False)
+
+
+REGISTRY = SchemaRegistry()
+
+
+def get_schema(filename):
+    """Return the compiled schema for the given filename from the process-wide registry.
+
+    :param filename: the filename of the XSD file, e.g. ``qes_230310.xsd``.
+    :return: the compiled ``XMLSchema``.
+    """
+    return REGISTRY.get(filename)
+
+
+def prewarm_schemas(filenames=None):
+    """Compile the given schemas in the process-wide registry, by default all bundled ones.
+
+    :param filenames: optional list of schema filenames.
+    :return: list of filenames of the schemas that are in the registry after prewarming.
+    """
+    return REGISTRY.prewarm(filenames)
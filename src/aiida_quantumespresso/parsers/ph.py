@@ -4,9 +4,11 @@ import os
 import re
 
 from aiida import orm
+from aiida.common import exceptions
 
 from aiida_quantumespresso.calculations.ph import PhCalculation
 from aiida_quantumespresso.parsers.parse_raw.ph import parse_initialization_qpoints, parse_raw_ph_output
+from aiida_quantumespresso.utils.executors import validate_executor
 from aiida_quantumespresso.utils.mapping import get_logging_container
 
 from .base import BaseParser
@@ -59,10 +61,26 @@ class PhParser(BaseParser):
         if base_exit_code:
             return self.exit(base_exit_code, logs)
 
+        try:
+            settings = self.node.inputs.settings.get_dict()
+        except exceptions.NotExistent:
+            settings = {}
+
+        # The dynamical matrices can be parsed concurrently, as defined by the `dynmat_workers` and `dynmat_executor`
+        # parser options.
+        parser_options = settings.get(self.get_parser_settings_key(), None) or {}
+        max_workers = parser_options.get('dynmat_workers', None)
+        executor = parser_options.get('dynmat_executor', 'thread')
+
+        try:
+            validate_executor(executor)
+        except ValueError as exception:
+            return self.exit(self.exit_codes.ERROR_UNEXPECTED_PARSER_EXCEPTION.format(exception=exception))
+
         filename_tensor = self.node.process_class._OUTPUT_XML_TENSOR_FILE_NAME
 
         try:
-            with self.retrieved.base.repository.open(filename_tensor, 'r') as handle:
+            with self.timed('read'), self.retrieved.base.repository.open(filename_tensor, 'r') as handle:
                 tensor_file = handle.read()
         except OSError:
             tensor_file = None
@@ -77,9 +95,13 @@ class PhParser(BaseParser):
             if not filename.startswith(dynmat_prefix) or filename.endswith('.freq'):
                 continue
 
-            dynmat_files.append(self.retrieved.base.repository.get_object_content(os.path.join(dynmat_folder, filename)))
+            with self.timed('read'):
+                dynmat_files.append(
+                    self.retrieved.base.repository.get_object_content(os.path.join(dynmat_folder, filename))
+                )
 
-        parsed_ph_data, logs = parse_raw_ph_output(stdout, logs, tensor_file, dynmat_files)
+        with self.timed('dynmat'):
+            parsed_ph_data, logs = parse_raw_ph_output(stdout, logs, tensor_file, dynmat_files, max_workers, executor)
         parsed_data.update(parsed_ph_data)
 
         self.out('output_parameters', orm.Dict(parsed_data))
@@ -89,3 +111,8 @@ class PhParser(BaseParser):
                 return self.exit(self.exit_codes.get(exit_code), logs)
 
         return self.exit(logs=logs)
+
+    @staticmethod
+    def get_parser_settings_key():
+        """Return the key that contains the optional parser options in the `settings` input node."""
+        return 'parser_options'
@@ -1,17 +1,20 @@
 # -*- coding: utf-8 -*-
 """`Parser` implementation for the `PpCalculation` calculation job class."""
+import functools
+import io
 import os
 import re
 from typing import Tuple
 
 from aiida import orm
-from aiida.common import AttributeDict
+from aiida.common import AttributeDict, exceptions
 import numpy as np
 
 from aiida_quantumespresso.calculations.pp import PpCalculation
 from aiida_quantumespresso.utils.mapping import get_logging_container
 
 from .base import BaseParser
+from .parse_raw.cube import get_region, read_cube
 
 
 class PpParser(BaseParser):
@@ -99,13 +102,26 @@ class PpParser(BaseParser):
         if iflag not in range(5):
             return self.exit_codes.ERROR_UNSUPPORTED_DATAFILE_FORMAT
 
+        try:
+            settings = self.node.inputs.settings.get_dict()
+        except exceptions.NotExistent:
+            settings = {}
+
+        # The parser options can reduce the size of the output arrays: the `region` restricts the data to a part of the
+        # grid, e.g. a slab or a line, and the `dtype` can reduce the precision of the data and coordinates. Also, the
+        # volumetric data of a Gaussian cube file can be downsampled while it is being read, by only keeping every n-th
+        # point of the grid along each axis as defined by the `cube_stride` parser option.
+        parser_options = settings.get('parser_options', None) or {}
+        options = {'dtype': parser_options.get('dtype', 'float64'), 'region': parser_options.get('region', None)}
+        cube_stride = parser_options.get('cube_stride', 1)
+
         data_parsed = []
         parsers = {
-            0: self.parse_gnuplot1D,
-            1: self.parse_gnuplot1D,
-            2: self.parse_gnuplot2D,
-            3: self.parse_gaussian,
-            4: self.parse_gnuplot_polar,
+            0: functools.partial(self.parse_gnuplot1D, **options),
+            1: functools.partial(self.parse_gnuplot1D, **options),
+            2: functools.partial(self.parse_gnuplot2D, **options),
+            3: functools.partial(self.parse_gaussian, stride=cube_stride, **options),
+            4: functools.partial(self.parse_gnuplot_polar, **options),
         }
 
         def get_key_from_filename(filename):
@@ -120,21 +136,24 @@ class PpParser(BaseParser):
         if self.node.base.attributes.get('parse_data_files'):
             for filename in filenames:
                 # Directly parse the retrieved files after reading them to memory (`data_raw`). The raw data
-                # of each file is released from memory after parsing, to improve memory usage.
+                # of each file is released from memory after parsing, to improve memory usage. Gaussian cube files
+                # are not read to memory at all, but their data is streamed directly from the handle into an array.
                 if filename.endswith(filename_suffix):
-                    # Read the file to memory
                     try:
                         with file_opener(filename) as handle:
-                            data_raw = handle.read()
+                            data_raw = handle if iflag == 3 else handle.read()
+                            # Parse the file
+                            try:
+                                key = get_key_from_filename(filename)
+                                data_units = self.units_dict[parsed_data['plot_num']]
+                                data_parsed.append((key, parsers[iflag](data_raw, data_units)))
+                                del data_raw
+                            except Exception as exception:  # pylint: disable=broad-except
+                                return self.exit_codes.ERROR_OUTPUT_DATAFILE_PARSE.format(
+                                    filename=filename, exception=exception
+                                )
                     except OSError:
                         return self.exit_codes.ERROR_OUTPUT_DATAFILE_READ.format(filename=filename)
-                    # Parse the file
-                    try:
-                        key = get_key_from_filename(filename)
-                        data_parsed.append((key, parsers[iflag](data_raw, self.units_dict[parsed_data['plot_num']])))
-                        del data_raw
-                    except Exception as exception:  # pylint: disable=broad-except
-                        return self.exit_codes.ERROR_OUTPUT_DATAFILE_PARSE.format(filename=filename, exception=exception)
 
             # If we don't have any parsed files, we exit. Note that this will not catch the case where there should be more
             # than one file, but the engine did not retrieve all of them. Since often we anyway don't know how many files
@@ -176,141 +195,144 @@ class PpParser(BaseParser):
         return parsed_data, logs
 
     @staticmethod
-    def parse_gnuplot1D(data_file_str, data_units):
+    def get_output_dtype(dtype):
+        """Return the floating point type of the output arrays.
+
+        :param dtype: the name of the type, either ``float64`` or ``float32``
+        :raises ValueError: if the type is not supported
+        """
+        if dtype not in ('float64', 'float32'):
+            raise ValueError(f'the dtype should be either `float64` or `float32`, got: {dtype}')
+
+        return np.dtype(dtype)
+
+    @staticmethod
+    def select_region(region, shape, *arrays):
+        """Select a region of the grid from arrays whose first axes correspond to the axes of the grid.
+
+        :param region: the region of the grid to keep, see :func:`~.parse_raw.cube.get_region`
+        :param shape: the shape of the grid
+        :param arrays: the arrays to select the region from
+        :return: list of the selected regions of the arrays
+        """
+        if region is None:
+            return list(arrays)
+
+        index = tuple(slice(start, stop) for start, stop in get_region(region, shape))
+
+        return [array[index] for array in arrays]
+
+    @staticmethod
+    def parse_gnuplot1D(data_file_str, data_units, dtype='float64', region=None):
         """Parse 1D GNUPlot formatted output.
 
         :param data_file_str: the data file read in as a single string
+        :param dtype: the floating point type of the output arrays, either ``float64`` or ``float32``
+        :param region: optional ``[[start, stop]]`` range of the points to keep
         """
-        data_lines = data_file_str.splitlines()
+        dtype = PpParser.get_output_dtype(dtype)
+        columns = np.loadtxt(io.StringIO(data_file_str), dtype=np.float64, ndmin=2)
+        columns, = PpParser.select_region(region, columns.shape[:1], columns)
 
-        n_col = len(data_lines[0].split())
+        n_col = columns.shape[1]
 
         # 1D case
         if n_col == 2:
-            coords = []
-            data = []
-            data_integral = []
-            for line in data_lines:
-                split_line = line.split()
-                coords.append(float(split_line[0]))
-                data.append(float(split_line[1]))
-            y_data = [data]
             y_names = ['data']
             y_units = [data_units]
 
         # 1D case with spherical averaging
         if n_col == 3:
-            coords = []
-            data = []
-            data_integral = []
-            for line in data_lines:
-                split_line = line.split()
-                coords.append(float(split_line[0]))
-                data.append(float(split_line[1]))
-                data_integral.append(float(split_line[2]))
-            y_data = [data, data_integral]
             y_names = ['data', 'integrated_data']
             y_units = [data_units, data_units.replace('bohr^3', 'bohr')]
 
         x_units = 'bohr'
         arraydata = orm.ArrayData()
-        arraydata.set_array('x_coordinates', np.array(coords))
+        arraydata.set_array('x_coordinates', columns[:, 0].astype(dtype))
         arraydata.set_array('x_coordinates_units', np.array(x_units))
-        for name, data, units in zip(y_names, y_data, y_units):
-            arraydata.set_array(name, np.array(data))
+        for name, data, units in zip(y_names, columns[:, 1:].T, y_units):
+            arraydata.set_array(name, data.astype(dtype))
             arraydata.set_array(name + '_units', np.array(units))
 
         return arraydata
 
     @staticmethod
-    def parse_gnuplot_polar(data_file_str, data_units):
+    def parse_gnuplot_polar(data_file_str, data_units, dtype='float64', region=None):
         """Parse 2D Polar GNUPlot formatted, single column output.
 
         :param data_file_str: the data file read in as a single string
+        :param dtype: the floating point type of the output arrays, either ``float64`` or ``float32``
+        :param region: optional ``[start, stop]`` ranges of the two angular grid indices to keep, as declared in the
+            header, with the points ordered such that the second grid index runs fastest
         """
-        data_lines = data_file_str.splitlines()
-        data_lines.pop(0)  # First line is a header
+        dtype = PpParser.get_output_dtype(dtype)
+        handle = io.StringIO(data_file_str)
+        shape = tuple(int(value) for value in handle.readline().split())  # First line is a header with the dimensions
+        data = np.loadtxt(handle, dtype=np.float64, ndmin=1)
 
-        data = []
-        for line in data_lines:
-            data.append(float(line))
+        if region is not None:
+            data, = PpParser.select_region(region, shape, data.reshape(shape))
 
         arraydata = orm.ArrayData()
-        arraydata.set_array('data', np.array(data))
+        arraydata.set_array('data', data.ravel().astype(dtype))
         arraydata.set_array('data_units', np.array([data_units]))
 
         return arraydata
 
     @staticmethod
-    def parse_gnuplot2D(data_file_str, data_units):
+    def parse_gnuplot2D(data_file_str, data_units, dtype='float64', region=None):
         """Parse 2D GNUPlot formatted output.
 
+        The points are written in blocks, separated by an empty line, of which each corresponds to a single value of the
+        first grid index. The number of lines in a block therefore defines the second dimension of the grid.
+
         :param data_file_str: the data file read in as a single string
+        :param dtype: the floating point type of the output arrays, either ``float64`` or ``float32``
+        :param region: optional ``[start, stop]`` ranges of the two grid indices to keep
         """
-        data_lines = data_file_str.splitlines()
-
-        coords = []
-        data = []
-
-        for line in data_lines:
-            stripped = line.strip()
-            if stripped == '':
-                continue
-            else:
-                split_line = stripped.split()
-                coords.append([float(split_line[0]), float(split_line[1])])
-                data.append(float(split_line[2]))
+        dtype = PpParser.get_output_dtype(dtype)
+        columns = np.loadtxt(io.StringIO(data_file_str), dtype=np.float64, ndmin=2)
+        coords = columns[:, :2]
+        data = columns[:, 2]
+
+        if region is not None:
+            data_file_str = data_file_str.strip('\n')
+            match = re.search(r'\n[ \t]*\n', data_file_str)
+            block = len(data) if match is None else data_file_str.count('\n', 0, match.start()) + 1
+            shape = (len(data) // block, block)
+            coords, data = PpParser.select_region(region, shape, coords.reshape(shape + (2,)), data.reshape(shape))
 
         coords_units = 'bohr'
         arraydata = orm.ArrayData()
-        arraydata.set_array('xy_coordinates', np.array(coords))
-        arraydata.set_array('data', np.array(data))
+        arraydata.set_array('xy_coordinates', coords.reshape(-1, 2).astype(dtype))
+        arraydata.set_array('data', data.ravel().astype(dtype))
         arraydata.set_array('xy_coordinates_units', np.array(coords_units))
         arraydata.set_array('data_units', np.array(data_units))
 
         return arraydata
 
     @staticmethod
-    def parse_gaussian(data_file_str, data_units):
+    def parse_gaussian(data_file, data_units, stride=1, dtype='float64', region=None):
         """Parse Gaussian Cube formatted output.
 
-        :param data_file_str: the data file read in as a single string
+        The volumetric data is streamed from the file handle directly into an array, without reading the entire file to
+        memory first. See :func:`aiida_quantumespresso.parsers.parse_raw.cube.read_cube` for details.
+
+        :param data_file: a handle to the data file, or the data file read in as a single string
+        :param stride: only keep every n-th point of the grid along each axis: a positive integer for all three axes, or
+            a sequence of three positive integers. The voxel vectors are scaled accordingly.
+        :param dtype: the floating point type of the output data, either ``float64`` or ``float32``
+        :param region: optional ``[start, stop]`` ranges of the three grid indices to keep. The ``origin`` output array
+            is shifted to the first point of the region.
         """
-        lines = data_file_str.splitlines()
-
-        atoms_line = lines[2].split()
-        natoms = int(atoms_line[0])  # The number of atoms listed in the file
-        origin = np.array(atoms_line[1:], dtype=float)
-
-        header = lines[:6 + natoms]  # Header of the file: comments, the voxel, and the number of atoms and datapoints
-        data_lines = lines[6 + natoms:]  # The actual data: atoms and volumetric data
-
-        # Parse the declared dimensions of the volumetric data
-        x_line = header[3].split()
-        xdim = int(x_line[0])
-        y_line = header[4].split()
-        ydim = int(y_line[0])
-        z_line = header[5].split()
-        zdim = int(z_line[0])
-
-        # Get the vectors describing the basis voxel
-        voxel_array = np.array([[x_line[1], x_line[2], x_line[3]], [y_line[1], y_line[2], y_line[3]],
-                                [z_line[1], z_line[2], z_line[3]]],
-                               dtype=np.float64)
-
-        # Get the volumetric data
-        data_array = np.empty(xdim * ydim * zdim, dtype=float)
-        cursor = 0
-        for line in data_lines:
-            ls = line.split()
-            data_array[cursor:cursor + len(ls)] = ls
-            cursor += len(ls)
-        data_array = data_array.reshape((xdim, ydim, zdim))
+        dtype = PpParser.get_output_dtype(dtype)
+        header, data_array = read_cube(data_file, stride=stride, region=region, dtype=dtype)
 
         coordinates_units = 'bohr'
 
         arraydata = orm.ArrayData()
-        arraydata.set_array('voxel', voxel_array)
+        arraydata.set_array('origin', header['origin'])
+        arraydata.set_array('voxel', header['voxel'])
         arraydata.set_array('data', data_array)
         arraydata.set_array('data_units', np.array(data_units))
         arraydata.set_array('coordinates_units', np.array(coordinates_units))
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
+from concurrent.futures import ThreadPoolExecutor
 import fnmatch
 from pathlib import Path
 import re
 from typing import List, Optional, Tuple
 
+from aiida.common import exceptions
 from aiida.common.extendeddicts import AttributeDict
 from aiida.engine import ExitCode
 from aiida.orm import BandsData, Dict, KpointsData, ProjectionData, StructureData, XyData
@@ -21,6 +23,9 @@ from aiida_quantumespresso.utils.mapping import get_logging_container
 
 from .base import BaseParser
 
+# Translation table that replaces the separators in the ``weight*[#index]+weight*[#index]`` projections by spaces
+PSI_SEPARATORS = str.maketrans('*[#]+', '     ')
+
 
 class ProjwfcParser(BaseParser):
     """This class is the implementation of the Parser class for the ``projwfc.x`` code  in Quantum ESPRESSO.
@@ -49,7 +54,8 @@ class ProjwfcParser(BaseParser):
             return self.exit(self.exit_codes.ERROR_NO_RETRIEVED_TEMPORARY_FOLDER)
 
         # Parse the XML to obtain the `structure`, `kpoints` and spin-related settings from the parent calculation
-        parsed_xml, logs_xml, xml_exit_code = self._parse_xml(retrieved_temporary_folder)
+        with self.timed('xml'):
+            parsed_xml, logs_xml, xml_exit_code = self._parse_xml(retrieved_temporary_folder)
         self.emit_logs(logs_xml)
         if xml_exit_code is not None:
             return xml_exit_code
@@ -61,15 +67,32 @@ class ProjwfcParser(BaseParser):
         spinorbit = parsed_xml.get('spin_orbit_calculation')
         non_collinear = parsed_xml.get('non_colinear_calculation')
 
-        orbitals = self._parse_orbitals(header, structure, non_collinear, spinorbit)
-        bands, projections = self._parse_bands_and_projections(kpoint_blocks, len(orbitals))
-        energy, dos_node, pdos_array = self._parse_pdos_files(retrieved_temporary_folder, nspin, spinorbit, logs)
+        try:
+            settings = self.node.inputs.settings.get_dict()
+        except exceptions.NotExistent:
+            settings = {}
+
+        # The `pdos_max_workers` parser option sets the number of threads used to read the `pdos_atm` files, and the
+        # projection weights below the `projections_threshold` parser option are set to zero
+        parser_options = settings.get('parser_options', None) or {}
+        max_workers = parser_options.get('pdos_max_workers', None)
+        threshold = parser_options.get('projections_threshold', None)
+
+        with self.timed('projections'):
+            orbitals = self._parse_orbitals(header, structure, non_collinear, spinorbit)
+            bands, projections = self._parse_bands_and_projections(kpoint_blocks, len(orbitals), threshold)
+
+        with self.timed('pdos'):
+            energy, dos_node, pdos_array = self._parse_pdos_files(
+                retrieved_temporary_folder, nspin, spinorbit, logs, max_workers
+            )
 
         self.out('Dos', dos_node)
 
-        output_node_dict = self._build_bands_and_projections(
-            kpoints, bands, energy, orbitals, projections, pdos_array, nspin
-        )
+        with self.timed('outputs'):
+            output_node_dict = self._build_bands_and_projections(
+                kpoints, bands, energy, orbitals, projections, pdos_array, nspin
+            )
         for linkname, node in output_node_dict.items():
             self.out(linkname, node)
 
@@ -219,59 +242,119 @@ class ProjwfcParser(BaseParser):
         return orbitals
 
     @staticmethod
-    def _parse_bands_and_projections(kpoint_blocks: list, num_orbitals: int) -> Tuple[ArrayLike, ArrayLike]:
+    def _parse_bands_and_projections(kpoint_blocks: list,
+                                     num_orbitals: int,
+                                     threshold: Optional[float] = None) -> Tuple[ArrayLike, ArrayLike]:
         """Parse the bands energies and orbital projections from the kpoint blocks in the stdout.
 
+        Each band block consists of a header with the energy, followed by the projections on the orbitals, e.g.::
+
+            ==== e(   1) =    -5.79862 eV ====
+                 psi = 0.498*[#   1]+0.498*[#   5]
+                |psi|^2 = 0.996
+
+        Instead of matching each band with a regular expression, the energies and the ``weight*[#index]`` pairs of all
+        bands are collected as text and converted into arrays at once. The weights are then scattered into the
+        projections array, based on the number of pairs of each band.
+
         :param kpoint_blocks: list of blocks for each k-point that contain the energies and projections in the stdout.
         :param num_orbitals: number of orbitals used for the projections.
+        :param threshold: optional threshold below which the projection weights are set to zero.
 
         :return: tuple with two arrays containing the band energies and projection values
         """
+        band_blocks = [block.split('==== e(')[1:] for block in kpoint_blocks]
+        num_kpoints = len(band_blocks)
+        num_bands = len(band_blocks[0]) if band_blocks else 0
 
-        # Parse the bands energies
-        energy_pattern = re.compile(r'====\se\(\s*\d+\)\s=\s*(\S+)\seV\s====')
-        bands = np.array([energy_pattern.findall(block) for block in kpoint_blocks])
+        if any(len(blocks) != num_bands for blocks in band_blocks):
+            raise ValueError('the number of bands is not the same for all k-points.')
 
-        # Parse the projection arrays
-        energy_pattern = re.compile(r'\n====.+==== \n')
-        psi_pattern = re.compile(r'([.\d]+)\*\[#\s*(\d+)\]')
+        energies = []
+        psi_texts = []
 
-        projections = []
+        for blocks in band_blocks:
+            for block in blocks:
+                header, _, body = block.partition('\n')
+                energies.append(header.split('=')[1].split()[0])
+                start = body.find('psi =')
+                psi_texts.append('' if start == -1 else body[start + 5:body.find('|psi|^2', start)])
 
-        for block in kpoint_blocks:
+        bands = np.array(energies, dtype=np.float64).reshape(num_kpoints, num_bands)
 
-            kpoint_projections = []
+        # Convert the ``weight*[#index]`` pairs of all bands into an array of alternating weights and orbital indices
+        counts = [psi_text.count('*') for psi_text in psi_texts]
+        pairs = np.array(''.join(psi_texts).translate(PSI_SEPARATORS).split(), dtype=np.float64).reshape(-1, 2)
 
-            for band_projections in re.split(energy_pattern, block)[1:]:
+        if len(pairs) != sum(counts):
+            raise ValueError('the number of orbital projections does not match the number of weights.')
 
-                proj_array = np.zeros(num_orbitals)
+        weights = pairs[:, 0]
+        orbital_indices = pairs[:, 1].astype(int) - 1
+        band_indices = np.repeat(np.arange(len(psi_texts)), counts)
 
-                for [projection_value, orbital_index] in psi_pattern.findall(band_projections):
-                    proj_array[int(orbital_index) - 1] = projection_value
+        if threshold is not None:
+            weights = np.where(weights < threshold, 0., weights)
 
-                kpoint_projections.append(proj_array)
+        projections = np.zeros((num_kpoints * num_bands, num_orbitals))
+        projections[band_indices, orbital_indices] = weights
 
-            projections.append(kpoint_projections)
+        return bands, projections.reshape(num_kpoints, num_bands, num_orbitals)
 
-        projections = np.array(projections)
+    @staticmethod
+    def _read_pdos_file(filepath: Path) -> ArrayLike:
+        """Read a PDOS file into a two-dimensional array, skipping the commented header.
 
-        return bands, projections
+        :param filepath: path to the PDOS file.
+        :return: array with a row for each energy and a column for each column of the file.
+        """
+        with filepath.open('r') as handle:
+            return np.loadtxt(handle, dtype=np.float64, comments='#', ndmin=2)
 
-    def _parse_pdos_files(self, retrieved_temporary_folder: Path, nspin: int,
-                          spinorbit: bool, logs: AttributeDict) -> Tuple[ArrayLike, XyData, ArrayLike]:
-        """Parse the PDOS files and convert them into arrays.
+    @staticmethod
+    def _read_pdos_num_columns(filepath: Path) -> int:
+        """Return the number of columns of a PDOS file, reading only up to its first line of data.
 
-        Reads in all of the ``*.pdos*`` files and converts the data into arrays. The PDOS arrays are then concatenated
-        and reordered so the order of the columns matches the order of the orbitals read from the statelines. This is
-        done in three steps:
+        :param filepath: path to the PDOS file.
+        :return: the number of columns of the first line that is neither empty nor commented.
+        """
+        with filepath.open('r') as handle:
+            for line in handle:
+                if line.strip() and not line.lstrip().startswith('#'):
+                    return len(line.split())
+
+        return 0
 
-        1. Sort the filenames by the atom # and wfc #, in that order.
-        2. Concatenate all the PDOS files into one large array.
-        3. Reorder the columns depending on the ``npsin`` value and if spin-orbit is used.
+    @classmethod
+    def _read_pdos_file_into(cls, filepath: Path, pdos_array: ArrayLike, columns: ArrayLike, first_pdos_column: int):
+        """Read the PDOS columns of a PDOS file into the given columns of the PDOS array.
+
+        :param filepath: path to the PDOS file.
+        :param pdos_array: the PDOS array that is filled in place.
+        :param columns: the column of the PDOS array for each of the PDOS columns of the file.
+        :param first_pdos_column: index of the first PDOS column of the file.
+        """
+        pdos_array[:, columns] = cls._read_pdos_file(filepath)[:, first_pdos_column:]
+
+    def _parse_pdos_files(
+        self,
+        retrieved_temporary_folder: Path,
+        nspin: int,
+        spinorbit: bool,
+        logs: AttributeDict,
+        max_workers: Optional[int] = None
+    ) -> Tuple[ArrayLike, XyData, ArrayLike]:
+        """Parse the PDOS files and convert them into arrays.
+
+        Reads in all of the ``*.pdos*`` files and converts the data into arrays. The PDOS columns of all files are
+        written into a single array, in the order that matches the order of the orbitals read from the statelines. To
+        this end, the ``pdos_atm`` filenames are sorted by the atom # and wfc #, in that order, and then read with
+        :meth:`_read_pdos_atm_files`.
 
         :param retrieved_temporary_folder: temporary folder of retrieved files that is deleted after parsing.
         :param nspin: nspin value of the parent calculation.
         :param spinorbit: True if the calculation used spin-orbit coupling.
+        :param max_workers: number of threads to read the ``pdos_atm`` files, by default they are read sequentially.
 
         :return: tuple of three containing the energy grid, the total DOS as a node and the PDOS
         """
@@ -294,9 +377,8 @@ class ProjwfcParser(BaseParser):
         # Read the `pdos_tot` file
         try:
             pdostot_filepath = next(retrieved_temporary_folder.glob('*pdos_tot*'))
-            with pdostot_filepath.open('r') as pdostot_file:
-                # Columns: Energy(eV), Ldos, Pdos
-                pdostot_array = np.atleast_2d(np.genfromtxt(pdostot_file))
+            # Columns: Energy(eV), Ldos, Pdos
+            pdostot_array = self._read_pdos_file(pdostot_filepath)
         except (OSError, KeyError):
             logs.error.append('ERROR_READING_PDOSTOT_FILE')
             return np.array([]), XyData(), np.array([])
@@ -316,41 +398,76 @@ class ProjwfcParser(BaseParser):
         else:
             dos_node.set_y(pdostot_array[:, 1], 'Dos', 'states/eV')
 
+        # Read the `pdos_atm` files, keeping the pdos in sync with the orbitals by properly sorting the filenames
+        pdos_file_paths = list(retrieved_temporary_folder.glob('*pdos_atm*'))
+        pdos_file_paths.sort(key=lambda path: natural_sort_key(path.name))
+        pdos_array = self._read_pdos_atm_files(pdos_file_paths, len(energy), nspin, spinorbit, max_workers)
+
+        return energy, dos_node, pdos_array
+
+    @classmethod
+    def _read_pdos_atm_files(
+        cls,
+        filepaths: List[Path],
+        num_energies: int,
+        nspin: int,
+        spinorbit: bool,
+        max_workers: Optional[int] = None
+    ) -> ArrayLike:
+        """Read the PDOS columns of the ``pdos_atm`` files into a single preallocated PDOS array.
+
+        First the column of the PDOS array is determined for each column of the files, from their first line of data
+        and depending on the ``npsin`` value and if spin-orbit is used. The PDOS array is then allocated and each file
+        is read directly into its own columns, such that the peak memory only exceeds the size of the PDOS array by
+        the size of the files that are being read at the same time.
+
+        :param filepaths: paths of the ``pdos_atm`` files, sorted in the order of the orbitals.
+        :param num_energies: number of energies of the PDOS files.
+        :param nspin: nspin value of the parent calculation.
+        :param spinorbit: True if the calculation used spin-orbit coupling.
+        :param max_workers: number of threads to read the ``pdos_atm`` files, by default they are read sequentially.
+        :return: the PDOS array with a row for each energy and a column for each orbital.
+        """
         # We're only interested in the PDOS, so we skip the first columns corresponding to the energy and LDOS
         if nspin == 1 or spinorbit:
             first_pdos_column = 2
         else:
             first_pdos_column = 3
 
-        # Read the `pdos_atm` files
-        pdos_atm_array_dict = {}
-        for path in retrieved_temporary_folder.glob('*pdos_atm*'):
-            with path.open('r') as pdosatm_file:
-                pdos_atm_array_dict[path.name] = np.atleast_2d(np.genfromtxt(pdosatm_file))[:, first_pdos_column:]
-
-        # Keep the pdos in sync with the orbitals by properly sorting the filenames
-        pdos_file_names = [k for k in pdos_atm_array_dict]
-        pdos_file_names.sort(key=natural_sort_key)
+        # Determine the column of the PDOS array for each PDOS column of the files, i.e. the files concatenated
+        num_columns = [cls._read_pdos_num_columns(path) - first_pdos_column for path in filepaths]
+        columns = np.arange(sum(num_columns))
 
         # Make sure the order of the PDOS columns matches with the orbitals
-        if nspin != 4 or spinorbit:
-            # Simply concatenate the PDOS columns as they are ordered by the filenames
-            pdos_array = np.concatenate([pdos_atm_array_dict[name] for name in pdos_file_names], axis=1)
-            if nspin == 2:
-                # Reorder the columns so the 'up' spin columns are first
-                pdos_array = np.concatenate([pdos_array[:, 0::2], pdos_array[:, 1::2]], axis=1)
-            if nspin == 4:
-                # Reorder the columns like the order of orbitals for spin-orbit
-                pdos_array = np.concatenate([pdos_array[:, 1::2], pdos_array[:, 0::2]], axis=1)
-        else:
+        if nspin == 2:
+            # Reorder the columns so the 'up' spin columns are first
+            columns = np.where(columns % 2 == 0, columns // 2, (len(columns) + 1) // 2 + columns // 2)
+        elif nspin == 4 and spinorbit:
+            # Reorder the columns like the order of orbitals for spin-orbit
+            columns = np.where(columns % 2 == 1, columns // 2, len(columns) // 2 + columns // 2)
+        elif nspin == 4:
             # Here all the 'up' orbitals for each l number come first, so the PDOS columns must be sorted accordingly
-            pdos_list = []
-            for wfc_pdos_array in [pdos_atm_array_dict[name] for name in pdos_file_names]:
-                # Reorder the columns so the 'up' spin columns _for this l number_ come first
-                pdos_list.append(np.concatenate([wfc_pdos_array[:, 0::2], wfc_pdos_array[:, 1::2]], axis=1))
-            pdos_array = np.concatenate(pdos_list, axis=1)
+            offsets = np.repeat(np.cumsum([0] + num_columns)[:-1], num_columns)
+            local = columns - offsets
+            half = np.repeat((np.array(num_columns, dtype=int) + 1) // 2, num_columns)
+            columns = offsets + np.where(local % 2 == 0, local // 2, half + local // 2)
+
+        # Each file is read directly into its own columns of the PDOS array, which are disjoint for all files
+        pdos_array = np.empty((num_energies, len(columns)), dtype=np.float64)
+        bounds = np.cumsum([0] + num_columns)
+        file_columns = [columns[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+        def read_pdos_file(filepath, file_column):
+            cls._read_pdos_file_into(filepath, pdos_array, file_column, first_pdos_column)
+
+        if max_workers is None or max_workers <= 1:
+            for filepath, file_column in zip(filepaths, file_columns):
+                read_pdos_file(filepath, file_column)
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(read_pdos_file, filepaths, file_columns))
 
-        return energy, dos_node, pdos_array
+        return pdos_array
 
     @classmethod
     def _build_bands_and_projections(
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 """`Parser` implementation for the `PwCalculation` calculation job class."""
+import contextlib
+import os
+import tempfile
 import traceback
 
 from aiida import orm
@@ -9,14 +12,117 @@ import numpy
 
 from aiida_quantumespresso.calculations.pw import PwCalculation
 from aiida_quantumespresso.utils.mapping import get_logging_container
+from aiida_quantumespresso.utils.trajectory import (
+    TrajectoryFrames,
+    get_trajectory_chunk_size,
+    get_trajectory_sampling,
+    sample_trajectory_array,
+    set_trajectory,
+    transform_trajectory_array,
+)
 
 from .base import BaseParser
 from .parse_raw.pw import reduce_symmetries
 
 
+def _convert_list_to_arrays(key, value):
+    """Convert a list of numbers, or nested lists of numbers with a regular shape, into a single array.
+
+    :param key: the key of the output parameters
+    :param value: the value of the output parameters
+    :return: dictionary with the array under the same key
+    :raises ValueError: if the value cannot be converted to a numeric array
+    """
+    array = numpy.array(value)
+
+    if not isinstance(value, list) or not value or array.dtype.kind not in 'biuf':
+        raise ValueError(f'`{key}` is not a non-empty list of numbers')
+
+    return {key: array}
+
+
+def _convert_records_to_arrays(key, value):
+    """Convert a list of dictionaries with the same keys, e.g. the symmetries, into one array per dictionary key.
+
+    The arrays are named `{key}_{field}`, e.g. `symmetries_symmetry_number` for the `symmetry_number` of all elements
+    of the `symmetries`.
+
+    :param key: the key of the output parameters
+    :param value: the value of the output parameters
+    :return: dictionary with an array for each field of the records
+    :raises ValueError: if the records do not all have the same fields or a field cannot be converted to an array
+    """
+    if not isinstance(value, list) or not value or not all(isinstance(record, dict) for record in value):
+        raise ValueError(f'`{key}` is not a non-empty list of dictionaries')
+
+    fields = list(value[0].keys())
+
+    if any(list(record.keys()) != fields for record in value):
+        raise ValueError(f'the elements of `{key}` do not all have the same keys')
+
+    arrays = {}
+
+    for field in fields:
+        try:
+            arrays[f'{key}_{field}'] = numpy.array([record[field] for record in value])
+        except ValueError as exception:
+            raise ValueError(f'the `{field}` of `{key}` cannot be converted to an array') from exception
+
+        if arrays[f'{key}_{field}'].dtype.kind not in 'biufU':
+            raise ValueError(f'the `{field}` of `{key}` cannot be converted to an array')
+
+    return arrays
+
+
+def _convert_occupations_to_arrays(key, value):
+    """Convert the atomic occupations of the Hubbard atoms, keyed by the atomic index, into one array per spin channel.
+
+    The arrays are named `{key}_index` for the atomic indices and `{key}_{spin}` for the occupations, where `spin` is
+    `total` and, for spin-polarised calculations, `up` and `down`.
+
+    :param key: the key of the output parameters
+    :param value: the value of the output parameters
+    :return: dictionary with the array of atomic indices and an array for each spin channel
+    :raises ValueError: if the occupations of all atoms do not have the same spin channels or cannot be converted
+    """
+    if not isinstance(value, dict) or not value or not all(isinstance(record, dict) for record in value.values()):
+        raise ValueError(f'`{key}` is not a non-empty dictionary of dictionaries')
+
+    spins = list(next(iter(value.values())).keys())
+
+    if any(list(record.keys()) != spins for record in value.values()):
+        raise ValueError(f'the elements of `{key}` do not all have the same keys')
+
+    arrays = {f'{key}_index': numpy.array([int(index) for index in value])}
+
+    for spin in spins:
+        arrays[f'{key}_{spin}'] = numpy.array([float(record[spin]) for record in value.values()])
+
+    return arrays
+
+
 class PwParser(BaseParser):
     """`Parser` implementation for the `PwCalculation` calculation job class."""
 
+    #: Registry of the bulky output parameters that are moved to the `output_parameters_arrays` output node when the
+    #: `output_parameters_arrays` parser option is enabled: the symmetries, which contain the equivalent ions of every
+    #: symmetry operation, the per-species magnetization data and the Hubbard occupations of every atom. These are then
+    #: no longer stored in the `output_parameters`, or in the `output_atomic_occupations` for the Hubbard occupations,
+    #: so consumers of the `symmetries` should use `get_extended_symmetries`, which reads them from either node. Each
+    #: key maps onto the function that converts the value into a dictionary of named arrays, see
+    #: `_convert_list_to_arrays`, `_convert_records_to_arrays` and `_convert_occupations_to_arrays`. Values that cannot
+    #: be converted, e.g. an empty list or symmetries that could not be mapped in `reduce_symmetries`, are kept where
+    #: they are. All other keys, including small vectors like the `fft_grid` and `monkhorst_pack_grid` that are useful
+    #: in queries, are always stored in the `output_parameters`.
+    OUTPUT_PARAMETERS_ARRAYS = {
+        'symmetries': _convert_records_to_arrays,
+        'lattice_symmetries': _convert_records_to_arrays,
+        'starting_magnetization': _convert_list_to_arrays,
+        'magnetization_angle1': _convert_list_to_arrays,
+        'magnetization_angle2': _convert_list_to_arrays,
+        'atomic_occupations': _convert_occupations_to_arrays,
+    }
+
     def parse(self, **kwargs):
         """Parse the retrieved files of a completed `PwCalculation` into output nodes.
 
@@ -49,29 +155,55 @@ class PwParser(BaseParser):
         # We check if the `CRASH` file was retrieved. If so, we parse its output
         crash_file_filename = self.node.process_class._CRASH_FILE
         if crash_file_filename in self.retrieved.base.repository.list_object_names():
-            crash_file = self.retrieved.base.repository.get_object_content(crash_file_filename)
+            with self.timed('read'):
+                crash_file = self.retrieved.base.repository.get_object_content(crash_file_filename)
 
         parameters = self.node.inputs.parameters.get_dict()
-        parsed_xml, logs_xml = self.parse_xml(dir_with_bands, parser_options)
-        parsed_stdout, logs_stdout = self.parse_stdout(parameters, parser_options, parsed_xml, crash_file)
-
-        parsed_bands = parsed_stdout.pop('bands', {})
-        parsed_structure = parsed_stdout.pop('structure', {})
-        parsed_trajectory = parsed_stdout.pop('trajectory', {})
-        parsed_parameters = self.build_output_parameters(parsed_stdout, parsed_xml)
 
-        # Append the last frame of some of the smaller trajectory arrays to the parameters for easy querying
-        self.final_trajectory_frame_to_parameters(parsed_parameters, parsed_trajectory)
+        with self.timed('xml'):
+            parsed_xml, logs_xml = self.parse_xml(dir_with_bands, parser_options)
 
-        # If the parser option 'all_symmetries' is False, we reduce the raw parsed symmetries to save space
-        all_symmetries = False if parser_options is None else parser_options.get('all_symmetries', False)
-        if not all_symmetries and 'cell' in parsed_structure:
-            reduce_symmetries(parsed_parameters, parsed_structure, self.logger)
-
-        structure = self.build_output_structure(parsed_structure)
-        kpoints = self.build_output_kpoints(parsed_parameters, structure)
-        bands = self.build_output_bands(parsed_bands, kpoints)
-        trajectory = self.build_output_trajectory(parsed_trajectory, structure)
+        # The `trajectory_chunk_size` parser option writes the frames of the trajectory arrays to temporary files in
+        # chunks while the stdout is being parsed, instead of holding them in memory.
+        try:
+            chunk_size = get_trajectory_chunk_size(parser_options or {})
+        except ValueError as exception:
+            self.logger.error(f'{exception}: building the trajectory in memory.')
+            chunk_size = None
+
+        trajectory_directory = tempfile.TemporaryDirectory() if chunk_size else contextlib.nullcontext()
+
+        with trajectory_directory as dirpath:
+            with self.timed('stdout'):
+                parsed_stdout, logs_stdout = self.parse_stdout(
+                    parameters,
+                    parser_options,
+                    parsed_xml,
+                    crash_file,
+                    trajectory_frames=None if dirpath is None else
+                    lambda key: TrajectoryFrames(os.path.join(dirpath, f'{key}.bin'), chunk_size),
+                )
+
+            parsed_bands = parsed_stdout.pop('bands', {})
+            parsed_structure = parsed_stdout.pop('structure', {})
+            parsed_trajectory = parsed_stdout.pop('trajectory', {})
+            parsed_parameters = self.build_output_parameters(parsed_stdout, parsed_xml)
+
+            # Append the last frame of some of the smaller trajectory arrays to the parameters for easy querying
+            self.final_trajectory_frame_to_parameters(parsed_parameters, parsed_trajectory)
+
+            # If the parser option 'all_symmetries' is False, we reduce the raw parsed symmetries to save space
+            all_symmetries = False if parser_options is None else parser_options.get('all_symmetries', False)
+            if not all_symmetries and 'cell' in parsed_structure:
+                reduce_symmetries(parsed_parameters, parsed_structure, self.logger)
+
+            with self.timed('outputs'):
+                structure = self.build_output_structure(parsed_structure)
+                kpoints = self.build_output_kpoints(parsed_parameters, structure)
+                bands = self.build_output_bands(parsed_bands, kpoints)
+                trajectory = self.build_output_trajectory(
+                    parsed_trajectory, structure, **self.get_trajectory_sampling(parser_options or {})
+                )
 
         # Determine whether the input kpoints were defined as a mesh or as an explicit list
         try:
@@ -94,6 +226,12 @@ class PwParser(BaseParser):
         if not structure.is_stored:
             self.out('output_structure', structure)
 
+        # Move the bulky entries of the registry to a separate `ArrayData` node if requested
+        if (parser_options or {}).get('output_parameters_arrays', False):
+            parameters_arrays = self.build_output_parameters_arrays(parsed_parameters)
+            if parameters_arrays:
+                self.out('output_parameters_arrays', parameters_arrays)
+
         # Separate the atomic_occupations dictionary in its own node if it is present
         atomic_occupations = parsed_parameters.pop('atomic_occupations', None)
         if atomic_occupations:
@@ -317,6 +455,9 @@ class PwParser(BaseParser):
         logs = get_logging_container()
         parsed_data = {}
 
+        # If the parser option 'fast_xml' is True, the XML is not validated and only the fields that are used are decoded
+        fast_xml = False if parser_options is None else parser_options.get('fast_xml', False)
+
         object_names = self.retrieved.base.repository.list_object_names()
         xml_files = [xml_file for xml_file in self.node.process_class.xml_filenames if xml_file in object_names]
 
@@ -331,7 +472,7 @@ class PwParser(BaseParser):
 
         try:
             with self.retrieved.base.repository.open(xml_files[0]) as xml_file:
-                parsed_data, logs = parse_xml(xml_file, dir_with_bands)
+                parsed_data, logs = parse_xml(xml_file, dir_with_bands, validate=not fast_xml)
         except IOError:
             self.exit_code_xml = self.exit_codes.ERROR_OUTPUT_XML_READ
         except XMLParseError:
@@ -344,15 +485,17 @@ class PwParser(BaseParser):
 
         return parsed_data, logs
 
-    def parse_stdout(self, parameters, parser_options=None, parsed_xml=None, crash_file=None):
+    def parse_stdout(self, parameters, parser_options=None, parsed_xml=None, crash_file=None, trajectory_frames=None):
         """Parse the stdout output file.
 
         :param parameters: the input parameters dictionary
         :param parser_options: optional dictionary with parser options
         :param parsed_xml: the raw parsed data from the XML output
+        :param trajectory_frames: optional factory of the containers of the trajectory arrays with a frame per step,
+            see :class:`~aiida_quantumespresso.parsers.parse_raw.pw_stream.PwStdoutParser`
         :return: tuple of two dictionaries, first with raw parsed data and second with log messages
         """
-        from aiida_quantumespresso.parsers.parse_raw.pw import parse_stdout
+        from aiida_quantumespresso.parsers.parse_raw.pw_stream import parse_stdout_stream
 
         logs = get_logging_container()
         parsed_data = {}
@@ -363,18 +506,21 @@ class PwParser(BaseParser):
             self.exit_code_stdout = self.exit_codes.ERROR_OUTPUT_STDOUT_MISSING
             return parsed_data, logs
 
+        # The stdout is parsed line by line straight from the repository, such that it is never loaded in memory as a
+        # whole, which can be significant for long molecular dynamics or relaxation runs.
         try:
-            stdout = self.retrieved.base.repository.get_object_content(filename_stdout)
+            with self.retrieved.base.repository.open(filename_stdout) as handle:
+                try:
+                    parsed_data, logs = parse_stdout_stream(
+                        handle, parameters, parser_options, parsed_xml, crash_file, trajectory_frames
+                    )
+                except Exception as exc:
+                    logs.critical.append(traceback.format_exc())
+                    self.exit_code_stdout = self.exit_codes.ERROR_UNEXPECTED_PARSER_EXCEPTION.format(exception=exc)
         except IOError:
             self.exit_code_stdout = self.exit_codes.ERROR_OUTPUT_STDOUT_READ
             return parsed_data, logs
 
-        try:
-            parsed_data, logs = parse_stdout(stdout, parameters, parser_options, parsed_xml, crash_file)
-        except Exception as exc:
-            logs.critical.append(traceback.format_exc())
-            self.exit_code_stdout = self.exit_codes.ERROR_UNEXPECTED_PARSER_EXCEPTION.format(exception=exc)
-
         # If the stdout was incomplete, most likely the job was interrupted before it could cleanly finish, so the
         # output files are most likely corrupt and cannot be restarted from
         if 'ERROR_OUTPUT_STDOUT_INCOMPLETE' in logs['error']:
@@ -419,6 +565,35 @@ class PwParser(BaseParser):
 
         return parameters
 
+    def build_output_parameters_arrays(self, parameters):
+        """Move the entries of the `OUTPUT_PARAMETERS_ARRAYS` registry from the output parameters to an `ArrayData`.
+
+        :param parameters: the output parameters, from which the converted entries are removed
+        :return: an `ArrayData` or None if none of the entries could be converted
+        """
+        arrays = {}
+
+        for key, convert in self.OUTPUT_PARAMETERS_ARRAYS.items():
+            if key not in parameters:
+                continue
+
+            try:
+                arrays.update(convert(key, parameters[key]))
+            except ValueError:
+                continue
+
+            parameters.pop(key)
+
+        if not arrays:
+            return None
+
+        parameters_arrays = orm.ArrayData()
+
+        for name, array in arrays.items():
+            parameters_arrays.set_array(name, array)
+
+        return parameters_arrays
+
     def build_output_structure(self, parsed_structure):
         """Build the output structure from the raw parsed data.
 
@@ -435,51 +610,105 @@ class PwParser(BaseParser):
 
         return convert_qe_to_aiida_structure(parsed_structure, self.node.inputs.structure)
 
+    def get_trajectory_sampling(self, parser_options):
+        """Return the sub-sampling of the output trajectory that is requested through the parser options.
+
+        The frames of the trajectory are only sub-sampled for molecular dynamics, i.e. `md` and `vc-md` calculations,
+        since the validation of the other calculation types relies on the final frames of the trajectory. Invalid
+        options are reported through the logger, in which case the full trajectory is stored.
+
+        :param parser_options: dictionary with the parser options
+        :return: dictionary with the `frames` and `dtype` arguments of `build_output_trajectory`
+        """
+        if not any(key.startswith('trajectory_') for key in parser_options):
+            return {}
+
+        if self.get_calculation_type() not in ['md', 'vc-md']:
+            self.logger.warning('the `trajectory_*` parser options are only supported for `md` and `vc-md`, ignoring.')
+            return {}
+
+        try:
+            frames, dtype = get_trajectory_sampling(parser_options)
+        except ValueError as exception:
+            self.logger.error(f'{exception}: storing the full trajectory.')
+            return {}
+
+        return {'frames': frames, 'dtype': dtype}
+
     @staticmethod
-    def build_output_trajectory(parsed_trajectory, structure):
+    def build_output_trajectory(parsed_trajectory, structure, frames=slice(None), dtype=None):
         """Build the output trajectory from the raw parsed trajectory data.
 
+        The frames of the positions, cells and all other arrays with more than one dimension, e.g. the forces, can be
+        sub-sampled with the `frames` slice. The one-dimensional arrays of scalar observables, e.g. the energies, are
+        always stored at full resolution.
+
+        The frames of the arrays with more than one dimension are either parsed as lists or, with the
+        `trajectory_chunk_size` parser option, as `TrajectoryFrames` that were written to files while parsing. The
+        latter are memory mapped, such that the trajectory is never fully loaded in memory.
+
         :param parsed_trajectory: the raw parsed trajectory data
+        :param structure: the output structure
+        :param frames: the `slice` of the frames to store
+        :param dtype: the precision of the sub-sampled floating point arrays, the parsed one if None
         :return: a `TrajectoryData` or None
         """
+
+        def to_array(value):
+            """Convert the parsed frames to an array, which is memory mapped for `TrajectoryFrames`."""
+            if isinstance(value, TrajectoryFrames):
+                return value.finalize()
+
+            return numpy.array(value)
+
         fractional = False
 
         if 'atomic_positions_relax' in parsed_trajectory:
-            positions = numpy.array(parsed_trajectory.pop('atomic_positions_relax'))
+            positions = parsed_trajectory.pop('atomic_positions_relax')
         elif 'atomic_fractionals_relax' in parsed_trajectory:
             fractional = True
-            positions = numpy.array(parsed_trajectory.pop('atomic_fractionals_relax'))
+            positions = parsed_trajectory.pop('atomic_fractionals_relax')
         else:
             # The positions were never printed, the calculation did not change the structure
-            positions = numpy.array([[site.position for site in structure.sites]])
+            positions = [[site.position for site in structure.sites]]
 
         try:
-            cells = numpy.array(parsed_trajectory.pop('lattice_vectors_relax'))
+            cells = to_array(parsed_trajectory.pop('lattice_vectors_relax'))
         except KeyError:
             # The cell is never printed, the calculation was at fixed cell
             cells = numpy.array([structure.cell])
 
         # Ensure there are as many frames for cell as positions, even when the calculation was done at fixed cell
         if len(cells) == 1 and len(positions) > 1:
-            cells = numpy.array([cells[0]] * len(positions))
+            cells = numpy.broadcast_to(cells[0], (len(positions), 3, 3))
+
+        def to_cartesian(chunk, chunk_slice):
+            """Convert a chunk of fractional positions to cartesian."""
+            return numpy.einsum('ijk, ikm -> ijm', chunk, cells[chunk_slice])
+
+        positions = to_array(positions)
 
         if fractional:
-            # convert positions to cartesian
-            positions = numpy.einsum('ijk, ikm -> ijm', positions, cells)
+            positions = transform_trajectory_array(positions, to_cartesian)
 
         symbols = [str(site.kind_name) for site in structure.sites]
         stepids = numpy.arange(len(positions))
 
         trajectory = orm.TrajectoryData()
-        trajectory.set_trajectory(
-            stepids=stepids,
-            cells=cells,
+        set_trajectory(
+            trajectory,
+            dtype=dtype,
+            stepids=stepids[frames],
+            cells=sample_trajectory_array(cells, frames),
             symbols=symbols,
-            positions=positions,
+            positions=sample_trajectory_array(positions, frames),
         )
 
         for key, value in parsed_trajectory.items():
-            trajectory.set_array(key, numpy.array(value))
+            value = to_array(value)
+            if value.ndim > 1:
+                value = sample_trajectory_array(value, frames, dtype)
+            trajectory.set_array(key, value)
 
         return trajectory
 
@@ -533,7 +762,7 @@ class PwParser(BaseParser):
         if len(parsed_bands['occupations']) > 1:
             occupations = parsed_bands['occupations']
         else:
-            occupations = 2. * numpy.array(parsed_bands['occupations'][0])
+            occupations = 2. * numpy.asarray(parsed_bands['occupations'][0])
 
         if len(parsed_bands['bands']) > 1:
             bands_energies = parsed_bands['bands']
@@ -587,15 +816,44 @@ class PwParser(BaseParser):
 
     def get_extended_symmetries(self):
         """Return the extended dictionary of symmetries based on reduced symmetries stored in output parameters."""
-        from aiida_quantumespresso.parsers.parse_raw.pw import get_symmetry_mapping
+        from aiida_quantumespresso.parsers.parse_raw.pw import get_symmetry_table
 
-        possible_symmetries = get_symmetry_mapping()
-        parameters = self.node.base.links.get_outgoing(node_class=orm.Dict).get_node_by_label('output_parameters')
+        possible_symmetries = get_symmetry_table()
+        outputs = self.node.base.links.get_outgoing()
+        parameters = outputs.get_node_by_label('output_parameters')
 
         symmetries_extended = []
-        symmetries_reduced = parameters.get_dict()['symmetries']  # rimetti lo zero
+
+        try:
+            symmetries_reduced = parameters.get_dict()['symmetries']  # rimetti lo zero
+        except KeyError:
+            # The symmetries were moved to the `output_parameters_arrays` by the `output_parameters_arrays` option
+            parameters_arrays = outputs.get_node_by_label('output_parameters_arrays')
+            fields = [name for name in parameters_arrays.get_arraynames() if name.startswith('symmetries_')]
+            columns = {name[len('symmetries_'):]: parameters_arrays.get_array(name).tolist() for name in fields}
+            symmetries_reduced = [dict(zip(columns.keys(), values)) for values in zip(*columns.values())]
+
+        # symmetry numbers that are not in the symmetry table would wrap around or fail in the gather, so skip them
+        num_symmetries = len(possible_symmetries.names)
+        valid_symmetries = []
 
         for element in symmetries_reduced:
+            number = element['symmetry_number']
+
+            if isinstance(number, int) and 0 <= number < num_symmetries:
+                valid_symmetries.append(element)
+            else:
+                self.logger.warning(f'Symmetry number {number} not found')
+
+        symmetries_reduced = valid_symmetries
+
+        # expand the symmetry numbers with a single gather from the symmetry table
+        numbers = numpy.array([element['symmetry_number'] for element in symmetries_reduced], dtype=int)
+        names = possible_symmetries.names[numbers].tolist()
+        rotations = possible_symmetries.matrices[numbers].tolist()
+        inversions = possible_symmetries.inversions[numbers].tolist()
+
+        for element, name, rotation, inversion in zip(symmetries_reduced, names, rotations, inversions):
 
             symmetry = {}
 
@@ -605,10 +863,9 @@ class PwParser(BaseParser):
                 except KeyError:
                     pass
 
-            # expand the rest
-            symmetry['name'] = possible_symmetries[element['symmetry_number']]['name']
-            symmetry['rotation'] = possible_symmetries[element['symmetry_number']]['matrix']
-            symmetry['inversion'] = possible_symmetries[element['symmetry_number']]['inversion']
+            symmetry['name'] = name
+            symmetry['rotation'] = rotation
+            symmetry['inversion'] = inversion
 
             symmetries_extended.append(symmetry)
 
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
-from aiida.orm import Dict
+from aiida.common import exceptions
+from aiida.orm import ArrayData, Dict
 
 from aiida_quantumespresso.data.force_constants import ForceConstantsData
 from aiida_quantumespresso.utils.mapping import get_logging_container
@@ -31,6 +32,27 @@ class Q2rParser(BaseParser):
             return self.exit(self.exit_codes.ERROR_READING_FORCE_CONSTANTS_FILE, logs)
 
         with self.retrieved.base.repository.open(filename_force_constants, 'rb') as handle:
-            self.out('force_constants', ForceConstantsData(file=handle))
+            force_constants = ForceConstantsData(file=handle)
+
+        self.out('force_constants', force_constants)
+
+        try:
+            settings = self.node.inputs.settings.get_dict()
+        except exceptions.NotExistent:
+            settings = {}
+
+        # If the parser option `force_constants_array` is True, the parsed force constants are also stored as an array,
+        # such that they can be used directly without having to parse the text file again.
+        parser_options = settings.get('parser_options', None) or {}
+
+        if parser_options.get('force_constants_array', False):
+            try:
+                force_constants_array = force_constants.force_constants
+            except ValueError:
+                return self.exit(self.exit_codes.ERROR_READING_FORCE_CONSTANTS_FILE, logs)
+
+            array = ArrayData()
+            array.set_array('force_constants', force_constants_array)
+            self.out('force_constants_array', array)
 
         return self.exit(logs=logs)
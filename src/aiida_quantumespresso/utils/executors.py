@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""Utilities to create the pools of workers that are used to parse independent output files concurrently."""
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+
+EXECUTORS = ('thread', 'process')
+
+
+def validate_executor(executor: str) -> None:
+    """Validate the type of pool of workers.
+
+    :param executor: the type of pool of workers, one of :data:`EXECUTORS`.
+    :raises ValueError: if the type is not supported.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f'invalid executor `{executor}`, should be one of {EXECUTORS}')
+
+
+def get_executor(executor: str, max_workers: int) -> Executor:
+    """Return a new pool of workers of the given type.
+
+    The parsers typically run inside a daemon worker, which has its own threads, event loop and open connections to the
+    database and the message broker. A ``process`` pool therefore never forks the current process, but spawns fresh
+    interpreters for its workers. These have to import the functions that they run, so starting the pool takes some
+    time, which only pays off if the parsing of each file is expensive.
+
+    :param executor: the type of pool of workers, one of :data:`EXECUTORS`.
+    :param max_workers: the maximum number of workers of the pool.
+    :raises ValueError: if the type is not supported.
+    """
+    validate_executor(executor)
+
+    if executor == 'process':
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+    return ThreadPoolExecutor(max_workers=max_workers)
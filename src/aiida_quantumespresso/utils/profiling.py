@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""Utilities to measure the time spent in the different phases of the parsing of the outputs of a calculation."""
+import cProfile
+import contextlib
+import contextvars
+import io
+import pstats
+import time
+
+_TIMINGS = contextvars.ContextVar('timings', default=None)
+
+
+@contextlib.contextmanager
+def timed(phase):
+    """Add the wall time spent in the block to the given phase of the active :func:`record_timings` context.
+
+    This is a no-op if no timings are being recorded, so it can be used freely in the parsing code. The time spent in
+    the same phase multiple times is summed. Phases can be nested, in which case the time of the inner phase is also
+    included in that of the outer phase. Code that runs in a pool of workers is not recorded.
+
+    :param phase: the name of the phase, e.g. ``stdout``.
+    """
+    timings = _TIMINGS.get()
+
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        timings[phase] = timings.get(phase, 0.) + time.perf_counter() - start
+
+
+@contextlib.contextmanager
+def record_timings(profile=False, limit=20):
+    """Record the time spent in each phase marked with :func:`timed` while the block is executed.
+
+    The yielded dictionary is filled when the block exits with the following keys:
+
+        * ``timings``: dictionary with the wall time in seconds of each phase and the ``total`` of the block.
+        * ``profile``: if ``profile`` is True, the statistics of ``cProfile`` of the functions with the largest
+          cumulative time as a string.
+
+    :param profile: whether to also profile the block with ``cProfile``.
+    :param limit: the number of functions that are included in the profile statistics.
+    """
+    result = {}
+    timings = {}
+    token = _TIMINGS.set(timings)
+    profiler = cProfile.Profile() if profile else None
+    start = time.perf_counter()
+
+    try:
+        if profiler is None:
+            yield result
+        else:
+            with profiler:
+                yield result
+    finally:
+        timings['total'] = time.perf_counter() - start
+        _TIMINGS.reset(token)
+        result['timings'] = timings
+
+        if profiler is not None:
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(limit)
+            result['profile'] = stream.getvalue()
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""Utilities to stage input files once per computer in a remote cache directory that is addressed by their content.
+
+By default, the pseudopotentials and other file inputs of a calculation are uploaded to the working directory of every
+calculation. Instead, the files can be staged once in a cache directory on the computer with
+:func:`stage_remote_cache`, where each file is named after its md5 checksum. Calculations that specify the cache
+directory in the ``REMOTE_FILE_CACHE`` key of their ``settings`` then symlink the cached files into their working
+directory, see :func:`get_remote_cache_copy_lists`.
+
+The files that are staged and verified are recorded in the metadata of the computer, since the transport is not
+available when the input files of a calculation are prepared. Files that are not recorded are copied as usual.
+"""
+import os
+import pathlib
+import tempfile
+import uuid as _uuid
+
+from aiida import orm
+from aiida.common.escaping import escape_for_bash
+from aiida.common.files import md5_from_filelike
+
+REMOTE_CACHE_PROPERTY = 'quantumespresso_remote_file_cache'
+
+
+def get_remote_cache_filename(node):
+    """Return the filename of the file of a ``SinglefileData`` in the remote cache.
+
+    The filename is the md5 checksum of the content followed by the extension of the original filename, e.g.
+    ``d41d8cd98f00b204e9800998ecf8427e.upf``.
+
+    :param node: the ``SinglefileData`` node, e.g. a ``UpfData``.
+    """
+    md5 = node.base.attributes.get('md5', None)
+
+    if md5 is None:
+        with node.open(mode='rb') as handle:
+            md5 = md5_from_filelike(handle)
+
+    return md5 + pathlib.PurePosixPath(node.filename).suffix
+
+
+def get_remote_cache_entries(computer, dirpath):
+    """Return the filenames that are staged and verified in the given remote cache directory of the computer.
+
+    :param computer: the ``Computer`` of the remote cache.
+    :param dirpath: the absolute path of the remote cache directory.
+    :return: set of filenames in the remote cache directory.
+    """
+    return set(computer.get_property(REMOTE_CACHE_PROPERTY, {}).get(str(dirpath), []))
+
+
+def _set_remote_cache_entries(computer, dirpath, filenames):
+    """Record the filenames that are staged and verified in the given remote cache directory of the computer."""
+    registry = computer.get_property(REMOTE_CACHE_PROPERTY, {})
+    registry[str(dirpath)] = sorted(filenames)
+    computer.set_property(REMOTE_CACHE_PROPERTY, registry)
+
+
+def _get_remote_md5(transport, filepath):
+    """Return the md5 checksum of a remote file, or None if it does not exist.
+
+    :raises OSError: if the checksum of an existing file cannot be computed with ``md5sum``.
+    """
+    if not transport.path_exists(filepath):
+        return None
+
+    retval, stdout, stderr = transport.exec_command_wait(f'md5sum {escape_for_bash(filepath)}')
+
+    if retval != 0:
+        raise OSError(f'could not compute the md5 checksum of the remote file `{filepath}`: {stderr}')
+
+    return stdout.split()[0]
+
+
+def _upload_file(transport, node, filepath, md5, replace):
+    """Upload the file of a node to a temporary remote file, which replaces ``filepath`` once it is verified.
+
+    :raises OSError: if the md5 checksum of the uploaded file does not match.
+    """
+    dirpath, filename = os.path.split(filepath)
+    filepath_temporary = os.path.join(dirpath, f'.{filename}.{_uuid.uuid4().hex}')
+
+    with tempfile.TemporaryDirectory() as dirname:
+        filepath_local = os.path.join(dirname, filename)
+        with node.open(mode='rb') as source, open(filepath_local, 'wb') as target:
+            target.write(source.read())
+        transport.putfile(filepath_local, filepath_temporary)
+
+    if _get_remote_md5(transport, filepath_temporary) != md5:
+        transport.remove(filepath_temporary)
+        raise OSError(f'the md5 checksum of the file `{filepath}` does not match after the upload.')
+
+    if replace:
+        transport.remove(filepath)
+
+    transport.rename(filepath_temporary, filepath)
+
+
+def stage_remote_cache(computer, nodes, dirpath, transport=None):
+    """Stage the files of the given nodes in the remote cache directory of the computer.
+
+    Files that are already in the cache are verified against their md5 checksum and are only uploaded if they are
+    missing or their checksum does not match. Each file is uploaded to a temporary file in the cache directory, which
+    replaces the cached file once it is verified, such that the cache never contains incomplete files. The staged files
+    are recorded in the metadata of the computer.
+
+    :param computer: the ``Computer`` of the remote cache.
+    :param nodes: iterable of ``SinglefileData`` nodes, e.g. the ``UpfData`` of a pseudopotential family.
+    :param dirpath: the absolute path of the remote cache directory, which is created if it does not exist.
+    :param transport: an open transport to the computer, by default a new transport is opened.
+    :return: dictionary with the filename in the remote cache of each node, keyed by the UUID of the node.
+    :raises OSError: if a file cannot be uploaded or its checksum does not match after the upload.
+    """
+    dirpath = str(dirpath)
+
+    if not os.path.isabs(dirpath):
+        raise ValueError(f'the remote cache directory should be an absolute path, got: {dirpath}')
+
+    if transport is None:
+        with computer.get_transport() as opened_transport:
+            return stage_remote_cache(computer, nodes, dirpath, opened_transport)
+
+    entries = get_remote_cache_entries(computer, dirpath)
+    filenames = {}
+
+    transport.makedirs(dirpath, ignore_existing=True)
+
+    for node in nodes:
+        filename = get_remote_cache_filename(node)
+        filepath = os.path.join(dirpath, filename)
+        md5 = pathlib.PurePosixPath(filename).stem
+        md5_remote = _get_remote_md5(transport, filepath)
+
+        if md5_remote != md5:
+            _upload_file(transport, node, filepath, md5, replace=md5_remote is not None)
+
+        entries.add(filename)
+        filenames[node.uuid] = filename
+
+    _set_remote_cache_entries(computer, dirpath, entries)
+
+    return filenames
+
+
+def verify_remote_cache(computer, dirpath, transport=None):
+    """Verify the files that are recorded in the remote cache directory of the computer against their md5 checksum.
+
+    Files that are missing or whose checksum does not match are removed from the record, such that calculations fall
+    back to copying them, until they are staged again with :func:`stage_remote_cache`.
+
+    :param computer: the ``Computer`` of the remote cache.
+    :param dirpath: the absolute path of the remote cache directory.
+    :param transport: an open transport to the computer, by default a new transport is opened.
+    :return: set of the filenames that were removed from the record.
+    """
+    dirpath = str(dirpath)
+
+    if transport is None:
+        with computer.get_transport() as opened_transport:
+            return verify_remote_cache(computer, dirpath, opened_transport)
+
+    entries = get_remote_cache_entries(computer, dirpath)
+    invalid = {
+        filename for filename in entries
+        if _get_remote_md5(transport, os.path.join(dirpath, filename)) != pathlib.PurePosixPath(filename).stem
+    }
+
+    _set_remote_cache_entries(computer, dirpath, entries - invalid)
+
+    return invalid
+
+
+def get_remote_cache_copy_lists(computer, dirpath, local_copy_list):
+    """Replace the entries of a local copy list of which the file is staged in the remote cache by symlinks.
+
+    :param computer: the ``Computer`` on which the calculation runs.
+    :param dirpath: the absolute path of the remote cache directory.
+    :param local_copy_list: the local copy list of the calculation, with tuples of the UUID of a ``SinglefileData``
+        node, the filename in its repository and the relative destination path.
+    :return: tuple of the local copy list with the entries that are not in the remote cache, and the remote symlink
+        list with the entries that are.
+    """
+    entries = get_remote_cache_entries(computer, dirpath)
+    remaining_copy_list = []
+    remote_symlink_list = []
+
+    for uuid, filename, destination in local_copy_list:
+        node = orm.load_node(uuid)
+        cache_filename = get_remote_cache_filename(node)
+
+        if cache_filename in entries and filename == node.filename:
+            remote_symlink_list.append((computer.uuid, os.path.join(str(dirpath), cache_filename), destination))
+        else:
+            remaining_copy_list.append((uuid, filename, destination))
+
+    return remaining_copy_list, remote_symlink_list
@@ -1,5 +1,21 @@
 # -*- coding: utf-8 -*-
 """Utilities for calculation job resources."""
+import math
+
+import numpy
+
+# Relative cost of the communication in the plane-wave and FFT parallelization, per doubling of the number of processes
+# over which each wave function is distributed.
+_PLANE_WAVE_OVERHEAD = 0.1
+
+# Relative cost of the communication in the band parallelization, per doubling of the number of band groups.
+_BAND_GROUP_OVERHEAD = 0.05
+
+# Relative cost of a pool whose processes are not all on the same machine, while pools could be kept on one machine.
+_INTER_MACHINE_OVERHEAD = 0.25
+
+# Minimum number of bands in each row of the grid of processes of the parallel subspace diagonalization.
+_MIN_BANDS_PER_DIAGONALIZATION_ROW = 100
 
 
 def create_scheduler_resources(scheduler, base, goal):
@@ -65,3 +81,197 @@ def get_default_options(max_num_machines=1, max_wallclock_seconds=1800, with_mpi
         'max_wallclock_seconds': int(max_wallclock_seconds),
         'withmpi': with_mpi,
     }
+
+
+def get_irreducible_kpoints_count(structure, kpoints, use_symmetry=True, use_time_reversal=True):
+    """Return the number of irreducible k-points of the k-points of a calculation.
+
+    For an explicit list of k-points this is simply the number of k-points. For a mesh, the k-points are reduced with
+    the symmetry operations of the structure found by ``spglib``, where sites of different kinds are not equivalent.
+    This is an estimate of the number of k-points used by ``pw.x``, which can find fewer symmetries, for example because
+    of the magnetization of the kinds or fractional translations that are not commensurate with the FFT grid, but not
+    more.
+
+    :param structure: the ``StructureData`` of the calculation.
+    :param kpoints: the ``KpointsData`` of the calculation.
+    :param use_symmetry: whether the symmetry operations of the structure are used, i.e. ``SYSTEM.nosym`` is not set.
+    :param use_time_reversal: whether time reversal symmetry is used, i.e. ``SYSTEM.noinv`` is not set.
+    :return: the number of irreducible k-points.
+    """
+    from aiida.tools.data.structure import structure_to_spglib_tuple
+    import spglib
+
+    try:
+        mesh, offset = kpoints.get_kpoints_mesh()
+    except AttributeError:
+        return len(kpoints.get_kpoints())
+
+    if use_symmetry:
+        rotations = spglib.get_symmetry(structure_to_spglib_tuple(structure)[0])['rotations']
+    else:
+        rotations = numpy.eye(3, dtype='intc')[None, :, :]
+
+    is_shift = [0 if shift == 0. else 1 for shift in offset]
+    mapping, _ = spglib.get_stabilized_reciprocal_mesh(mesh, rotations, is_shift, is_time_reversal=use_time_reversal)
+
+    return len(numpy.unique(mapping))
+
+
+def get_number_of_bands_estimate(num_electrons, occupations=None, noncolin=False):
+    """Return the number of bands that ``pw.x`` uses by default for the given number of valence electrons.
+
+    :param num_electrons: the number of valence electrons.
+    :param occupations: the ``SYSTEM.occupations`` of the calculation.
+    :param noncolin: whether the calculation is noncollinear, i.e. ``SYSTEM.noncolin`` is set.
+    :return: the number of bands.
+    """
+    num_occupied = num_electrons if noncolin else num_electrons / 2
+
+    if occupations == 'fixed':
+        return max(int(math.ceil(num_occupied)), 1)
+
+    return max(int(round(1.2 * num_occupied)), int(round(num_occupied)) + 4)
+
+
+def get_fft_planes_estimate(structure, ecutrho):
+    """Return an estimate of the number of planes along the third axis of the FFT grid of the charge density.
+
+    The planes are distributed over the processes of the plane-wave parallelization of ``pw.x``, so this is the maximum
+    number of processes over which each wave function can be usefully distributed.
+
+    :param structure: the ``StructureData`` of the calculation.
+    :param ecutrho: the kinetic energy cutoff for the charge density in Ry.
+    :return: the number of planes.
+    """
+    from qe_tools import CONSTANTS
+
+    length = numpy.linalg.norm(structure.cell[2]) / CONSTANTS.bohr_to_ang
+
+    return int(math.sqrt(ecutrho) * length / math.pi) + 1
+
+
+def _get_divisors(number):
+    """Return the divisors of the given positive integer in ascending order."""
+    return [divisor for divisor in range(1, number + 1) if number % divisor == 0]
+
+
+def get_automatic_parallelization(
+    num_mpiprocs, num_kpoints, num_bands, num_fft_planes, num_mpiprocs_per_machine=None, max_npool=None
+):
+    """Return the parallelization flags of ``pw.x`` that maximize the throughput for the given calculation.
+
+    Each combination of a number of pools ``npool``, that divides the number of processes and is not larger than the
+    number of k-points, and a number of band groups ``nband`` is assigned a relative cost with a simple model: the time
+    of a pool is proportional to the number of k-points and bands that its processes treat, divided by the number of
+    processes over which each wave function is distributed, with a communication overhead for the plane-wave and band
+    parallelization and for pools that span multiple machines. Band groups are only used once the number of processes
+    of a pool exceeds the number of FFT planes. The combination with the lowest cost is returned, preferring more pools.
+
+    The parallel subspace diagonalization uses a square grid of ``ndiag`` processes of each band group, where each row
+    of the grid holds at least ``_MIN_BANDS_PER_DIAGONALIZATION_ROW`` bands, since the serial diagonalization is faster
+    for small numbers of bands.
+
+    :param num_mpiprocs: the total number of MPI processes of the calculation.
+    :param num_kpoints: the number of irreducible k-points, see :func:`get_irreducible_kpoints_count`.
+    :param num_bands: the number of bands, see :func:`get_number_of_bands_estimate`.
+    :param num_fft_planes: the number of FFT planes, see :func:`get_fft_planes_estimate`.
+    :param num_mpiprocs_per_machine: the number of MPI processes on each machine, by default all processes are assumed
+        to be on the same machine.
+    :param max_npool: optional maximum number of pools, e.g. to limit the memory, see
+        :func:`get_memory_aware_resources`.
+    :return: dictionary with the ``npool``, ``nband`` and ``ndiag`` flags that can be used for the ``parallelization``
+        input of a ``PwCalculation``.
+    """
+    if min(num_mpiprocs, num_kpoints, num_bands, num_fft_planes) < 1:
+        raise ValueError('the number of processes, k-points, bands and FFT planes should all be positive.')
+
+    num_mpiprocs_per_machine = num_mpiprocs_per_machine or num_mpiprocs
+    candidates = []
+
+    for npool in _get_divisors(num_mpiprocs):
+        if npool > num_kpoints or (max_npool is not None and npool > max_npool):
+            break
+
+        num_mpiprocs_per_pool = num_mpiprocs // npool
+        nband = 1
+
+        for divisor in _get_divisors(num_mpiprocs_per_pool):
+            if divisor > num_bands:
+                break
+            nband = divisor
+            if num_mpiprocs_per_pool // divisor <= num_fft_planes:
+                break
+
+        num_mpiprocs_per_group = num_mpiprocs_per_pool // nband
+        cost = (
+            math.ceil(num_kpoints / npool) * math.ceil(num_bands / nband) / num_mpiprocs_per_group *
+            (1 + _PLANE_WAVE_OVERHEAD * math.log2(num_mpiprocs_per_group)) *
+            (1 + _BAND_GROUP_OVERHEAD * math.log2(nband))
+        )
+
+        if num_mpiprocs_per_machine % num_mpiprocs_per_pool and num_mpiprocs_per_pool % num_mpiprocs_per_machine:
+            cost *= 1 + _INTER_MACHINE_OVERHEAD
+
+        candidates.append((cost, -npool, nband))
+
+    cost, npool, nband = min(candidates)
+    npool = -npool
+
+    num_rows = min(math.isqrt(num_mpiprocs // npool // nband), max(num_bands // _MIN_BANDS_PER_DIAGONALIZATION_ROW, 1))
+
+    return {'npool': npool, 'nband': nband, 'ndiag': num_rows**2}
+
+
+def get_ram_in_megabytes(value, units):
+    """Return the RAM estimate of the output parameters of a ``pw.x`` calculation in MB.
+
+    :param value: the value of the estimate, e.g. the ``estimated_ram_per_process`` output parameter.
+    :param units: the units of the estimate, e.g. the ``estimated_ram_per_process_units`` output parameter.
+    """
+    factors = {'mb': 1, 'gb': 1024}
+
+    try:
+        return value * factors[units.lower()]
+    except KeyError as exception:
+        raise ValueError(f'unknown units `{units}` of the RAM estimate.') from exception
+
+
+def get_memory_aware_resources(
+    ram_per_pool,
+    max_memory_per_machine,
+    num_mpiprocs_per_machine,
+    num_machines=1,
+    max_num_machines=None,
+    max_npool=None,
+):
+    """Return the number of machines and pools with which the memory of each machine stays within the given budget.
+
+    The data of ``pw.x`` is distributed over the processes of each pool, but is replicated over the pools, so the memory
+    of each machine is the memory of a single pool times the number of pools, divided by the number of machines. The
+    smallest number of machines for which the memory fits is returned, with the largest number of pools that fits on
+    them.
+
+    :param ram_per_pool: the memory of a single pool in MB, e.g. the ``estimated_ram_per_process`` of an initialization
+        calculation times the number of processes of each of its pools.
+    :param max_memory_per_machine: the memory that can be used on each machine in MB.
+    :param num_mpiprocs_per_machine: the number of MPI processes on each machine.
+    :param num_machines: the minimum number of machines.
+    :param max_num_machines: the maximum number of machines, by default equal to ``num_machines``.
+    :param max_npool: optional maximum number of pools, e.g. the ``npool`` of the explicit ``parallelization``.
+    :return: tuple of the number of machines and the number of pools.
+    :raises ValueError: if the memory does not fit within the budget, even with a single pool on the maximum number of
+        machines.
+    """
+    max_num_machines = max(max_num_machines or num_machines, num_machines)
+
+    for machines in range(num_machines, max_num_machines + 1):
+        for npool in reversed(_get_divisors(machines * num_mpiprocs_per_machine)):
+            if max_npool is not None and npool > max_npool:
+                continue
+            if npool * ram_per_pool <= machines * max_memory_per_machine:
+                return machines, npool
+
+    raise ValueError(
+        f'a single pool requires {ram_per_pool / max_num_machines:.1f} MB per machine on {max_num_machines} machines, '
+        f'which exceeds the budget of {max_memory_per_machine:.1f} MB per machine.'
+    )
@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""Utilities to reduce the size of the trajectories that are stored by the parsers."""
+import pathlib
+
+import numpy
+
+TRAJECTORY_DTYPES = ('float32', 'float64')
+
+
+def get_trajectory_sampling(parser_options):
+    """Return the frames and the precision of the trajectory arrays that are requested through the parser options.
+
+    The following parser options are supported:
+
+        * ``trajectory_stride``: only keep every n-th frame of the trajectory, default is 1.
+        * ``trajectory_window``: only keep the first n frames if positive, or the last n frames if negative.
+        * ``trajectory_dtype``: the precision of the floating point arrays, either ``float32`` or ``float64`` (default).
+
+    The window is applied before the stride, e.g. a window of -1000 with a stride of 10 keeps every tenth frame of the
+    last 1000 frames.
+
+    :param parser_options: dictionary with the parser options.
+    :return: tuple of the ``slice`` that selects the frames and the ``numpy.dtype`` of the floating point arrays.
+    :raises ValueError: if any of the options is invalid.
+    """
+    stride = parser_options.get('trajectory_stride', 1)
+    window = parser_options.get('trajectory_window', None)
+    dtype = parser_options.get('trajectory_dtype', 'float64')
+
+    if isinstance(stride, bool) or not isinstance(stride, int) or stride < 1:
+        raise ValueError(f'`trajectory_stride` should be a positive integer, got: {stride}')
+
+    if window is not None and (isinstance(window, bool) or not isinstance(window, int) or window == 0):
+        raise ValueError(f'`trajectory_window` should be a non-zero integer, got: {window}')
+
+    if dtype not in TRAJECTORY_DTYPES:
+        raise ValueError(f'`trajectory_dtype` should be one of {TRAJECTORY_DTYPES}, got: {dtype}')
+
+    if window is None:
+        frames = slice(None, None, stride)
+    elif window > 0:
+        frames = slice(None, window, stride)
+    else:
+        frames = slice(window, None, stride)
+
+    return frames, numpy.dtype(dtype)
+
+
+def get_trajectory_chunk_size(parser_options):
+    """Return the number of frames per chunk with which the trajectory is written to disk while it is being parsed.
+
+    The ``trajectory_chunk_size`` parser option enables the out-of-core construction of the trajectory arrays: the
+    frames are written to temporary files in chunks of this number of frames as soon as they are parsed, through a
+    ``TrajectoryArrayWriter``. By default, the trajectory arrays are built in memory.
+
+    :param parser_options: dictionary with the parser options.
+    :return: the number of frames per chunk, or None if the trajectory should be built in memory.
+    :raises ValueError: if the option is invalid.
+    """
+    chunk_size = parser_options.get('trajectory_chunk_size', None)
+
+    if chunk_size is not None and (isinstance(chunk_size, bool) or not isinstance(chunk_size, int) or chunk_size < 1):
+        raise ValueError(f'`trajectory_chunk_size` should be a positive integer, got: {chunk_size}')
+
+    return chunk_size
+
+
+def sample_trajectory_array(array, frames=slice(None), dtype=None):
+    """Return the selected frames of a trajectory array, with floating point values converted to the given precision.
+
+    :param array: array with the frames along the first axis.
+    :param frames: ``slice`` that selects the frames to keep.
+    :param dtype: precision of the returned array if it contains floating point values, the original one if None.
+    :return: the sub-sampled array.
+    """
+    array = numpy.asanyarray(array)[frames]
+
+    if dtype is not None and numpy.issubdtype(array.dtype, numpy.floating) and array.dtype != dtype:
+        array = convert_trajectory_array(array, dtype)
+
+    return array
+
+
+def set_trajectory(trajectory, dtype=None, **kwargs):
+    """Set the trajectory arrays of a ``TrajectoryData``, storing the floating point arrays with the given precision.
+
+    The ``TrajectoryData.set_trajectory`` method only accepts double precision arrays, so these are validated first and
+    then replaced by their counterpart with the requested precision.
+
+    :param trajectory: the ``TrajectoryData``.
+    :param dtype: precision of the floating point arrays, the original one if None.
+    :param kwargs: the keyword arguments of ``TrajectoryData.set_trajectory``.
+    """
+    trajectory.set_trajectory(**kwargs)
+
+    if dtype is None or dtype == numpy.float64:
+        return
+
+    for name in ['positions', 'cells', 'times', 'velocities']:
+        if kwargs.get(name, None) is not None:
+            trajectory.set_array(name, convert_trajectory_array(kwargs[name], dtype))
+
+
+def convert_trajectory_array(array, dtype):
+    """Return the array converted to the given precision.
+
+    Arrays that are memory mapped to a file by a ``TrajectoryArrayWriter`` are converted chunk by chunk to a new file
+    in the same directory, such that the array is never fully loaded to memory.
+
+    :param array: the array to convert.
+    :param dtype: the precision of the returned array.
+    :return: the converted array.
+    """
+    if not isinstance(array, numpy.memmap) or array.filename is None:
+        return numpy.asarray(array).astype(dtype)
+
+    filepath = pathlib.Path(array.filename)
+    filepath = filepath.with_name(f'{filepath.name}.{numpy.dtype(dtype).name}')
+
+    with TrajectoryArrayWriter(filepath, array.shape[1:], dtype) as writer:
+        for start in range(0, len(array), writer.chunk_size):
+            writer.extend(array[start:start + writer.chunk_size])
+
+    return writer.finalize()
+
+
+def transform_trajectory_array(array, transform, chunk_size=1000):
+    """Return the array transformed by a function that is applied to one chunk of frames at a time.
+
+    Arrays that are memory mapped to a file by a ``TrajectoryArrayWriter`` are transformed chunk by chunk to a new file
+    in the same directory, such that the array is never fully loaded to memory.
+
+    :param array: array with the frames along the first axis.
+    :param transform: function that is called with a chunk of frames and the ``slice`` of the chunk in the full array,
+        and that should return the transformed chunk with the same shape.
+    :param chunk_size: the number of frames that are transformed at a time if the array is memory mapped.
+    :return: the transformed array.
+    """
+    if not isinstance(array, numpy.memmap) or array.filename is None:
+        return transform(numpy.asarray(array), slice(None))
+
+    filepath = pathlib.Path(array.filename)
+    filepath = filepath.with_name(f'{filepath.name}.transformed')
+
+    with TrajectoryArrayWriter(filepath, array.shape[1:], array.dtype, chunk_size) as writer:
+        for start in range(0, len(array), chunk_size):
+            chunk_slice = slice(start, start + chunk_size)
+            writer.extend(transform(array[chunk_slice], chunk_slice))
+
+    return writer.finalize()
+
+
+class TrajectoryFrames:
+    """Container of the frames of a trajectory array that writes them to a file in chunks as they are appended.
+
+    This is used in place of a list by parsers that parse a trajectory one frame at a time, such as the parser of the
+    stdout of ``pw.x``, such that only one chunk of frames is held in memory at any time. The shape of the frames is
+    defined by the first frame. Once all frames are appended, ``finalize`` returns them as an array that is memory
+    mapped to the file.
+    """
+
+    def __init__(self, filepath, chunk_size):
+        """Construct a new instance.
+
+        :param filepath: the path of the file to write the frames to, which is only created once a frame is appended.
+        :param chunk_size: the number of frames that are buffered in memory before they are written to the file.
+        """
+        self.filepath = pathlib.Path(filepath)
+        self.chunk_size = chunk_size
+        self._writer = None
+
+    def __len__(self):
+        """Return the number of frames that were appended."""
+        return 0 if self._writer is None else len(self._writer)
+
+    def append(self, frame):
+        """Append a single frame.
+
+        :param frame: array-like with the shape of the first frame.
+        :raises ValueError: if the frame does not have the shape of the first frame.
+        """
+        frame = numpy.asarray(frame, dtype=numpy.float64)
+
+        if self._writer is None:
+            self._writer = TrajectoryArrayWriter(self.filepath, frame.shape, chunk_size=self.chunk_size)
+        elif frame.shape != self._writer.frame_shape:
+            raise ValueError(f'expected a frame with shape {self._writer.frame_shape}, got: {frame.shape}')
+
+        self._writer.append(frame)
+
+    def finalize(self):
+        """Close the file and return the array of all frames as a read-only memory map.
+
+        :return: the array with the frames along the first axis.
+        """
+        if self._writer is None:
+            return numpy.empty((0,), dtype=numpy.float64)
+
+        return self._writer.finalize()
+
+
+class TrajectoryArrayWriter:
+    """Write the frames of a trajectory array to a file on disk in chunks with a fixed number of frames.
+
+    The frames are collected in a buffer of ``chunk_size`` frames, which is appended to a raw binary file every time it
+    is full. The complete array is returned by ``finalize`` as a read-only memory map of the file, which can be passed
+    directly to ``ArrayData.set_array`` without ever holding the full array in memory::
+
+        with TrajectoryArrayWriter(filepath, frame_shape=(num_atoms, 3)) as writer:
+            for frames in chunks:
+                writer.extend(frames)
+
+        trajectory.set_array('forces', writer.finalize())
+    """
+
+    def __init__(self, filepath, frame_shape, dtype=numpy.float64, chunk_size=1000):
+        """Construct a new instance and open the file for writing.
+
+        :param filepath: the path of the file to write the frames to, which is overwritten if it exists.
+        :param frame_shape: the shape of a single frame.
+        :param dtype: the type of the array.
+        :param chunk_size: the number of frames that are buffered in memory before they are written to the file.
+        """
+        self.filepath = pathlib.Path(filepath)
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = numpy.dtype(dtype)
+        self.num_frames = 0
+        self._buffer = numpy.empty((chunk_size, *self.frame_shape), dtype=self.dtype)
+        self._num_buffered = 0
+        self._handle = open(self.filepath, 'wb')  # pylint: disable=consider-using-with
+
+    def __enter__(self):
+        """Return the writer itself, such that it is closed when the context is exited."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Write the buffered frames to the file and close it."""
+        self.close()
+
+    def __len__(self):
+        """Return the number of frames that were appended, including those that are still buffered."""
+        return self.num_frames + self._num_buffered
+
+    @property
+    def chunk_size(self):
+        """Return the number of frames that are buffered in memory before they are written to the file."""
+        return len(self._buffer)
+
+    def append(self, frame):
+        """Append a single frame to the array.
+
+        :param frame: array-like with the shape of a frame.
+        """
+        self._buffer[self._num_buffered] = frame
+        self._num_buffered += 1
+
+        if self._num_buffered == self.chunk_size:
+            self.flush()
+
+    def extend(self, frames):
+        """Append multiple frames to the array.
+
+        :param frames: array-like with the frames along the first axis.
+        """
+        frames = numpy.asarray(frames, dtype=self.dtype)
+
+        if frames.shape[1:] != self.frame_shape:
+            raise ValueError(f'expected frames with shape {self.frame_shape}, got: {frames.shape[1:]}')
+
+        start = 0
+
+        while start < len(frames):
+            chunk = frames[start:start + self.chunk_size - self._num_buffered]
+            self._buffer[self._num_buffered:self._num_buffered + len(chunk)] = chunk
+            self._num_buffered += len(chunk)
+            start += len(chunk)
+
+            if self._num_buffered == self.chunk_size:
+                self.flush()
+
+    def flush(self):
+        """Write the buffered frames to the file."""
+        if self._handle.closed:
+            raise ValueError('the writer is already closed.')
+
+        self._buffer[:self._num_buffered].tofile(self._handle)
+        self.num_frames += self._num_buffered
+        self._num_buffered = 0
+
+    def close(self):
+        """Write the buffered frames to the file and close it."""
+        if not self._handle.closed:
+            self.flush()
+            self._handle.close()
+
+    def finalize(self):
+        """Close the file and return the array of all frames as a read-only memory map.
+
+        :return: the array with shape ``(num_frames, *frame_shape)``.
+        """
+        self.close()
+
+        if self.num_frames == 0:
+            return numpy.empty((0, *self.frame_shape), dtype=self.dtype)
+
+        return numpy.memmap(self.filepath, dtype=self.dtype, mode='r', shape=(self.num_frames, *self.frame_shape))
@@ -3,7 +3,7 @@
 from aiida import orm
 from aiida.common import AttributeDict, exceptions
 from aiida.common.lang import type_check
-from aiida.engine import BaseRestartWorkChain, ExitCode, ProcessHandlerReport, process_handler, while_
+from aiida.engine import BaseRestartWorkChain, ExitCode, ProcessHandlerReport, ToContext, if_, process_handler, while_
 from aiida.plugins import CalculationFactory, GroupFactory
 
 from aiida_quantumespresso.calculations.functions.create_kpoints_from_distance import create_kpoints_from_distance
@@ -34,6 +34,7 @@ class PwBaseWorkChain(ProtocolMixin, BaseRestartWorkChain):
         'delta_factor_nbnd': 0.05,
         'delta_minimum_nbnd': 4,
         'delta_factor_trust_radius_min': 0.1,
+        'factor_estimated_ram': 1.25,
     })
 
     @classmethod
@@ -51,10 +52,26 @@ class PwBaseWorkChain(ProtocolMixin, BaseRestartWorkChain):
             help='Optional input when constructing the k-points based on a desired `kpoints_distance`. Setting this to '
                  '`True` will force the k-point mesh to have an even number of points along each lattice vector except '
                  'for any non-periodic directions.')
+        spec.input('automatic_parallelization', valid_type=orm.Bool, required=False,
+            help='Optional input to let the work chain choose the `npool`, `nband` and `ndiag` parallelization flags '
+                 'of each calculation, based on the number of irreducible k-points, the number of bands and the '
+                 'resources in the `metadata.options`. Cannot be used together with the `pw.parallelization` input.')
+        spec.input('max_memory_per_machine', valid_type=orm.Float, required=False,
+            help='Optional memory budget in GB of each machine. If specified, an initialization calculation is run '
+                 'first to estimate the memory of the calculation, after which the number of machines and pools are '
+                 'chosen such that the memory of each machine stays within the budget.')
+        spec.input('max_num_machines', valid_type=orm.Int, required=False,
+            help='The maximum number of machines that can be used to stay within the `max_memory_per_machine` budget. '
+                 'By default, the number of machines of the `metadata.options` is not increased.')
+        spec.inputs.validator = cls.validate_inputs
 
         spec.outline(
             cls.setup,
             cls.validate_kpoints,
+            if_(cls.should_run_init)(
+                cls.run_init,
+                cls.inspect_init,
+            ),
             while_(cls.should_run_process)(
                 cls.prepare_process,
                 cls.run_process,
@@ -64,6 +81,8 @@ class PwBaseWorkChain(ProtocolMixin, BaseRestartWorkChain):
         )
 
         spec.expose_outputs(PwCalculation)
+        spec.output('automatic_parallelization', valid_type=orm.Dict, required=False,
+            help='The parallelization flags of the last calculation if `automatic_parallelization` was enabled.')
 
         spec.exit_code(201, 'ERROR_INVALID_INPUT_PSEUDO_POTENTIALS',
             message='The explicit `pseudos` or `pseudo_family` could not be used to get the necessary pseudos.')
@@ -87,6 +106,9 @@ class PwBaseWorkChain(ProtocolMixin, BaseRestartWorkChain):
             message='The calculation failed with a known unrecoverable error.')
         spec.exit_code(320, 'ERROR_INITIALIZATION_CALCULATION_FAILED',
             message='The initialization calculation failed.')
+        spec.exit_code(321, 'ERROR_INSUFFICIENT_MEMORY',
+            message='The estimated memory of the calculation exceeds the `max_memory_per_machine` budget, even with a '
+                    'single pool on the maximum number of machines.')
         spec.exit_code(501, 'ERROR_IONIC_CONVERGENCE_REACHED_EXCEPT_IN_FINAL_SCF',
             message='Then ionic minimization cycle converged but the thresholds are exceeded in the final SCF.')
         spec.exit_code(710, 'WARNING_ELECTRONIC_CONVERGENCE_NOT_REACHED',
@@ -94,6 +116,18 @@ class PwBaseWorkChain(ProtocolMixin, BaseRestartWorkChain):
                     'is `False` and/or `electron_maxstep` is 0.')
         # yapf: enable
 
+    @classmethod
+    def validate_inputs(cls, value, port_namespace):  # pylint: disable=unused-argument
+        """Validate the top level namespace."""
+
+        if 'automatic_parallelization' in port_namespace and value.get('automatic_parallelization', False):
+            if 'parallelization' in value.get('pw', {}):
+                return 'The `automatic_parallelization` and `pw.parallelization` inputs cannot be specified together.'
+
+        if 'max_num_machines' in port_namespace and 'max_num_machines' in value:
+            if 'max_memory_per_machine' not in value:
+                return 'The `max_num_machines` input can only be specified together with `max_memory_per_machine`.'
+
     @classmethod
     def get_protocol_filepath(cls):
         """Return ``pathlib.Path`` to the ``.yaml`` file that defines the protocols."""
@@ -258,6 +292,7 @@ class PwBaseWorkChain(ProtocolMixin, BaseRestartWorkChain):
             self.ctx.inputs.parameters.setdefault('CELL', {})
 
         self.ctx.inputs.settings = self.ctx.inputs.settings.get_dict() if 'settings' in self.ctx.inputs else {}
+        self.ctx.max_npool = None
 
     def validate_kpoints(self):
         """Validate the inputs related to k-points.
@@ -284,6 +319,95 @@ class PwBaseWorkChain(ProtocolMixin, BaseRestartWorkChain):
 
         self.ctx.inputs.kpoints = kpoints
 
+    def should_run_init(self):
+        """Return whether an initialization calculation should be run to estimate the memory of the calculation."""
+        return 'max_memory_per_machine' in self.inputs
+
+    def run_init(self):
+        """Run an initialization ``PwCalculation`` that only runs the preamble, to estimate the memory it requires.
+
+        The calculation has the same inputs and resources as the first calculation, but only runs until the ``pw.x``
+        preamble is written, which includes the estimated RAM per process.
+        """
+        self.prepare_process()
+
+        inputs = AttributeDict(self.ctx.inputs)
+        inputs.settings = {**inputs.settings, 'ONLY_INITIALIZATION': True}
+        inputs.metadata = {**inputs.metadata, 'call_link_label': 'initialization'}
+        inputs = self._wrap_bare_dict_inputs(PwCalculation.spec().inputs, inputs)
+
+        node = self.submit(PwCalculation, **inputs)
+        self.report(f'launching initialization {node.process_label}<{node.pk}>')
+
+        return ToContext(calculation_init=node)
+
+    def inspect_init(self):
+        """Choose the number of machines and pools from the memory estimate of the initialization calculation.
+
+        The memory of a single pool is the ``estimated_ram_per_process`` times the number of processes of each pool,
+        multiplied by the ``factor_estimated_ram`` default since the estimate does not include all memory. The number
+        of machines and pools are then chosen with
+        :func:`~aiida_quantumespresso.utils.resources.get_memory_aware_resources`, where the number of machines is only
+        increased up to ``max_num_machines``. The number of MPI processes per machine is kept, since the distributed
+        memory of each machine does not depend on it.
+        """
+        from aiida_quantumespresso.utils import resources
+
+        calculation = self.ctx.calculation_init
+
+        if not calculation.is_finished_ok:
+            self.report(f'initialization {calculation.process_label}<{calculation.pk}> failed')
+            return self.exit_codes.ERROR_INITIALIZATION_CALCULATION_FAILED
+
+        output_parameters = calculation.outputs.output_parameters.get_dict()
+        num_mpiprocs, num_mpiprocs_per_machine = self.get_num_mpiprocs()
+
+        if 'estimated_ram_per_process' not in output_parameters or num_mpiprocs_per_machine is None:
+            self.report('could not estimate the memory of the calculation, keeping the resources.')
+            return
+
+        ram_per_process = resources.get_ram_in_megabytes(
+            output_parameters['estimated_ram_per_process'], output_parameters['estimated_ram_per_process_units']
+        )
+        try:
+            parallelization = calculation.inputs.parallelization.get_dict()
+        except AttributeError:
+            parallelization = {}
+        ram_per_pool = ram_per_process * num_mpiprocs / parallelization.get('npool', 1)
+
+        options = self.ctx.inputs.metadata.options
+        num_machines = options.get('resources', {}).get('num_machines', 1)
+        max_npool = None if self.inputs.get('automatic_parallelization', False) else parallelization.get('npool', 1)
+
+        try:
+            num_machines, npool = resources.get_memory_aware_resources(
+                ram_per_pool * self.defaults.factor_estimated_ram,
+                self.inputs.max_memory_per_machine.value * 1024,
+                num_mpiprocs_per_machine,
+                num_machines=num_machines,
+                max_num_machines=self.inputs.get('max_num_machines', orm.Int(num_machines)).value,
+                max_npool=max_npool,
+            )
+        except ValueError as exception:
+            self.report(f'estimated memory of {ram_per_pool:.1f} MB per pool: {exception}')
+            return self.exit_codes.ERROR_INSUFFICIENT_MEMORY
+
+        options['resources'] = {
+            **options.get('resources', {}),
+            'num_machines': num_machines,
+            'num_mpiprocs_per_machine': num_mpiprocs_per_machine,
+        }
+        options['resources'].pop('tot_num_mpiprocs', None)
+        self.ctx.max_npool = npool
+
+        if parallelization.get('npool', 1) > npool and not self.inputs.get('automatic_parallelization', False):
+            self.ctx.inputs.parallelization = orm.Dict({**parallelization, 'npool': npool})
+
+        self.report(
+            f'estimated memory of {ram_per_pool:.1f} MB per pool: using {num_machines} machines with at most {npool} '
+            'pools'
+        )
+
     def set_restart_type(self, restart_type, parent_folder=None):
         """Set the restart type for the next iteration."""
 
@@ -322,6 +446,92 @@ class PwBaseWorkChain(ProtocolMixin, BaseRestartWorkChain):
             max_seconds = max_wallclock_seconds * self.defaults.delta_factor_max_seconds
             self.ctx.inputs.parameters['CONTROL']['max_seconds'] = max_seconds
 
+        if self.inputs.get('automatic_parallelization', False):
+            self.set_automatic_parallelization()
+
+    def get_num_mpiprocs(self):
+        """Return the total number of MPI processes and the number of MPI processes per machine of the next calculation.
+
+        The numbers are taken from the resources in the ``metadata.options``, where the number of MPI processes per
+        machine defaults to that of the computer. Either number is ``None`` if it cannot be determined.
+        """
+        inputs = self.ctx.inputs
+        resources_options = inputs.metadata.options.get('resources', {})
+        num_mpiprocs_per_machine = resources_options.get('num_mpiprocs_per_machine', None)
+
+        if num_mpiprocs_per_machine is None:
+            num_mpiprocs_per_machine = inputs.code.computer.get_default_mpiprocs_per_machine()
+
+        if not inputs.metadata.options.get('withmpi', True):
+            num_mpiprocs = 1
+        elif 'tot_num_mpiprocs' in resources_options:
+            num_mpiprocs = resources_options['tot_num_mpiprocs']
+        elif num_mpiprocs_per_machine is not None:
+            num_mpiprocs = resources_options.get('num_machines', 1) * num_mpiprocs_per_machine
+        else:
+            num_mpiprocs = None
+
+        return num_mpiprocs, num_mpiprocs_per_machine
+
+    def set_automatic_parallelization(self):
+        """Set the ``parallelization`` input of the next calculation that maximizes its throughput.
+
+        The flags are chosen by :func:`~aiida_quantumespresso.utils.resources.get_automatic_parallelization`, based on
+        the number of irreducible k-points, the number of bands and the total number of MPI processes of the resources
+        in the ``metadata.options``. The number of pools is limited by the memory budget if ``max_memory_per_machine``
+        was specified. If the total number of MPI processes cannot be determined, the ``parallelization`` input is not
+        set.
+        """
+        from aiida_quantumespresso.utils import resources
+
+        inputs = self.ctx.inputs
+        num_mpiprocs, num_mpiprocs_per_machine = self.get_num_mpiprocs()
+
+        if num_mpiprocs is None:
+            self.report('could not determine the number of MPI processes, skipping the automatic parallelization.')
+            inputs.pop('parallelization', None)
+            return
+
+        system = inputs.parameters['SYSTEM']
+        num_kpoints = resources.get_irreducible_kpoints_count(
+            inputs.structure,
+            inputs.kpoints,
+            use_symmetry=not system.get('nosym', False),
+            use_time_reversal=not system.get('noinv', False),
+        )
+
+        num_bands = system.get('nbnd', None)
+        if num_bands is None:
+            num_electrons = sum(inputs.pseudos[site.kind_name].z_valence for site in inputs.structure.sites)
+            num_bands = resources.get_number_of_bands_estimate(
+                num_electrons - system.get('tot_charge', 0),
+                occupations=system.get('occupations', None),
+                noncolin=system.get('noncolin', False),
+            )
+
+        ecutrho = system.get('ecutrho', 4 * system.get('ecutwfc', 0))
+        num_fft_planes = resources.get_fft_planes_estimate(inputs.structure, ecutrho)
+
+        parallelization = resources.get_automatic_parallelization(
+            num_mpiprocs, num_kpoints, num_bands, num_fft_planes, num_mpiprocs_per_machine, self.ctx.max_npool
+        )
+        inputs.parallelization = orm.Dict(parallelization)
+
+        flags = ', '.join(f'{key}={value}' for key, value in parallelization.items())
+        self.report(
+            f'automatic parallelization for {num_mpiprocs} MPI processes, {num_kpoints} irreducible k-points and '
+            f'{num_bands} bands: {flags}'
+        )
+
+    def get_outputs(self, node):
+        """Return the outputs of the calculation and its parallelization flags if these were chosen automatically."""
+        outputs = super().get_outputs(node)
+
+        if self.inputs.get('automatic_parallelization', False) and 'parallelization' in node.inputs:
+            outputs['automatic_parallelization'] = node.inputs.parallelization
+
+        return outputs
+
     def report_error_handled(self, calculation, action):
         """Report an action taken for a calculation that has failed.
 
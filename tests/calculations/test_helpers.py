@@ -1,8 +1,15 @@
 # -*- coding: utf-8 -*-
 """Tests for the calculation input helper utilities."""
+import os
+
 import pytest
 
-from aiida_quantumespresso.calculations.helpers import QEInputValidationError, pw_input_helper
+from aiida_quantumespresso.calculations.helpers import (
+    DIRPATH_DEFINITIONS,
+    QEInputValidationError,
+    get_keyword_index,
+    pw_input_helper,
+)
 
 
 def test_pw_helper_multidimensional(generate_structure):
@@ -31,3 +38,33 @@ def test_pw_helper_multidimensional(generate_structure):
     with pytest.raises(QEInputValidationError):
         parameters['SYSTEM']['hubbard_j'] = [[1, 'Ge', 15.7]]  # Second element is a non-existing structure kind name
         pw_input_helper(parameters, structure, version='6.4')
+
+
+def test_get_keyword_index(tmp_path):
+    """Test the keyword index compiled from the ``INPUT_PW`` definitions."""
+    index = get_keyword_index('6.4')
+
+    assert get_keyword_index('6.4') is index
+    assert index.variables['ecutwfc'] == {'namelist': 'SYSTEM', 'expected_type': 'REAL'}
+    assert index.variables['calculation']['allowed_values'] == [
+        'scf', 'nscf', 'bands', 'relax', 'md', 'vc-relax', 'vc-md'
+    ]
+    assert index.dimensions['hubbard_u'] == {'namelist': 'SYSTEM', 'expected_type': 'REAL', 'end_val': 'ntyp'}
+    assert index.multidimensions['hubbard_j']['indexes'] == ['i', 'ityp']
+    assert set(index.names) == set(index.variables) | set(index.dimensions) | set(index.multidimensions)
+
+    with pytest.raises(TypeError):
+        index.variables['ecutwfc'] = {}
+
+    # The index that is cached on disk is identical to the compiled one
+    filepath = os.path.join(DIRPATH_DEFINITIONS, 'INPUT_PW-6.4.xml')
+    assert get_keyword_index(filepath=filepath, dirpath_cache=tmp_path) == index
+    assert len(list(tmp_path.glob('INPUT_PW-*.json'))) == 1
+    get_keyword_index.cache_clear()
+    assert get_keyword_index(filepath=filepath, dirpath_cache=tmp_path) == index
+
+
+def test_get_keyword_index_unknown_version():
+    """Test that :func:`get_keyword_index` suggests the closest older version for an unknown version."""
+    with pytest.raises(QEInputValidationError, match='the older, closest version you can use is 6.4'):
+        get_keyword_index('6.5')
@@ -72,3 +72,14 @@ def test_serialize_builder(fixture_code, generate_inputs_ph, data_regression, se
     builder = code.get_builder()
     builder._update(**generate_inputs_ph())  # pylint: disable=protected-access
     data_regression.check(serialize_builder(builder))
+
+
+def test_ph_parser_options(fixture_sandbox, generate_inputs_ph, generate_calc_job):
+    """Test that the ``parser_options`` in the ``settings`` are accepted and not written to the input file."""
+    entry_point_name = 'quantumespresso.ph'
+    inputs = generate_inputs_ph()
+    inputs['settings'] = orm.Dict({'parser_options': {'dynmat_workers': 2}})
+    generate_calc_job(fixture_sandbox, entry_point_name, inputs)
+
+    with fixture_sandbox.open('aiida.in') as handle:
+        assert 'dynmat_workers' not in handle.read()
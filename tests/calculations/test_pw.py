@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 """Tests for the `PwCalculation` class."""
+import io
 
 from aiida import orm
 from aiida.common import datastructures
@@ -336,6 +337,40 @@ def test_pw_validate_inputs_restart_nscf(
     generate_calc_job(fixture_sandbox, entry_point_name, inputs)
 
 
+def test_pw_remote_file_cache(fixture_sandbox, generate_calc_job, generate_inputs_pw, tmp_path):
+    """Test that the ``REMOTE_FILE_CACHE`` setting symlinks the files that are staged in the remote cache."""
+    from aiida_quantumespresso.utils.remote_cache import get_remote_cache_filename, stage_remote_cache
+
+    entry_point_name = 'quantumespresso.pw'
+
+    inputs = generate_inputs_pw()
+    inputs['settings'] = orm.Dict({'REMOTE_FILE_CACHE': str(tmp_path)})
+    inputs['vdw_table'] = orm.SinglefileData(io.BytesIO(b'vdW kernel table'), filename='vdW_kernel_table').store()
+    upf = inputs['pseudos']['Si'].store()
+    computer = inputs['code'].computer
+
+    # Nothing is staged yet, so all files are copied
+    calc_info = generate_calc_job(fixture_sandbox, entry_point_name, inputs)
+    assert len(calc_info.local_copy_list) == 2
+    assert calc_info.remote_symlink_list == []
+
+    stage_remote_cache(computer, [upf], tmp_path)
+    calc_info = generate_calc_job(fixture_sandbox, entry_point_name, inputs)
+    filepath = str(tmp_path / get_remote_cache_filename(upf))
+
+    assert calc_info.local_copy_list == [(inputs['vdw_table'].uuid, 'vdW_kernel_table', './pseudo/vdW_kernel_table')]
+    assert calc_info.remote_symlink_list == [(computer.uuid, filepath, './pseudo/Si.upf')]
+
+
+def test_pw_remote_file_cache_relative(fixture_sandbox, generate_calc_job, generate_inputs_pw):
+    """Test that the ``REMOTE_FILE_CACHE`` setting should be an absolute path."""
+    inputs = generate_inputs_pw()
+    inputs['settings'] = orm.Dict({'REMOTE_FILE_CACHE': 'cache'})
+
+    with pytest.raises(InputValidationError, match='should be an absolute path'):
+        generate_calc_job(fixture_sandbox, 'quantumespresso.pw', inputs)
+
+
 def test_fixed_coords(fixture_sandbox, generate_calc_job, generate_inputs_pw, file_regression):
     """Test a ``PwCalculation`` where the ``fixed_coords`` setting was provided."""
     entry_point_name = 'quantumespresso.pw'
@@ -350,6 +385,28 @@ def test_fixed_coords(fixture_sandbox, generate_calc_job, generate_inputs_pw, fi
     file_regression.check(input_written, encoding='utf-8', extension='.in')
 
 
+def test_atomic_cards(fixture_sandbox, generate_calc_job, generate_inputs_pw, file_regression):
+    """Test the site cards and the explicit ``K_POINTS`` card of the input file of a ``PwCalculation``."""
+    entry_point_name = 'quantumespresso.pw'
+
+    inputs = generate_inputs_pw()
+    inputs['settings'] = orm.Dict({
+        'FIXED_COORDS': [[True, False, False], [False, True, True]],
+        'ATOMIC_FORCES': [[0, 1, -2], [0.123456789012, -1e-12, 1234.5]],
+        'ATOMIC_VELOCITIES': [[-0.0, 0.5, 1e-5], [3.25, -7.125, 0.1]],
+    })
+    kpoints = orm.KpointsData()
+    kpoints.set_cell_from_structure(inputs['structure'])
+    kpoints.set_kpoints([[0., 0., 0.], [0.5, -0.25, 0.125], [1 / 3, 2 / 3, 0.]], weights=[0.25, 0.5, 0.25])
+    inputs['kpoints'] = kpoints
+    generate_calc_job(fixture_sandbox, entry_point_name, inputs)
+
+    with fixture_sandbox.open('aiida.in') as handle:
+        input_written = handle.read()
+
+    file_regression.check(input_written, encoding='utf-8', extension='.in')
+
+
 @pytest.mark.parametrize(['fixed_coords', 'error_message'], [
     ([[True, True], [False, True]], 'The `fixed_coords` setting must be a list of lists with length 3.'),
     ([[True, True, 1], [False, True, False]
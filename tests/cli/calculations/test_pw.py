@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 """Tests for the ``calculation launch pw`` command."""
+import os
 import re
 
 import pytest
@@ -53,3 +54,34 @@ def test_valid_hubbard_parameters(run_cli_process_launch_command, fixture_code,
 
     options = ['-X', code.full_label, '-F', sssp.label, '--hubbard-file', filepk]
     run_cli_process_launch_command(launch_calculation, options=options)
+
+
+def test_monitor_calculation(run_cli_command, generate_calc_job_node, fixture_localhost, filepath_tests):
+    """Test the ``calculation monitor pw`` command on the stdout of a finished relaxation."""
+    from aiida import orm
+
+    from aiida_quantumespresso.cli.calculations.pw import monitor_calculation
+
+    inputs = {'parameters': orm.Dict({'CONTROL': {'calculation': 'vc-relax'}})}
+    node = generate_calc_job_node('quantumespresso.pw', fixture_localhost, 'vcrelax_success', inputs)
+    node.set_remote_workdir(os.path.join(filepath_tests, 'parsers', 'fixtures', 'pw', 'vcrelax_success'))
+
+    result = run_cli_command(monitor_calculation, [str(node.pk), '--once'])
+
+    assert len(result.output_lines) == 1 + 5
+    assert result.output_lines[-1].split()[:2] == ['5', '-308.31217395']
+
+
+def test_monitor_calculation_queued(run_cli_command, generate_calc_job_node, fixture_localhost, tmp_path):
+    """Test the ``calculation monitor pw`` command for a calculation whose stdout has not been written yet."""
+    from aiida import orm
+
+    from aiida_quantumespresso.cli.calculations.pw import monitor_calculation
+
+    inputs = {'parameters': orm.Dict({'CONTROL': {'calculation': 'vc-relax'}})}
+    node = generate_calc_job_node('quantumespresso.pw', fixture_localhost, 'vcrelax_success', inputs)
+    node.set_remote_workdir(str(tmp_path))
+
+    result = run_cli_command(monitor_calculation, [str(node.pk), '--once'])
+
+    assert len(result.output_lines) == 1
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""Tests for the :mod:`data.force_constants` module."""
+# pylint: disable=redefined-outer-name
+import os
+
+import numpy
+import pytest
+
+from aiida_quantumespresso.data.force_constants import parse_q2r_force_constants_file
+
+QPOINTS_MESH = (2, 3, 4)
+NAT = 2
+
+
+@pytest.fixture
+def force_constants_lines(filepath_tests):
+    """Return the lines of a force constants file with a 2x3x4 mesh and random force constants, and the latter."""
+    filepath = os.path.join(filepath_tests, 'calculations', 'fixtures', 'matdyn', 'default', 'force_constants.dat')
+
+    with open(filepath, encoding='utf-8') as handle:
+        lines = handle.read().splitlines()
+
+    # Keep the header, up to the line with the q-points mesh, that is replaced
+    header = lines[:lines.index('   2   2   2')]
+    force_constants = numpy.random.default_rng(0).normal(size=QPOINTS_MESH + (3, 3, NAT, NAT))
+    lines = header + [''.join(f'{mesh:4d}' for mesh in QPOINTS_MESH)]
+
+    # The blocks of force constants are written for each pair of directions and atoms, with the first mesh index
+    # running fastest within each block
+    for ji1, ji2, na1, na2 in numpy.ndindex(3, 3, NAT, NAT):
+        lines.append(f'   {ji1 + 1}   {ji2 + 1}   {na1 + 1}   {na2 + 1}')
+        for mi3, mi2, mi1 in numpy.ndindex(QPOINTS_MESH[::-1]):
+            value = force_constants[mi1, mi2, mi3, ji1, ji2, na1, na2]
+            lines.append(f'{mi1 + 1:4d}{mi2 + 1:4d}{mi3 + 1:4d}{value:19.11E}')
+
+    return lines, force_constants
+
+
+def test_parse_q2r_force_constants_file(force_constants_lines):
+    """Test :func:`parse_q2r_force_constants_file` parses the force constants with the correct shape and order."""
+    lines, reference = force_constants_lines
+    parsed_data, force_constants, warnings = parse_q2r_force_constants_file(lines, also_force_constants=True)
+    reference = numpy.vectorize(lambda value: float(f'{value:19.11E}'))(reference)
+
+    assert not warnings
+    assert parsed_data['qpoints_mesh'] == QPOINTS_MESH
+    assert force_constants.shape == QPOINTS_MESH + (3, 3, NAT, NAT)
+    assert numpy.array_equal(force_constants, reference)
+
+
+@pytest.mark.parametrize(('modify', 'message'), (
+    (lambda lines: lines[:-1], 'incomplete'),
+    (lambda lines: [line.replace('   1   1   1   2', '   1   1   2   1') for line in lines], 'Wrong indices'),
+    (lambda lines: lines[:-1] + ['   1   3   4' + lines[-1][12:]], 'Wrong supercell indices'),
+))
+def test_parse_q2r_force_constants_file_invalid(force_constants_lines, modify, message):
+    """Test :func:`parse_q2r_force_constants_file` raises if the force constants block is invalid."""
+    lines, _ = force_constants_lines
+
+    with pytest.raises(ValueError, match=message):
+        parse_q2r_force_constants_file(modify(lines), also_force_constants=True)
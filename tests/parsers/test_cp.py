@@ -48,3 +48,138 @@ def test_cp_default(
         data['trajectory'] = results['output_trajectory'].base.attributes.all
 
     data_regression.check(data)
+
+
+@pytest.mark.parametrize('version', ['default', '6.6_autopilot', '6.6_verlet', '6.6_cgsteps'])
+@pytest.mark.parametrize(('extension', 'num_elements'), [('pos', None), ('vel', None), ('for', None), ('cel', 3)])
+def test_cp_traj_array(filepath_tests, version, extension, num_elements):
+    """Test that `parse_cp_traj_array` gives the same result as the line-by-line `parse_cp_traj_stanzas`."""
+    import os
+
+    import numpy
+
+    from aiida_quantumespresso.parsers.parse_raw.cp import parse_cp_traj_array, parse_cp_traj_stanzas
+
+    filepath = os.path.join(filepath_tests, 'parsers', 'fixtures', 'cp', version, f'aiida.{extension}')
+
+    with open(filepath, encoding='utf-8') as handle:
+        lines = handle.read().splitlines()
+
+    if num_elements is None:
+        short_lines = [index for index, line in enumerate(lines) if len(line.split()) == 2]
+        num_elements = (short_lines[1] if len(short_lines) > 1 else max(len(lines), 2)) - 1
+
+    expected = parse_cp_traj_stanzas(num_elements, [line.split() for line in lines], 'traj', rescale=0.5)
+    result = parse_cp_traj_array(num_elements, lines, 'traj', rescale=0.5)
+
+    if expected['traj_steps']:
+        assert result['traj_data'].shape == (len(expected['traj_steps']), num_elements, 3)
+    else:
+        assert result['traj_data'].shape == (0,)
+    numpy.testing.assert_array_equal(result['traj_steps'], expected['traj_steps'])
+    numpy.testing.assert_array_equal(result['traj_times'], expected['traj_times'])
+    numpy.testing.assert_allclose(result['traj_data'], expected['traj_data'], rtol=1e-15)
+
+
+@pytest.mark.parametrize(('lines', 'message'), (
+    (['1 0.1', '0 0 0', '1 1 1', '0 0 0'], 'Wrong position of long line.'),
+    (['1 0.1', '0 0 0', '2 0.2', '0 0 0', '1 1 1'], 'Wrong position of short line.'),
+    (['1 0.1', '0 0 0', '1 1'], 'Wrong position of short line.'),
+    (['1 0.1', '0 0 0 0', '1 1 1'], r'Wrong line length \(4\)'),
+    (['1 0.1', '0 0 0'], r'Wrong length of last block \(1 lines instead of 0\).'),
+))
+def test_cp_traj_array_malformed(lines, message):
+    """Test that `parse_cp_traj_array` reports the errors of `parse_cp_traj_stanzas` for malformed stanzas."""
+    from aiida_quantumespresso.parsers.parse_raw.cp import parse_cp_traj_array
+
+    with pytest.raises(ValueError, match=message):
+        parse_cp_traj_array(2, lines, 'traj')
+
+
+def test_cp_traj_array_overflow():
+    """Test that a time printed as asterisks is parsed as -1."""
+    from aiida_quantumespresso.parsers.parse_raw.cp import parse_cp_traj_array
+
+    result = parse_cp_traj_array(1, ['1 ******', '1 2 3', '2 0.2', '4 5 6'], 'traj', rescale=2.)
+    assert result['traj_times'].tolist() == [-1.0, 0.2]
+    assert result['traj_data'].tolist() == [[[2., 4., 6.]], [[8., 10., 12.]]]
+
+
+def test_cp_trajectory_sampling(fixture_localhost, generate_calc_job_node, generate_parser, generate_structure):
+    """Test the `trajectory_stride`, `trajectory_window` and `trajectory_dtype` parser options."""
+    import numpy
+
+    def parse(settings=None):
+        inputs = AttributeDict({'structure': generate_structure(structure_id='water'), 'parameters': orm.Dict({})})
+        if settings is not None:
+            inputs['settings'] = orm.Dict(settings)
+        node = generate_calc_job_node('quantumespresso.cp', fixture_localhost, '6.6_autopilot', inputs)
+        results, calcfunction = generate_parser('quantumespresso.cp').parse_from_node(node, store_provenance=False)
+        assert calcfunction.is_finished_ok, calcfunction.exit_message
+        return results['output_trajectory']
+
+    parser_options = {'trajectory_window': -5, 'trajectory_stride': 2, 'trajectory_dtype': 'float32'}
+    full = parse()
+    sampled = parse({'parser_options': parser_options})
+
+    assert full.numsteps > 5
+    assert sampled.numsteps == 3
+    numpy.testing.assert_array_equal(sampled.get_stepids(), full.get_stepids()[-5::2])
+
+    for name in ['positions', 'cells', 'velocities', 'times']:
+        assert sampled.get_array(name).dtype == numpy.float32
+        numpy.testing.assert_allclose(sampled.get_array(name), full.get_array(name)[-5::2], rtol=1e-6)
+
+    # The scalar observables of the EVP file are stored for all steps
+    for name in ['scf_total_energy', 'ionic_temperature', 'pressure']:
+        numpy.testing.assert_array_equal(sampled.get_array(name), full.get_array(name))
+
+
+@pytest.mark.parametrize('chunk_size', (1, 2, 100))
+def test_cp_traj_chunks(filepath_tests, chunk_size):
+    """Test that `iterate_cp_traj_chunks` gives the same frames as `parse_cp_traj_array`."""
+    import os
+
+    import numpy
+
+    from aiida_quantumespresso.parsers.parse_raw.cp import iterate_cp_traj_chunks, parse_cp_traj_array
+
+    filepath = os.path.join(filepath_tests, 'parsers', 'fixtures', 'cp', 'default', 'aiida.pos')
+
+    with open(filepath, encoding='utf-8') as handle:
+        expected = parse_cp_traj_array(2, handle.read().splitlines(), 'traj')
+
+    with open(filepath, encoding='utf-8') as handle:
+        chunks = list(iterate_cp_traj_chunks(2, handle, 'traj', chunk_size=chunk_size))
+
+    assert len(chunks) == -(-len(expected['traj_steps']) // chunk_size)
+
+    for key in ['traj_steps', 'traj_times', 'traj_data']:
+        numpy.testing.assert_array_equal(numpy.concatenate([chunk[key] for chunk in chunks]), expected[key])
+
+
+@pytest.mark.parametrize('version', ['default', '6.6_autopilot'])
+def test_cp_trajectory_chunk_size(
+    fixture_localhost, generate_calc_job_node, generate_parser, generate_structure, version
+):
+    """Test that the `trajectory_chunk_size` parser option gives the same trajectory as the in-memory parsing."""
+    import numpy
+
+    structure_id = 'silicon' if version == 'default' else 'water'
+
+    def parse(settings=None):
+        inputs = AttributeDict({'structure': generate_structure(structure_id=structure_id), 'parameters': orm.Dict()})
+        if settings is not None:
+            inputs['settings'] = orm.Dict(settings)
+        node = generate_calc_job_node('quantumespresso.cp', fixture_localhost, version, inputs)
+        results, calcfunction = generate_parser('quantumespresso.cp').parse_from_node(node, store_provenance=False)
+        assert calcfunction.is_finished_ok, calcfunction.exit_message
+        return results['output_trajectory']
+
+    full = parse()
+    chunked = parse({'parser_options': {'trajectory_chunk_size': 3}})
+
+    assert sorted(chunked.get_arraynames()) == sorted(full.get_arraynames())
+
+    for name in full.get_arraynames():
+        numpy.testing.assert_array_equal(chunked.get_array(name), full.get_array(name))
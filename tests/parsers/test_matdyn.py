@@ -32,3 +32,43 @@ def test_matdyn_default(fixture_localhost, generate_calc_job_node, generate_pars
         'output_parameters': results['output_parameters'].get_dict(),
         'output_phonon_bands': results['output_phonon_bands'].base.attributes.all
     })
+
+
+def test_parse_raw_matdyn_phonon_file():
+    """Test `parse_raw_matdyn_phonon_file` for a file with values that are glued together."""
+    import numpy
+    from qe_tools import CONSTANTS
+
+    from aiida_quantumespresso.parsers.matdyn import parse_raw_matdyn_phonon_file
+
+    content = (
+        ' &plot nbnd=   4, nks=   2 /\n'
+        '            0.000000  0.000000  0.000000\n'
+        '  -21.3032-1204.1234  585.5869 1.5E+01\n'
+        '            0.500000 -0.500000  0.500000\n'
+        '-12040.1234-1020.536  585.5869 5.855869e-02\n'
+    )
+    parsed_data = parse_raw_matdyn_phonon_file(content)
+
+    assert parsed_data['warnings'] == []
+    assert parsed_data['num_kpoints'] == 2
+    expected = numpy.array([[-21.3032, -1204.1234, 585.5869, 15.], [-12040.1234, -1020.536, 585.5869, 5.855869e-2]])
+    numpy.testing.assert_allclose(parsed_data['phonon_bands'], expected * CONSTANTS.invcm_to_THz)
+
+
+def test_parse_raw_matdyn_phonon_file_invalid():
+    """Test `parse_raw_matdyn_phonon_file` for files with invalid or missing frequencies."""
+    from aiida_quantumespresso.parsers.matdyn import parse_raw_matdyn_phonon_file
+
+    header = ' &plot nbnd=   2, nks=   1 /\n            0.000000  0.000000  0.000000\n'
+
+    parsed_data = parse_raw_matdyn_phonon_file(header + '  -21.3032 **********\n')
+    assert parsed_data['warnings'] == ['Bad formatting of frequencies']
+    assert 'phonon_bands' not in parsed_data
+
+    parsed_data = parse_raw_matdyn_phonon_file(header + '  -21.3032\n')
+    assert parsed_data['warnings'] == ['Error while parsing the frequencies, dimension exceeded']
+    assert 'phonon_bands' not in parsed_data
+
+    parsed_data = parse_raw_matdyn_phonon_file(' &plot /\n')
+    assert parsed_data['warnings'] == ['Number of bands or kpoints unreadable in phonon frequencies file']
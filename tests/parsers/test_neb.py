@@ -3,6 +3,7 @@
 from aiida import orm
 from aiida.common import AttributeDict
 import numpy as np
+import pytest
 
 
 def generate_inputs(parser_options=None):
@@ -100,3 +101,40 @@ def test_neb_all_iterations(
 
     data = build_num_regression_dictionary([results['iteration_array']], [results['iteration_array'].get_arraynames()])
     num_regression.check(data, default_tolerance=dict(atol=0, rtol=1e-18))
+
+
+@pytest.mark.parametrize('image_executor', ('thread', 'process'))
+def test_neb_image_workers(fixture_localhost, generate_calc_job_node, generate_parser, image_executor):
+    """Test the ``image_workers`` parser option, that parses the images concurrently, gives the same outputs."""
+    name = 'default'
+    entry_point_calc_job = 'quantumespresso.neb'
+    entry_point_parser = 'quantumespresso.neb'
+    outputs = []
+
+    for parser_options in [None, {'image_workers': 2, 'image_executor': image_executor}]:
+        node = generate_calc_job_node(entry_point_calc_job, fixture_localhost, name, generate_inputs(parser_options))
+        parser = generate_parser(entry_point_parser)
+        results, calcfunction = parser.parse_from_node(node, store_provenance=False)
+
+        assert calcfunction.is_finished_ok, calcfunction.exit_message
+        outputs.append({
+            'parameters': results['output_parameters'].get_dict(),
+            'positions': results['output_trajectory'].get_array('positions'),
+            'cells': results['output_trajectory'].get_array('cells'),
+        })
+
+    assert outputs[0]['parameters'] == outputs[1]['parameters']
+    assert np.array_equal(outputs[0]['positions'], outputs[1]['positions'])
+    assert np.array_equal(outputs[0]['cells'], outputs[1]['cells'])
+
+
+def test_neb_image_executor_invalid(fixture_localhost, generate_calc_job_node, generate_parser):
+    """Test an invalid ``image_executor`` parser option makes the parser fail before any image is parsed."""
+    parser_options = {'image_workers': 2, 'image_executor': 'fork'}
+    node = generate_calc_job_node('quantumespresso.neb', fixture_localhost, 'default', generate_inputs(parser_options))
+    parser = generate_parser('quantumespresso.neb')
+    _, calcfunction = parser.parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.is_failed, calcfunction.process_state
+    assert calcfunction.exit_status == node.process_class.exit_codes.ERROR_UNEXPECTED_PARSER_EXCEPTION.status
+    assert 'invalid executor' in calcfunction.exit_message
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-outer-name
+"""Tests for the :mod:`aiida_quantumespresso.parsers.parse_raw.cube` module."""
+import io
+import warnings
+
+import numpy as np
+import pytest
+
+from aiida_quantumespresso.parsers.parse_raw.cube import iterate_volumetric_chunks, read_cube
+
+SHAPE = (3, 4, 5)
+
+
+@pytest.fixture
+def cube_content():
+    """Return the content of a cube file with two atoms and the volumetric data ``0, 1, ..., nx * ny * nz - 1``."""
+    lines = [
+        'comment',
+        'comment',
+        '    2    0.000000    0.000000    0.000000',
+        f'    {SHAPE[0]}    0.100000    0.000000    0.000000',
+        f'    {SHAPE[1]}    0.000000    0.200000    0.000000',
+        f'    {SHAPE[2]}    0.000000    0.000000    0.300000',
+        '    8    8.000000    0.000000    0.000000    0.000000',
+        '    1    1.000000    1.000000    1.000000    1.000000',
+    ]
+    values = np.arange(np.prod(SHAPE), dtype=np.float64)
+
+    # Like ``pp.x``, write at most six values per line and start a new line for each ``z`` row
+    for row in values.reshape(-1, SHAPE[2]):
+        for start in range(0, len(row), 6):
+            lines.append(' '.join(f'{value:13.5E}' for value in row[start:start + 6]))
+
+    return '\n'.join(lines) + '\n'
+
+
+@pytest.mark.parametrize('chunk_size', (7, 64, 2**22))
+def test_read_cube(cube_content, chunk_size):
+    """Test :func:`read_cube` for chunks that are smaller and larger than a line."""
+    header, data = read_cube(io.StringIO(cube_content), chunk_size=chunk_size)
+
+    assert header['shape'] == SHAPE
+    assert header['atoms'] == [(8, 8.0, [0.0, 0.0, 0.0]), (1, 1.0, [1.0, 1.0, 1.0])]
+    assert np.allclose(header['voxel'], np.diag([0.1, 0.2, 0.3]))
+    assert np.array_equal(data, np.arange(np.prod(SHAPE), dtype=np.float64).reshape(SHAPE))
+
+
+@pytest.mark.parametrize('stride', (1, 2, (2, 3, 4), (3, 1, 5)))
+def test_read_cube_stride(cube_content, stride):
+    """Test :func:`read_cube` with a ``stride`` gives the same result as slicing the full data."""
+    _, reference = read_cube(cube_content)
+    header, data = read_cube(io.StringIO(cube_content), stride=stride, chunk_size=16)
+    strides = (stride,) * 3 if isinstance(stride, int) else stride
+
+    assert np.array_equal(data, reference[::strides[0], ::strides[1], ::strides[2]])
+    assert np.allclose(header['voxel'], np.diag([0.1, 0.2, 0.3]) * np.array(strides)[:, None])
+
+
+@pytest.mark.parametrize('region', (None, [[1, 3], None, [2, 4]]))
+def test_read_cube_dtype(cube_content, region):
+    """Test :func:`read_cube` allocates the data directly in the requested ``dtype``."""
+    _, reference = read_cube(cube_content, region=region)
+    _, data = read_cube(io.StringIO(cube_content), region=region, dtype=np.float32, chunk_size=16)
+
+    assert data.dtype == np.float32
+    assert np.array_equal(data, reference.astype(np.float32))
+
+
+@pytest.mark.parametrize('stride', (0, (1, 2), 1.5))
+def test_read_cube_invalid_stride(cube_content, stride):
+    """Test :func:`read_cube` raises for an invalid ``stride``."""
+    with pytest.raises(ValueError, match='the stride should be'):
+        read_cube(cube_content, stride=stride)
+
+
+@pytest.mark.parametrize(('modify', 'message'), (
+    (lambda content: content.rsplit('\n', 2)[0], 'instead of the'),
+    (lambda content: content + ' 1.0\n', 'more than the'),
+    (lambda content: content.replace('1.00000E+00', 'invalid'), 'could not be read'),
+))
+def test_read_cube_invalid_data(cube_content, modify, message):
+    """Test :func:`read_cube` raises if the volumetric data is incomplete, too long or invalid."""
+    with pytest.raises(ValueError, match=message):
+        read_cube(modify(cube_content))
+
+
+def test_iterate_volumetric_chunks_warning_filters():
+    """Test the warning filters are not modified while :func:`iterate_volumetric_chunks` is suspended."""
+    filters = list(warnings.filters)
+    chunks = iterate_volumetric_chunks(io.StringIO('1.0 2.0\n3.0 4.0\n'), chunk_size=8)
+
+    assert np.array_equal(next(chunks), [1.0, 2.0])
+    assert warnings.filters == filters
+    assert np.array_equal(np.concatenate(list(chunks)), [3.0, 4.0])
+    assert warnings.filters == filters
+
+
+@pytest.mark.parametrize(('region', 'stride'), (
+    ([[1, 3], None, None], 1),
+    ([None, [2, 3], [1, 2]], 1),
+    ([[-2, None], [1, None], [None, -1]], (1, 2, 2)),
+))
+def test_read_cube_region(cube_content, region, stride):
+    """Test :func:`read_cube` with a ``region`` gives the same result as slicing the full data."""
+    reference_header, reference = read_cube(cube_content)
+    header, data = read_cube(io.StringIO(cube_content), stride=stride, region=region, chunk_size=16)
+    strides = (stride,) * 3 if isinstance(stride, int) else stride
+    slices = tuple(slice(*(axis or (None, None)), step) for axis, step in zip(region, strides))
+    starts = [index.indices(dimension)[0] for index, dimension in zip(slices, SHAPE)]
+
+    assert np.array_equal(data, reference[slices])
+    assert np.allclose(header['origin'], reference_header['origin'] + np.array(starts) @ reference_header['voxel'])
+
+
+@pytest.mark.parametrize('region', ([[0, 1], [0, 1]], [[0, 1], [2, 2], None], [[0, 1.5], None, None]))
+def test_read_cube_invalid_region(cube_content, region):
+    """Test :func:`read_cube` raises for an invalid ``region``."""
+    with pytest.raises(ValueError, match='region'):
+        read_cube(cube_content, region=region)
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""Tests for the :mod:`aiida_quantumespresso.parsers.parse_raw.messages` module."""
+import re
+
+import pytest
+
+from aiida_quantumespresso.parsers.parse_raw.messages import MessageMatcher, MessageRegistry
+from aiida_quantumespresso.utils.mapping import get_logging_container
+
+ERRORS = {
+    'convergence NOT achieved': 'ERROR_CONVERGENCE',
+    'NOT achieved': 'ERROR_NOT_ACHIEVED',
+    re.compile(r'\s+some nodes have no k-points.*'): 'ERROR_NPOOLS',
+}
+WARNINGS = {'Warning:': None, 'DEPRECATED:': 'WARNING_DEPRECATED'}
+
+STDOUT = """
+     Program PWSCF v.7.2 starts on
+     Warning: card &INPUTPH ignored
+     convergence NOT achieved after 100 iterations
+     some nodes have no k-points
+some nodes have no k-points at the start of the line
+     DEPRECATED: option
+     Warning: card &INPUTPH ignored
+     JOB DONE.
+     Warning: last line"""
+
+
+def detect_reference(logs, line):
+    """Detect the messages in a line like ``MessageMatcher.detect``, but by checking all markers without prefilter."""
+    for markers, messages in ((ERRORS, logs.error), (WARNINGS, logs.warning)):
+        for marker, message in markers.items():
+            if (marker in line) if isinstance(marker, str) else marker.match(line):
+                messages.append(line if message is None else message)
+
+
+def search_reference(logs, text):
+    """Search the messages in a text like ``MessageMatcher.search``, as originally implemented by ``BaseParser``."""
+    for marker, message in ERRORS.items():
+        if re.search(marker if isinstance(marker, re.Pattern) else re.escape(marker), text):
+            logs.error.append(message)
+
+    for marker, message in WARNINGS.items():
+        for warning in set(re.findall(fr'({re.escape(marker)}.+)\n', text)):
+            logs.warning.append(warning if message is None else message)
+
+
+def test_detect():
+    """Test ``MessageMatcher.detect`` gives the same result as checking all markers one by one."""
+    matcher = MessageMatcher(ERRORS, WARNINGS)
+    logs = get_logging_container()
+    expected = get_logging_container()
+
+    for line in STDOUT.split('\n'):
+        matcher.detect(logs, line)
+        detect_reference(expected, line)
+
+    assert logs == expected
+    assert logs.error == ['ERROR_CONVERGENCE', 'ERROR_NOT_ACHIEVED', 'ERROR_NPOOLS']
+    assert logs.warning[-1] == '     Warning: last line'
+
+
+def test_prefilter():
+    """Test ``MessageMatcher.prefilter`` only passes the lines that can contain a marker."""
+    matcher = MessageMatcher(ERRORS, WARNINGS)
+    lines = [line for line in STDOUT.split('\n') if matcher.prefilter(line)]
+
+    assert len(lines) == 7
+    assert lines[-1] == '     Warning: last line'
+    assert not any('JOB DONE' in line or 'Program' in line for line in lines)
+    assert not MessageMatcher().prefilter(STDOUT)
+
+
+def test_search():
+    """Test ``MessageMatcher.search`` gives the same result as searching the entire text marker by marker."""
+    matcher = MessageMatcher(ERRORS, WARNINGS)
+    logs = get_logging_container()
+    expected = get_logging_container()
+
+    matcher.search(logs, STDOUT)
+    search_reference(expected, STDOUT)
+
+    assert logs.error == expected.error
+    assert sorted(logs.warning) == sorted(expected.warning)
+    assert logs.warning.count('WARNING_DEPRECATED') == 1
+    assert 'Warning: card &INPUTPH ignored' in logs.warning
+    assert 'Warning: last line' not in logs.warning
+
+
+def test_has_error():
+    """Test ``MessageMatcher.has_error``."""
+    matcher = MessageMatcher(ERRORS, WARNINGS)
+
+    assert matcher.has_error('scf NOT achieved')
+    assert not matcher.has_error('Warning: only a warning')
+
+
+@pytest.mark.parametrize(('pattern', 'expected'), (
+    (r'\s+some nodes.*', 'some nodes'),
+    (r'^\s*Error.+$', 'Error'),
+    (r'value\.+', r'value\.+'),
+    (r'.*', '.*'),
+))
+def test_prefilter_pattern(pattern, expected):
+    """Test the prefilter pattern of compiled regular expressions."""
+    assert MessageMatcher._get_prefilter_pattern(re.compile(pattern)) == f'(?:{expected})'  # pylint: disable=protected-access
+
+
+def test_registry():
+    """Test that registering markers extends an existing entry and updates its matcher."""
+    registry = MessageRegistry()
+    registry.register('code', errors={'some error': 'ERROR_SOME'})
+    matcher = registry.get_matcher('code')
+
+    assert 'code' in registry
+    assert registry.get_matcher('code') is matcher
+    assert not registry.get_warnings('code')
+
+    registry.register('code', errors={'other error': 'ERROR_OTHER'}, warnings={'Warning:': None})
+    logs = get_logging_container()
+    registry.get_matcher('code').detect(logs, 'some error and other error')
+
+    assert registry.get_matcher('code') is not matcher
+    assert registry.get_errors('code') == {'some error': 'ERROR_SOME', 'other error': 'ERROR_OTHER'}
+    assert logs.error == ['ERROR_SOME', 'ERROR_OTHER']
+
+    with pytest.raises(KeyError):
+        registry.get_matcher('unknown')
+
+
+def test_base_parser_registered(monkeypatch):
+    """Test that ``BaseParser`` subclasses register their markers and pick up markers registered by plugins."""
+    from aiida_quantumespresso.parsers.parse_raw import messages
+    from aiida_quantumespresso.parsers.ph import PhParser
+
+    assert PhParser.get_message_registry_name() in messages.MESSAGES
+
+    registry = MessageRegistry()
+    monkeypatch.setattr('aiida_quantumespresso.parsers.base.MESSAGES', registry)
+    registry.register(
+        PhParser.get_message_registry_name(),
+        errors={re.compile(marker): message for marker, message in PhParser.get_error_map().items()},
+    )
+
+    stdout = 'Program PHONON v.7.2 starts on\n     new plugin error\n     wrong representation\n'
+    _, logs = PhParser._parse_stdout_base(stdout, get_logging_container())  # pylint: disable=protected-access
+    assert logs.error == ['ERROR_OUTPUT_STDOUT_INCOMPLETE', 'ERROR_WRONG_REPRESENTATION']
+
+    registry.register(PhParser.get_message_registry_name(), errors={'new plugin error': 'ERROR_PLUGIN'})
+    _, logs = PhParser._parse_stdout_base(stdout, get_logging_container())  # pylint: disable=protected-access
+    assert logs.error == ['ERROR_OUTPUT_STDOUT_INCOMPLETE', 'ERROR_WRONG_REPRESENTATION', 'ERROR_PLUGIN']
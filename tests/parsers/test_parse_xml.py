@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""Tests for the :mod:`aiida_quantumespresso.parsers.parse_xml.parse` module."""
+import copy
+import pathlib
+from xml.etree import ElementTree
+
+import numpy
+import pytest
+
+from aiida_quantumespresso.parsers.parse_xml import parse as parse_module
+from aiida_quantumespresso.parsers.parse_xml.exceptions import XMLParseError
+from aiida_quantumespresso.parsers.parse_xml.extract import XMLExtractionError, extract_xml_dictionary
+from aiida_quantumespresso.parsers.parse_xml.parse import decode_xml, parse_ks_energies, parse_xml_post_6_2
+from aiida_quantumespresso.parsers.parse_xml.pw.parse import parse_xml
+from aiida_quantumespresso.parsers.parse_xml.versions import QeXmlVersion, get_xml_file_version
+from aiida_quantumespresso.utils.mapping import get_logging_container
+
+FILEPATH_FIXTURES = pathlib.Path(__file__).parent / 'fixtures' / 'pw'
+FIXTURES = sorted(path.name for path in FILEPATH_FIXTURES.iterdir() if (path / 'data-file-schema.xml').is_file())
+FILEPATH_TESTS = pathlib.Path(__file__).parent.parent
+
+
+def get_schema_xml_fixtures():
+    """Return the relative filepaths of all XML files in the test suite that use the schema-based format."""
+    filepaths = []
+
+    for filepath in sorted(FILEPATH_TESTS.rglob('*.xml')):
+        try:
+            if get_xml_file_version(ElementTree.parse(filepath)) == QeXmlVersion.POST_6_2:
+                filepaths.append(str(filepath.relative_to(FILEPATH_TESTS)))
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    return filepaths
+
+
+def assert_subset(extracted, decoded, path=''):
+    """Assert that every field of the extracted dictionary is identical, including its type, to the decoded one."""
+    if isinstance(extracted, dict):
+        assert isinstance(decoded, dict), path
+        for key, value in extracted.items():
+            assert key in decoded, f'{path}/{key}'
+            assert_subset(value, decoded[key], f'{path}/{key}')
+    elif isinstance(extracted, list):
+        assert isinstance(decoded, list) and len(extracted) == len(decoded), path
+        for index, (value, other) in enumerate(zip(extracted, decoded)):
+            assert_subset(value, other, f'{path}[{index}]')
+    else:
+        assert type(extracted) is type(decoded) and extracted == decoded, f'{path}: {extracted!r} != {decoded!r}'
+
+
+def parse_ks_energies_reference(ks_states, num_spins, num_bands, alat):
+    """Parse the Kohn-Sham energies like ``parse_ks_energies``, but by building the arrays from nested lists."""
+    from qe_tools import CONSTANTS
+
+    k_points = [[kp * 2 * numpy.pi / alat for kp in ks_state['k_point']['$']] for ks_state in ks_states]
+    k_points_weights = [ks_state['k_point']['@weight'] for ks_state in ks_states]
+    eigenvalues = [[ks_state['eigenvalues']['$'][spin * num_bands:(spin + 1) * num_bands]
+                    for ks_state in ks_states]
+                   for spin in range(num_spins)]
+    occupations = [[ks_state['occupations']['$'][spin * num_bands:(spin + 1) * num_bands]
+                    for ks_state in ks_states]
+                   for spin in range(num_spins)]
+
+    return k_points, k_points_weights, numpy.array(eigenvalues) * CONSTANTS.hartree_to_ev, numpy.array(occupations)
+
+
+@pytest.mark.parametrize('fixture', FIXTURES)
+def test_parse_ks_energies(fixture):
+    """Test that the bands and k-points are parsed into float64 arrays that are identical to the list based results."""
+    try:
+        with (FILEPATH_FIXTURES / fixture / 'data-file-schema.xml').open() as handle:
+            parsed_data, logs = parse_xml(handle)
+    except Exception:  # pylint: disable=broad-except
+        pytest.skip('fixture does not contain a parsable XML output file')
+
+    if 'bands' not in parsed_data or logs.error:
+        pytest.skip('fixture does not contain band structure')
+
+    bands = parsed_data['bands']
+    num_spins = 2 if parsed_data['lsda'] else 1
+    num_bands = parsed_data['number_of_bands']
+    num_k_points = parsed_data['number_of_k_points']
+
+    for array in (bands['bands'], bands['occupations']):
+        assert array.dtype == numpy.float64
+        assert array.shape == (num_spins, num_k_points, num_bands)
+        assert array.flags.c_contiguous
+
+    assert parsed_data['k_points'].shape == (num_k_points, 3)
+    assert parsed_data['k_points_weights'].shape == (num_k_points,)
+
+
+def test_parse_ks_energies_spin():
+    """Test ``parse_ks_energies`` for a spin-polarized calculation against the list based reference."""
+    ks_states = [{
+        'k_point': {
+            '$': [0.1 * index, 0.2, -0.3],
+            '@weight': 0.25 * (index + 1)
+        },
+        'eigenvalues': {
+            '$': [-0.5 + 0.1 * band + 0.01 * index for band in range(6)]
+        },
+        'occupations': {
+            '$': [1.0, 1.0, 0.5, 1.0, 0.0, 0.0]
+        },
+    } for index in range(4)]
+
+    results = parse_ks_energies(ks_states, 2, 3, 5.43)
+    expected = parse_ks_energies_reference(ks_states, 2, 3, 5.43)
+
+    for result, reference in zip(results, expected):
+        numpy.testing.assert_array_equal(result, reference)
+
+    assert results[2].shape == (2, 4, 3)
+    numpy.testing.assert_array_equal(results[3][1, 0], [1.0, 0.0, 0.0])
+
+
+def test_parse_ks_energies_invalid():
+    """Test ``parse_ks_energies`` raises if the number of eigenvalues does not match the number of bands."""
+    ks_states = [{
+        'k_point': {
+            '$': [0.0, 0.0, 0.0],
+            '@weight': 2.0
+        },
+        'eigenvalues': {
+            '$': [-0.5, 0.1]
+        },
+        'occupations': {
+            '$': [1.0, 0.0, 0.0]
+        },
+    }]
+
+    with pytest.raises(XMLParseError, match='Unexpected number of eigenvalues'):
+        parse_ks_energies(ks_states, 1, 3, 5.43)
+
+
+@pytest.mark.parametrize('filepath', get_schema_xml_fixtures())
+def test_extract_xml_dictionary(filepath):
+    """Test that the non-validating extraction gives the same fields as decoding with the schema for all fixtures."""
+    xml = ElementTree.parse(FILEPATH_TESTS / filepath)
+    extracted = extract_xml_dictionary(xml)
+    decoded = decode_xml(copy.deepcopy(xml), get_logging_container())
+
+    assert_subset(extracted, decoded)
+    assert 'output' in extracted
+
+
+@pytest.mark.parametrize('filepath', get_schema_xml_fixtures())
+def test_parse_xml_post_6_2_fast(filepath, monkeypatch):
+    """Test that parsing with ``validate=False`` gives identical results as with the schema for all fixtures."""
+    xml = ElementTree.parse(FILEPATH_TESTS / filepath)
+
+    try:
+        parsed_data, logs = parse_xml_post_6_2(copy.deepcopy(xml))
+    except Exception as exception:  # pylint: disable=broad-except
+        with pytest.raises(type(exception)):
+            parse_xml_post_6_2(xml, validate=False)
+        return
+
+    def decode_xml_fail(*_):
+        raise AssertionError('the XML should not be decoded with the schema')
+
+    monkeypatch.setattr(parse_module, 'decode_xml', decode_xml_fail)
+    parsed_data_fast, logs_fast = parse_xml_post_6_2(xml, validate=False)
+
+    numpy.testing.assert_equal(parsed_data_fast, parsed_data)
+    assert logs_fast.warning == logs.warning
+
+
+def test_parse_xml_post_6_2_fallback():
+    """Test that parsing with ``validate=False`` falls back to the schema if an element has an unexpected value."""
+    xml = ElementTree.parse(FILEPATH_FIXTURES / 'default_xml_230310' / 'data-file-schema.xml')
+    xml.find('./output/band_structure/nks').text = 'thirteen'
+
+    with pytest.raises(XMLExtractionError, match='nks'):
+        extract_xml_dictionary(xml)
+
+    _, logs = parse_xml_post_6_2(copy.deepcopy(xml), validate=False)
+    _, logs_schema = parse_xml_post_6_2(xml)
+
+    assert any('Falling back' in message for message in logs.info)
+    assert logs.error == logs_schema.error
+    assert logs.error
+
+
+@pytest.mark.parametrize(('content', 'expected'), (
+    (
+        '<root><a>1</a><b x="2.5">mp</b><c><d>true</d></c></root>', {
+            'a': 1,
+            'b': {
+                '@x': 2.5,
+                '$': 'mp'
+            },
+            'c': {
+                'd': True
+            }
+        }
+    ),
+    ('<root><e>1 2</e><e>3</e><f/></root>', {
+        'e': [[1, 2], [3]],
+        'f': None
+    }),
+))
+def test_field_decode(content, expected):
+    """Test the conventions of ``Field.decode`` with respect to attributes, multiple and empty elements."""
+    from aiida_quantumespresso.parsers.parse_xml.extract import Field, to_bool, to_float, to_int, to_ints, to_string
+
+    field = Field(
+        children={
+            'a': Field(to_int),
+            'b': Field(to_string, attributes={'x': to_float}),
+            'c': Field(children={'d': Field(to_bool)}),
+            'e': Field(to_ints, multiple=True),
+            'f': Field(children={'g': Field(to_int)}),
+        }
+    )
+    assert field.decode(ElementTree.fromstring(content)) == expected
+
+
+def test_field_decode_invalid():
+    """Test that ``Field.decode`` raises for repeated single elements and invalid values."""
+    from aiida_quantumespresso.parsers.parse_xml.extract import Field, to_bool
+
+    field = Field(children={'a': Field(to_bool)})
+
+    with pytest.raises(XMLExtractionError, match='more than once'):
+        field.decode(ElementTree.fromstring('<root><a>true</a><a>false</a></root>'))
+
+    with pytest.raises(XMLExtractionError, match='invalid content'):
+        field.decode(ElementTree.fromstring('<root><a>yes</a></root>'))
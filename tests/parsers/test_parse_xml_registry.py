@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Tests for the :mod:`aiida_quantumespresso.parsers.parse_xml.registry` module."""
+import threading
+
+import pytest
+
+from aiida_quantumespresso.parsers.parse_xml.registry import SchemaRegistry
+from aiida_quantumespresso.parsers.parse_xml.versions import get_available_xml_schemas
+
+
+def test_registry_caches_schema():
+    """Test that a schema is only compiled once and the same instance is returned on subsequent calls."""
+    registry = SchemaRegistry()
+    schema = registry.get('qes_230310.xsd')
+
+    assert registry.get('qes_230310.xsd') is schema
+    assert registry.misses == 1
+    assert registry.hits == 1
+
+
+def test_registry_lru_eviction():
+    """Test that the least recently used schema is evicted when the registry is full."""
+    registry = SchemaRegistry(maxsize=2)
+    registry.get('qes_220603.xsd')
+    registry.get('qes_230310.xsd')
+    registry.get('qes_220603.xsd')
+    registry.get('qes_240411.xsd')
+
+    assert len(registry) == 2
+    assert 'qes_220603.xsd' in registry
+    assert 'qes_240411.xsd' in registry
+    assert 'qes_230310.xsd' not in registry
+
+
+def test_registry_disabled():
+    """Test that a registry with ``maxsize=0`` does not cache anything."""
+    registry = SchemaRegistry(maxsize=0)
+
+    assert registry.get('qes_230310.xsd') is not registry.get('qes_230310.xsd')
+    assert len(registry) == 0
+
+
+def test_registry_invalid_maxsize():
+    """Test that a negative ``maxsize`` raises."""
+    with pytest.raises(ValueError):
+        SchemaRegistry(maxsize=-1)
+
+
+def test_registry_prewarm():
+    """Test that prewarming compiles all bundled schemas if the registry is large enough."""
+    schemas = get_available_xml_schemas()
+    registry = SchemaRegistry(maxsize=len(schemas))
+
+    assert sorted(registry.prewarm()) == sorted(schemas)
+
+
+def test_registry_thread_safe():
+    """Test that concurrent requests for the same schema result in a single compilation."""
+    registry = SchemaRegistry()
+    results = []
+
+    def target():
+        results.append(registry.get('qes_230310.xsd'))
+
+    threads = [threading.Thread(target=target) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 8
+    assert all(schema is results[0] for schema in results)
+    assert len(registry) == 1
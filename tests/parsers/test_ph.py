@@ -143,3 +143,78 @@ def test_ph_failed_wrong_representation(fixture_localhost, generate_calc_job_nod
     assert calcfunction.is_finished, calcfunction.exception
     assert calcfunction.is_failed, calcfunction.exit_status
     assert calcfunction.exit_status == node.process_class.exit_codes.ERROR_WRONG_REPRESENTATION.status
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_ph_dynmat_workers(fixture_localhost, generate_calc_job_node, generate_parser, executor):
+    """Test that parsing the dynamical matrices in a pool of workers gives the same result as parsing them in order."""
+    name = 'default'
+    entry_point_calc_job = 'quantumespresso.ph'
+    entry_point_parser = 'quantumespresso.ph'
+
+    node = generate_calc_job_node(entry_point_calc_job, fixture_localhost, name, generate_inputs())
+    parser = generate_parser(entry_point_parser)
+    expected, _ = parser.parse_from_node(node, store_provenance=False)
+
+    inputs = generate_inputs()
+    inputs['settings'] = orm.Dict({'parser_options': {'dynmat_workers': 2, 'dynmat_executor': executor}})
+    node = generate_calc_job_node(entry_point_calc_job, fixture_localhost, name, inputs)
+    results, calcfunction = parser.parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.is_finished_ok, calcfunction.exit_message
+    assert results['output_parameters'].get_dict() == expected['output_parameters'].get_dict()
+
+
+def test_ph_dynmat_workers_invalid_executor(fixture_localhost, generate_calc_job_node, generate_parser):
+    """Test that an invalid ``dynmat_executor`` parser option makes the parser fail."""
+    name = 'default'
+    entry_point_calc_job = 'quantumespresso.ph'
+    entry_point_parser = 'quantumespresso.ph'
+
+    inputs = generate_inputs()
+    inputs['settings'] = orm.Dict({'parser_options': {'dynmat_workers': 2, 'dynmat_executor': 'invalid'}})
+    node = generate_calc_job_node(entry_point_calc_job, fixture_localhost, name, inputs)
+    parser = generate_parser(entry_point_parser)
+    _, calcfunction = parser.parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.is_failed
+    assert calcfunction.exit_status == node.process_class.exit_codes.ERROR_UNEXPECTED_PARSER_EXCEPTION.status
+
+
+@pytest.mark.parametrize(('original', 'replacement', 'warning'), (
+    (None, None, None),
+    ('-21.303176', '*********', 'frequencies'),
+    ('0.252146', '********', 'eigenvectors'),
+))
+def test_parse_ph_dynmat(filepath_tests, original, replacement, warning):
+    """Test that the dynamical matrix modes are the same when tokenized at once and when parsed line by line."""
+    import pathlib
+
+    from aiida_quantumespresso.parsers.parse_raw.ph import _parse_dynmat_modes_lines, parse_ph_dynmat
+    from aiida_quantumespresso.utils.mapping import get_logging_container
+
+    filepath = pathlib.Path(filepath_tests) / 'parsers' / 'fixtures' / 'ph' / 'default' / 'DYN_MAT'
+    content = (filepath / 'dynamical-matrix-1').read_text()
+
+    if original is not None:
+        content = content.replace(original, replacement, 1)
+
+    lines = content.split('\n')
+    logs = get_logging_container()
+    parsed_data = parse_ph_dynmat(lines, logs, also_eigenvectors=True)
+
+    mode_starts = [index for index, line in enumerate(lines) if 'freq' in line]
+    mode_blocks = [(start, start + 3) for start in mode_starts]
+    logs_expected = get_logging_container()
+    frequencies, eigenvectors = _parse_dynmat_modes_lines(lines, mode_blocks, logs_expected)
+
+    assert parsed_data['frequencies'] == frequencies
+    assert parsed_data['eigenvectors'] == eigenvectors
+    assert logs.warning == logs_expected.warning
+    assert len(eigenvectors) == 6
+    assert all(len(eigenvector) == 2 for eigenvector in eigenvectors)
+
+    if warning is None:
+        assert not logs.warning
+    else:
+        assert logs.warning == [f'Wrong fortran formatting found while parsing {warning}']
@@ -3,6 +3,7 @@
 """Tests for the `PpParser`."""
 from aiida import orm
 from aiida.common import AttributeDict
+import numpy as np
 import pytest
 
 
@@ -293,7 +294,7 @@ def test_pp_default_3d(
     assert calcfunction.is_finished_ok, calcfunction.exit_message
     assert 'output_parameters' in results
     assert 'output_data' in results
-    assert len(results['output_data'].get_arraynames()) == 4
+    assert len(results['output_data'].get_arraynames()) == 5
     data_array = results['output_data'].get_array('data').flatten()
     voxel_array = results['output_data'].get_array('voxel').flatten()
     data_units_array = results['output_data'].get_array('data_units')
@@ -309,6 +310,7 @@ def test_pp_default_3d(
     )
     data_regression.check({
         'parameters': results['output_parameters'].get_dict(),
+        'origin': results['output_data'].get_array('origin').tolist(),
         'data_units': data_units_array.tolist(),
         'coordinates_units': coordinates_units_array.tolist()
     })
@@ -338,7 +340,7 @@ def test_pp_default_3d_keep_data_files(generate_calc_job_node, generate_parser,
     assert calcfunction.is_finished_ok, calcfunction.exit_message
     assert 'output_parameters' in results
     assert 'output_data' in results
-    assert len(results['output_data'].get_arraynames()) == 4
+    assert len(results['output_data'].get_arraynames()) == 5
 
 
 def test_pp_default_3d_parse_data_files(generate_calc_job_node, generate_parser, generate_inputs_3d, tmpdir):
@@ -383,7 +385,7 @@ def test_pp_default_3d_multiple(generate_calc_job_node, generate_parser, generat
     for key in ['K001_B001', 'K001_B002']:
         assert key in results['output_data_multiple']
         node = results['output_data_multiple'][key]
-        assert len(node.get_arraynames()) == 4
+        assert len(node.get_arraynames()) == 5
 
 
 def test_pp_default_3d_failed_missing(fixture_localhost, generate_calc_job_node, generate_parser, generate_inputs_3d):
@@ -459,3 +461,109 @@ def test_pp_default_3d_failed_format(fixture_localhost, generate_calc_job_node,
     assert calcfunction.is_finished, calcfunction.exception
     assert calcfunction.is_failed, calcfunction.exit_status
     assert calcfunction.exit_status == node.process_class.exit_codes.ERROR_OUTPUT_DATAFILE_PARSE.status
+
+
+@pytest.mark.parametrize('stride', (2, [1, 2, 4]))
+def test_pp_default_3d_cube_stride(
+    fixture_localhost, generate_calc_job_node, generate_parser, generate_inputs_3d, stride
+):
+    """Test the ``cube_stride`` parser option downsamples the volumetric data of a Gaussian cube file."""
+    entry_point_calc_job = 'quantumespresso.pp'
+    entry_point_parser = 'quantumespresso.pp'
+    attributes = {'keep_data_files': False, 'parse_data_files': True}
+    outputs = []
+
+    for settings in [None, {'parser_options': {'cube_stride': stride}}]:
+        inputs = AttributeDict(generate_inputs_3d)
+        if settings is not None:
+            inputs['settings'] = orm.Dict(settings)
+        node = generate_calc_job_node(
+            entry_point_calc_job, fixture_localhost, 'default_3d', inputs, attributes=attributes
+        )
+        parser = generate_parser(entry_point_parser)
+        results, calcfunction = parser.parse_from_node(node, store_provenance=False)
+
+        assert calcfunction.is_finished_ok, calcfunction.exit_message
+        outputs.append(results['output_data'])
+
+    strides = (stride,) * 3 if isinstance(stride, int) else stride
+    data = outputs[0].get_array('data')
+    assert np.array_equal(outputs[1].get_array('data'), data[::strides[0], ::strides[1], ::strides[2]])
+    assert np.allclose(outputs[1].get_array('voxel'), outputs[0].get_array('voxel') * np.array(strides)[:, None])
+
+
+@pytest.mark.parametrize(('test_name', 'inputs', 'region', 'slices'), (
+    ('default_1d', 'generate_inputs_1d', [[2, 7]], (slice(2, 7),)),
+    ('default_1d_spherical', 'generate_inputs_1d_spherical', [[None, -3]], (slice(None, -3),)),
+    ('default_2d', 'generate_inputs_2d', [[1, 2], None], (slice(1, 2), slice(None))),
+    ('default_polar', 'generate_inputs_polar', [None, [2, 4]], (slice(None), slice(2, 4))),
+    ('default_3d', 'generate_inputs_3d', [None, [3, 4], [0, 1]], (slice(None), slice(3, 4), slice(0, 1))),
+))
+def test_pp_parser_options_region_dtype(
+    request, fixture_localhost, generate_calc_job_node, generate_parser, test_name, inputs, region, slices
+):
+    """Test the ``region`` and ``dtype`` parser options select a region of the grid in single precision."""
+    entry_point_calc_job = 'quantumespresso.pp'
+    entry_point_parser = 'quantumespresso.pp'
+    attributes = {'keep_data_files': False, 'parse_data_files': True}
+    outputs = []
+
+    for settings in [None, {'parser_options': {'region': region, 'dtype': 'float32'}}]:
+        inputs_node = AttributeDict(request.getfixturevalue(inputs))
+        if settings is not None:
+            inputs_node['settings'] = orm.Dict(settings)
+        node = generate_calc_job_node(
+            entry_point_calc_job, fixture_localhost, test_name, inputs_node, attributes=attributes
+        )
+        parser = generate_parser(entry_point_parser)
+        results, calcfunction = parser.parse_from_node(node, store_provenance=False)
+
+        assert calcfunction.is_finished_ok, calcfunction.exit_message
+        outputs.append(results['output_data'])
+
+    reference, output = outputs[0], outputs[1]
+    assert sorted(output.get_arraynames()) == sorted(reference.get_arraynames())
+
+    for name in reference.get_arraynames():
+        if name.endswith('units') or name == 'voxel':
+            assert np.array_equal(output.get_array(name), reference.get_array(name))
+            continue
+
+        if name == 'origin':
+            # The origin of the sub-grid is shifted to the first point of the region
+            shape = reference.get_array('data').shape
+            starts = [index.indices(dimension)[0] for index, dimension in zip(slices, shape)]
+            expected = reference.get_array('origin') + np.array(starts) @ reference.get_array('voxel')
+            assert np.allclose(output.get_array(name), expected)
+            continue
+
+        expected = reference.get_array(name)
+
+        if len(slices) > 1 and expected.ndim < 3:
+            # The 2D and polar data are stored as a flat list of points, with the last grid index running fastest
+            shape = (len(expected) // 10, 10) if test_name == 'default_2d' else (4, 4)
+            expected = expected.reshape(shape + expected.shape[1:])[slices].reshape((-1,) + expected.shape[1:])
+        else:
+            expected = expected[slices]
+
+        assert output.get_array(name).dtype == np.float32
+        assert np.array_equal(output.get_array(name), expected.astype(np.float32))
+
+
+@pytest.mark.parametrize('parser_options', ({'dtype': 'float16'}, {'region': [[0, 1], [0, 1]]}))
+def test_pp_parser_options_invalid(
+    fixture_localhost, generate_calc_job_node, generate_parser, generate_inputs_3d, parser_options
+):
+    """Test that invalid parser options make the parser fail with ``ERROR_OUTPUT_DATAFILE_PARSE``."""
+    entry_point_calc_job = 'quantumespresso.pp'
+    entry_point_parser = 'quantumespresso.pp'
+    attributes = {'keep_data_files': False, 'parse_data_files': True}
+
+    inputs = AttributeDict(generate_inputs_3d)
+    inputs['settings'] = orm.Dict({'parser_options': parser_options})
+    node = generate_calc_job_node(entry_point_calc_job, fixture_localhost, 'default_3d', inputs, attributes=attributes)
+    parser = generate_parser(entry_point_parser)
+    _, calcfunction = parser.parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.is_failed, calcfunction.exit_status
+    assert calcfunction.exit_status == node.process_class.exit_codes.ERROR_OUTPUT_DATAFILE_PARSE.status
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=redefined-outer-name
 """Tests for the `ProjwfcParser`."""
-
+from aiida.common import AttributeDict
 import pytest
 
 
@@ -109,3 +109,98 @@ def test_projwfc_xml_failures(generate_projwfc_node, generate_parser, tmpdir, te
 
     assert calcfunction.is_failed, calcfunction.process_state
     assert calcfunction.exit_status == exit_status
+
+
+@pytest.mark.parametrize('max_workers', (None, 4))
+@pytest.mark.parametrize('nspin, spinorbit', ((1, False), (2, False), (4, False), (4, True)))
+def test_projwfc_parse_pdos_files(generate_projwfc_node, generate_parser, tmp_path, nspin, spinorbit, max_workers):
+    """Test ``ProjwfcParser._parse_pdos_files`` on a synthetic folder with 500 ``pdos_atm`` files.
+
+    The PDOS array should be identical to the one of the original implementation, that reads each file with
+    ``numpy.genfromtxt`` and reorders the columns by concatenating them.
+    """
+    import re
+
+    import numpy as np
+
+    folder = tmp_path / 'synthetic'
+    folder.mkdir()
+    num_energies = 50
+    first_pdos_column = 2 if nspin == 1 or spinorbit else 3
+    rng = np.random.default_rng(0)
+
+    def write_pdos_file(filename, num_pdos_columns):
+        columns = rng.random((num_energies, first_pdos_column + num_pdos_columns))
+        columns[:, 0] = np.linspace(-10, 10, num_energies)
+        lines = ['# E (eV)  ldos(E)  pdos(E)'] + [' '.join(f'{value:10.3E}' for value in row) for row in columns]
+        (folder / filename).write_text('\n'.join(lines) + '\n')
+
+    write_pdos_file('aiida.pdos_tot', 0)
+
+    for atom in range(1, 251):
+        for wfc, (label, num_orbitals) in enumerate((('s', 1), ('p', 3)), start=1):
+            num_pdos_columns = num_orbitals if nspin == 1 else 2 * num_orbitals
+            write_pdos_file(f'aiida.pdos_atm#{atom}(Si)_wfc#{wfc}({label})', num_pdos_columns)
+
+    def natural_sort_key(sort_key):
+        return [int(text) if text.isdigit() else text for text in re.split('([0-9]+)', sort_key)]
+
+    arrays = [
+        np.atleast_2d(np.genfromtxt(path))[:, first_pdos_column:]
+        for path in sorted(folder.glob('*pdos_atm*'), key=lambda path: natural_sort_key(path.name))
+    ]
+
+    if nspin != 4 or spinorbit:
+        reference = np.concatenate(arrays, axis=1)
+        if nspin == 2:
+            reference = np.concatenate([reference[:, 0::2], reference[:, 1::2]], axis=1)
+        if nspin == 4:
+            reference = np.concatenate([reference[:, 1::2], reference[:, 0::2]], axis=1)
+    else:
+        reference = np.concatenate([np.concatenate([array[:, 0::2], array[:, 1::2]], axis=1) for array in arrays], 1)
+
+    parser = generate_parser('quantumespresso.projwfc')(generate_projwfc_node('nonpolarised'))
+    logs = AttributeDict({'error': [], 'warning': []})
+    # pylint: disable=protected-access
+    energy, _, pdos_array = parser._parse_pdos_files(folder, nspin, spinorbit, logs, max_workers)
+
+    assert not logs.error
+    assert np.array_equal(energy, np.genfromtxt(folder / 'aiida.pdos_tot')[:, 0])
+    assert np.array_equal(pdos_array, reference)
+
+
+@pytest.mark.parametrize('test_name', ('nonpolarised', 'noncollinear', 'spinorbit', 'spinpolarised', 'numbered_kinds'))
+@pytest.mark.parametrize('threshold', (None, 0.1))
+def test_projwfc_parse_bands_and_projections(filepath_tests, generate_parser, test_name, threshold):
+    """Test ``ProjwfcParser._parse_bands_and_projections`` against the original regular expression implementation."""
+    import os
+    import re
+
+    import numpy as np
+
+    filepath = os.path.join(filepath_tests, 'parsers', 'fixtures', 'projwfc', test_name, 'aiida.out')
+
+    with open(filepath, encoding='utf-8') as handle:
+        stdout = handle.read()
+
+    kpoint_blocks = stdout.split('Lowdin Charges:')[0].split('k = ')[1:]
+    num_orbitals = int(re.search(r'natomwfc\s*=\s*(\d+)', stdout).group(1))
+
+    energy_pattern = re.compile(r'====\se\(\s*\d+\)\s=\s*(\S+)\seV\s====')
+    band_pattern = re.compile(r'\n====.+==== \n')
+    psi_pattern = re.compile(r'([.\d]+)\*\[#\s*(\d+)\]')
+    reference_bands = np.array([energy_pattern.findall(block) for block in kpoint_blocks], dtype=float)
+    reference_projections = np.zeros(reference_bands.shape + (num_orbitals,))
+
+    for kpoint_index, block in enumerate(kpoint_blocks):
+        for band_index, band_projections in enumerate(re.split(band_pattern, block)[1:]):
+            for projection_value, orbital_index in psi_pattern.findall(band_projections):
+                if threshold is None or float(projection_value) >= threshold:
+                    reference_projections[kpoint_index, band_index, int(orbital_index) - 1] = projection_value
+
+    parser_class = generate_parser('quantumespresso.projwfc')
+    # pylint: disable=protected-access
+    bands, projections = parser_class._parse_bands_and_projections(kpoint_blocks, num_orbitals, threshold)
+
+    assert np.array_equal(bands, reference_bands)
+    assert np.array_equal(projections, reference_projections)
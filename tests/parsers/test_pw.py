@@ -3,6 +3,7 @@
 """Tests for the `PwParser`."""
 from aiida import orm
 from aiida.common import AttributeDict
+import numpy as np
 import pytest
 
 from aiida_quantumespresso.calculations.pw import PwCalculation
@@ -140,6 +141,27 @@ def test_pw_default_xml(
     })
 
 
+@pytest.mark.parametrize('xml_format', ['190304', '211101', '230310', '241015'])
+def test_pw_default_xml_fast(fixture_localhost, generate_calc_job_node, generate_parser, generate_inputs, xml_format):
+    """Test the ``fast_xml`` parser option, that skips the schema validation, gives the exact same outputs."""
+    name = f'default_xml_{xml_format}'
+    entry_point_calc_job = 'quantumespresso.pw'
+    entry_point_parser = 'quantumespresso.pw'
+    outputs = []
+
+    for settings in [None, {'parser_options': {'fast_xml': True}}]:
+        node = generate_calc_job_node(entry_point_calc_job, fixture_localhost, name, generate_inputs(settings=settings))
+        parser = generate_parser(entry_point_parser)
+        results, calcfunction = parser.parse_from_node(node, store_provenance=False)
+
+        assert calcfunction.is_finished_ok, calcfunction.exit_message
+        assert not orm.Log.collection.get_logs_for(node)
+        outputs.append({key: results[key].base.attributes.all for key in ['output_band', 'output_trajectory']})
+        outputs[-1]['output_parameters'] = results['output_parameters'].get_dict()
+
+    assert outputs[0] == outputs[1]
+
+
 def test_pw_initialization_xml_new(
     fixture_localhost, generate_calc_job_node, generate_parser, generate_inputs, data_regression
 ):
@@ -173,7 +195,7 @@ def test_pw_failed_base_exception(
 
     This should return ``ERROR_UNEXPECTED_PARSER_EXCEPTION`` formatted with exception title.
     """
-    from aiida_quantumespresso.parsers.parse_raw import pw
+    from aiida_quantumespresso.parsers.parse_raw import pw_stream
 
     exception = 'the parser encountered an error.'
 
@@ -190,7 +212,7 @@ def test_pw_failed_base_exception(
     node = generate_calc_job_node(entry_point_calc_job, fixture_localhost, name, generate_inputs())
     parser = generate_parser(entry_point_parser)
 
-    monkeypatch.setattr(pw, 'parse_stdout', parse_stdout)
+    monkeypatch.setattr(pw_stream, 'parse_stdout_stream', parse_stdout)
     monkeypatch.setattr(parser, 'parse_xml', parse_xml)
 
     _, calcfunction = parser.parse_from_node(node, store_provenance=False)
@@ -1206,3 +1228,240 @@ def test_magnetic_moments_v68(
         'atomic_magnetic_moments':
         results['output_trajectory'].get_array('atomic_magnetic_moments').tolist(),
     })
+
+
+def test_pw_build_output_trajectory_sampling(generate_structure):
+    """Test the sub-sampling of the frames and the precision of the trajectory in `build_output_trajectory`."""
+    from aiida_quantumespresso.parsers.pw import PwParser
+
+    structure = generate_structure()
+    num_frames = 10
+    positions = np.random.rand(num_frames, len(structure.sites), 3)
+    forces = np.random.rand(num_frames, len(structure.sites), 3)
+    energy = np.random.rand(num_frames)
+
+    def get_parsed_trajectory():
+        return {'atomic_positions_relax': positions, 'forces': forces, 'energy': energy}
+
+    full = PwParser.build_output_trajectory(get_parsed_trajectory(), structure)
+    sampled = PwParser.build_output_trajectory(
+        get_parsed_trajectory(), structure, frames=slice(-5, None, 2), dtype=np.dtype('float32')
+    )
+
+    assert full.numsteps == num_frames
+    assert sampled.get_stepids().tolist() == [5, 7, 9]
+
+    for name in ['positions', 'cells', 'forces']:
+        assert sampled.get_array(name).dtype == np.float32
+        np.testing.assert_allclose(sampled.get_array(name), full.get_array(name)[-5::2], rtol=1e-6)
+
+    # The scalar observables are stored at full resolution
+    np.testing.assert_array_equal(sampled.get_array('energy'), energy)
+
+
+def test_pw_trajectory_sampling_ignored(fixture_localhost, generate_calc_job_node, generate_parser, generate_inputs):
+    """Test that the `trajectory_*` parser options are ignored for calculations other than `md` and `vc-md`."""
+    parser_options = {'trajectory_window': -3, 'trajectory_stride': 2, 'trajectory_dtype': 'float32'}
+    inputs = generate_inputs(calculation_type='vc-relax', settings={'parser_options': parser_options})
+    node = generate_calc_job_node('quantumespresso.pw', fixture_localhost, 'vcrelax_success', inputs)
+    results, calcfunction = generate_parser('quantumespresso.pw').parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.is_finished_ok, calcfunction.exit_message
+    assert results['output_trajectory'].numsteps == 4
+    assert results['output_trajectory'].get_array('positions').dtype == np.float64
+    assert any('trajectory_' in log.message for log in orm.Log.collection.get_logs_for(node))
+
+
+@pytest.mark.parametrize('fractional', (True, False))
+def test_pw_build_output_trajectory_chunk_size(tmp_path, generate_structure, fractional):
+    """Test that building the trajectory from frames that were written to files gives the same result as in memory."""
+    from aiida_quantumespresso.parsers.pw import PwParser
+    from aiida_quantumespresso.utils.trajectory import TrajectoryFrames
+
+    structure = generate_structure()
+    num_frames = 7
+    key = 'atomic_fractionals_relax' if fractional else 'atomic_positions_relax'
+    positions = np.random.rand(num_frames, len(structure.sites), 3).tolist()
+    cells = np.random.rand(num_frames, 3, 3).tolist()
+    forces = np.random.rand(num_frames, len(structure.sites), 3).tolist()
+    energy = np.random.rand(num_frames).tolist()
+
+    def get_frames(name, values):
+        frames = TrajectoryFrames(tmp_path / f'{name}.bin', chunk_size=3)
+        for value in values:
+            frames.append(value)
+        return frames
+
+    full = PwParser.build_output_trajectory({
+        key: positions,
+        'lattice_vectors_relax': cells,
+        'forces': forces,
+        'energy': energy,
+    }, structure)
+    chunked = PwParser.build_output_trajectory({
+        key: get_frames(key, positions),
+        'lattice_vectors_relax': get_frames('lattice_vectors_relax', cells),
+        'forces': get_frames('forces', forces),
+        'energy': energy,
+    }, structure)
+
+    assert sorted(chunked.get_arraynames()) == sorted(full.get_arraynames())
+
+    for name in full.get_arraynames():
+        np.testing.assert_allclose(chunked.get_array(name), full.get_array(name), rtol=1e-15)
+
+
+def test_pw_trajectory_chunk_size(fixture_localhost, generate_calc_job_node, generate_parser, generate_inputs):
+    """Test that the `trajectory_chunk_size` parser option gives the same trajectory as parsing it in memory."""
+    trajectories = []
+
+    for settings in (None, {'parser_options': {'trajectory_chunk_size': 2}}):
+        inputs = generate_inputs(calculation_type='vc-relax', settings=settings)
+        node = generate_calc_job_node('quantumespresso.pw', fixture_localhost, 'vcrelax_success', inputs)
+        results, calcfunction = generate_parser('quantumespresso.pw').parse_from_node(node, store_provenance=False)
+
+        assert calcfunction.is_finished_ok, calcfunction.exit_message
+        trajectories.append(results['output_trajectory'])
+
+    full, chunked = trajectories
+
+    assert sorted(chunked.get_arraynames()) == sorted(full.get_arraynames())
+
+    for name in full.get_arraynames():
+        np.testing.assert_array_equal(chunked.get_array(name), full.get_array(name))
+
+
+def test_pw_output_parameters_arrays(fixture_localhost, generate_calc_job_node, generate_parser, generate_inputs):
+    """Test that the ``output_parameters_arrays`` parser option moves the list-valued output parameters to arrays."""
+    from aiida_quantumespresso.parsers.pw import PwParser
+
+    name = 'default'
+    entry_point_calc_job = 'quantumespresso.pw'
+    entry_point_parser = 'quantumespresso.pw'
+
+    node = generate_calc_job_node(entry_point_calc_job, fixture_localhost, name, generate_inputs())
+    parser = generate_parser(entry_point_parser)
+    results, _ = parser.parse_from_node(node, store_provenance=False)
+    expected = results['output_parameters'].get_dict()
+
+    inputs = generate_inputs(settings={'parser_options': {'output_parameters_arrays': True}})
+    node = generate_calc_job_node(entry_point_calc_job, fixture_localhost, name, inputs)
+    results, calcfunction = parser.parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.is_finished_ok, calcfunction.exit_message
+    assert 'output_parameters_arrays' in results
+
+    parameters = results['output_parameters'].get_dict()
+    arrays = results['output_parameters_arrays']
+
+    for key, value in expected.items():
+        if key not in PwParser.OUTPUT_PARAMETERS_ARRAYS or value == []:
+            assert parameters[key] == value
+            continue
+
+        assert key not in parameters
+
+        if isinstance(value[0], dict):
+            for field in value[0]:
+                assert arrays.get_array(f'{key}_{field}').tolist() == [record[field] for record in value]
+        else:
+            assert arrays.get_array(key).tolist() == value
+
+    assert 'symmetries_symmetry_number' in arrays.get_arraynames()
+
+    # The small vectors that are useful in queries are never moved
+    for key in ('fft_grid', 'smooth_fft_grid', 'monkhorst_pack_grid', 'monkhorst_pack_offset'):
+        assert parameters[key] == expected[key]
+
+
+def test_pw_output_parameters_arrays_occupations():
+    """Test the conversion of the Hubbard atomic occupations for the ``output_parameters_arrays`` parser option."""
+    from aiida_quantumespresso.parsers.pw import PwParser
+
+    convert = PwParser.OUTPUT_PARAMETERS_ARRAYS['atomic_occupations']
+    occupations = {
+        '1': dict(up='4.957', down='3.041', total='7.998'),
+        '2': dict(up='3.041', down='4.957', total='7.998'),
+    }
+    arrays = convert('atomic_occupations', occupations)
+
+    assert arrays['atomic_occupations_index'].tolist() == [1, 2]
+    assert arrays['atomic_occupations_up'].tolist() == [4.957, 3.041]
+    assert arrays['atomic_occupations_down'].tolist() == [3.041, 4.957]
+    assert arrays['atomic_occupations_total'].tolist() == [7.998, 7.998]
+
+    with pytest.raises(ValueError):
+        convert('atomic_occupations', {'1': dict(total='7.998'), '2': dict(up='4.957', down='3.041', total='7.998')})
+
+
+def test_get_symmetry_table():
+    """Test that the symmetry table is consistent with the symmetry mapping and only built once."""
+    from aiida_quantumespresso.parsers.parse_raw.pw import get_symmetry_mapping, get_symmetry_table
+
+    table = get_symmetry_table()
+    mapping = get_symmetry_mapping()
+
+    assert get_symmetry_table() is table
+    assert table.matrices.shape == (len(mapping), 3, 3)
+    assert not table.matrices.flags.writeable
+
+    for index, symmetry in enumerate(mapping):
+        assert table.names[index] == symmetry['name']
+        assert table.indices[symmetry['name'].strip()] == index
+        assert table.inversions[index] == symmetry['inversion']
+        np.testing.assert_array_equal(table.matrices[index], symmetry['matrix'])
+
+
+@pytest.mark.parametrize('profile', (False, True))
+def test_pw_parser_timings(fixture_localhost, generate_calc_job_node, generate_parser, generate_inputs, profile):
+    """Test that the ``timings`` and ``profile`` parser options store the timings of the parsing phases as extras."""
+    name = 'default_xml_241015'
+    entry_point_calc_job = 'quantumespresso.pw'
+    entry_point_parser = 'quantumespresso.pw'
+
+    parser_options = {'profile': True} if profile else {'timings': True}
+    inputs = generate_inputs(settings={'parser_options': parser_options})
+    node = generate_calc_job_node(entry_point_calc_job, fixture_localhost, name, inputs)
+    parser = generate_parser(entry_point_parser)
+    results, calcfunction = parser.parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.is_finished_ok, calcfunction.exit_message
+    assert 'output_parameters' in results
+
+    timings = node.base.extras.get('parser_timings')
+    assert {'stdout', 'xml', 'xml_schema', 'xml_decode', 'outputs', 'total'}.issubset(timings)
+    assert all(timings[phase] <= timings['total'] for phase in timings)
+    assert ('pw.py' in node.base.extras.get('parser_profile', '')) is profile
+
+
+def test_pw_parser_no_timings(fixture_localhost, generate_calc_job_node, generate_parser, generate_inputs):
+    """Test that no timings are stored by default."""
+    node = generate_calc_job_node('quantumespresso.pw', fixture_localhost, 'default', generate_inputs())
+    parser = generate_parser('quantumespresso.pw')
+    parser.parse_from_node(node, store_provenance=False)
+
+    assert 'parser_timings' not in node.base.extras.keys()
+
+
+def test_pw_get_extended_symmetries(fixture_localhost, generate_calc_job_node, generate_parser, generate_inputs):
+    """Test ``PwParser.get_extended_symmetries`` expands the reduced symmetries and skips unknown symmetry numbers."""
+    from aiida.common import LinkType
+
+    from aiida_quantumespresso.parsers.parse_raw.pw import get_symmetry_mapping
+
+    node = generate_calc_job_node('quantumespresso.pw', fixture_localhost, 'default', generate_inputs())
+    symmetries = [{'symmetry_number': number, 't_rev': '0'} for number in (0, 3, -1, 64)]
+    output_parameters = orm.Dict({'symmetries': symmetries})
+    output_parameters.base.links.add_incoming(node, link_type=LinkType.CREATE, link_label='output_parameters')
+    output_parameters.store()
+
+    symmetries_extended = generate_parser('quantumespresso.pw')(node).get_extended_symmetries()
+    possible_symmetries = get_symmetry_mapping()
+
+    assert symmetries_extended == [{
+        't_rev': '0',
+        'name': possible_symmetries[number]['name'],
+        'rotation': possible_symmetries[number]['matrix'].tolist(),
+        'inversion': possible_symmetries[number]['inversion'],
+    } for number in (0, 3)]
+    assert isinstance(symmetries_extended[0]['rotation'], list)
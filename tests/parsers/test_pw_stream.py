@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-outer-name
+"""Tests for the streaming parser of the stdout of `pw.x` in :mod:`aiida_quantumespresso.parsers.parse_raw.pw_stream`.
+
+For each of the ``pw.x`` output fixtures, the parsed data and logs are compared to the stored reference results.
+"""
+import copy
+import io
+import pathlib
+
+import numpy
+import pytest
+
+from aiida_quantumespresso.parsers.parse_raw.pw_stream import (
+    PwStdoutParser,
+    PwStdoutState,
+    iterate_lines,
+    parse_stdout_stream,
+    parse_stdout_tail,
+)
+
+FILEPATH_FIXTURES = pathlib.Path(__file__).parent / 'fixtures' / 'pw'
+FIXTURES = sorted(path.name for path in FILEPATH_FIXTURES.iterdir() if (path / 'aiida.out').is_file())
+
+
+def get_parsed_xml(dirpath):
+    """Return the data parsed from the XML output in the given fixture directory or ``None`` if it cannot be parsed."""
+    from aiida_quantumespresso.parsers.parse_xml.pw.parse import parse_xml
+
+    for filename in ['data-file-schema.xml', 'data-file.xml']:
+        filepath = dirpath / filename
+        if filepath.is_file():
+            try:
+                with filepath.open('r') as handle:
+                    return parse_xml(handle, dir_with_bands=str(dirpath))[0]
+            except Exception:  # pylint: disable=broad-except
+                return None
+    return None
+
+
+def normalize_logs(logs):
+    """Return the sorted log messages per level with tracebacks removed, as those differ between implementations."""
+    return {key: sorted(message.split('Traceback')[0] for message in value) for key, value in logs.items()}
+
+
+def serialize(value):
+    """Return the value with all NumPy arrays, NumPy scalars and tuples converted to their builtin counterparts."""
+    if isinstance(value, dict):
+        return {key: serialize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, numpy.ndarray)):
+        return [serialize(item) for item in value]
+    if isinstance(value, numpy.generic):
+        return value.item()
+    return value
+
+
+def parse(stdout, parameters, parser_options=None, parsed_xml=None, crash_file=None):
+    """Parse the stdout from a file handle and return the serialized results or the raised exception type."""
+    arguments = (parameters, parser_options, copy.deepcopy(parsed_xml), crash_file)
+
+    try:
+        parsed_data, logs = parse_stdout_stream(io.StringIO(stdout), *copy.deepcopy(arguments))
+    except Exception as exception:  # pylint: disable=broad-except
+        return {'exception': type(exception).__name__}
+
+    return {'parsed_data': serialize(parsed_data), 'logs': normalize_logs(logs)}
+
+
+@pytest.mark.parametrize('content', ('', 'a', 'a\n', 'a\nb', 'a\nb\n', '\n\n'))
+def test_iterate_lines(content):
+    r"""Test that ``iterate_lines`` yields the same lines as ``str.split('\n')``."""
+    assert list(iterate_lines(io.StringIO(content))) == content.split('\n')
+
+
+@pytest.mark.parametrize('fixture', FIXTURES)
+@pytest.mark.parametrize('with_xml', (True, False))
+def test_parse_stdout_stream(fixture, with_xml, data_regression):
+    """Test the results of the streaming parser for all ``pw.x`` fixtures against the stored reference results."""
+    dirpath = FILEPATH_FIXTURES / fixture
+    stdout = (dirpath / 'aiida.out').read_text()
+    crash_file = (dirpath / 'CRASH').read_text() if (dirpath / 'CRASH').is_file() else None
+    parsed_xml = get_parsed_xml(dirpath) if with_xml else None
+
+    if with_xml and parsed_xml is None:
+        pytest.skip('fixture does not contain a parsable XML output file')
+
+    results = {}
+    variants = (
+        ('scf', dict(CONTROL=dict(calculation='scf')), None, crash_file),
+        ('atomic_occupations', dict(SYSTEM=dict(nspin=2)), dict(parse_atomic_occupations=True), crash_file),
+        ('lelfield', dict(CONTROL=dict(lelfield=True)), {}, None),
+    )
+
+    for key, parameters, parser_options, crash in variants:
+        results[key] = parse(stdout, parameters, parser_options, parsed_xml, crash)
+
+    data_regression.check(results)
+
+
+def test_parse_stdout_stream_string():
+    """Test that ``parse_stdout_stream`` gives the same results for the stdout content as a string or a file handle."""
+    filepath = FILEPATH_FIXTURES / 'default' / 'aiida.out'
+    parsed_data, logs = parse_stdout_stream(filepath.read_text(), {})
+
+    with filepath.open('r') as handle:
+        expected_data, expected_logs = parse_stdout_stream(handle, {})
+
+    assert parsed_data == expected_data
+    assert sorted(logs.error) == sorted(expected_logs.error)
+
+
+def test_pw_stdout_parser_feed():
+    """Test that feeding lines one at a time to ``PwStdoutParser`` gives the same result as ``parse_stdout_stream``."""
+    stdout = (FILEPATH_FIXTURES / 'relax_success' / 'aiida.out').read_text()
+    parser = PwStdoutParser({})
+
+    for line in stdout.split('\n'):
+        parser.feed(line)
+
+    parsed_data, _ = parser.finalize()
+    expected_data, _ = parse_stdout_stream(io.StringIO(stdout), {})
+
+    assert parsed_data == expected_data
+
+
+def test_incomplete_header():
+    """Test that an output without the basic information returns only the detected messages."""
+    stdout = '\n'.join(['     Program PWSCF v.6.4.1 starts on', '     Error in routine cdiaghg (1):'])
+    parsed_data, logs = parse_stdout_stream(stdout, {})
+
+    assert parsed_data == {'trajectory': {}}
+    assert 'ERROR_OUTPUT_STDOUT_INCOMPLETE' in logs.error
+
+
+@pytest.mark.parametrize('chunk_size', (1, 97, 4096, None))
+def test_parse_stdout_tail(chunk_size):
+    """Test that parsing the stdout in chunks with ``parse_stdout_tail`` gives the same trajectory as in one go."""
+    content = (FILEPATH_FIXTURES / 'vcrelax_success' / 'aiida.out').read_bytes()
+    chunk_size = chunk_size or len(content)
+    state = PwStdoutState({})
+    trajectory = {}
+    written = 0
+
+    # Simulate a file that is being written in chunks that do not respect line boundaries, reading it from the offset
+    while written < len(content):
+        written += chunk_size
+        offset = state.offset
+        for key, values in parse_stdout_tail(content[offset:written], state).items():
+            trajectory.setdefault(key, []).extend(values)
+        assert state.offset <= written
+        assert content[state.offset - 1:state.offset] in (b'', b'\n')
+
+    parsed_data, _ = parse_stdout_stream(content.decode(), {})
+
+    assert state.offset == len(content)
+    assert state.job_done
+    assert trajectory == parse_stdout_tail(content, PwStdoutState({}))
+    assert trajectory['energy'] == parsed_data['trajectory']['energy']
+    assert trajectory['forces'] == parsed_data['trajectory']['forces']
+    assert trajectory['energy_threshold'] == parsed_data['trajectory']['energy_threshold']
+    assert not parse_stdout_tail(b'', state)
+
+
+def test_parse_stdout_tail_incomplete_line():
+    """Test that a trailing line without a line terminator is only parsed once it has been completed."""
+    state = PwStdoutState({})
+
+    assert not parse_stdout_tail(b'     lattice parameter (alat)  =  10.2', state)
+    assert state.offset == 0
+
+    parse_stdout_tail(b'     lattice parameter (alat)  =  10.2000  a.u.\n     JOB', state)
+    assert state.offset == 48
+    assert state.parser.header['alat'] == 10.2
+    assert not state.job_done
+
+    parse_stdout_tail(b'     JOB DONE.\n', state)
+    assert state.job_done
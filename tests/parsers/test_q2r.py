@@ -22,3 +22,21 @@ def test_q2r_default(fixture_localhost, generate_calc_job_node, generate_parser,
     assert not orm.Log.collection.get_logs_for(node)
     assert 'force_constants' in results
     data_regression.check(results['force_constants'].get_content())
+
+
+def test_q2r_force_constants_array(fixture_localhost, generate_calc_job_node, generate_parser):
+    """Test the ``force_constants_array`` parser option stores the parsed force constants as an array."""
+    entry_point_calc_job = 'quantumespresso.q2r'
+    entry_point_parser = 'quantumespresso.q2r'
+
+    inputs = {'settings': orm.Dict({'parser_options': {'force_constants_array': True}})}
+    node = generate_calc_job_node(entry_point_calc_job, fixture_localhost, 'default', inputs)
+    parser = generate_parser(entry_point_parser)
+    results, calcfunction = parser.parse_from_node(node, store_provenance=False)
+
+    assert calcfunction.is_finished_ok, calcfunction.exit_message
+    assert 'force_constants_array' in results
+
+    force_constants = results['force_constants_array'].get_array('force_constants')
+    assert force_constants.shape == results['force_constants'].qpoints_mesh + (3, 3, 2, 2)
+    assert (force_constants == results['force_constants'].force_constants).all()
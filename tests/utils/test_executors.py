@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""Tests for the :mod:`aiida_quantumespresso.utils.executors` module."""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from aiida_quantumespresso.utils.executors import get_executor
+
+
+@pytest.mark.parametrize(('executor', 'cls'), (('thread', ThreadPoolExecutor), ('process', ProcessPoolExecutor)))
+def test_get_executor(executor, cls):
+    """Test :func:`get_executor` returns a working pool of the requested type."""
+    with get_executor(executor, 2) as pool:
+        assert isinstance(pool, cls)
+        assert list(pool.map(abs, [-1, 2, -3])) == [1, 2, 3]
+
+
+def test_get_executor_process_spawn():
+    """Test :func:`get_executor` never forks the current process for a ``process`` pool."""
+    with get_executor('process', 1) as pool:
+        assert pool._mp_context.get_start_method() == 'spawn'  # pylint: disable=protected-access
+
+
+def test_get_executor_invalid():
+    """Test :func:`get_executor` raises for an unsupported type of pool."""
+    with pytest.raises(ValueError, match='invalid executor'):
+        get_executor('fork', 2)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""Tests for the :mod:`aiida_quantumespresso.utils.profiling` module."""
+import time
+
+from aiida_quantumespresso.utils.profiling import record_timings, timed
+
+
+def test_timed_without_recording():
+    """Test that :func:`timed` is a no-op outside of a :func:`record_timings` context."""
+    with timed('phase'):
+        pass
+
+
+def test_record_timings():
+    """Test the timings recorded by :func:`record_timings`."""
+    with record_timings() as result:
+        for _ in range(2):
+            with timed('outer'):
+                with timed('inner'):
+                    time.sleep(0.01)
+
+    timings = result['timings']
+    assert set(timings) == {'outer', 'inner', 'total'}
+    assert 0.02 <= timings['inner'] <= timings['outer'] <= timings['total']
+    assert 'profile' not in result
+
+    # The recording is no longer active once the context has exited
+    with timed('after'):
+        pass
+
+    assert 'after' not in result['timings']
+
+
+def test_record_timings_profile():
+    """Test that :func:`record_timings` profiles the block if requested."""
+
+    def profiled_function():
+        return sum(range(100))
+
+    with record_timings(profile=True) as result:
+        profiled_function()
+
+    assert 'total' in result['timings']
+    assert 'profiled_function' in result['profile']
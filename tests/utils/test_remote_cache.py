@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=redefined-outer-name
+"""Tests for the :mod:`aiida_quantumespresso.utils.remote_cache` module."""
+import hashlib
+
+import pytest
+
+from aiida_quantumespresso.utils.remote_cache import (
+    get_remote_cache_copy_lists,
+    get_remote_cache_entries,
+    get_remote_cache_filename,
+    stage_remote_cache,
+    verify_remote_cache,
+)
+
+
+@pytest.fixture
+def pseudo(generate_upf_data):
+    """Return a stored ``UpfData`` node."""
+    return generate_upf_data('Si').store()
+
+
+def test_get_remote_cache_filename(pseudo):
+    """Test :func:`get_remote_cache_filename`."""
+    md5 = hashlib.md5(pseudo.get_content(mode='rb')).hexdigest()
+    assert get_remote_cache_filename(pseudo) == f'{md5}.upf'
+
+
+def test_stage_remote_cache(fixture_localhost, pseudo, tmp_path):
+    """Test that :func:`stage_remote_cache` uploads the files once and records them on the computer."""
+    dirpath = tmp_path / 'cache'
+    filename = get_remote_cache_filename(pseudo)
+
+    assert stage_remote_cache(fixture_localhost, [pseudo], dirpath) == {pseudo.uuid: filename}
+    assert (dirpath / filename).read_bytes() == pseudo.get_content(mode='rb')
+    assert get_remote_cache_entries(fixture_localhost, dirpath) == {filename}
+    assert sorted(path.name for path in dirpath.iterdir()) == [filename]
+
+    # A file that does not match its checksum is uploaded again
+    (dirpath / filename).write_text('corrupted')
+    stage_remote_cache(fixture_localhost, [pseudo], dirpath)
+    assert (dirpath / filename).read_bytes() == pseudo.get_content(mode='rb')
+
+
+def test_stage_remote_cache_relative(fixture_localhost, pseudo):
+    """Test that :func:`stage_remote_cache` raises for a relative cache directory."""
+    with pytest.raises(ValueError, match='absolute path'):
+        stage_remote_cache(fixture_localhost, [pseudo], 'cache')
+
+
+def test_verify_remote_cache(fixture_localhost, pseudo, tmp_path):
+    """Test that :func:`verify_remote_cache` removes the missing files from the record."""
+    filename = stage_remote_cache(fixture_localhost, [pseudo], tmp_path)[pseudo.uuid]
+
+    assert verify_remote_cache(fixture_localhost, tmp_path) == set()
+    assert get_remote_cache_entries(fixture_localhost, tmp_path) == {filename}
+
+    (tmp_path / filename).unlink()
+
+    assert verify_remote_cache(fixture_localhost, tmp_path) == {filename}
+    assert get_remote_cache_entries(fixture_localhost, tmp_path) == set()
+
+
+def test_get_remote_cache_copy_lists(fixture_localhost, generate_upf_data, pseudo, tmp_path):
+    """Test that :func:`get_remote_cache_copy_lists` only symlinks the files that are staged in the cache."""
+    filename = stage_remote_cache(fixture_localhost, [pseudo], tmp_path)[pseudo.uuid]
+    other = generate_upf_data('O').store()
+    local_copy_list = [
+        (pseudo.uuid, pseudo.filename, './pseudo/Si.upf'),
+        (other.uuid, other.filename, './pseudo/O.upf'),
+    ]
+
+    local_copy_list, remote_symlink_list = get_remote_cache_copy_lists(fixture_localhost, tmp_path, local_copy_list)
+
+    assert local_copy_list == [(other.uuid, other.filename, './pseudo/O.upf')]
+    assert remote_symlink_list == [(fixture_localhost.uuid, str(tmp_path / filename), './pseudo/Si.upf')]
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""Tests for the :mod:`aiida_quantumespresso.utils.resources` module."""
+import pytest
+
+from aiida_quantumespresso.utils.resources import (
+    cmdline_remove_npools,
+    get_automatic_parallelization,
+    get_irreducible_kpoints_count,
+    get_memory_aware_resources,
+    get_number_of_bands_estimate,
+    get_ram_in_megabytes,
+)
+
+
+def test_cmdline_remove_npools():
+    """Test :func:`cmdline_remove_npools`."""
+    assert cmdline_remove_npools(['-nk', '4', '-ntg', '8', '-npools', '2']) == ['-ntg', '8']
+
+
+@pytest.mark.parametrize(('mesh', 'offset', 'use_symmetry', 'use_time_reversal', 'expected'), (
+    ((2, 2, 2), (0., 0., 0.), True, True, 3),
+    ((4, 4, 4), (0.5, 0.5, 0.5), True, True, 10),
+    ((2, 2, 2), (0., 0., 0.), False, True, 8),
+    ((3, 3, 3), (0., 0., 0.), False, True, 14),
+    ((3, 3, 3), (0., 0., 0.), False, False, 27),
+))
+def test_get_irreducible_kpoints_count(generate_structure, mesh, offset, use_symmetry, use_time_reversal, expected):
+    """Test :func:`get_irreducible_kpoints_count` for a k-point mesh of silicon."""
+    from aiida.orm import KpointsData
+
+    kpoints = KpointsData()
+    kpoints.set_kpoints_mesh(mesh, offset)
+
+    assert get_irreducible_kpoints_count(generate_structure(), kpoints, use_symmetry, use_time_reversal) == expected
+
+
+def test_get_irreducible_kpoints_count_list(generate_structure):
+    """Test :func:`get_irreducible_kpoints_count` for an explicit list of k-points."""
+    from aiida.orm import KpointsData
+
+    kpoints = KpointsData()
+    kpoints.set_kpoints([[0., 0., 0.], [0.5, 0., 0.], [0.5, 0.5, 0.]])
+
+    assert get_irreducible_kpoints_count(generate_structure(), kpoints) == 3
+
+
+@pytest.mark.parametrize(('num_electrons', 'occupations', 'noncolin', 'expected'), (
+    (8, 'fixed', False, 4),
+    (9, 'fixed', False, 5),
+    (8, 'smearing', False, 8),
+    (100, 'smearing', False, 60),
+    (8, 'smearing', True, 12),
+))
+def test_get_number_of_bands_estimate(num_electrons, occupations, noncolin, expected):
+    """Test :func:`get_number_of_bands_estimate`."""
+    assert get_number_of_bands_estimate(num_electrons, occupations, noncolin) == expected
+
+
+@pytest.mark.parametrize(('arguments', 'expected'), (
+    ((1, 10, 20, 30), dict(npool=1, nband=1, ndiag=1)),
+    ((48, 48, 20, 30), dict(npool=48, nband=1, ndiag=1)),
+    ((48, 10, 20, 30), dict(npool=2, nband=1, ndiag=1)),
+    ((256, 4, 400, 60), dict(npool=4, nband=2, ndiag=16)),
+    ((128, 1, 2000, 40), dict(npool=1, nband=4, ndiag=25)),
+))
+def test_get_automatic_parallelization(arguments, expected):
+    """Test :func:`get_automatic_parallelization`."""
+    parallelization = get_automatic_parallelization(*arguments)
+
+    assert parallelization == expected
+    assert arguments[0] % (parallelization['npool'] * parallelization['nband']) == 0
+    assert parallelization['npool'] <= arguments[1]
+
+
+def test_get_automatic_parallelization_machines():
+    """Test that :func:`get_automatic_parallelization` avoids pools that are split over multiple machines."""
+    assert get_automatic_parallelization(96, 3, 20, 100)['npool'] == 3
+    assert get_automatic_parallelization(96, 3, 20, 100, num_mpiprocs_per_machine=48)['npool'] == 1
+
+
+def test_get_automatic_parallelization_invalid():
+    """Test that :func:`get_automatic_parallelization` raises for invalid arguments."""
+    with pytest.raises(ValueError):
+        get_automatic_parallelization(4, 0, 20, 30)
+
+
+def test_get_ram_in_megabytes():
+    """Test :func:`get_ram_in_megabytes`."""
+    assert get_ram_in_megabytes(12.5, 'MB') == 12.5
+    assert get_ram_in_megabytes(12.5, 'Mb') == 12.5
+    assert get_ram_in_megabytes(2., 'GB') == 2048.
+
+    with pytest.raises(ValueError):
+        get_ram_in_megabytes(2., 'TB')
+
+
+@pytest.mark.parametrize(('arguments', 'expected'), (
+    (dict(max_memory_per_machine=10000), (1, 4)),
+    (dict(max_memory_per_machine=5000), (1, 2)),
+    (dict(max_memory_per_machine=5000, max_npool=1), (1, 1)),
+    (dict(max_memory_per_machine=2000, max_num_machines=4), (2, 1)),
+    (dict(max_memory_per_machine=2000, num_machines=4, max_num_machines=2), (4, 2)),
+))
+def test_get_memory_aware_resources(arguments, expected):
+    """Test :func:`get_memory_aware_resources` for pools of 2500 MB on machines with 8 processes."""
+    assert get_memory_aware_resources(2500, num_mpiprocs_per_machine=8, **arguments) == expected
+
+
+def test_get_memory_aware_resources_insufficient():
+    """Test that :func:`get_memory_aware_resources` raises if a single pool does not fit on the machines."""
+    with pytest.raises(ValueError, match='exceeds the budget'):
+        get_memory_aware_resources(2500, 2000, 8, max_num_machines=1)
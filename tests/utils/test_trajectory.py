@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""Tests for the :mod:`aiida_quantumespresso.utils.trajectory` module."""
+import numpy
+import pytest
+
+from aiida_quantumespresso.utils.trajectory import get_trajectory_sampling, sample_trajectory_array
+
+
+@pytest.mark.parametrize(('parser_options', 'expected'), (
+    ({}, list(range(10))),
+    (dict(trajectory_stride=3), [0, 3, 6, 9]),
+    (dict(trajectory_window=4), [0, 1, 2, 3]),
+    (dict(trajectory_window=-4), [6, 7, 8, 9]),
+    (dict(trajectory_window=-5, trajectory_stride=2), [5, 7, 9]),
+    (dict(trajectory_window=20), list(range(10))),
+))
+def test_get_trajectory_sampling(parser_options, expected):
+    """Test the frames selected by :func:`get_trajectory_sampling`."""
+    frames, dtype = get_trajectory_sampling(parser_options)
+    assert list(range(10))[frames] == expected
+    assert dtype == numpy.float64
+
+
+@pytest.mark.parametrize(
+    'parser_options', (
+        dict(trajectory_stride=0),
+        dict(trajectory_stride=1.5),
+        dict(trajectory_stride=True),
+        dict(trajectory_window=0),
+        dict(trajectory_window='last'),
+        dict(trajectory_dtype='float16'),
+    )
+)
+def test_get_trajectory_sampling_invalid(parser_options):
+    """Test that :func:`get_trajectory_sampling` raises for invalid options."""
+    with pytest.raises(ValueError):
+        get_trajectory_sampling(parser_options)
+
+
+def test_sample_trajectory_array():
+    """Test :func:`sample_trajectory_array`."""
+    array = numpy.arange(24, dtype=float).reshape(4, 2, 3)
+
+    sampled = sample_trajectory_array(array, slice(None, None, 2), numpy.dtype('float32'))
+    assert sampled.dtype == numpy.float32
+    numpy.testing.assert_array_equal(sampled, array[::2])
+
+    # Arrays that do not contain floating point values keep their type
+    assert sample_trajectory_array(numpy.arange(4), slice(1, None), numpy.dtype('float32')).tolist() == [1, 2, 3]
+    assert sample_trajectory_array(array) is not None
+    numpy.testing.assert_array_equal(sample_trajectory_array(array), array)
+
+
+@pytest.mark.parametrize('chunk_size', (1, 3, 4, 100))
+def test_trajectory_array_writer(tmp_path, chunk_size):
+    """Test that the :class:`TrajectoryArrayWriter` returns all appended frames in order."""
+    from aiida_quantumespresso.utils.trajectory import TrajectoryArrayWriter
+
+    frames = numpy.random.rand(10, 2, 3)
+
+    with TrajectoryArrayWriter(tmp_path / 'frames.bin', (2, 3), chunk_size=chunk_size) as writer:
+        writer.append(frames[0])
+        writer.extend(frames[1:6])
+        writer.extend(frames[6:6])
+        writer.append(frames[6])
+        writer.extend(frames[7:])
+
+    array = writer.finalize()
+
+    assert isinstance(array, numpy.memmap)
+    assert writer.num_frames == 10
+    numpy.testing.assert_array_equal(array, frames)
+
+
+def test_trajectory_array_writer_empty(tmp_path):
+    """Test :class:`TrajectoryArrayWriter` without any frames and with frames of the wrong shape."""
+    from aiida_quantumespresso.utils.trajectory import TrajectoryArrayWriter
+
+    writer = TrajectoryArrayWriter(tmp_path / 'frames.bin', (2, 3))
+
+    with pytest.raises(ValueError, match='expected frames with shape'):
+        writer.extend(numpy.zeros((1, 3, 3)))
+
+    assert writer.finalize().shape == (0, 2, 3)
+
+
+def test_trajectory_frames(tmp_path):
+    """Test that the :class:`TrajectoryFrames` writes the appended frames to a file in chunks."""
+    from aiida_quantumespresso.utils.trajectory import TrajectoryFrames
+
+    frames = numpy.random.rand(7, 2, 3)
+    container = TrajectoryFrames(tmp_path / 'frames.bin', chunk_size=2)
+
+    assert len(container) == 0
+    assert not (tmp_path / 'frames.bin').exists()
+
+    for frame in frames.tolist():
+        container.append(frame)
+
+    assert len(container) == 7
+
+    with pytest.raises(ValueError, match='expected a frame with shape'):
+        container.append(numpy.zeros((3, 3)))
+
+    array = container.finalize()
+
+    assert isinstance(array, numpy.memmap)
+    numpy.testing.assert_array_equal(array, frames)
+    assert TrajectoryFrames(tmp_path / 'empty.bin', chunk_size=2).finalize().shape == (0,)
+
+
+def test_transform_trajectory_array(tmp_path):
+    """Test :func:`transform_trajectory_array` and the chunked conversion of the precision of memory mapped arrays."""
+    from aiida_quantumespresso.utils.trajectory import TrajectoryArrayWriter, transform_trajectory_array
+
+    frames = numpy.random.rand(7, 2, 3)
+    offsets = numpy.arange(7)[:, None, None]
+
+    def transform(chunk, chunk_slice):
+        return chunk * 2 + offsets[chunk_slice]
+
+    numpy.testing.assert_array_equal(transform_trajectory_array(frames, transform), frames * 2 + offsets)
+
+    with TrajectoryArrayWriter(tmp_path / 'frames.bin', (2, 3)) as writer:
+        writer.extend(frames)
+
+    array = transform_trajectory_array(writer.finalize(), transform, chunk_size=3)
+    assert isinstance(array, numpy.memmap)
+    numpy.testing.assert_array_equal(array, frames * 2 + offsets)
+
+    sampled = sample_trajectory_array(array, slice(None, None, 2), numpy.dtype('float32'))
+    assert isinstance(sampled, numpy.memmap)
+    assert sampled.dtype == numpy.float32
+    numpy.testing.assert_allclose(sampled, (frames * 2 + offsets)[::2], rtol=1e-6)
@@ -380,3 +380,155 @@ def test_restart_mode(generate_workchain_pw, generate_calc_job_node, restart_mod
     process.setup()
 
     assert process.ctx.inputs['parameters']['CONTROL']['restart_mode'] == expected
+
+
+def test_automatic_parallelization(generate_workchain_pw, generate_calc_job_node):
+    """Test that the ``parallelization`` is set and reported if ``automatic_parallelization`` is enabled."""
+    from aiida.orm import Bool
+
+    inputs = generate_workchain_pw(return_inputs=True)
+    inputs['automatic_parallelization'] = Bool(True)
+    inputs['pw']['metadata']['options']['resources'] = {'num_machines': 1, 'num_mpiprocs_per_machine': 6}
+    inputs['pw']['metadata']['options']['withmpi'] = True
+
+    process = generate_workchain_pw(inputs=inputs)
+    process.setup()
+    process.validate_kpoints()
+    process.prepare_process()
+
+    # Silicon with a 2x2x2 mesh has 3 irreducible k-points and 8 valence electrons, so 8 bands with smearing.
+    parallelization = process.ctx.inputs.parallelization.get_dict()
+    assert parallelization == {'npool': 3, 'nband': 1, 'ndiag': 1}
+
+    node = generate_calc_job_node(inputs={'parameters': Dict(), 'parallelization': process.ctx.inputs.parallelization})
+    assert process.get_outputs(node)['automatic_parallelization'].get_dict() == parallelization
+
+
+def test_automatic_parallelization_conflict(generate_workchain_pw):
+    """Test that ``automatic_parallelization`` cannot be combined with an explicit ``pw.parallelization``."""
+    from aiida.orm import Bool
+
+    inputs = generate_workchain_pw(return_inputs=True)
+    inputs['automatic_parallelization'] = Bool(True)
+    inputs['pw']['parallelization'] = Dict({'npool': 2})
+
+    with pytest.raises(ValueError, match='cannot be specified together'):
+        generate_workchain_pw(inputs=inputs)
+
+
+@pytest.mark.parametrize(('max_memory_per_machine', 'max_num_machines', 'expected'), (
+    (8., None, (1, 2)),
+    (2., 2, (2, 1)),
+))
+def test_inspect_init(
+    generate_workchain_pw, generate_calc_job_node, max_memory_per_machine, max_num_machines, expected
+):
+    """Test that ``PwBaseWorkChain.inspect_init`` sets the resources and pools within the memory budget."""
+    from aiida.common import LinkType
+    from aiida.orm import Float, Int
+    from plumpy import ProcessState
+
+    inputs = generate_workchain_pw(return_inputs=True)
+    inputs['max_memory_per_machine'] = Float(max_memory_per_machine)
+    if max_num_machines is not None:
+        inputs['max_num_machines'] = Int(max_num_machines)
+    inputs['pw']['metadata']['options']['resources'] = {'num_machines': 1, 'num_mpiprocs_per_machine': 8}
+    inputs['pw']['metadata']['options']['withmpi'] = True
+    inputs['pw']['parallelization'] = Dict({'npool': 4})
+
+    process = generate_workchain_pw(inputs=inputs)
+    process.setup()
+    assert process.should_run_init()
+
+    # With 4 pools of 2 processes of 1000 MB, each pool requires 2000 MB, which is 2500 MB with the safety factor.
+    node = generate_calc_job_node(inputs={'parameters': Dict(), 'parallelization': Dict({'npool': 4})})
+    output_parameters = Dict({'estimated_ram_per_process': 1000., 'estimated_ram_per_process_units': 'MB'})
+    output_parameters.base.links.add_incoming(node, link_type=LinkType.CREATE, link_label='output_parameters')
+    output_parameters.store()
+    node.set_process_state(ProcessState.FINISHED)
+    node.set_exit_status(0)
+    process.ctx.calculation_init = node
+
+    assert process.inspect_init() is None
+    assert process.ctx.inputs.metadata.options.resources['num_machines'] == expected[0]
+    assert process.ctx.inputs.parallelization['npool'] == expected[1]
+    assert process.ctx.max_npool == expected[1]
+
+
+def test_run_init(generate_workchain_pw, monkeypatch):
+    """Test that ``PwBaseWorkChain.run_init`` launches an initialization calculation with the same inputs."""
+    from aiida.orm import Float
+
+    inputs = generate_workchain_pw(return_inputs=True)
+    inputs['max_memory_per_machine'] = Float(8.)
+
+    process = generate_workchain_pw(inputs=inputs)
+    process.setup()
+    process.validate_kpoints()
+
+    submitted = {}
+
+    def mock_submit(_, **kwargs):
+        submitted.update(kwargs)
+        return process.ctx.children[-1]
+
+    monkeypatch.setattr(process, 'submit', mock_submit)
+    process.run_init()
+
+    assert submitted['settings'].get_dict() == {'ONLY_INITIALIZATION': True}
+    assert submitted['metadata']['call_link_label'] == 'initialization'
+    assert submitted['parameters']['CONTROL']['max_seconds'] == process.ctx.inputs.parameters['CONTROL']['max_seconds']
+    assert 'ONLY_INITIALIZATION' not in process.ctx.inputs.settings
+    assert process.ctx.inputs.metadata['call_link_label'] != 'initialization'
+
+
+def test_inspect_init_insufficient_memory(generate_workchain_pw, generate_calc_job_node):
+    """Test that ``PwBaseWorkChain.inspect_init`` aborts if the memory does not fit, or increases the machines."""
+    from aiida.common import LinkType
+    from aiida.orm import Float, Int
+    from plumpy import ProcessState
+
+    node = generate_calc_job_node(inputs={'parameters': Dict()})
+    output_parameters = Dict({'estimated_ram_per_process': 0.5, 'estimated_ram_per_process_units': 'GB'})
+    output_parameters.base.links.add_incoming(node, link_type=LinkType.CREATE, link_label='output_parameters')
+    output_parameters.store()
+    node.set_process_state(ProcessState.FINISHED)
+    node.set_exit_status(0)
+
+    inputs = generate_workchain_pw(return_inputs=True)
+    inputs['max_memory_per_machine'] = Float(4.)
+    inputs['pw']['metadata']['options']['resources'] = {'num_machines': 1, 'num_mpiprocs_per_machine': 8}
+    inputs['pw']['metadata']['options']['withmpi'] = True
+
+    process = generate_workchain_pw(inputs=inputs)
+    process.setup()
+    process.ctx.calculation_init = node
+    assert process.inspect_init() == PwBaseWorkChain.exit_codes.ERROR_INSUFFICIENT_MEMORY
+
+    inputs['max_num_machines'] = Int(4)
+    process = generate_workchain_pw(inputs=inputs)
+    process.setup()
+    process.ctx.calculation_init = node
+    assert process.inspect_init() is None
+    assert process.ctx.inputs.metadata.options.resources['num_machines'] == 2
+    assert process.ctx.max_npool == 1
+
+
+def test_inspect_init_failed(generate_workchain_pw):
+    """Test that ``PwBaseWorkChain.inspect_init`` aborts if the initialization calculation failed."""
+    process = generate_workchain_pw(exit_code=PwCalculation.exit_codes.ERROR_OUTPUT_STDOUT_MISSING)
+    process.setup()
+    process.ctx.calculation_init = process.ctx.children[-1]
+
+    assert process.inspect_init() == PwBaseWorkChain.exit_codes.ERROR_INITIALIZATION_CALCULATION_FAILED
+
+
+def test_max_num_machines_requires_memory(generate_workchain_pw):
+    """Test that ``max_num_machines`` can only be specified together with ``max_memory_per_machine``."""
+    from aiida.orm import Int
+
+    inputs = generate_workchain_pw(return_inputs=True)
+    inputs['max_num_machines'] = Int(2)
+
+    with pytest.raises(ValueError, match='only be specified together'):
+        generate_workchain_pw(inputs=inputs)